@@ -0,0 +1,191 @@
+"""Functions for copying a finished build into a test run. Builds are never copied
+outright; their files are symlinked, hardlinked or reflinked (copy-on-write
+cloned) instead, except for those the test asks to have really copied. See
+TestBuilder.copy_build()."""
+
+import errno
+import fcntl
+import glob
+import os
+import shutil
+import stat
+from pathlib import Path
+from typing import Callable, List, Set
+
+from pavilion.errors import TestBuilderError
+
+COPY_METHODS = ('symlink', 'toplevel', 'hardlink', 'reflink')
+"""The ways a build can be copied into a test run. See copy_tree()."""
+
+# The Linux FICLONE ioctl request number (_IOW(0x94, 9, int)).
+_FICLONE = 0x40049409
+
+# Errors that mean a hardlink or reflink isn't possible for the build
+# directory's filesystem (or between it and the destination's).
+_LINK_UNSUPPORTED = (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.EOPNOTSUPP,
+                     errno.EINVAL, errno.ENOTTY, errno.EBADF)
+
+
+def find_copy_files(build_path: Path, copy_globs: List[str]) -> Set[str]:
+    """Find all the build files that should be actually copied (rather than
+    linked) according to the given 'copy_files' globs.
+
+    :raises TestBuilderError: When a glob doesn't match anything.
+    """
+
+    do_copy = set()
+    for copy_glob in copy_globs:
+        final_glob = build_path.as_posix() + '/' + copy_glob
+        blob = glob.glob(final_glob, recursive=True)
+        if not blob:
+            avail = '\n'.join(glob.glob(final_glob.rsplit('/')[0]))
+            raise TestBuilderError(
+                "Could not perform build copy. Files meant to be fully copied ("
+                "rather than symlinked) could not be found:\n"
+                "base_glob: {}\n"
+                "full_glob: {}\n"
+                "These files were available in the top glob dir: {}"
+                .format(copy_glob, final_glob, avail))
+
+        do_copy.update(blob)
+
+    return do_copy
+
+
+def writable_copy(src, dst):
+    """Make a regular, writable copy of the file src at dst."""
+
+    cpy_path = shutil.copy2(src, dst)
+    base_mode = os.stat(cpy_path).st_mode
+    os.chmod(cpy_path, base_mode | stat.S_IWUSR | stat.S_IWGRP)
+    return cpy_path
+
+
+def symlink(src, dst):
+    """Symlink dst to the real path of src."""
+
+    return os.symlink(os.path.realpath(src), dst)
+
+
+def reflink(src, dst):
+    """Make a copy-on-write clone of the file src at dst. Like copy_files,
+    the clone is writable, since changing it can't affect the build.
+
+    :raises OSError: When the filesystem doesn't support reflinks.
+    """
+
+    with open(src, 'rb') as src_file:
+        try:
+            with open(dst, 'wb') as dst_file:
+                fcntl.ioctl(dst_file.fileno(), _FICLONE, src_file.fileno())
+        except OSError:
+            os.unlink(dst)
+            raise
+
+    shutil.copystat(src, dst)
+    base_mode = os.stat(dst).st_mode
+    os.chmod(dst, base_mode | stat.S_IWUSR | stat.S_IWGRP)
+    return dst
+
+
+def link_copy_func(method: str, do_copy: Set[str], fallbacks: List[int]) -> Callable:
+    """Return a copy function (for shutil.copytree) that links files using the
+    given copy method, and actually copies those in do_copy. If the method
+    turns out not to be supported, the remaining files are symlinked instead,
+    and the number of files this happened to is kept in fallbacks[0]."""
+
+    if method == 'hardlink':
+        link = os.link
+    elif method == 'reflink':
+        link = reflink
+    else:
+        link = None
+
+    def copy_func(src, dst):
+        """Copy or link a single file."""
+
+        if src in do_copy:
+            # Actually copy files that were explicitly asked for.
+            return writable_copy(src, dst)
+
+        if link is not None:
+            if not fallbacks[0]:
+                try:
+                    return link(src, dst)
+                except OSError as err:
+                    if err.errno not in _LINK_UNSUPPORTED:
+                        raise
+
+            fallbacks[0] += 1
+
+        return symlink(src, dst)
+
+    return copy_func
+
+
+def toplevel_copy(src_dir: str, dest: str, do_copy: Set[str], expand: Set[str]):
+    """Create dest as a directory, and symlink each entry of src_dir into it.
+    Files in do_copy are copied instead, and directories in expand (those that
+    contain files to copy) are recreated recursively in the same way."""
+
+    os.mkdir(dest)
+    with os.scandir(src_dir) as entries:
+        for entry in entries:
+            dst_path = os.path.join(dest, entry.name)
+            if entry.is_symlink():
+                # Links within the build are copied as is, as with copytree.
+                os.symlink(os.readlink(entry.path), dst_path)
+            elif entry.is_dir() and entry.path in expand:
+                toplevel_copy(entry.path, dst_path, do_copy, expand)
+            elif entry.path in do_copy and not entry.is_dir():
+                writable_copy(entry.path, dst_path)
+            else:
+                symlink(entry.path, dst_path)
+
+    shutil.copystat(src_dir, dest)
+
+
+def copy_tree(src_dir: str, dest: str, method: str, do_copy: Set[str]) -> int:
+    """Copy the build at src_dir to dest using the given copy method (one of
+    COPY_METHODS):
+
+    - symlink - Recreate the build's directories, and symlink every file.
+    - toplevel - Symlink only the top level entries of the build into dest.
+      Directories that contain files in do_copy are recreated as with 'symlink'.
+      This is the fastest method, but files added to or removed from the
+      symlinked directories change the build itself.
+    - hardlink - Recreate the directories, and hardlink every file. The files
+      keep the build's (read only) permissions.
+    - reflink - Recreate the directories, and make a copy-on-write clone of
+      every file. This needs filesystem support (like XFS or btrfs).
+
+    The 'hardlink' and 'reflink' methods fall back to symlinks when the
+    filesystem doesn't support them. Files in do_copy are always copied.
+
+    :returns: The number of files that were symlinked instead, because the
+        filesystem doesn't support the method.
+    :raises OSError: On copy errors.
+    """
+
+    fallbacks = [0]
+
+    if method == 'toplevel':
+        # Every directory between the build root and a file to copy has
+        # to be a real directory.
+        expand = set()
+        for path in do_copy:
+            parent = os.path.dirname(path)
+            while len(parent) > len(src_dir):
+                expand.add(parent)
+                parent = os.path.dirname(parent)
+            if os.path.isdir(path) and not os.path.islink(path):
+                expand.add(path)
+
+        toplevel_copy(src_dir, dest, do_copy, expand)
+    else:
+        # Perform a link copy of the original build directory into our
+        # test directory.
+        shutil.copytree(src_dir, dest, symlinks=True,
+                        copy_function=link_copy_func(method, do_copy, fallbacks))
+
+    return fallbacks[0]
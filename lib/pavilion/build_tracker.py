@@ -7,6 +7,9 @@ from typing import List
 
 from pavilion.status_file import STATES
 
+BUILD_LOG_NAME = "pav_build_log"
+"""The name of the build log, within each build directory."""
+
 
 class MultiBuildTracker:
     """Allows for the central organization of multiple build tracker objects.
@@ -1,12 +1,11 @@
 """Contains the object for tracking multi-threaded builds, along with
 the TestBuilder class itself."""
 
-import glob
 import hashlib
 import io
 import os
+import re
 import shutil
-import stat
 import subprocess
 import tarfile
 import threading
@@ -16,8 +15,9 @@ from pathlib import Path
 from typing import Union, Dict
 
 import pavilion.config
-from pavilion import extract, lockfile, utils, wget, create_files
-from pavilion.build_tracker import BuildTracker
+from pavilion import extract, lockfile, utils, wget, create_files, source_manifest
+from pavilion import build_copy
+from pavilion.build_tracker import BuildTracker, BUILD_LOG_NAME
 from pavilion.errors import TestBuilderError, TestConfigError
 from pavilion.status_file import TestStatusFile, STATES
 from pavilion.test_config import parse_timeout
@@ -47,7 +47,10 @@ class TestBuilder:
     DEPRECATED = ".pav_deprecated_build"
     FINISHED_SUFFIX = '.finished'
 
-    LOG_NAME = "pav_build_log"
+    LOG_NAME = BUILD_LOG_NAME
+
+    EXTRACT_CACHE_DIR = 'extract_cache'
+    """Where extracted source tarballs are kept, under the working_dir."""
 
     def __init__(self, pav_cfg: pavilion.config.PavConfig, working_dir: Path, config: dict,
                  script: Path, status: TestStatusFile, download_dest: Path,
@@ -175,8 +178,8 @@ class TestBuilder:
         #  - The build script
         #  - The build specificity
         #  - The src archive.
-        #    - For directories, the mtime (updated to the time of the most
-        #      recently updated file) is hashed instead.
+        #    - For directories, the hash of the directory's contents (see
+        #      source_manifest).
         #  - All of the build's 'extra_files'
         #  - All files needed to be created at build time 'create_files'
 
@@ -217,7 +220,6 @@ class TestBuilder:
             elif full_path.is_file():
                 hash_obj.update(self._hash_file(full_path))
             elif full_path.is_dir():
-                self._date_dir(full_path)
                 hash_obj.update(self._hash_dir(full_path))
             else:
                 raise TestBuilderError(
@@ -353,14 +355,8 @@ class TestBuilder:
             raise TestBuilderError(
                 "Could not find source '{}'".format(src_path.as_posix()))
 
-        if found_src_path.is_dir():
-            # For directories, update the directories mtime to match the
-            # latest mtime in the entire directory.
-            self._date_dir(found_src_path)
-            return found_src_path
-
-        elif found_src_path.is_file():
-            # For static files, we'll end up just hashing the whole thing.
+        if found_src_path.is_dir() or found_src_path.is_file():
+            # Either will be hashed by content.
             return found_src_path
 
         else:
@@ -368,6 +364,27 @@ class TestBuilder:
                 "Source location '{}' points to something unusable."
                 .format(found_src_path))
 
+    # Matches the parallelism flags of common build tools, capturing the job count
+    # if it's given.
+    _JOBS_RE = re.compile(
+        r'\b(?:g?make|ninja|cmake|scons)\b[^;&|\n]*?\s(?:-j|--jobs)(?:[=\s]?\s*(\d+))?')
+
+    def build_jobs(self, cpus: int) -> int:
+        """Estimate how many cpus this build will use, based on the '-j' (or
+        '--jobs') flags given to make and similar tools in the build commands. A
+        flag without a count (or with an unresolved one) counts as all cpus.
+
+        :param cpus: The number of cpus available. The result will be at most this.
+        """
+
+        jobs = 1
+        for cmd in self._config.get('cmds', []):
+            for match in self._JOBS_RE.finditer(cmd):
+                count = match.group(1)
+                jobs = max(jobs, int(count) if count else cpus)
+
+        return max(1, min(jobs, cpus))
+
     def build(self, test_id: str, tracker: BuildTracker,
               cancel_event: threading.Event = None):
         """Perform the build if needed, do a soft-link copy of the build
@@ -615,6 +632,28 @@ class TestBuilder:
         'x-lzma',
     )
 
+    def _extract_tarball(self, src_path: Path, dest: Path, umask: int,
+                         tracker: BuildTracker) -> Union[str, None]:
+        """Extract the given tarball to dest. Unless disabled in the pavilion
+        config, each tarball is only extracted once (into the extract cache in the
+        working_dir); builds that use the same tarball copy that extracted tree.
+
+        :returns: An error message on failure, None otherwise.
+        """
+
+        def note(msg):
+            tracker.update(state=STATES.BUILDING, note=msg)
+
+        if not self._pav_cfg.get('build_extract_cache', True):
+            note("Extracting tarfile {} for build {}".format(src_path, dest))
+            return extract.extract_tarball(src_path, dest, umask)
+
+        # The umask is applied when extracting, so it's part of the key.
+        cached = (self._pav_cfg.working_dir/self.EXTRACT_CACHE_DIR/
+                  '{}-{:03o}'.format(self._hash_file(src_path).hex(), umask))
+
+        return extract.extract_tarball_cached(src_path, dest, umask, cached, note)
+
     def _setup_build_dir(self, dest, tracker: BuildTracker):
         """Setup the build directory, by extracting or copying the source
             and any extra files.
@@ -667,11 +706,10 @@ class TestBuilder:
             if category == 'application' and subtype in self.TAR_SUBTYPES:
 
                 if tarfile.is_tarfile(src_path.as_posix()):
-                    tracker.update(
-                        state=STATES.BUILDING,
-                        note=("Extracting tarfile {} for build {}"
-                              .format(src_path, dest)))
-                    extract.extract_tarball(src_path, dest, umask)
+                    extract_error = self._extract_tarball(src_path, dest, umask,
+                                                          tracker)
+                    if extract_error is not None:
+                        tracker.fail(extract_error)
                 else:
                     tracker.update(
                         state=STATES.BUILDING,
@@ -751,7 +789,10 @@ class TestBuilder:
                     .format(path, dest, err))
 
     def copy_build(self, dest: Path):
-        """Copy the build (using 'symlink' copying to the destination.
+        """Copy the build to the destination, according to the build's
+        'copy_method' (or the 'build_copy_method' in the pavilion config). See
+        build_copy.copy_tree() for the methods. Files that match the 'copy_files'
+        globs are always copied.
 
         :param dest: Where to copy the build to.
         :raises TestBuilderError: When copy errors happen
@@ -760,45 +801,18 @@ class TestBuilder:
 
         start = time.time()
 
-        do_copy = set()
-        copy_globs = self._config.get('copy_files', [])
-        for copy_glob in copy_globs:
-            final_glob = self.path.as_posix() + '/' + copy_glob
-            blob = glob.glob(final_glob, recursive=True)
-            if not blob:
-                avail = '\n'.join(glob.glob(final_glob.rsplit('/')[0]))
-                raise TestBuilderError(
-                    "Could not perform build copy. Files meant to be fully copied ("
-                    "rather than symlinked) could not be found:\n"
-                    "base_glob: {}\n"
-                    "full_glob: {}\n"
-                    "These files were available in the top glob dir: {}"
-                    .format(copy_glob, final_glob, avail))
-
-            do_copy.update(blob)
-
-        def maybe_symlink_copy(src, dst):
-            """Makes a symlink from src to dst, unless the file is in
-            the list of files to do a regular copy on.
-            """
-
-            if src in do_copy:
-                # Actually copy files that were explicitly asked for.
-                cpy_path = shutil.copy2(src, dst)
-                base_mode = os.stat(cpy_path).st_mode
-                os.chmod(cpy_path, base_mode | stat.S_IWUSR | stat.S_IWGRP)
-                return cpy_path
-            else:
-                src = os.path.realpath(src)
-                return os.symlink(src, dst)
+        do_copy = build_copy.find_copy_files(self.path, self._config.get('copy_files', []))
+
+        method = (self._config.get('copy_method')
+                  or self._pav_cfg.get('build_copy_method') or 'symlink')
+        if method not in build_copy.COPY_METHODS:
+            raise TestBuilderError(
+                "Invalid build copy method '{}'. Expected one of: {}"
+                .format(method, ', '.join(build_copy.COPY_METHODS)))
 
-        # Perform a symlink copy of the original build directory into our test
-        # directory.
         try:
-            shutil.copytree(self.path.as_posix(),
-                            dest.as_posix(),
-                            symlinks=True,
-                            copy_function=maybe_symlink_copy)
+            fallbacks = build_copy.copy_tree(self.path.as_posix(), dest.as_posix(),
+                                             method, do_copy)
         except OSError as err:
             raise TestBuilderError(
                 "Could not perform the build directory copy: {}".format(err))
@@ -814,9 +828,11 @@ class TestBuilder:
                 "Could not update timestamp on build directory '%s': %s"
                 .format(self.path, err))
 
-        self.status.set(STATES.BUILD_COPIED,
-                        "Performed symlink copy in {:0.2f}s."
-                        .format(time.time() - start))
+        note = "Performed {} copy in {:0.2f}s.".format(method, time.time() - start)
+        if fallbacks:
+            note += (" The filesystem doesn't support {}s, so {} files were "
+                     "symlinked instead.".format(method, fallbacks))
+        self.status.set(STATES.BUILD_COPIED, note)
 
         return True
 
@@ -921,17 +937,18 @@ class TestBuilder:
 
         return hash_obj.digest()
 
-    @staticmethod
-    def _hash_dir(path):
-        """Instead of hashing the files within a directory, we just create a
-            'hash' based on it's name and mtime, assuming we've run _date_dir
-            on it before hand. This produces an arbitrary string, not a hash.
+    def _hash_dir(self, path: Path) -> bytes:
+        """Hash the contents of the given directory. The directory's manifest
+        (kept in the working_dir) lets us skip re-reading unchanged files.
         :param Path path: The path to the directory.
-        :returns: The 'hash'
+        :returns: The hash
         """
 
-        dir_stat = path.stat()
-        return '{} {:0.5f}'.format(path, dir_stat.st_mtime).encode()
+        try:
+            return source_manifest.hash_dir(self._pav_cfg.working_dir, path)
+        except OSError as err:
+            raise TestBuilderError(
+                "Could not hash source directory '{}': {}".format(path, err))
 
     @staticmethod
     def _isurl(url):
@@ -939,24 +956,6 @@ class TestBuilder:
         parsed = urllib.parse.urlparse(url)
         return parsed.scheme != ''
 
-    @staticmethod
-    def _date_dir(base_path):
-        """Update the mtime of the given directory or path to the the latest
-        mtime contained within.
-        :param Path base_path: The root of the path to evaluate.
-        """
-
-        src_stat = base_path.stat()
-        latest = src_stat.st_mtime
-
-        for path in utils.flat_walk(base_path):
-            dir_stat = path.stat()
-            if dir_stat.st_mtime > latest:
-                latest = dir_stat.st_mtime
-
-        if src_stat.st_mtime != latest:
-            os.utime(base_path.as_posix(), (src_stat.st_atime, latest))
-
     def __hash__(self):
         """Having a comparison operator breaks hashing."""
         return id(self)
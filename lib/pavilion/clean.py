@@ -1,5 +1,6 @@
 """Provides utility functions for deleting Pavilion working_dir files."""
 import shutil
+import time
 from functools import partial
 from pathlib import Path
 from typing import List
@@ -8,6 +9,7 @@ from pavilion import dir_db
 from pavilion import lockfile
 from pavilion import utils
 from pavilion.builder import TestBuilder
+from pavilion.jobs import Job, NodeSnapshot
 from pavilion.test_run import test_run_attr_transform
 
 
@@ -147,3 +149,76 @@ def delete_lingering_build_files(pav_cfg, build_dir: Path, tests_dir: Path,
                             .format(path.name))
 
     return msgs
+
+
+def delete_extract_cache(working_dir: Path, verbose: bool = False) -> List[str]:
+    """Remove the cached extractions of build source tarballs. Builds that are
+    copying from a removed entry will simply extract their tarball again.
+
+    :param working_dir: The working directory to clean.
+    :param verbose: Print output
+    """
+
+    cache_dir = working_dir/TestBuilder.EXTRACT_CACHE_DIR
+
+    msgs = []
+    if not cache_dir.exists():
+        return msgs
+
+    for path in cache_dir.iterdir():
+        try:
+            if path.is_dir() and not path.is_symlink():
+                shutil.rmtree(path.as_posix())
+            else:
+                path.unlink()
+        except OSError as err:
+            msgs.append("Could not remove extract cache entry {}: {}"
+                        .format(path, err))
+            continue
+
+        if verbose:
+            msgs.append("Removed extract cache entry {}.".format(path.name))
+
+    return msgs
+
+
+NODE_SNAPSHOT_MIN_AGE = 60*60
+"""Node snapshots used more recently than this (in seconds) are never removed, as
+jobs that reference them may still be in the process of being created."""
+
+
+def delete_unused_node_snapshots(pav_cfg, verbose: bool = False) -> List[str]:
+    """Remove the node snapshots that are no longer referenced by any job.
+
+    :param pav_cfg: The pavilion config (for the working_dir to clean).
+    :param verbose: Print output
+    """
+
+    snap_dir = NodeSnapshot.snapshot_dir(pav_cfg)
+
+    msgs = []
+    if not snap_dir.exists():
+        return msgs
+
+    used = set()
+    for job_path in snap_dir.parent.iterdir():
+        try:
+            with (job_path/Job.NODE_REF_FN).open() as ref_file:
+                used.add(ref_file.readline().strip())
+        except OSError:
+            continue
+
+    now = time.time()
+    for path in snap_dir.iterdir():
+        try:
+            if path.name in used or now - path.stat().st_mtime < NODE_SNAPSHOT_MIN_AGE:
+                continue
+            path.unlink()
+        except OSError as err:
+            msgs.append("Could not remove node snapshot {}: {}".format(path, err))
+            continue
+
+        if verbose:
+            msgs.append("Removed node snapshot {}.".format(path.name))
+
+    return msgs
@@ -8,7 +8,7 @@ import logging
 import sys
 import time
 from pathlib import Path
-from typing import List, TextIO
+from typing import List, TextIO, Union
 
 from pavilion import config
 from pavilion import dir_db
@@ -18,7 +18,8 @@ from pavilion import series
 from pavilion import sys_vars
 from pavilion import utils
 from pavilion.errors import TestRunError, CommandError
-from pavilion.test_run import TestRun, test_run_attr_transform, load_tests
+from pavilion.test_run import (TestRun, TestSummary, test_run_attr_transform, load_tests,
+                               load_summaries)
 from pavilion.types import ID_Pair
 
 LOGGER = logging.getLogger(__name__)
@@ -61,19 +62,20 @@ def arg_filtered_tests(pav_cfg, args: argparse.Namespace,
             args.newer_than = time.time() - dt.timedelta(days=1).total_seconds()
             args.sys_name = sys_vars.get_vars(defer=True).get('sys_name')
 
-    filter_func = filters.make_test_run_filter(
-        complete=args.complete,
-        incomplete=args.incomplete,
-        passed=args.passed,
-        failed=args.failed,
-        name=args.name,
-        user=args.user,
-        state=args.state,
-        has_state=args.has_state,
-        sys_name=args.sys_name,
-        older_than=args.older_than,
-        newer_than=args.newer_than,
-    )
+    filter_args = {
+        'complete': args.complete,
+        'incomplete': args.incomplete,
+        'passed': args.passed,
+        'failed': args.failed,
+        'name': args.name,
+        'user': args.user,
+        'state': args.state,
+        'has_state': args.has_state,
+        'sys_name': args.sys_name,
+        'older_than': args.older_than,
+        'newer_than': args.newer_than,
+    }
+    filter_func = filters.make_test_run_filter(**filter_args)
 
     order_func, order_asc = filters.get_sort_opts(args.sort_by, "TEST")
 
@@ -91,7 +93,9 @@ def arg_filtered_tests(pav_cfg, args: argparse.Namespace,
                 order_func=order_func,
                 order_asc=order_asc,
                 verbose=verbose,
-                limit=limit)
+                limit=limit,
+                idx_filters=filters.make_test_run_index_filters(**filter_args),
+                idx_order=args.sort_by.lstrip('-'))
 
             tests.data.extend(matching_tests.data)
             tests.paths.extend(matching_tests.paths)
@@ -280,7 +284,9 @@ def _filter_tests_by_raw_id(pav_cfg, id_pairs: List[ID_Pair],
 
 
 def get_tests_by_paths(pav_cfg, test_paths: List[Path], errfile: TextIO,
-                       exclude_ids: List[str] = None) -> List[TestRun]:
+                       exclude_ids: List[str] = None, summaries: bool = False,
+                       lazy: bool = False) \
+        -> List[Union[TestRun, TestSummary]]:
     """Given a list of paths to test run directories, return the corresponding
     list of tests.
 
@@ -288,6 +294,8 @@ def get_tests_by_paths(pav_cfg, test_paths: List[Path], errfile: TextIO,
     :param test_paths: The test run paths.
     :param errfile: Where to print warnings or errors.
     :param exclude_ids: A list of test raw id's to filter out.
+    :param summaries: Load test summaries rather than full test runs.
+    :param lazy: Lazily load the test runs (see TestRun.load).
     """
 
     test_pairs = []  # type: List[ID_Pair]
@@ -311,11 +319,16 @@ def get_tests_by_paths(pav_cfg, test_paths: List[Path], errfile: TextIO,
     if exclude_ids:
         test_pairs = _filter_tests_by_raw_id(pav_cfg, test_pairs, exclude_ids)
 
-    return load_tests(pav_cfg, test_pairs, errfile)
+    if summaries:
+        return load_summaries(pav_cfg, test_pairs, errfile)
+
+    return load_tests(pav_cfg, test_pairs, errfile, lazy=lazy)
 
 
 def get_tests_by_id(pav_cfg, test_ids: List['str'], errfile: TextIO,
-                    exclude_ids: List[str] = None) -> List[TestRun]:
+                    exclude_ids: List[str] = None, summaries: bool = False,
+                    lazy: bool = False) \
+        -> List[Union[TestRun, TestSummary]]:
     """Convert a list of raw test id's and series id's into a list of
     test objects.
 
@@ -323,6 +336,9 @@ def get_tests_by_id(pav_cfg, test_ids: List['str'], errfile: TextIO,
     :param test_ids: A list of tests or test series names.
     :param errfile: stream to output errors as needed
     :param exclude_ids: A list of raw test ids to prune from the test list.
+    :param summaries: Load test summaries (see TestSummary) rather than full
+        test runs. This is much faster when you only need to report on the tests.
+    :param lazy: Lazily load the test runs (see TestRun.load).
     :return: List of test objects
     """
 
@@ -363,4 +379,7 @@ def get_tests_by_id(pav_cfg, test_ids: List['str'], errfile: TextIO,
     if exclude_ids:
         test_id_pairs = _filter_tests_by_raw_id(pav_cfg, test_id_pairs, exclude_ids)
 
-    return load_tests(pav_cfg, test_id_pairs, errfile)
+    if summaries:
+        return load_summaries(pav_cfg, test_id_pairs, errfile)
+
+    return load_tests(pav_cfg, test_id_pairs, errfile, lazy=lazy)
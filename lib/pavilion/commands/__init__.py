@@ -3,10 +3,11 @@ module. While commands are all technically plugins, these are manually added bec
 its faster than searching for them and loading them as plugins."""
 
 import importlib
-from typing import Union
+from typing import List, Union
 
 from pavilion import arguments
 from pavilion import errors
+from pavilion import lazy_plugins
 from .base_classes import Command, add_command, sub_cmd
 from .base_classes import cmd_tracker as _cmd_tracker
 
@@ -44,22 +45,35 @@ _aliases = {
 }
 
 
+def _add_dummy_parser(cmd: str, aliases: List[str]):
+    """Add a placeholder subparser for the given command. Activating the real
+    command will replace it."""
+
+    subp = arguments.get_subparser()
+    dummy_parser = subp.add_parser(cmd, aliases=aliases, add_help=False)
+    dummy_parser.add_argument('--help', '-h', action='store_true')
+
+
 def register_core_plugins():
     """Add all the builtin plugins and activate them."""
 
     # Add fake options for each command and their aliases.
-    subp = arguments.get_subparser()
-
     # When we 'get' the command below, we'll replace this subparser
     # with the real one.
     for cmd in _builtin_commands.keys():
-        dummy_parser = subp.add_parser(cmd, aliases=_aliases.get(cmd, []),
-                                       add_help=False)
-        dummy_parser.add_argument('--help', '-h', action='store_true')
+        _add_dummy_parser(cmd, _aliases.get(cmd, []))
 
 
-# Pavilion looks for this function on the Plugin class
+def register_lazy_plugin(names: List[str]):
+    """Add a command plugin that hasn't been loaded yet, under the given names (the
+    first of which is its command name). It will be loaded when it's first gotten."""
+
+    _add_dummy_parser(names[0], [name for name in names[1:] if name != names[0]])
+
+
+# Pavilion looks for these functions on the Plugin class
 Command.register_core_plugins = register_core_plugins
+Command.register_lazy_plugin = register_lazy_plugin
 
 
 def get_command(command_name: str) -> Union[None, Command]:
@@ -73,6 +87,10 @@ def get_command(command_name: str) -> Union[None, Command]:
     if command_name in _commands:
         return _commands[command_name]
 
+    # Load the command plugin with this name, if there is one.
+    if lazy_plugins.load('command', command_name) and command_name in _commands:
+        return _commands[command_name]
+
     # Find the real command from amongst the aliases.
     if command_name not in _builtin_commands:
         for alias_cmd, aliases in _aliases.items():
@@ -105,6 +123,7 @@ def load(*cmds: str):
     """Load the given commands. If no commands are given, load all commands."""
 
     if not cmds:
+        lazy_plugins.load('command')
         cmds = _builtin_commands.keys()
 
     for cmd in cmds:
@@ -35,7 +35,8 @@ class CatCommand(Command):
     def run(self, pav_cfg, args):
         """Run this command."""
 
-        tests = cmd_utils.get_tests_by_id(pav_cfg, [args.test_id], self.errfile)
+        tests = cmd_utils.get_tests_by_id(pav_cfg, [args.test_id], self.errfile,
+                                          lazy=True)
         if not tests:
             output.fprint(self.errfile, "Could not find test '{}'".format(args.test_id))
             return errno.EEXIST
@@ -82,6 +82,7 @@ class CleanCommand(Command):
         series_dir = pav_cfg.working_dir / 'series'       # type: Path
         output.fprint(self.outfile, "Removing Series...", end=end)
         rm_series_count, msgs = clean.delete_series(pav_cfg, series_dir, args.verbose)
+        msgs.extend(clean.delete_unused_node_snapshots(pav_cfg, args.verbose))
         if args.verbose:
             for msg in msgs:
                 output.fprint(self.outfile, msg, color=output.YELLOW)
@@ -98,6 +99,7 @@ class CleanCommand(Command):
                                                         args.verbose)
             msgs.extend(clean.delete_lingering_build_files(pav_cfg, builds_dir, tests_dir,
                                                            args.verbose))
+            msgs.extend(clean.delete_extract_cache(working_dir, args.verbose))
             if args.verbose:
                 for msg in msgs:
                     output.fprint(self.outfile, msg, color=output.YELLOW)
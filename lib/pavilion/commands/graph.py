@@ -6,13 +6,15 @@ import errno
 import re
 import statistics
 from argparse import RawDescriptionHelpFormatter
-from typing import Dict
+from typing import Dict, List, Tuple
 
 from pavilion import cmd_utils
 from pavilion import filters
 from pavilion import output
+from pavilion import result_utils
 from pavilion.result.common import ResultError
-from pavilion.result.evaluations import check_evaluations, evaluate_results
+from pavilion.result.evaluations import (check_evaluations, check_expression,
+                                         evaluate_results_many)
 from .base_classes import Command
 
 try:
@@ -140,19 +142,25 @@ class GraphCommand(Command):
 
         output.fprint(self.outfile, "Generating Graph...")
 
-        # Get filtered Test IDs.
+        # Get filtered Test IDs, skipping those that are to be excluded.
         test_paths = cmd_utils.arg_filtered_tests(pav_cfg, args, verbose=self.errfile).paths
+        try:
+            if args.exclude:
+                exclude_paths = {path.resolve() for path in
+                                 cmd_utils.test_list_to_paths(pav_cfg, args.exclude,
+                                                              self.errfile)}
+                test_paths = [path for path in test_paths
+                              if path.resolve() not in exclude_paths]
+
+            # Add any additional tests provided via the command line.
+            if args.tests:
+                test_paths.extend(cmd_utils.test_list_to_paths(pav_cfg, args.tests,
+                                                               self.errfile))
+        except ValueError as err:
+            output.fprint(self.errfile, err, color=output.RED)
+            return errno.EINVAL
 
-        # Load TestRun for all tests, skip those that are to be excluded.
-        tests = cmd_utils.get_tests_by_paths(
-            pav_cfg, test_paths, self.errfile, exclude_ids=args.exclude)
-
-        # Add any additional tests provided via the command line.
-        if args.tests:
-            cmdline_tests = cmd_utils.get_tests_by_id(pav_cfg, args.tests, self.errfile)
-            tests.extend(cmdline_tests)
-
-        if not tests:
+        if not test_paths:
             output.fprint(self.errfile, "Test filtering resulted in an empty list.")
             return errno.EINVAL
 
@@ -170,30 +178,29 @@ class GraphCommand(Command):
         except ResultError as err:
             output.fprint(self.errfile, "Invalid graph evaluation:\n{}".format(err),
                           color=output.RED)
+            keys = None
+        else:
+            keys = self.get_result_keys(all_evals)
+
+        # Only the results the evaluations use are needed, and those can mostly
+        # come from the result store rather than from loading each test.
+        test_results = result_utils.get_results_by_paths(pav_cfg, test_paths,
+                                                         self.errfile, keys=keys)
 
         # Set colormap and build colormap dict
         colormap = matplotlib.pyplot.get_cmap('tab20')
         colormap = GraphCommand.set_colors(y_evals, colormap.colors)
 
         # Populate graph data dict with evaluation data from all tests provided.
-        graph_data = {}
-        for test in tests:
-            try:
-                test_graph_data = GraphCommand.gather_graph_data(x_eval,
-                                                                 y_evals,
-                                                                 test.results)
-            except InvalidEvaluationError as err:
-                output.fprint(self.errfile, "Error gathering graph data for test {}: \n{}"
-                              .format(test.id, err), color=output.YELLOW)
-                continue
-            except ResultTypeError as err:
-                output.fprint(self.errfile, "Gather graph data for test {} resulted in "
-                                            "invalid type: \n{}"
-                              .format(test.id, err), color=output.YELLOW)
-                continue
+        try:
+            graph_data, errors = GraphCommand.gather_graph_data(x_eval, y_evals,
+                                                                test_results)
+        except InvalidEvaluationError as err:
+            output.fprint(self.errfile, err, color=output.RED)
+            return errno.EINVAL
 
-            graph_data = GraphCommand.combine_graph_data(graph_data,
-                                                         test_graph_data)
+        for error in errors:
+            output.fprint(self.errfile, error, color=output.YELLOW)
 
         graph_data = collections.OrderedDict(sorted(graph_data.items()))
 
@@ -207,6 +214,21 @@ class GraphCommand(Command):
                           color=output.RED)
             return errno.EINVAL
 
+    @staticmethod
+    def get_result_keys(evaluations: Dict[str, str]) -> List[str]:
+        """Return the top level result keys the given evaluations use (as well as
+        those needed to evaluate and report on any test's results).
+
+        :param evaluations: The (already checked) graph evaluations.
+        """
+
+        keys = {'id', 'result', 'return_value'}
+        for expr in evaluations.values():
+            for var in check_expression(expr):
+                keys.add(var.split('.')[0])
+
+        return sorted(keys)
+
     @staticmethod
     def set_colors(y_evals, colors) -> Dict:
         """Set color for each y value to be plotted.
@@ -225,9 +247,52 @@ class GraphCommand(Command):
         return colormap
 
     @staticmethod
-    def gather_graph_data(x_eval, y_evals, test_results) -> Dict:
+    def gather_graph_data(x_eval, y_evals, test_results: List[dict]) \
+            -> Tuple[Dict, List[str]]:
+        """
+        Evaluate the graph evaluations for all of the given test results, and
+        combine them into a single graph data dict (see format_graph_data()).
+        Each evaluation is performed for all of the results at once.
+
+        :param x_eval: The x value evaluation dict.
+        :param y_evals: The y value evaluations dict.
+        :param test_results: The result dict for each test run.
+        :raises InvalidEvaluationError: When the evaluations themselves are bad.
+        :return: The graph data, and an error message for each test run that
+                 couldn't be graphed.
         """
-        Gather and format a test run objects results.
+
+        all_evals = y_evals.copy()
+        all_evals.update(x_eval)
+
+        try:
+            eval_errors = evaluate_results_many(test_results, all_evals)
+        except ResultError as err:
+            raise InvalidEvaluationError("Invalid graph evaluation:\n{}".format(err))
+
+        graph_data = {}
+        errors = []
+        for results, eval_error in zip(test_results, eval_errors):
+            if eval_error is not None:
+                errors.append("Error gathering graph data for test {}: \n{}"
+                              .format(results.get('id'), eval_error))
+                continue
+
+            try:
+                test_graph_data = GraphCommand.format_graph_data(x_eval, y_evals, results)
+            except ResultTypeError as err:
+                errors.append("Gather graph data for test {} resulted in invalid type: \n{}"
+                              .format(results.get('id'), err))
+                continue
+
+            graph_data = GraphCommand.combine_graph_data(graph_data, test_graph_data)
+
+        return graph_data, errors
+
+    @staticmethod
+    def format_graph_data(x_eval, y_evals, test_results) -> Dict:
+        """
+        Format a test run's (already evaluated) results.
 
         :param x_eval:
         :param y_evals:
@@ -245,15 +310,6 @@ class GraphCommand(Command):
         }
         """
 
-        all_evals = y_evals.copy()
-        all_evals.update(x_eval)
-
-        try:
-            evaluate_results(results=test_results, evaluations=all_evals)
-        except ResultError as err:
-            raise InvalidEvaluationError("Invalid graph evaluation for test "
-                                         "{}:\n{}"
-                                         .format(test_results['id'], err))
         x_vals = test_results['x']
 
         if isinstance(x_vals, (int, float, str)):
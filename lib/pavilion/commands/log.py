@@ -118,7 +118,7 @@ class LogCommand(Command):
                 if cmd_name == 'series':
                     test = series.TestSeries.load(pav_cfg, args.id)
                 else:
-                    test = TestRun.load_from_raw_id(pav_cfg, args.id)
+                    test = TestRun.load_from_raw_id(pav_cfg, args.id, lazy=True)
             except pavilion.exceptions.TestRunError as err:
                 output.fprint(self.errfile, "Error loading test: {}".format(err),
                               color=output.RED)
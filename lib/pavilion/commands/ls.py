@@ -77,7 +77,8 @@ class LSCommand(Command):
     def run(self, pav_cfg, args):
         """List the run directory for the given run."""
 
-        tests = cmd_utils.get_tests_by_id(pav_cfg, [args.test_id], self.errfile)
+        tests = cmd_utils.get_tests_by_id(pav_cfg, [args.test_id], self.errfile,
+                                          lazy=True)
         if not tests:
             output.fprint(self.errfile, "Could not find test '{}'".format(args.test_id))
             return errno.EEXIST
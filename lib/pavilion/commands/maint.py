@@ -1,10 +1,12 @@
 """A command to (relatively) quickly list tests, series, and other (as yet
 undefined) bits."""
 import errno
+import subprocess
 
 import pavilion.result.common
 from pavilion import output
 from pavilion import result
+from pavilion import schedulers
 from .base_classes import Command, sub_cmd
 
 
@@ -53,6 +55,32 @@ class MaintCommand(Command):
             help="Test run ids and/or uuids to prune in the results log."
         )
 
+        node_inv_p = subparsers.add_parser(
+            name="node_inventory",
+            help="Refresh the cached scheduler node inventories.",
+            description=(
+                "Get the current node inventory from each advanced scheduler (like "
+                "Slurm), and update the shared node inventory cache in the "
+                "working_dir. This can be used to pre-warm the cache, such as from "
+                "a cron job.")
+        )
+
+        node_inv_p.add_argument(
+            'schedulers', nargs='*',
+            help="The schedulers to refresh the inventory for. Defaults to all "
+                 "available advanced schedulers."
+        )
+
+        subparsers.add_parser(
+            name="result_store",
+            help="Update the result store in each working_dir.",
+            description=(
+                "Add the results of existing test runs to the result store in each "
+                "working_dir, and remove those of test runs that no longer exist. "
+                "Test runs add their results to the store as they complete, so this "
+                "is mostly needed for test runs from before the store existed.")
+        )
+
     def run(self, pav_cfg, args):
         """Find and run the given maint sub-command."""
 
@@ -80,3 +108,101 @@ class MaintCommand(Command):
                 rows=pruned,
                 title="Pruned Results"
             )
+
+    @sub_cmd()
+    def _node_inventory_cmd(self, pav_cfg, args):
+        """Refresh the node inventory cache for the given schedulers."""
+
+        sched_names = args.schedulers
+        if not sched_names:
+            sched_names = []
+            for sched_name in schedulers.list_plugins():
+                sched = schedulers.get_plugin(sched_name)
+                if isinstance(sched, schedulers.SchedulerPluginAdvanced) \
+                        and sched.available():
+                    sched_names.append(sched_name)
+
+        rows = []
+        ret = 0
+        for sched_name in sched_names:
+            try:
+                sched = schedulers.get_plugin(sched_name)
+            except schedulers.SchedulerPluginError as err:
+                output.fprint(self.errfile, err, color=output.RED)
+                ret = errno.EINVAL
+                continue
+
+            if not isinstance(sched, schedulers.SchedulerPluginAdvanced):
+                output.fprint(self.errfile,
+                              "Scheduler '{}' does not gather a node inventory."
+                              .format(sched_name), color=output.YELLOW)
+                continue
+
+            if not sched.available():
+                output.fprint(self.errfile,
+                              "Scheduler '{}' is not available on this system."
+                              .format(sched_name), color=output.YELLOW)
+                continue
+
+            try:
+                nodes = sched.refresh_node_inventory(pav_cfg)
+            except (OSError, ValueError, subprocess.SubprocessError,
+                    schedulers.SchedulerPluginError) as err:
+                output.fprint(self.errfile,
+                              "Error getting node inventory for scheduler '{}': {}"
+                              .format(sched_name, err), color=output.RED)
+                ret = errno.EIO
+                continue
+
+            rows.append({
+                'scheduler': sched_name,
+                'nodes': len(nodes) if nodes is not None else 0,
+            })
+
+        output.draw_table(
+            outfile=self.outfile,
+            fields=['scheduler', 'nodes'],
+            rows=rows,
+            title="Refreshed Node Inventories"
+        )
+
+        return ret
+
+    @sub_cmd()
+    def _result_store_cmd(self, pav_cfg, args):
+        """Bring the result store in each working_dir up to date."""
+
+        _ = args
+
+        rows = []
+        ret = 0
+        seen = set()
+        for label, config in pav_cfg.configs.items():
+            working_dir = config['working_dir']
+            # Multiple config directories may share a working_dir.
+            if working_dir in seen:
+                continue
+            seen.add(working_dir)
+
+            try:
+                added, removed = result.ResultStore(working_dir).sync()
+            except pavilion.result.common.ResultError as err:
+                output.fprint(self.errfile, err, color=output.RED)
+                ret = errno.EIO
+                continue
+
+            rows.append({
+                'label': label,
+                'working_dir': working_dir,
+                'added': added,
+                'removed': removed,
+            })
+
+        output.draw_table(
+            outfile=self.outfile,
+            fields=['label', 'working_dir', 'added', 'removed'],
+            rows=rows,
+            title="Updated Result Stores"
+        )
+
+        return ret
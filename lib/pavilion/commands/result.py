@@ -89,17 +89,22 @@ class ResultsCommand(Command):
         """Print the test results in a variety of formats."""
 
         test_paths = cmd_utils.arg_filtered_tests(pav_cfg, args, verbose=self.errfile).paths
-        tests = cmd_utils.get_tests_by_paths(pav_cfg, test_paths, self.errfile)
 
         log_file = None
         if args.show_log and args.re_run:
             log_file = io.StringIO()
 
         if args.re_run:
+            tests = cmd_utils.get_tests_by_paths(pav_cfg, test_paths, self.errfile)
             if not self.update_results(pav_cfg, tests, log_file, save=args.save):
                 return errno.EINVAL
 
-        results = result_utils.get_results(pav_cfg, tests)
+            results = result_utils.get_results(pav_cfg, tests)
+        else:
+            # We don't need the tests themselves, so get what results we can from
+            # the result store instead.
+            results = result_utils.get_results_by_paths(pav_cfg, test_paths, self.errfile)
+
         flat_results = []
         for rslt in results:
             flat_results.append(utils.flatten_dictionary(rslt))
@@ -216,6 +221,7 @@ class ResultsCommand(Command):
 
         reslvr = resolver.TestConfigResolver(pav_cfg)
 
+        updated_tests = []
         for test in tests:
 
             # Re-load the raw config using the saved name, host, and modes
@@ -282,24 +288,33 @@ class ResultsCommand(Command):
                               .format(err), color=output.RED)
                 return False
 
-            if save:
-                test.status.set(STATES.RESULTS, note="Re-running results.")
-
-            # The new results will be attached to the test (but not saved).
-            results = test.gather_results(test.results.get('return_value', 1),
-                                          regather=True if not save else False,
-                                          log_file=log_file)
-
-            if save:
-                test.save_results(results)
-                with test.results_log.open('a') as log_file:
-                    log_file.write(
-                        "Results were re-ran and saved on {}\n"
-                        .format(datetime.datetime.today()
-                                .strftime('%m-%d-%Y')))
-                    log_file.write("See results.json for updated results.\n")
-                test.status.set(state=STATES.COMPLETE,
-                                note="The test completed with result: {}"
-                                     .format(results["result"]))
+            updated_tests.append(test)
+
+        # Parse the result files for all the tests through a single pool of
+        # processes, rather than starting a new pool for each test.
+        with result.ResultPool(pav_cfg['max_cpu']) as result_pool:
+            for test in updated_tests:
+                if save:
+                    test.status.set(STATES.RESULTS, note="Re-running results.")
+                result_pool.submit(test)
+
+            for test in updated_tests:
+                # The new results will be attached to the test (but not saved).
+                results = test.gather_results(test.results.get('return_value', 1),
+                                              regather=True if not save else False,
+                                              log_file=log_file,
+                                              result_pool=result_pool)
+
+                if save:
+                    test.save_results(results)
+                    with test.results_log.open('a') as results_log:
+                        results_log.write(
+                            "Results were re-ran and saved on {}\n"
+                            .format(datetime.datetime.today()
+                                    .strftime('%m-%d-%Y')))
+                        results_log.write("See results.json for updated results.\n")
+                    test.status.set(state=STATES.COMPLETE,
+                                    note="The test completed with result: {}"
+                                         .format(results["result"]))
 
         return True
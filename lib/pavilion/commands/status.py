@@ -67,7 +67,8 @@ class StatusCommand(Command):
                 return 1
             return status_utils.print_status_history(tests[-1], self.outfile, args.json)
 
-        tests = cmd_utils.get_tests_by_paths(pav_cfg, test_paths, self.errfile)
+        tests = cmd_utils.get_tests_by_paths(pav_cfg, test_paths, self.errfile,
+                                             summaries=True)
 
         statuses = status_utils.get_statuses(pav_cfg, tests)
         if args.summary:
@@ -198,6 +198,13 @@ class PavConfig(PavConfigDict):
         self.flatten_results: bool = True
         self.exception_log: OptPath = None
         self.wget_timeout: int = 5
+        self.node_inventory_ttl: int = 300
+        self.status_format: str = 'text'
+        self.config_cache: bool = True
+        self.build_copy_method: str = 'symlink'
+        self.build_extract_cache: bool = True
+        self.parse_cache_size: int = 4096
+        self.result_store: bool = True
         self.proxies: Dict[str, str] = {}
         self.no_proxy: List[str] = []
         self.env_setup: List[str] = []
@@ -448,6 +455,49 @@ class PavilionConfigLoader(yc.YamlConfigLoader):
                       "networks without internet access, zero will allow you "
                       "to spot issues faster."
         ),
+        yc.IntRangeElem(
+            "node_inventory_ttl", default=300, vmin=0,
+            help_text="How long (in seconds) the node inventory gathered by advanced "
+                      "schedulers (like Slurm) is cached in the working_dir. "
+                      "Concurrent Pavilion invocations will share a single "
+                      "snapshot for this long. Zero disables the cache."
+        ),
+        yc.StrElem(
+            "status_format", default="text", choices=['text', 'binary'],
+            help_text="The format of newly created test run status files. The "
+                      "'binary' format keeps a summary of the test's states, which "
+                      "makes status checks on large numbers of tests faster. "
+                      "Existing status files are always read in the format they "
+                      "were created with."),
+        yc.BoolElem(
+            "config_cache", default=True,
+            help_text="Cache parsed test suite, host and mode configs in the "
+                      "working_dir. Cache entries are invalidated automatically when "
+                      "the files they came from change."),
+        yc.StrElem(
+            "build_copy_method", default="symlink",
+            choices=['symlink', 'toplevel', 'hardlink', 'reflink'],
+            help_text="How builds are copied into each test run, unless the test's "
+                      "'build.copy_method' says otherwise. See the test build "
+                      "documentation for the differences between them."),
+        yc.BoolElem(
+            "build_extract_cache", default=True,
+            help_text="Keep a copy of each extracted build source tarball in the "
+                      "working_dir, so that builds that share a tarball only "
+                      "extract it once. 'pav clean' removes these."),
+        yc.IntRangeElem(
+            "parse_cache_size", default=4096, vmin=0,
+            help_text="The maximum number of parsed test config strings and "
+                      "expressions to keep in memory for reuse. Set to 0 to "
+                      "disable the cache."),
+        yc.BoolElem(
+            "result_store", default=True,
+            help_text="Also save test results to a database in the working_dir, "
+                      "which lets 'pav result' and 'pav graph' query the results "
+                      "of many test runs quickly. Disable this if your working_dir "
+                      "is on a filesystem with unreliable file locking. Use "
+                      "'pav maint result_store' to add results from existing "
+                      "test runs."),
         yc.CategoryElem(
             "proxies", sub_elem=yc.StrElem(),
             help_text="Proxies, by protocol, to use when accessing the "
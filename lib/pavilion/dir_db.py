@@ -7,7 +7,7 @@ import math
 import os
 import pickle
 import shutil
-import tempfile
+import sqlite3
 import time
 from concurrent.futures import ThreadPoolExecutor
 from functools import partial
@@ -121,134 +121,468 @@ def identity(value):
     return value
 
 
-def index(pav_cfg,
-          id_dir: Path, idx_name: str,
-          transform: Callable[[Path], Dict[str, Any]],
-          complete_key: str = 'complete',
-          refresh_period: int = 1,
-          verbose: IO[str] = None,
-          fn_base: int = 10) -> Index:
-    """Load and/or update an index of the given directory for the given
-    transform, and return it. The returned index is a dictionary by id of
-    the transformed data.
+INDEX_DIR = '.index'
+"""The directory (under the id_dir) that holds index databases. These are kept in
+a sub-directory so that updating them doesn't change the id_dir's mtime."""
 
-    :param pav_cfg: The pavilion config.
-    :param id_dir: The directory to index.
-    :param idx_name: The name of the index.
-    :param transform: A transformation function that produces a json
-        compatible dictionary.
-    :param complete_key: The key in the transformed dictionary that marks a
-        record as complete. If not given, the record is always assumed to be
-        complete. Incomplete records are recompiled every time the index is
-        updated (hopefully they will be complete eventually).
-    :param refresh_period: Only update the index if this much time (in seconds)
-        has passed since the last update.
-    :param verbose: Print status information during indexing.
-    :param fn_base: The integer base for dir_db.
+INDEX_EXT = '.db'
+"""The file extension for dir_db index databases."""
+
+INDEX_SCHEMA_VERSION = 1
+"""Index databases with a different schema version are rebuilt from scratch."""
+
+INDEX_TIMEOUT = 10
+"""How long (in seconds) to wait on other processes that are writing to an index."""
+
+INDEX_MTIME_MARGIN = 2
+"""Directory modification times this recent (in seconds) aren't trusted for change
+detection, as further changes within the filesystem's timestamp granularity
+wouldn't be visible."""
+
+INDEX_COLUMNS = ('complete', 'created', 'finished', 'name', 'result', 'started',
+                 'sys_name', 'user')
+"""Keys from the transformed data that are also stored in their own (indexed) columns
+of the index database, so that filtering and sorting can be done by the database. The
+'complete' column always holds the value of the index's complete_key. Records
+that lack these keys simply have a NULL value in that column."""
+
+# These are the columns that get an actual database index (beyond the id primary key).
+_SQL_INDEXED_COLUMNS = ('complete', 'created', 'result', 'sys_name', 'user')
+
+IndexFilter = NamedTuple("IndexFilter", [('column', str), ('op', str), ('value', Any)])
+"""A filter to apply to an index column when selecting items from an index. The op
+may be any of '=', '!=', '<', '<=', '>', '>='. These are applied by the index
+database before any filter function is used, and should thus never be more
+restrictive than the filter function."""
+
+_INDEX_FILTER_OPS = ('=', '!=', '<', '<=', '>', '>=')
+
+IndexStats = NamedTuple("IndexStats", [('transformed', int), ('cached', int),
+                                       ('removed', int), ('scanned', bool)])
+"""Statistics from an index update. 'transformed' entries were (re)generated with the
+transform function, 'cached' entries were served as is from the index, and
+'removed' entries were deleted because their directory no longer exists. 'scanned'
+is whether the id directory itself had to be scanned for changes."""
+
+
+def _index_connect(idx_path: Path, verbose: IO[str] = None) -> sqlite3.Connection:
+    """Open (and create, if needed) the index database at the given path. If the
+    database can't be opened, fall back to a temporary in-memory database.
+
+    :param idx_path: The path to the index database file.
+    :param verbose: Where to print status information.
+    """
+
+    try:
+        idx_path.parent.mkdir(exist_ok=True)
+        conn = sqlite3.connect(idx_path.as_posix(), timeout=INDEX_TIMEOUT)
+        # WAL mode lets readers continue while another process updates the index.
+        # Not every filesystem supports it, in which case SQLite leaves the journal mode
+        # as is.
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        _index_create_table(conn)
+    except (OSError, sqlite3.Error) as err:
+        output.fprint(verbose, "Error opening index at '{}'. Using a temporary index "
+                               "instead. {}".format(idx_path.as_posix(), err),
+                      color=output.GRAY)
+        conn = sqlite3.connect(':memory:')
+        _index_create_table(conn)
+
+    return conn
+
+
+def _index_create_table(conn: sqlite3.Connection):
+    """Create the index tables and column indexes, if they don't already exist. Tables
+    from an incompatible schema version are replaced."""
+
+    columns = ', '.join('{} NUMERIC'.format(col) for col in INDEX_COLUMNS)
+    with conn:
+        conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)')
+        version = conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+        if version is None or version[0] != INDEX_SCHEMA_VERSION:
+            conn.execute('DROP TABLE IF EXISTS entries')
+            conn.execute('DELETE FROM meta')
+            conn.execute("INSERT INTO meta VALUES ('schema', ?)", (INDEX_SCHEMA_VERSION,))
+
+        # The mtime column holds the (nanosecond) mtime of the entry's directory
+        # when it was last transformed, or NULL if that wasn't reliable.
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries '
+            '(id INTEGER PRIMARY KEY, mtime INTEGER, {}, data TEXT NOT NULL)'
+            .format(columns))
+        for col in _SQL_INDEXED_COLUMNS:
+            conn.execute('CREATE INDEX IF NOT EXISTS entries_{col} ON entries ({col})'
+                         .format(col=col))
+
+
+def _stable_mtime(path: Path, now: float) -> Union[int, None]:
+    """Return the mtime (in ns) of the given path, or None if it is too recent to be
+    trusted for change detection (see INDEX_MTIME_MARGIN).
+
+    :raises OSError: When the path can't be stat'ed.
     """
 
-    idx_path = (id_dir/idx_name).with_suffix('.pkl')
+    mtime = path.stat().st_mtime_ns
+    if now - mtime/1e9 < INDEX_MTIME_MARGIN:
+        return None
+    return mtime
 
-    idx = Index({})
 
-    # Open and read the index if it exists. Any errors cause the index to
-    # regenerate from scratch.
-    idx_mtime = 0
-    if idx_path.exists():
-        try:
-            with idx_path.open('rb') as idx_file:
-                idx = pickle.load(idx_file)
-        except (OSError, PermissionError, json.JSONDecodeError) as err:
-            # In either error case, start from scratch.
-            output.fprint(verbose, "Error reading index at '{}'. Regenerating from "
-                                   "scratch. {}".format(idx_path.as_posix(), err),
-                          color=output.GRAY)
+def _dir_signature(id_dir: Path, now: float) -> Union[str, None]:
+    """Return a signature for the state of the id_dir, based on its mtime and the
+    mtime of its 'next_id' pkey file. Creating or removing any id directory
+    changes the signature. Returns None if a reliable signature can't be had."""
 
-    if not id_dir.exists():
-        return idx
+    try:
+        dir_mtime = _stable_mtime(id_dir, now)
+    except OSError:
+        return None
 
-    if idx and time.time() - idx_mtime <= refresh_period:
-        return idx
+    if dir_mtime is None:
+        return None
 
-    files = [file.path for file in os.scandir(id_dir.as_posix())]
+    try:
+        pkey_mtime = _stable_mtime(id_dir/PKEY_FN, now)
+        if pkey_mtime is None:
+            return None
+    except OSError:
+        # No pkey file (yet).
+        pkey_mtime = 0
 
-    def make_int_ids(paths: List[Path]) -> List[Tuple[int, Path]]:
-        """Convert an filename to an integer if we can."""
+    return '{}:{}'.format(dir_mtime, pkey_mtime)
 
-        id_results = []
 
-        for id_path in paths:
-            id_path = Path(id_path)
+def _index_row(id_: int, mtime: Union[int, None], data: Dict[str, Any],
+               complete_key: str) -> tuple:
+    """Convert the given transformed data into a row for the index table."""
 
-            try:
-                id_results.append((int(id_path.name, fn_base), id_path))
-            except ValueError:
-                pass
+    row = [id_, mtime]
+    for col in INDEX_COLUMNS:
+        if col == 'complete':
+            val = bool(data.get(complete_key, False))
+        else:
+            val = data.get(col)
+        if not isinstance(val, (str, int, float, type(None))):
+            val = None
+        row.append(val)
+    row.append(output.json_dumps(data))
+    return tuple(row)
+
+
+def _index_write(conn: sqlite3.Connection, rows: List[tuple], missing: Iterable[int],
+                 meta: Dict[str, Any] = None):
+    """Insert/replace the given rows, delete the missing ids, and update the
+    meta information in a single transaction."""
+
+    placeholders = ', '.join('?' for _ in range(len(INDEX_COLUMNS) + 3))
+    with conn:
+        conn.executemany('INSERT OR REPLACE INTO entries VALUES ({})'.format(placeholders),
+                         rows)
+        conn.executemany('DELETE FROM entries WHERE id = ?',
+                         [(id_,) for id_ in missing])
+        if meta:
+            conn.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)', meta.items())
+
+
+def _index_to_memory(conn: sqlite3.Connection, idx_path: Path) -> sqlite3.Connection:
+    """Copy the on disk index into an in-memory database, and return a connection
+    to that."""
+
+    mem_conn = sqlite3.connect(':memory:')
+    _index_create_table(mem_conn)
+    try:
+        mem_conn.execute('ATTACH DATABASE ? AS disk', (idx_path.as_posix(),))
+        with mem_conn:
+            mem_conn.execute('INSERT INTO main.entries SELECT * FROM disk.entries')
+        mem_conn.execute('DETACH DATABASE disk')
+    except sqlite3.Error:
+        # We'll just have to rebuild everything in memory.
+        pass
+    conn.close()
+    return mem_conn
 
-        return id_results
+
+def _index_import_legacy(conn: sqlite3.Connection, legacy_path: Path, complete_key: str):
+    """Seed a new index database with the contents of the older pickle based index,
+    if there is one. This saves us from having to transform every directory again."""
+
+    if not legacy_path.exists() or \
+            conn.execute('SELECT 1 FROM entries LIMIT 1').fetchone() is not None:
+        return
+
+    try:
+        with legacy_path.open('rb') as legacy_file:
+            legacy_idx = pickle.load(legacy_file)
+        rows = [_index_row(id_, None, data, complete_key)
+                for id_, data in legacy_idx.items()]
+        _index_write(conn, rows, [])
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, TypeError,
+            ValueError, sqlite3.Error):
+        # Any sort of problem just means we index from scratch.
+        pass
+
+
+def _index_update(pav_cfg, conn: sqlite3.Connection, idx_path: Path, id_dir: Path,
+                  transform: Callable[[Path], Dict[str, Any]], complete_key: str,
+                  refresh_period: int, verbose: IO[str], fn_base: int) \
+        -> Tuple[sqlite3.Connection, IndexStats]:
+    """Bring the index database up to date with the contents of the id_dir. Only new
+    entries and incomplete entries whose directory changed are transformed, and only
+    those rows (and the rows of deleted directories) are written. When the id_dir
+    itself hasn't changed, it isn't scanned at all.
+
+    Returns the connection to use for further queries (which may differ from the
+    one given if the index couldn't be written), and the update statistics."""
+
+    now = time.time()
+
+    meta = dict(conn.execute('SELECT key, value FROM meta'))
+
+    # Get this before scanning, so that any changes made while we scan are caught on
+    # the next update.
+    dir_sig = _dir_signature(id_dir, now)
+    dir_unchanged = dir_sig is not None and dir_sig == meta.get('dir_sig')
+
+    # New entries are always picked up, but changes to existing incomplete entries
+    # are only checked for every refresh_period seconds.
+    if dir_unchanged and now - meta.get('updated', 0) <= refresh_period:
+        return conn, IndexStats(0, _index_count(conn), 0, False)
 
     def do_transform(pair):
-        """Do the transform on the id and file pair."""
+        """Do the transform on the id and file pair. Get the directory mtime first,
+        so that any changes made during the transform are seen next time."""
 
         tid, file = pair
 
         try:
-            return tid, transform(file)
-        except (ValueError, KeyError, TypeError, OSError) as err:
-            return tid, None
+            mtime = _stable_mtime(file, now)
+            return tid, mtime, transform(file)
+        except (ValueError, KeyError, TypeError, OSError):
+            return tid, None, None
 
     thread_max = pav_cfg.get('max_threads')
-    with ThreadPoolExecutor(max_workers=thread_max) as pool:
-        # This sequence leaves us with a list of id, path pairs that need an index
-        # update.
-        chunk_size = int(math.ceil(len(files)/float(thread_max)))
-        chunks = [files[i*chunk_size:(i+1)*chunk_size] for i in range(thread_max)]
 
-        id_pairs = pool.map(make_int_ids, chunks)
-        # Grab the set of all ids. We'll use it to identify missing ids.
-        all_seen_ids = set()
+    if dir_unchanged:
+        # No id directories were added or removed, so just check on incomplete entries.
+        scanned = False
+        missing = set()
         update_id_pairs = []
-        for chunked_results in id_pairs:
-            for id_, path in chunked_results:
-                if id_ is None:
-                    continue
+        for id_, mtime in conn.execute('SELECT id, mtime FROM entries WHERE NOT complete'):
+            path = make_id_path(id_dir, id_)
+            try:
+                changed = mtime is None or path.stat().st_mtime_ns != mtime
+            except OSError:
+                missing.add(id_)
+                continue
+
+            if changed:
+                update_id_pairs.append((id_, path))
 
-                all_seen_ids.add(id_)
+    else:
+        scanned = True
 
-                if id_ in idx and idx[id_].get(complete_key, False):
+        _index_import_legacy(conn, (id_dir/idx_path.name).with_suffix('.pkl'),
+                             complete_key)
+
+        # The ids of every indexed entry, whether each is complete, and its mtime.
+        indexed = {id_: (complete, mtime) for id_, complete, mtime
+                   in conn.execute('SELECT id, complete, mtime FROM entries')}
+
+        files = [file.path for file in os.scandir(id_dir.as_posix())]
+
+        def make_int_ids(paths: List[Path]) -> List[Tuple[int, Path, Union[int, None]]]:
+            """Convert an filename to an integer if we can. Also get the mtime of
+            any incomplete entries."""
+
+            id_results = []
+
+            for id_path in paths:
+                id_path = Path(id_path)
+
+                try:
+                    id_ = int(id_path.name, fn_base)
+                except ValueError:
                     continue
-                update_id_pairs.append((id_, path))
 
-        missing = set(idx.keys()) - all_seen_ids
+                mtime = None
+                complete, idx_mtime = indexed.get(id_, (False, None))
+                if not complete and idx_mtime is not None:
+                    try:
+                        mtime = id_path.stat().st_mtime_ns
+                    except OSError:
+                        pass
+
+                id_results.append((id_, id_path, mtime))
 
-        transformed_data = pool.map(do_transform, update_id_pairs)
+            return id_results
 
-    for id_, data in transformed_data:
-        if data is None:
-            continue
+        with ThreadPoolExecutor(max_workers=thread_max) as pool:
+            chunk_size = int(math.ceil(len(files)/float(thread_max)))
+            chunks = [files[i*chunk_size:(i+1)*chunk_size] for i in range(thread_max)]
 
-        idx[id_] = data
+            # This sequence leaves us with a list of id, path pairs that need an index
+            # update.
+            all_seen_ids = set()
+            update_id_pairs = []
+            for chunked_results in pool.map(make_int_ids, chunks):
+                for id_, path, mtime in chunked_results:
+                    all_seen_ids.add(id_)
 
-    for id_ in missing:
-        del idx[id_]
+                    if id_ in indexed:
+                        complete, idx_mtime = indexed[id_]
+                        if complete or (idx_mtime is not None and mtime == idx_mtime):
+                            continue
+
+                    update_id_pairs.append((id_, path))
+
+        # Grab the set of all ids. We'll use it to identify missing ids.
+        missing = set(indexed.keys()) - all_seen_ids
+
+    with ThreadPoolExecutor(max_workers=thread_max) as pool:
+        transformed_data = list(pool.map(do_transform, update_id_pairs))
+
+    rows = [_index_row(id_, mtime, data, complete_key)
+            for id_, mtime, data in transformed_data if data is not None]
+
+    new_meta = {'updated': now}
+    if scanned:
+        new_meta['dir_sig'] = dir_sig
 
-    tmp_path = Path(tempfile.mktemp(
-        suffix='.dbtmp',
-        dir=idx_path.parent.as_posix()))
     try:
-        with tmp_path.open('wb') as tmp_file:
-            pickle.dump(idx, tmp_file)
-        tmp_path.rename(idx_path)
-    except OSError:
-        return idx
-    except (Exception, KeyboardInterrupt) as err:
-        try:
-            tmp_path.unlink()
-        except OSError:
-            pass
-        raise err
+        _index_write(conn, rows, missing, new_meta)
+    except sqlite3.Error as err:
+        output.fprint(verbose, "Could not update index at '{}'. Using a temporary "
+                               "copy instead. {}".format(idx_path.as_posix(), err),
+                      color=output.GRAY)
+        conn = _index_to_memory(conn, idx_path)
+        _index_write(conn, rows, missing)
+
+    stats = IndexStats(len(rows), _index_count(conn) - len(rows), len(missing), scanned)
+
+    return conn, stats
+
+
+def _index_count(conn: sqlite3.Connection) -> int:
+    """Return the number of entries in the index."""
+
+    return conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
 
-    return idx
+def _index_open(pav_cfg, id_dir: Path, idx_name: str,
+                transform: Callable[[Path], Dict[str, Any]],
+                complete_key: str = 'complete',
+                refresh_period: int = 1,
+                verbose: IO[str] = None,
+                fn_base: int = 10) -> sqlite3.Connection:
+    """Open the named index for the given id_dir, update it, and return a
+    connection to the index database. Arguments are as per 'index()'.
+    The caller is responsible for closing the connection."""
+
+    if not id_dir.exists():
+        conn = sqlite3.connect(':memory:')
+        _index_create_table(conn)
+        return conn
+
+    idx_path = (id_dir/INDEX_DIR/idx_name).with_suffix(INDEX_EXT)
+
+    conn = _index_connect(idx_path, verbose)
+
+    conn, stats = _index_update(pav_cfg, conn, idx_path, id_dir, transform, complete_key,
+                                refresh_period, verbose, fn_base)
+
+    if verbose is not None:
+        output.fprint(
+            verbose,
+            "Index '{}': {} entries transformed, {} served from the index, {} removed{}."
+            .format(idx_name, stats.transformed, stats.cached, stats.removed,
+                    '' if stats.scanned else ' (directory unchanged, scan skipped)'),
+            color=output.GRAY)
+
+    return conn
+
+
+def index(pav_cfg,
+          id_dir: Path, idx_name: str,
+          transform: Callable[[Path], Dict[str, Any]],
+          complete_key: str = 'complete',
+          refresh_period: int = 1,
+          verbose: IO[str] = None,
+          fn_base: int = 10) -> Index:
+    """Load and/or update an index of the given directory for the given
+    transform, and return it. The returned index is a dictionary by id of
+    the transformed data.
+
+    The index is kept in an SQLite database (``<id_dir>/.index/<idx_name>.db``),
+    keyed by id. The id directory is only scanned when its mtime (or that of its
+    'next_id' file) has changed since the last update, and only new entries and
+    changed incomplete entries are transformed again.
+
+    :param pav_cfg: The pavilion config.
+    :param id_dir: The directory to index.
+    :param idx_name: The name of the index.
+    :param transform: A transformation function that produces a json
+        compatible dictionary.
+    :param complete_key: The key in the transformed dictionary that marks a
+        record as complete. If not given, the record is always assumed to be
+        complete. Incomplete records are recompiled every time the index is
+        updated (hopefully they will be complete eventually).
+    :param refresh_period: Only check for changes to incomplete entries if this
+        much time (in seconds) has passed since the last update. New entries are
+        always added.
+    :param verbose: Print status information during indexing.
+    :param fn_base: The integer base for dir_db.
+    """
+
+    conn = _index_open(pav_cfg, id_dir, idx_name, transform, complete_key,
+                       refresh_period, verbose, fn_base)
+
+    try:
+        return Index({id_: json.loads(data) for id_, data in
+                      conn.execute('SELECT id, data FROM entries ORDER BY id')})
+    finally:
+        conn.close()
+
+
+def _index_query(conn: sqlite3.Connection, idx_filters: List[IndexFilter] = None,
+                 idx_order: str = None, order_asc: bool = True):
+    """Select rows from the index database, filtered and ordered by index columns.
+    Yields (id, data) tuples.
+
+    :param conn: The index database connection.
+    :param idx_filters: Filters to apply to index columns.
+    :param idx_order: The index column to sort on. Rows with a NULL value in this
+        column are excluded.
+    :param order_asc: Sort ascending if true, otherwise descending.
+    """
+
+    where = []
+    params = []
+    for idx_filter in idx_filters or []:
+        if idx_filter.column not in INDEX_COLUMNS and idx_filter.column != 'id':
+            raise ValueError("Invalid index column '{}'".format(idx_filter.column))
+        if idx_filter.op not in _INDEX_FILTER_OPS:
+            raise ValueError("Invalid index filter operation '{}'".format(idx_filter.op))
+
+        where.append('{} {} ?'.format(idx_filter.column, idx_filter.op))
+        params.append(idx_filter.value)
+
+    order = ''
+    if idx_order is not None:
+        if idx_order not in INDEX_COLUMNS and idx_order != 'id':
+            raise ValueError("Invalid index column '{}'".format(idx_order))
+
+        direction = 'ASC' if order_asc else 'DESC'
+        where.append('{} IS NOT NULL'.format(idx_order))
+        order = ' ORDER BY {col} {dir}, id {dir}'.format(col=idx_order, dir=direction)
+
+    query = 'SELECT id, data FROM entries'
+    if where:
+        query += ' WHERE ' + ' AND '.join(where)
+    query += order
+
+    for id_, data in conn.execute(query, params):
+        yield id_, json.loads(data)
 
 
 SelectItems = NamedTuple("SelectItems", [('data', List[Dict[str, Any]]),
@@ -301,7 +635,9 @@ def select(pav_cfg,
            idx_complete_key: 'str' = 'complete',
            use_index: Union[bool, str] = True,
            verbose: IO[str] = None,
-           limit: int = None) -> (List[Any], List[Path]):
+           limit: int = None,
+           idx_filters: List[IndexFilter] = None,
+           idx_order: str = None) -> (List[Any], List[Path]):
     """Filter and order found paths in the id directory based on the filter and
     other parameters. If a transform is given, this will create an index of the
     data returned by the transform to hasten this process.
@@ -327,6 +663,11 @@ def select(pav_cfg,
         is a valid integer.
     :param limit: The max items to return. None denotes return all.
     :param verbose: A file like object to print status info to.
+    :param idx_filters: Filters on index columns (see INDEX_COLUMNS) that the index
+        database can apply before the filter_func is called. The filter_func is
+        still applied to every item. Ignored when not using an index.
+    :param idx_order: The index column that order_func sorts by, if any. When given,
+        the index database does the sorting. Ignored when not using an index.
     :returns: A filtered, ordered list of transformed objects, and the list
               of untransformed paths.
     """
@@ -343,22 +684,33 @@ def select(pav_cfg,
                 "You must provide an index name using the 'use_index' "
                 "parameter when using a lambda function as the transform.")
 
+        if idx_order not in INDEX_COLUMNS and idx_order != 'id':
+            idx_order = None
+
         selected = []
 
-        idx = index(pav_cfg, id_dir, index_name, transform,
-                    complete_key=idx_complete_key, verbose=verbose)
-        for id_, data in idx.items():
-            path = make_id_path(id_dir, id_)
+        conn = _index_open(pav_cfg, id_dir, index_name, transform,
+                           complete_key=idx_complete_key, verbose=verbose,
+                           fn_base=fn_base)
+        try:
+            for id_, data in _index_query(conn, idx_filters, idx_order, order_asc):
+                if order_func is not None and order_func(data) is None:
+                    continue
 
-            if order_func is not None and order_func(data) is None:
-                continue
+                if not filter_func(data):
+                    continue
 
-            if not filter_func(data):
-                continue
+                selected.append((data, make_id_path(id_dir, id_)))
 
-            selected.append((data, path))
+                # When the database did the sorting, we can stop as soon as we
+                # have enough items.
+                if (idx_order is not None or order_func is None) \
+                        and limit is not None and len(selected) >= limit:
+                    break
+        finally:
+            conn.close()
 
-        if order_func is not None:
+        if order_func is not None and idx_order is None:
             selected.sort(key=lambda d: order_func(d[0]), reverse=not order_asc)
 
         return SelectItems(
@@ -5,12 +5,15 @@ in result evaluations.
 
 from .base import (FunctionPlugin, _FUNCTIONS, num, __reset)
 from .core import CoreFunctionPlugin
+from .. import lazy_plugins
 from ..errors import FunctionPluginError
 
 
 def get_plugin(name: str) -> FunctionPlugin:
     """Get the function plugin called 'name'."""
 
+    lazy_plugins.load('function', name)
+
     if name not in _FUNCTIONS:
         raise FunctionPluginError("No such function '{}'".format(name))
     else:
@@ -20,6 +23,8 @@ def get_plugin(name: str) -> FunctionPlugin:
 def list_plugins():
     """Return the list of function plugin names."""
 
+    lazy_plugins.load('function')
+
     return _FUNCTIONS.keys()
 
 
@@ -5,8 +5,23 @@ import os
 import pathlib
 import shutil
 import tarfile
+import uuid
 import zipfile
-from typing import Union
+import zlib
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Union
+
+from pavilion import utils
+
+WRITE_THREADS = 4
+"""The number of threads writing file contents while extracting tarballs."""
+
+MAX_PENDING_BYTES = 64*1024**2
+"""The most file data that can be read from a tarball but not yet written."""
+
+DIRECT_WRITE_SIZE = 8*1024**2
+"""Files at least this large are written directly, rather than being read into
+memory and handed to the write threads."""
 
 
 class FixedZipFile(zipfile.ZipFile):
@@ -91,48 +106,210 @@ class FixedTarFile(tarfile.TarFile):
                 raise tarfile.ExtractError("could not change mode")
 
 
+def _member_path(dest: str, name: str) -> str:
+    """Return the path the tar member with the given name extracts to under dest.
+
+    :raises tarfile.ExtractError: When the member would land outside of dest.
+    """
+
+    if os.path.isabs(name) or os.pardir in name.split('/'):
+        raise tarfile.ExtractError(
+            "Tarfile contains members with absolute paths or '..' components "
+            "('{}'), refusing to extract.".format(name))
+
+    return os.path.join(dest, name)
+
+
+def _write_file(path: str, data: bytes, mode: int, mtime: float):
+    """Write a file's contents and set its mode and modification time."""
+
+    with open(path, 'wb') as file:
+        file.write(data)
+    os.chmod(path, mode)
+    os.utime(path, (mtime, mtime))
+
+
+def _stream_extract(src: pathlib.Path, dest: pathlib.Path, umask: int):
+    """Extract the tarball at src into the (existing) directory dest. The tarball
+    is read (and decompressed) as a stream in this thread, while the file contents
+    are written by a pool of threads. Directory permissions and links are applied
+    once everything else is extracted. When a path appears more than once in the
+    tarball, the last member for it wins (as with tarfile.extractall()).
+
+    :raises OSError: On file errors.
+    :raises tarfile.TarError: On tarfile format errors.
+    """
+
+    dest = dest.as_posix()
+    umask = umask or 0
+    dirs = []
+    links = {}
+    # The most recent write for each path, so writes to the same path are ordered.
+    writes = {}
+    pending = set()
+    pending_bytes = {}
+
+    with tarfile.open(src.as_posix(), mode='r|*') as tar, \
+            ThreadPoolExecutor(max_workers=WRITE_THREADS) as pool:
+
+        for member in tar:
+            path = _member_path(dest, member.name)
+            mode = member.mode & ~umask
+
+            if member.isdir():
+                os.makedirs(path, exist_ok=True)
+                dirs.append((path, mode, member.mtime))
+                continue
+            elif member.issym() or member.islnk():
+                # Re-add, so the link is made in the order it was last seen.
+                links.pop(path, None)
+                links[path] = member
+                continue
+            elif not member.isreg():
+                # Device files and fifos are never needed for builds.
+                continue
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            member_file = tar.extractfile(member)
+
+            # Replace any earlier member with this path.
+            links.pop(path, None)
+            if path in writes:
+                writes.pop(path).result()
+
+            if member.size >= DIRECT_WRITE_SIZE:
+                with open(path, 'wb') as file:
+                    shutil.copyfileobj(member_file, file, 1024**2)
+                os.chmod(path, mode)
+                os.utime(path, (member.mtime, member.mtime))
+                continue
+
+            # Don't let reading get too far ahead of the writers.
+            while pending and sum(pending_bytes.values()) > MAX_PENDING_BYTES:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del pending_bytes[future]
+                    future.result()
+
+            future = pool.submit(_write_file, path, member_file.read(),
+                                 mode, member.mtime)
+            pending.add(future)
+            pending_bytes[future] = member.size
+            writes[path] = future
+
+        for future in pending:
+            future.result()
+
+    for path, member in links.items():
+        if os.path.lexists(path):
+            os.unlink(path)
+
+        if member.issym():
+            os.symlink(member.linkname, path)
+        else:
+            os.link(_member_path(dest, member.linkname), path)
+
+    # Set directory permissions deepest first, in case they remove write access.
+    for path, mode, mtime in reversed(dirs):
+        os.chmod(path, mode)
+        os.utime(path, (mtime, mtime))
+
+
 def extract_tarball(src: pathlib.Path, dest: pathlib.Path, umask: int):
     """Extract the given tarball at 'src' to the directory 'dest'. If the
     tarball contains a single directory then that directory will be 'dest',
     otherwise the contents of the tarball will be extracted into 'dest'.
 
+    Decompression is overlapped with writing the extracted files; see
+    WRITE_THREADS.
+
     :param src: The location of the tarball.
     :param dest: Where to extract to.
     :param umask: Umask to apply to extracted files.
     :returns: None if successful, an error message otherwise.
     """
 
+    tmpdir = dest.with_suffix('.extracted')
     try:
-        with FixedTarFile.open(src.as_posix(), umask=umask) as tar:
-            # Filter out all but the top level items.
-            top_level = [m for m in tar.members
-                         if '/' not in m.name]
-
-            for member in tar.members:
-                mpath = pathlib.Path(member.name)
-                if mpath.is_absolute():
-                    return ("Tarfile '{}' contains members with absolute "
-                            "paths, refusing to extract.".format(src))
-
-            # If the file contains only a single directory,
-            # make that directory the build directory. This
-            # should be the default in most cases.
-            if len(top_level) == 1 and top_level[0].isdir():
-                tmpdir = dest.with_suffix('.extracted')
-                tmpdir.mkdir()
-                tar.extractall(tmpdir.as_posix())
-                opath = tmpdir / top_level[0].name
-                opath.rename(dest)
-                tmpdir.rmdir()
-            else:
-                # Otherwise, the build path will contain the
-                # extracted contents of the archive.
-                dest.mkdir()
-                tar.extractall(dest.as_posix())
-    except (OSError, IOError,
+        tmpdir.mkdir()
+        _stream_extract(src, tmpdir, umask)
+
+        # If the file contains only a single directory,
+        # make that directory the build directory. This
+        # should be the default in most cases.
+        files = os.listdir(tmpdir.as_posix())
+        if len(files) == 1 and (tmpdir/files[0]).is_dir() \
+                and not (tmpdir/files[0]).is_symlink():
+            (tmpdir/files[0]).rename(dest)
+            tmpdir.rmdir()
+        else:
+            # Otherwise, the build path will contain the
+            # extracted contents of the archive.
+            tmpdir.rename(dest)
+    except (OSError, IOError, EOFError, lzma.LZMAError, zlib.error,
             tarfile.CompressionError, tarfile.TarError) as err:
         return ("Could not extract tarfile '{}' into '{}': {}"
                 .format(src, dest, err))
+    finally:
+        if tmpdir.exists():
+            shutil.rmtree(tmpdir.as_posix(), ignore_errors=True)
+
+
+def extract_tarball_cached(src: pathlib.Path, dest: pathlib.Path, umask: int,
+                           cached: pathlib.Path, note: Callable[[str], None]) \
+        -> Union[None, str]:
+    """Extract the tarball at 'src' to 'dest' (as with extract_tarball()), by way
+    of the extract cache entry 'cached'. The tarball is extracted there first
+    if it isn't already, and then that tree is copied to dest.
+
+    :param src: The location of the tarball.
+    :param dest: Where to extract to.
+    :param umask: Umask to apply to extracted files.
+    :param cached: The extract cache entry for this tarball (and umask).
+    :param note: Called with a message describing what's being done.
+    :returns: None if successful, an error message otherwise.
+    """
+
+    cache_dir = cached.parent
+    if not cached.exists():
+        note("Extracting tarfile {} for build {} into the extract cache."
+             .format(src, dest))
+
+        # Extract to a unique location, then move it into place. Should
+        # another build beat us to it, we just use theirs.
+        tmp_dest = cache_dir/'{}_{}.tmp'.format(cached.name, uuid.uuid4().hex)
+        try:
+            cache_dir.mkdir(exist_ok=True)
+        except OSError as err:
+            return ("Could not create extract cache directory '{}': {}"
+                    .format(cache_dir, err))
+
+        extract_error = extract_tarball(src, tmp_dest, umask)
+        if extract_error is not None:
+            return extract_error
+
+        try:
+            tmp_dest.rename(cached)
+        except OSError:
+            shutil.rmtree(tmp_dest.as_posix(), ignore_errors=True)
+    else:
+        note("Copying the cached extraction of tarfile {} for build {}."
+             .format(src, dest))
+
+    try:
+        utils.copytree(
+            cached.as_posix(),
+            dest.as_posix(),
+            copy_function=shutil.copyfile,
+            copystat=utils.make_umask_filtered_copystat(umask),
+            symlinks=True)
+    except OSError:
+        # The cache entry may have been removed out from under us (by
+        # 'pav clean'), so just extract the tarball directly instead.
+        shutil.rmtree(dest.as_posix(), ignore_errors=True)
+        return extract_tarball(src, dest, umask)
+
+    return None
 
 
 def decompress_file(src: pathlib.Path, dest: pathlib.Path, subtype: str) \
@@ -8,6 +8,7 @@ from functools import partial
 from pathlib import Path
 from typing import Dict, Any, Callable, List
 
+from pavilion import dir_db
 from pavilion import series
 from pavilion import utils
 from pavilion.status_file import TestStatusFile, SeriesStatusFile, StatusError
@@ -355,6 +356,60 @@ def make_test_run_filter(
     return filter_func
 
 
+def make_test_run_index_filters(
+        complete: bool = False, failed: bool = False, has_state: str = None,
+        incomplete: bool = False, name: str = None,
+        newer_than: float = None, older_than: float = None,
+        passed: bool = False, result_error: bool = False, state: str = None,
+        sys_name: str = None, user: str = None) -> List[dir_db.IndexFilter]:
+    """Generate the index column filters that correspond to the filter function
+    created by make_test_run_filter (given the same arguments). These let dir_db
+    skip most non-matching test runs when selecting from an index. Arguments
+    without a corresponding index column (has_state, name, state) are ignored.
+
+    :param complete: Only accept complete tests
+    :param failed: Only accept failed tests
+    :param has_state: Ignored.
+    :param incomplete: Only accept incomplete tests
+    :param name: Ignored.
+    :param newer_than: Only accept tests that are more recent than this date.
+    :param older_than: Only accept tests older than this date.
+    :param passed: Only accept passed tests
+    :param result_error: Only accept tests with a result error.
+    :param state: Ignored.
+    :param sys_name: Only accept tests with a matching sys_name.
+    :param user: Only accept tests started by this user.
+    """
+
+    # pylint: disable=unused-argument
+
+    if sys_name == LOCAL_SYS_NAME:
+        sys_vars = base_classes.get_vars(defer=True)
+        sys_name = sys_vars['sys_name']
+
+    idx_filters = []
+    if complete:
+        idx_filters.append(dir_db.IndexFilter('complete', '=', True))
+    if incomplete:
+        idx_filters.append(dir_db.IndexFilter('complete', '=', False))
+    if user:
+        idx_filters.append(dir_db.IndexFilter('user', '=', user))
+    if sys_name:
+        idx_filters.append(dir_db.IndexFilter('sys_name', '=', sys_name))
+    if passed:
+        idx_filters.append(dir_db.IndexFilter('result', '=', TestRun.PASS))
+    if failed:
+        idx_filters.append(dir_db.IndexFilter('result', '=', TestRun.FAIL))
+    if result_error:
+        idx_filters.append(dir_db.IndexFilter('result', '=', TestRun.ERROR))
+    if older_than is not None:
+        idx_filters.append(dir_db.IndexFilter('created', '<=', older_than))
+    if newer_than is not None:
+        idx_filters.append(dir_db.IndexFilter('created', '>=', newer_than))
+
+    return idx_filters
+
+
 def get_sort_opts(
         sort_name: str,
         stype: str) -> (Callable[[Path], Any], bool):
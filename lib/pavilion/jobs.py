@@ -2,9 +2,12 @@
 job, the job id, and the tests being run in that job."""
 
 
+import hashlib
 import json
+import os
 import pickle
 import shutil
+import struct
 import tempfile
 import uuid
 from pathlib import Path
@@ -31,6 +34,7 @@ class Job:
     SCHED_LOG_FN = 'sched.log'
     KICKOFF_LOG_FN = 'kickoff.log'
     NODE_INFO_FN = 'node_info.pkl'
+    NODE_REF_FN = 'node_info.ref'
 
     @classmethod
     def new(cls, pav_cfg, tests: list, kickoff_fn: str = None):
@@ -107,26 +111,74 @@ class Job:
                 parts.append(str(self.info[key]))
         return "_".join(parts)
 
-    def save_node_data(self, nodes: Nodes):
-        """Save node information (from kickoff time) for the given test."""
+    def save_node_data(self, nodes: Nodes, snapshot: 'NodeSnapshot' = None):
+        """Save node information (from kickoff time) for the given test.
+
+        :param nodes: The node info for each of the job's nodes.
+        :param snapshot: A node snapshot that contains all of the given nodes. When
+            given, the job just references the nodes in the snapshot rather than
+            saving its own copy of their info.
+        """
 
         try:
-            with (self.path/self.NODE_INFO_FN).open('wb') as data_file:
-                pickle.dump(nodes, data_file)
+            if snapshot is None:
+                with (self.path/self.NODE_INFO_FN).open('wb') as data_file:
+                    pickle.dump(nodes, data_file)
+            else:
+                with (self.path/self.NODE_REF_FN).open('w') as ref_file:
+                    ref_file.write(snapshot.hash + '\n')
+                    for node in nodes:
+                        ref_file.write(node + '\n')
         except OSError as err:
             raise JobError(
                 "Could not save node data: {}".format(err))
 
-    def load_sched_data(self) -> Nodes:
-        """Load the scheduler data that was saved from the kickoff time."""
+    def load_sched_data(self, node_names: List[str] = None) -> Nodes:
+        """Load the scheduler data that was saved from the kickoff time.
+
+        :param node_names: Only load the info for these nodes. They must all be
+            nodes that were saved with the job.
+        """
+
+        ref_path = self.path/self.NODE_REF_FN
+        if ref_path.exists():
+            try:
+                with ref_path.open() as ref_file:
+                    snap_hash = ref_file.readline().strip()
+                    job_nodes = [line.strip() for line in ref_file if line.strip()]
+            except OSError as err:
+                raise JobError(
+                    "Could not load node data: {}".format(err))
+
+            if node_names is None:
+                node_names = job_nodes
+            else:
+                missing = set(node_names) - set(job_nodes)
+                if missing:
+                    raise JobError(
+                        "Node data requested for nodes that aren't part of job {}: {}"
+                        .format(self.name, sorted(missing)))
+
+            snapshot = NodeSnapshot(self.path.parent/NodeSnapshot.SNAPSHOT_DIR/snap_hash)
+            return snapshot.load(node_names)
 
         try:
             with (self.path/self.NODE_INFO_FN).open('rb') as data_file:
-                return pickle.load(data_file)
+                nodes = pickle.load(data_file)
         except OSError as err:
             raise JobError(
                 "Could not load node data: {}".format(err))
 
+        if node_names is None:
+            return nodes
+
+        try:
+            return Nodes({node: nodes[node] for node in node_names})
+        except KeyError as err:
+            raise JobError(
+                "Node data requested for a node that isn't part of job {}: {}"
+                .format(self.name, err.args[0]))
+
     def get_test_id_pairs(self) -> List[ID_Pair]:
         """Return the test objects for each test that's part of this job. Only tests
         that still exist are returned."""
@@ -194,3 +246,114 @@ class Job:
         """Compare equality between two jobs."""
 
         return self.path == other.path
+
+
+class NodeSnapshot:
+    """A content addressed snapshot of the node info for many nodes, stored under
+    the jobs directory. Jobs reference the nodes they use in a snapshot rather than
+    each saving their own (often identical) copy of that information.
+
+    Each node's info is pickled separately, and followed by an index of where each
+    node's info is in the file. That lets us load the info for just the nodes we
+    need, without unpickling everything else."""
+
+    SNAPSHOT_DIR = '.node_snapshots'
+    """Where node snapshots are kept, under the jobs directory."""
+
+    _FOOTER = struct.Struct('>Q')
+
+    def __init__(self, path: Path):
+        """Reference the existing node snapshot at the given path."""
+
+        self.path = path
+        self.hash = path.name
+
+    @classmethod
+    def snapshot_dir(cls, pav_cfg) -> Path:
+        """The directory that holds the node snapshots."""
+
+        return pav_cfg['working_dir']/'jobs'/cls.SNAPSHOT_DIR
+
+    @classmethod
+    def save(cls, pav_cfg, nodes: Nodes) -> 'NodeSnapshot':
+        """Save a snapshot of the given nodes, if an identical one doesn't already
+        exist, and return it.
+
+        :raises JobError: When the snapshot can't be written.
+        """
+
+        rows = []
+        hasher = hashlib.sha256()
+        for name in sorted(nodes):
+            row = pickle.dumps(nodes[name])
+            hasher.update('{}\n{}\n'.format(name, len(row)).encode())
+            hasher.update(row)
+            rows.append((name, row))
+
+        snap_dir = cls.snapshot_dir(pav_cfg)
+        path = snap_dir/hasher.hexdigest()
+        if path.exists():
+            # Mark it as recently used, so it isn't cleaned up out from under us.
+            try:
+                os.utime(path.as_posix())
+            except OSError:
+                pass
+            return cls(path)
+
+        tmp_path = None
+        try:
+            snap_dir.mkdir(exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=snap_dir.as_posix(), prefix='.')
+            with os.fdopen(fd, 'wb') as snap_file:
+                index = {}
+                for name, row in rows:
+                    index[name] = (snap_file.tell(), len(row))
+                    snap_file.write(row)
+
+                index_pos = snap_file.tell()
+                pickle.dump(index, snap_file)
+                snap_file.write(cls._FOOTER.pack(index_pos))
+
+            os.chmod(tmp_path, 0o664)
+            os.rename(tmp_path, path.as_posix())
+        except OSError as err:
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+            raise JobError("Could not save node snapshot at '{}': {}".format(path, err))
+
+        return cls(path)
+
+    def load(self, node_names: List[str] = None) -> Nodes:
+        """Load the info for the given nodes (or all nodes) from the snapshot.
+
+        :raises JobError: When the snapshot can't be read or doesn't have one of
+            the given nodes.
+        """
+
+        nodes = Nodes({})
+        try:
+            with self.path.open('rb') as snap_file:
+                snap_file.seek(-self._FOOTER.size, os.SEEK_END)
+                index_pos, = self._FOOTER.unpack(snap_file.read(self._FOOTER.size))
+                snap_file.seek(index_pos)
+                index = pickle.load(snap_file)
+
+                if node_names is None:
+                    node_names = list(index)
+
+                for name in node_names:
+                    if name not in index:
+                        raise JobError(
+                            "Node snapshot '{}' has no info for node '{}'."
+                            .format(self.path, name))
+
+                    pos, size = index[name]
+                    snap_file.seek(pos)
+                    nodes[name] = pickle.loads(snap_file.read(size))
+        except (OSError, pickle.UnpicklingError, EOFError, struct.error) as err:
+            raise JobError("Could not load node snapshot '{}': {}".format(self.path, err))
+
+        return nodes
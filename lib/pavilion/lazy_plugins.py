@@ -0,0 +1,41 @@
+"""Plugins are only imported and activated when they're first needed (see
+pavilion.plugins). The plugin registries (and the config formats that plugins add
+to) use this module to ask for them. When the plugin system is initialized, it
+installs a loader for each plugin category here, which keeps those modules from
+having to import the plugin system (which imports them)."""
+
+from typing import Callable, Dict, Union
+
+# The loader for each plugin category. Each takes a plugin name (or None for
+# every plugin of the category), and returns whether anything was loaded.
+_LOADERS = {}  # type: Dict[str, Callable[[Union[str, None]], bool]]
+
+
+def set_loader(category: str, loader: Callable[[Union[str, None]], bool]):
+    """Install the lazy plugin loader for the given plugin category."""
+
+    _LOADERS[category] = loader
+
+
+def clear_loaders():
+    """Remove all installed loaders."""
+
+    _LOADERS.clear()
+
+
+def load(category: str, name: str = None) -> bool:
+    """Load the (not yet loaded) plugins of the given category that provide the
+    given name, or all of them if no name is given. This should be called before
+    every lookup by name, as an unloaded plugin may override (by priority) one
+    that's already registered under that name. Does nothing until the plugin
+    system is initialized.
+
+    :returns: True if anything was loaded.
+    :raises PluginError: When a plugin can't be activated.
+    """
+
+    loader = _LOADERS.get(category)
+    if loader is None:
+        return False
+
+    return loader(name)
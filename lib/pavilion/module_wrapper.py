@@ -5,6 +5,7 @@ import logging
 import re
 from typing import List, Union
 
+from pavilion import lazy_plugins
 from pavilion.module_actions import (
     ModuleLoad, ModuleSwap, ModuleUnload, ModuleAction)
 from pavilion.variables import VariableSetManager
@@ -83,6 +84,8 @@ found.
 :rtype: ModuleWrapper
 """
 
+    lazy_plugins.load('module', name)
+
     if name in _WRAPPED_MODULES:
         if version in _WRAPPED_MODULES[name]:
             # Grab the version specific wrapper.
@@ -99,6 +102,8 @@ def list_module_wrappers():
 
 :rtype: list
 """
+    lazy_plugins.load('module')
+
     return list(_WRAPPED_MODULES.keys())
 
 
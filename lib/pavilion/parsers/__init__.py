@@ -20,10 +20,12 @@ import re
 from typing import List
 
 import lark as _lark
-from .common import ParserValueError
+from .common import ParserValueError, ParseCache, PARSE_CACHE
 from .expressions import (get_expr_parser, EvaluationExprTransformer,
-                          VarRefVisitor)
-from .strings import get_string_parser, StringTransformer
+                          VarRefVisitor, parse_expression, EvaluationPlan,
+                          get_evaluation_plan)
+from .strings import (get_string_parser, StringTransformer, StringTemplate,
+                      compile_string)
 
 
 class ErrorCat:
@@ -90,9 +92,6 @@ class StringParserError(ValueError):
         return "\n".join([self.message, self.context])
 
 
-_TREE_CACHE = {}
-
-
 def parse_text(text, var_man) -> str:
     """Parse the given text and return the parsed result. Will try to figure
     out, to the best of its ability, exactly what caused any errors and report
@@ -104,18 +103,10 @@ def parse_text(text, var_man) -> str:
     :raises StringParserError: For syntax and other errors.
     """
 
-    parser = get_string_parser()
-    transformer = StringTransformer(var_man)
-
     def parse_fn(txt):
         """Shorthand for parsing text."""
 
-        tree = _TREE_CACHE.get(txt)
-        if tree is None:
-            tree = parser.parse(txt)
-            _TREE_CACHE[txt] = tree
-
-        return transformer.transform(tree)
+        return compile_string(txt).render(var_man)
 
     try:
         # On the surface it may seem that parsing and transforming should be
@@ -143,7 +134,7 @@ def check_expression(expr: str) -> List[str]:
     parser = get_expr_parser()
 
     try:
-        tree = parser.parse(expr)
+        tree = parse_expression(expr)
     except (_lark.UnexpectedCharacters, _lark.UnexpectedToken) as err:
         # Try to figure out why the error happened based on examples.
         err_type = match_examples(err, parser.parse, BAD_EXAMPLES, expr)
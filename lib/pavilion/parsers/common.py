@@ -1,6 +1,10 @@
 """This module contains base classes and exceptions shared by the various
 Pavilion parsers."""
 
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
 import lark
 
 
@@ -133,3 +137,94 @@ class PavTransformer(lark.Transformer):
             start_pos=tok_pos,
             end_pos=end_pos
         )
+
+
+class ParseCache:
+    """A bounded, thread safe, least recently used cache of parse results. It's
+    shared by all of the Pavilion parsers, with entries keyed by the kind of
+    result and the text that was parsed. Cached values are shared, and must never
+    be modified by their users.
+
+    :ivar int hits: How many lookups were found in the cache.
+    :ivar int misses: How many lookups had to be parsed.
+    """
+
+    DEFAULT_SIZE = 4096
+
+    def __init__(self, size: int = DEFAULT_SIZE):
+        """
+        :param size: The maximum number of entries to keep. Zero disables caching.
+        """
+
+        self._size = max(0, size)
+        self._entries = OrderedDict()  # type: OrderedDict[Hashable, Any]
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self) -> int:
+        """The maximum number of entries."""
+        return self._size
+
+    def resize(self, size: int):
+        """Change the maximum number of entries, evicting the least recently
+        used ones as needed."""
+
+        with self._lock:
+            self._size = max(0, size)
+            while len(self._entries) > self._size:
+                self._entries.popitem(last=False)
+
+    def get(self, kind: str, text: str, parse: Callable[[str], Any]) -> Any:
+        """Return the cached result for the given kind and text, or call
+        ``parse(text)`` to create it. Exceptions from parse() aren't cached.
+
+        :param kind: The kind of parse result.
+        :param text: The text to parse.
+        :param parse: A function that parses the text.
+        """
+
+        key = (kind, text)
+
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        value = parse(text)
+
+        if self._size:
+            with self._lock:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                if len(self._entries) > self._size:
+                    self._entries.popitem(last=False)
+
+        return value
+
+    def clear(self):
+        """Empty the cache and reset the stats."""
+
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return the cache's size, entry count, and hit and miss counts."""
+
+        with self._lock:
+            return {
+                'size': self._size,
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+PARSE_CACHE = ParseCache()
+"""The parse cache shared by all the Pavilion parsers."""
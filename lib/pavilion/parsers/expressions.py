@@ -6,13 +6,14 @@
 """
 
 import ast
+import functools
 from typing import Dict, Callable, Any, List
 
 import lark
 import pavilion.errors
 from pavilion import expression_functions as functions
 from pavilion.utils import auto_type_convert
-from .common import PavTransformer, ParserValueError
+from .common import PavTransformer, ParserValueError, PARSE_CACHE
 
 EXPR_GRAMMAR = r'''
 
@@ -122,9 +123,20 @@ def get_expr_parser(debug=False):
     return parser
 
 
+def parse_expression(expr: str) -> lark.Tree:
+    """Parse the given expression, using the shared parse cache. The returned
+    tree is shared, and must not be modified.
+
+    :raises lark.UnexpectedInput: On syntax errors.
+    """
+
+    return PARSE_CACHE.get('expr', expr, get_expr_parser().parse)
+
+
 class BaseExprTransformer(PavTransformer):
     """Transforms the expression parse tree into an actual value.  The
-    resolved value will be one of the literal types."""
+    resolved value will be one of the literal types. The tree itself is left
+    unchanged, so (cached) trees can be transformed any number of times."""
 
     # pylint: disable=no-self-use,invalid-name
 
@@ -435,8 +447,7 @@ class BaseExprTransformer(PavTransformer):
         """
 
         # Ints are a series of digits, so this can't fail
-        tok.value = int(tok.value)
-        return tok
+        return lark.Token.new_borrow_pos(tok.type, int(tok.value), tok)
 
     def FLOAT(self, tok: lark.Token) -> lark.Token:
         """Convert to a float.
@@ -445,22 +456,19 @@ class BaseExprTransformer(PavTransformer):
         """
 
         # Similar to ints, this can't fail either.
-        tok.value = float(tok.value)
-        return tok
+        return lark.Token.new_borrow_pos(tok.type, float(tok.value), tok)
 
     def BOOL(self, tok: lark.Token) -> lark.Token:
         """Convert to a boolean."""
 
         # Assumes BOOL only matches 'True' or 'False'
-        tok.value = tok.value == 'True'
-
-        return tok
+        return lark.Token.new_borrow_pos(tok.type, tok.value == 'True', tok)
 
     def ESCAPED_STRING(self, tok: lark.Token) -> lark.Token:
         """Remove quotes from the given string."""
 
-        tok.value = ast.literal_eval('r' + tok.value)
-        return tok
+        return lark.Token.new_borrow_pos(tok.type, ast.literal_eval('r' + tok.value),
+                                         tok)
 
 
 class ExprTransformer(BaseExprTransformer):
@@ -669,3 +677,120 @@ class VarRefVisitor(lark.Visitor):
         var_name = '.'.join(var_parts)
 
         return [var_name]
+
+
+class EvaluationPlan:
+    """A result evaluation expression, compiled so that it can be evaluated against
+    many result dicts without walking the parse tree each time.
+
+    The parse tree is flattened (once) into a post-order list of steps. Literal
+    tokens are converted when the plan is compiled. Evaluating the plan just runs
+    those steps with a value stack, calling the same EvaluationExprTransformer
+    methods the tree transform would, so the values (and errors) are identical.
+
+    :ivar List[str] var_refs: The variable references in the expression.
+    """
+
+    def __init__(self, tree: lark.Tree):
+        """
+        :param tree: The expression parse tree. It isn't modified.
+        """
+
+        # Each step is a (tree, value, child_count) tuple. Steps with a tree
+        # call the transformer method for that tree on the last child_count values.
+        # Other steps just push their (already transformed) value.
+        self._steps = []
+        self._compile(tree, EvaluationExprTransformer({}))
+        self.var_refs = VarRefVisitor().visit(tree)
+
+    def _compile(self, tree: lark.Tree, transformer: 'EvaluationExprTransformer'):
+        """Add the steps for the given tree, after those for each of its children."""
+
+        for child in tree.children:
+            if isinstance(child, lark.Tree):
+                self._compile(child, transformer)
+            elif isinstance(child, lark.Token):
+                # The token callbacks only convert literal values, and don't
+                # depend on the results.
+                self._steps.append(
+                    # pylint: disable=protected-access
+                    (None, transformer._call_userfunc_token(child), 0))
+            else:
+                self._steps.append((None, child, 0))
+
+        self._steps.append((tree, None, len(tree.children)))
+
+    def _bind(self, transformer: 'EvaluationExprTransformer') -> List[Callable]:
+        """Get the transformer method to call for each step (or None)."""
+
+        funcs = []
+        for tree, _, _ in self._steps:
+            if tree is None:
+                funcs.append(None)
+                continue
+
+            func = getattr(transformer, tree.data, None)
+            if func is None or hasattr(func, 'visit_wrapper'):
+                # Let the transformer handle anything unusual.
+                # pylint: disable=protected-access
+                func = functools.partial(transformer._call_userfunc, tree)
+            funcs.append(func)
+
+        return funcs
+
+    def _run(self, funcs: List[Callable]) -> Any:
+        """Run each step with the given bound methods, and return the final value."""
+
+        stack = []
+        for (_, value, child_count), func in zip(self._steps, funcs):
+            if func is None:
+                stack.append(value)
+            elif child_count:
+                children = stack[-child_count:]
+                del stack[-child_count:]
+                stack.append(func(children))
+            else:
+                stack.append(func([]))
+
+        return stack[0]
+
+    def evaluate(self, results: dict) -> Any:
+        """Evaluate the expression against the given results.
+
+        :raises ParserValueError: When the expression can't be evaluated (such as
+            due to a missing key), just as with EvaluationExprTransformer.
+        """
+
+        return self._run(self._bind(EvaluationExprTransformer(results)))
+
+    def evaluate_many(self, results_list: List[dict]) -> List[Any]:
+        """Evaluate the expression against each of the given result dicts.
+
+        :returns: The value for each result dict. When the expression couldn't be
+            evaluated for a result dict, the exception raised is given instead, so
+            that one bad result dict doesn't stop the rest.
+        """
+
+        transformer = EvaluationExprTransformer({})
+        funcs = self._bind(transformer)
+
+        values = []
+        for results in results_list:
+            transformer.results = results
+            try:
+                values.append(self._run(funcs))
+            except (ParserValueError, ArithmeticError, TypeError, ValueError) as err:
+                values.append(err)
+
+        return values
+
+
+def get_evaluation_plan(expr: str) -> EvaluationPlan:
+    """Parse and compile the given evaluation expression, using the shared parse
+    cache. The returned plan is shared, but is never modified.
+
+    :raises lark.UnexpectedInput: On syntax errors.
+    """
+
+    return PARSE_CACHE.get('eval_plan', expr,
+                           lambda text: EvaluationPlan(parse_expression(text)))
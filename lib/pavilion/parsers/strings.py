@@ -10,8 +10,8 @@ String LALR Grammar
 
 from typing import List
 import lark
-from .common import ParserValueError, PavTransformer
-from .expressions import get_expr_parser, ExprTransformer, VarRefVisitor
+from .common import ParserValueError, PavTransformer, PARSE_CACHE
+from .expressions import ExprTransformer, VarRefVisitor, parse_expression
 
 STRING_GRAMMAR = r'''
 // All strings resolve to this token. 
@@ -99,19 +99,28 @@ class ExprToken(lark.Token):
     """Denotes a special token that represents an expression."""
 
 
+STRING_ESCAPES = {'\\{{': '{{', '\\~': '~', '\\\\{{': '\\{{', '\\\\~': '\\~'}
+"""The extra escapes applied to the literal parts of strings."""
+
+
 class StringTransformer(PavTransformer):
     """Dynamically transform parsed strings into their final value.
 
     - string productions always return a list of tokens.
     - ExprTokens are generated for expressions.
+    - Iterations are compiled into Iteration objects, which are resolved along
+      with the rest of the string.
     - These lists are collapsed by both 'start' and 'sub_string' productions.
 
       - The collapsed result is a single token.
       - The collapse process resolves all ExprTokens.
     - All other productions collapse their components immediately.
+
+    The tree being transformed is never modified.
     """
 
     EXPRESSION = '<expression>'
+    ITERATION = '<iteration>'
 
     def __init__(self, var_man):
         """Initialize the transformer.
@@ -129,18 +138,7 @@ class StringTransformer(PavTransformer):
         :param list[lark.Token] items: A single token of string components.
         """
 
-        parts = []
-        for item in items[0].value:
-            if item.type == self.EXPRESSION:
-                parts.append(self._resolve_expr(item, self.var_man))
-            else:
-                parts.append(item.value)
-
-        # Add a trailing newline if necessary.
-        if len(items) > 1:
-            parts.append('\n')
-
-        return ''.join(parts)
+        return StringTemplate(items[0].value, len(items) > 1).render(self.var_man)
 
     def string(self, items) -> lark.Token:
         """Strings are merged into a single token whose value is all
@@ -151,16 +149,15 @@ class StringTransformer(PavTransformer):
 
         token_list = []
         for item in items:
-            if isinstance(item.value, list):
+            if item.type == self.ITERATION:
+                token_list.append(item)
+            elif isinstance(item.value, list):
                 token_list.extend(item.value)
             elif isinstance(item.value, dict):
                 token_list.append(item)
             else:
-                item.value = self._unescape(
-                    item.value, {'\\{{': '{{', '\\~': '~',
-                                 '\\\\{{': '\\{{', '\\\\~': '\\~'})
-
-                token_list.append(item)
+                token_list.append(lark.Token.new_borrow_pos(
+                    item.type, self.unescape(item.value, STRING_ESCAPES), item))
 
         return self._merge_tokens(items, token_list)
 
@@ -183,7 +180,8 @@ class StringTransformer(PavTransformer):
             )
 
         if items[-1].type == 'FORMAT':
-            expr_format = items.pop()
+            expr_format = items[-1]
+            items = items[:-1]
         else:
             expr_format = None
 
@@ -198,78 +196,23 @@ class StringTransformer(PavTransformer):
         """Handle an iteration section. These can contain anything except
         nested iteration sections. This part of the string will be repeated for
         every combination of used multi-valued variables (that don't specify
-        an index). The returned result is a single token that is fully
-        resolved and combined into a single string.
+        an index). The returned token's value is an Iteration, which is resolved
+        into a single string when the whole string is.
 
         :param items: The 'iter_inner' token and a separator token. The value
             of 'iter_inner' will be a list of Tokens including strings,
             escapes, and expressions.
         """
 
-        # The original tokens will be set as the inner value.
-        inner_items = items[0].value
-        separator = self._unescape(items[1].value[1:-1],
+        separator = self.unescape(items[1].value[1:-1],
                                    {'\\]': ']', '\\\\]': '\\]'})
 
-        expressions = [item for item in inner_items
-                       if item.type == self.EXPRESSION]
-
-        visitor = VarRefVisitor()
-        used_vars = []
-
-        expr_trees = {}
-
-        for expr in expressions:
-            expr_tree = self.parse_expr(expr)
-            expr_trees[expr] = expr_tree
+        iteration = Iteration(items[0].value, separator, self._merge_tokens(items, None))
 
-            # Get the used variables from the expression.
-            used_vars.extend(visitor.visit(expr_tree))
-
-        # Get a set of the (var_set, var) tuples used in expressions that
-        # aren't specifically indexed.
-        filtered_vars = []
-        direct_refs = set()
-        for var_name in used_vars:
-            var_set, var, idx, sub_var = self.var_man.resolve_key(var_name)
-            if idx is None:
-                if (var_set, var) not in filtered_vars:
-                    filtered_vars.append((var_set, var))
-            else:
-                direct_refs.add((var_set, var, idx, sub_var))
-
-        # Make sure no direct references were used to variables we'll be
-        # iterating over.
-        for direct_ref in direct_refs:
-            var_set, var, idx, sub_var = direct_ref
-            if (var_set, var) in filtered_vars:
-                key = self.var_man.key_as_dotted(direct_ref)
-                raise ParserValueError(
-                    token=self._merge_tokens(items, None),
-                    message="Variable {} was referenced, but is also being "
-                    "iterated over. You can't do both.".format(key)
-                )
-
-        # Get a variable manager for each permutation.
-        var_men = self.var_man.get_permutations(filtered_vars)
-
-        # Resolve iteration string and expression for each permutation.
-        iterations = []
-        for var_man in var_men:
-            parts = []
-            for item in inner_items:
-                if item.type == self.EXPRESSION:
-                    tree = expr_trees[item]
-                    parts.append(self._resolve_expr(item, var_man, tree=tree))
-                else:
-                    parts.append(item.value)
-
-            iterations.append(''.join(parts))
-
-        return self._merge_tokens(items, separator.join(iterations))
+        return self._merge_tokens(items, iteration, type_=self.ITERATION)
 
     @staticmethod
-    def _unescape(text, escapes) -> str:
+    def unescape(text, escapes) -> str:
         """Pavilion mostly relies yaml to handle un-escaping strings. There,
         are, however, a few contexts where additional escapes are necessary.
 
@@ -307,10 +250,11 @@ class StringTransformer(PavTransformer):
 
     @staticmethod
     def parse_expr(expr: lark.Token) -> lark.Tree:
-        """Parse the given expression token and return the tree."""
+        """Parse the given expression token and return the tree. The tree
+        comes from the shared parse cache, and must not be modified."""
 
         try:
-            return get_expr_parser().parse(expr.value['expr'])
+            return parse_expression(expr.value['expr'])
         except ParserValueError as err:
             err.pos_in_stream += expr.start_pos
             # Re-raise the corrected error
@@ -322,9 +266,8 @@ class StringTransformer(PavTransformer):
             err.expr_error = True
             raise err
 
-    def _resolve_expr(self,
-                      expr: lark.Token, var_man,
-                      tree=None) -> str:
+    @classmethod
+    def resolve_expr(cls, expr: lark.Token, var_man, tree=None) -> str:
         """Resolve the value of the the given expression token.
         :param expr: An expression token. The value will be a dict
             of the expr string and the formatter.
@@ -336,7 +279,7 @@ class StringTransformer(PavTransformer):
         """
 
         if tree is None:
-            tree = self.parse_expr(expr)
+            tree = cls.parse_expr(expr)
 
         transformer = ExprTransformer(var_man)
         try:
@@ -396,6 +339,191 @@ class StringTransformer(PavTransformer):
         return self._merge_tokens(items, flat_items)
 
 
+class StringCompiler(StringTransformer):
+    """Compiles a parsed string into a StringTemplate, rather than resolving
+    it."""
+
+    def __init__(self):
+        super().__init__(var_man=None)
+
+    def start(self, items) -> 'StringTemplate':
+        """Return the compiled string.
+
+        :param list[lark.Token] items: A single token of string components.
+        """
+
+        return StringTemplate(items[0].value, len(items) > 1)
+
+
+def _compile_parts(items: List[lark.Token], variables: List[str]) -> list:
+    """Compile string component tokens into a list of literal strings,
+    (expression token, expression tree) tuples, and Iterations. Variables used
+    by the expressions and iterations are added to 'variables'."""
+
+    parts = []
+    visitor = VarRefVisitor()
+
+    for item in items:
+        if item.type == StringTransformer.EXPRESSION:
+            tree = StringTransformer.parse_expr(item)
+            parts.append((item, tree))
+            used_vars = visitor.visit(tree)
+        elif item.type == StringTransformer.ITERATION:
+            parts.append(item.value)
+            used_vars = item.value.variables
+        else:
+            # Merge adjacent literal text.
+            if parts and isinstance(parts[-1], str):
+                parts[-1] += item.value
+            else:
+                parts.append(item.value)
+            continue
+
+        for var_name in used_vars:
+            if var_name not in variables:
+                variables.append(var_name)
+
+    return parts
+
+
+class Iteration:
+    """A compiled iteration section of a Pavilion string.
+
+    :ivar List[str] variables: The variables used in the iteration.
+    """
+
+    def __init__(self, items: List[lark.Token], separator: str, token: lark.Token):
+        """
+        :param items: The string and expression tokens in the iteration.
+        :param separator: The (unescaped) separator.
+        :param token: The token for the whole iteration, for errors.
+        """
+
+        self.separator = separator
+        self.token = token
+        self.variables = []  # type: List[str]
+        self._parts = _compile_parts(items, self.variables)
+
+    def render(self, var_man) -> str:
+        """Resolve this iteration against the given variable manager.
+
+        :param pavilion.test_config.variables.VariableSetManager var_man:
+        """
+
+        # Get a set of the (var_set, var) tuples used in expressions that
+        # aren't specifically indexed.
+        filtered_vars = []
+        direct_refs = set()
+        for var_name in self.variables:
+            var_set, var, idx, sub_var = var_man.resolve_key(var_name)
+            if idx is None:
+                if (var_set, var) not in filtered_vars:
+                    filtered_vars.append((var_set, var))
+            else:
+                direct_refs.add((var_set, var, idx, sub_var))
+
+        # Make sure no direct references were used to variables we'll be
+        # iterating over.
+        for direct_ref in direct_refs:
+            var_set, var, idx, sub_var = direct_ref
+            if (var_set, var) in filtered_vars:
+                key = var_man.key_as_dotted(direct_ref)
+                raise ParserValueError(
+                    token=self.token,
+                    message="Variable {} was referenced, but is also being "
+                    "iterated over. You can't do both.".format(key)
+                )
+
+        # Resolve iteration string and expression for each permutation.
+        iterations = []
+        for perm_var_man in var_man.get_permutations(filtered_vars):
+            parts = []
+            for part in self._parts:
+                if isinstance(part, str):
+                    parts.append(part)
+                else:
+                    expr, tree = part
+                    parts.append(StringTransformer.resolve_expr(
+                        expr, perm_var_man, tree=tree))
+
+            iterations.append(''.join(parts))
+
+        # The resolved iteration is unescaped like any other literal part of the
+        # enclosing string.
+        return StringTransformer.unescape(
+            self.separator.join(iterations), STRING_ESCAPES)
+
+
+class StringTemplate:
+    """A Pavilion string compiled for quick resolution. The literal parts of the
+    string are already unescaped, and all of its expressions are already parsed,
+    so rendering it against a variable manager only has to resolve the
+    expressions and iterations. Templates are cached and shared, so they're never
+    modified after creation.
+
+    :ivar List[str] variables: The variables used in the string.
+    """
+
+    def __init__(self, items: List[lark.Token], trailing_newline: bool):
+        """
+        :param items: The component tokens of the parsed string.
+        :param trailing_newline: Whether the string had a trailing newline.
+        """
+
+        self.variables = []  # type: List[str]
+        self._parts = _compile_parts(items, self.variables)
+        if trailing_newline:
+            self._parts.append('\n')
+
+        # Strings that are just text are the most common case by far.
+        self._text = None
+        if not self._parts:
+            self._text = ''
+        elif len(self._parts) == 1 and isinstance(self._parts[0], str):
+            self._text = self._parts[0]
+
+    def render(self, var_man) -> str:
+        """Resolve the string against the given variable manager.
+
+        :param pavilion.test_config.variables.VariableSetManager var_man:
+        :raises DeferredError: When a deferred variable is used.
+        :raises ParserValueError: When an expression can't be resolved.
+        """
+
+        if self._text is not None:
+            return self._text
+
+        parts = []
+        for part in self._parts:
+            if isinstance(part, str):
+                parts.append(part)
+            elif isinstance(part, Iteration):
+                parts.append(part.render(var_man))
+            else:
+                expr, tree = part
+                parts.append(StringTransformer.resolve_expr(
+                    expr, var_man, tree=tree))
+
+        return ''.join(parts)
+
+
+def compile_string(text: str) -> StringTemplate:
+    """Parse and compile the given Pavilion string, using the shared parse cache.
+    The returned template is shared, and must not be modified.
+
+    :raises lark.UnexpectedInput: On syntax errors.
+    :raises ParserValueError: On expression syntax errors.
+    """
+
+    return PARSE_CACHE.get('string', text, _compile_string)
+
+
+def _compile_string(text: str) -> StringTemplate:
+    """Parse and compile the given string, without the cache."""
+
+    return StringCompiler().transform(get_string_parser().parse(text))
+
+
 class StringVarRefVisitor(VarRefVisitor):
     """Parse expressions and get all used variables. """
 
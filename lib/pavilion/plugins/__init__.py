@@ -12,10 +12,19 @@ for Pavilion to recognize them.
   that aren't included as separate yapsy plugin modules.
 """
 
+import configparser
+import functools
+import hashlib
 import inspect
 import logging
+import os
+import pickle
+import threading
 import traceback
+from pathlib import Path
+from typing import Dict, List, Union
 
+from pavilion import lazy_plugins
 from pavilion.commands import Command
 from pavilion.expression_functions import FunctionPlugin
 from pavilion.module_wrapper import ModuleWrapper
@@ -48,10 +57,308 @@ class PluginError(RuntimeError):
     """General Plugin Error"""
 
 
+class LazyPluginManager:
+    """Finds the plugins in the given plugin directories, but only imports and
+    activates them when they're first needed (see load(), which the plugin
+    registries call through pavilion.lazy_plugins).
+
+    To do that without importing every plugin, it keeps a manifest (in the
+    working_dir) of each plugin's category and the names it registers under, as
+    found the last time the plugin was loaded. Plugins that are new, have changed
+    since, or that failed to load are always loaded immediately.
+
+    A name may be provided by more than one plugin (including core plugins), with
+    the highest priority one winning. Lookups by name should therefore always ask
+    for any unloaded plugins with that name to be loaded (see load()), even when
+    a plugin by that name is already registered.
+
+    :ivar List[str] plugin_dirs: The directories to look for plugins in.
+    :ivar Dict[str, dict] entries: The manifest entries, by plugin info file path.
+    :ivar list plugins: The (yapsy PluginInfo objects for) loaded plugins.
+    """
+
+    MANIFEST_DIR = 'plugin_manifests'
+    """Where plugin manifests are kept, under the working_dir."""
+
+    VERSION = 1
+
+    INFO_EXT = '.yapsy-plugin'
+
+    def __init__(self, plugin_dirs: List[str], working_dir: Union[Path, None],
+                 disabled: List[str]):
+        """
+        :param plugin_dirs: The directories to look for plugins in.
+        :param working_dir: Where to keep the plugin manifest. If None, no manifest
+            is kept (and all plugins are loaded immediately).
+        :param disabled: Plugins (as <category>.<name>) to never activate.
+        """
+
+        self.plugin_dirs = plugin_dirs
+        self.disabled = disabled
+        self.plugins = []
+        self.entries = {}  # type: Dict[str, dict]
+        # The (category, name) pairs provided by unloaded plugins.
+        self._unloaded_names = set()
+        self._changed = False
+        self._lock = threading.RLock()
+
+        if working_dir is None:
+            self.path = None
+        else:
+            name = hashlib.sha256('\0'.join(plugin_dirs).encode()).hexdigest()[:32]
+            self.path = Path(working_dir)/self.MANIFEST_DIR/(name + '.pkl')
+
+    def _load_manifest(self) -> Dict[str, dict]:
+        """Load the saved manifest entries, if there are any."""
+
+        if self.path is None:
+            return {}
+
+        try:
+            with self.path.open('rb') as manifest_file:
+                data = pickle.load(manifest_file)
+            if data['version'] == self.VERSION and data['dirs'] == self.plugin_dirs:
+                return data['entries']
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError, TypeError,
+                AttributeError, ValueError):
+            pass
+
+        return {}
+
+    def _save_manifest(self):
+        """Save the manifest, if it changed. This is best effort."""
+
+        if self.path is None or not self._changed:
+            return
+
+        data = {
+            'version': self.VERSION,
+            'dirs': self.plugin_dirs,
+            'entries': self.entries,
+        }
+
+        tmp_path = self.path.with_name('.{}.{}.tmp'.format(self.path.name, os.getpid()))
+        try:
+            self.path.parent.mkdir(exist_ok=True)
+            with tmp_path.open('wb') as tmp_file:
+                pickle.dump(data, tmp_file)
+            tmp_path.rename(self.path)
+            self._changed = False
+        except OSError:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+
+    @staticmethod
+    def _file_state(path: str) -> Union[tuple, None]:
+        """Return the (mtime, size) of the given file, or None if it's missing."""
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_info(self, info_path: str) -> dict:
+        """Create a new (unloaded) manifest entry from the given plugin info file."""
+
+        entry = {
+            'info_state': self._file_state(info_path),
+            'name': None,
+            'module': None,
+            'module_state': None,
+            'category': None,
+            'names': [],
+        }
+
+        parser = configparser.ConfigParser()
+        try:
+            parser.read(info_path)
+            entry['name'] = parser.get('Core', 'Name')
+            module = os.path.join(os.path.dirname(info_path), parser.get('Core', 'Module'))
+        except (configparser.Error, UnicodeDecodeError):
+            return entry
+
+        # Plugin modules can be a single file or a package.
+        if os.path.exists(module + '.py'):
+            entry['module'] = module + '.py'
+        else:
+            entry['module'] = os.path.join(module, '__init__.py')
+        entry['module_state'] = self._file_state(entry['module'])
+
+        return entry
+
+    def _find_info_files(self) -> List[str]:
+        """Find all the plugin info files, the same way yapsy does."""
+
+        info_files = []
+        for plugin_dir in self.plugin_dirs:
+            for dirpath, _, filenames in os.walk(plugin_dir, followlinks=True):
+                for filename in filenames:
+                    if filename.endswith(self.INFO_EXT):
+                        info_files.append(os.path.join(dirpath, filename))
+
+        return info_files
+
+    def scan(self):
+        """Find all the plugins, and load those that aren't (up to date) in the
+        manifest.
+
+        :raises PluginError: When a plugin can't be activated.
+        """
+
+        with self._lock:
+            old_entries = self._load_manifest()
+            to_load = set()
+
+            for info_path in self._find_info_files():
+                entry = old_entries.get(info_path)
+                if (entry is None
+                        or entry['category'] is None
+                        or entry['info_state'] != self._file_state(info_path)
+                        or entry['module_state'] != self._file_state(entry['module'])):
+                    entry = self._read_info(info_path)
+                    to_load.add(info_path)
+                    self._changed = True
+
+                entry['loaded'] = False
+                self.entries[info_path] = entry
+
+            if set(old_entries) != set(self.entries):
+                self._changed = True
+
+            self._check_conflicts()
+
+            self._load(to_load)
+            self._index_unloaded()
+
+    def _index_unloaded(self):
+        """Update the set of names provided by unloaded plugins."""
+
+        self._unloaded_names = {
+            (entry['category'], name) for entry in self.entries.values()
+            if not entry['loaded'] for name in entry['names']}
+
+    def _check_conflicts(self):
+        """Command plugins can't share names, so make sure they don't before we
+        load them (which would fail later, at a less convenient time).
+
+        :raises PluginError: On conflict.
+        """
+
+        command_names = {}
+        for info_path, entry in self.entries.items():
+            if entry['category'] != 'command':
+                continue
+
+            for name in entry['names']:
+                if name in command_names:
+                    raise PluginError(
+                        "Multiple commands of the same name are not allowed to "
+                        "exist. command.{} found at both {} and {}."
+                        .format(name, command_names[name], info_path))
+                command_names[name] = info_path
+
+    def _disabled(self, category: str, entry: dict) -> bool:
+        """Whether the plugin for the given entry is disabled."""
+
+        return '{}.{}'.format(category, entry['name']) in self.disabled
+
+    def _load(self, info_paths):
+        """Import and activate the plugins for the given info files, and record
+        what they provide in the manifest.
+
+        :raises PluginError: When a plugin can't be activated.
+        """
+
+        if not info_paths:
+            return
+
+        try:
+            pman = PluginManager.PluginManager(directories_list=self.plugin_dirs,
+                                               categories_filter=PLUGIN_CATEGORIES)
+            pman.locatePlugins()
+            candidates = []
+            for candidate in pman.getPluginCandidates():
+                if candidate[0] in info_paths:
+                    candidates.append(candidate)
+                else:
+                    pman.removePluginCandidate(candidate)
+
+            pman.loadPlugins()
+        except Exception as err:
+            raise PluginError("Error initializing plugin system: {}".format(err))
+
+        for info_path in info_paths:
+            self.entries[info_path]['loaded'] = True
+        self._index_unloaded()
+
+        for info_path, _, plugin in candidates:
+            entry = self.entries[info_path]
+            if getattr(plugin, 'plugin_object', None) is None or not plugin.categories:
+                # Yapsy will have logged why.
+                continue
+
+            category = plugin.category
+            plugin_obj = plugin.plugin_object
+            names = plugin_obj.aliases if category == 'command' else [plugin_obj.name]
+            if (entry['category'], entry['names']) != (category, names):
+                entry['category'] = category
+                entry['names'] = list(names)
+                self._changed = True
+
+            if self._disabled(category, entry):
+                # Don't initialize these plugins.
+                continue
+
+            try:
+                plugin_obj.activate()
+            except Exception as err:
+                raise PluginError("Error activating plugin {name}:\n{err}\n{tb}"
+                                  .format(name=plugin.name, err=err,
+                                          tb=traceback.format_exc()))
+
+            self.plugins.append(plugin)
+
+        self._save_manifest()
+
+    def unloaded(self, category: str, name: str = None) -> List[str]:
+        """Return the info paths of unloaded plugins of the given category (that
+        provide the given name)."""
+
+        return [info_path for info_path, entry in self.entries.items()
+                if not entry['loaded'] and entry['category'] == category
+                and (name is None or name in entry['names'])]
+
+    def load(self, category: str, name: str = None) -> bool:
+        """Load the unloaded plugins of the given category. If a name is given, only
+        load those that provide that name.
+
+        :returns: True if any plugins were loaded.
+        :raises PluginError: When a plugin can't be activated.
+        """
+
+        # This is called on most plugin lookups, so skip the lock when there's
+        # nothing to load.
+        if name is not None and (category, name) not in self._unloaded_names:
+            return False
+
+        with self._lock:
+            info_paths = set(self.unloaded(category, name))
+            self._load(info_paths)
+
+        return bool(info_paths)
+
+
 def initialize_plugins(pav_cfg):
-    """Initialize the plugin system, and activate plugins in all known plugin
-    directories (except those specifically disabled in the config. Should
-    only ever be run once pavilion command.
+    """Initialize the plugin system, and find the plugins in all known plugin
+    directories (except those specifically disabled in the config). Plugins
+    are only imported and activated when they're first needed, except for those
+    that haven't been seen before (or have changed). Should only ever be run once
+    per pavilion command.
+
     :param pav_cfg: The pavilion configuration
     :return: Nothing
     :raises PluginError: When there's an issue with a plugin or the plugin
@@ -71,39 +378,33 @@ def initialize_plugins(pav_cfg):
         if (config['path']/'plugins').exists():
             plugin_dirs.append((config['path']/'plugins').as_posix())
 
-    try:
-        pman = PluginManager.PluginManager(directories_list=plugin_dirs,
-                                           categories_filter=PLUGIN_CATEGORIES)
-
-        pman.collectPlugins()
-    except Exception as err:
-        raise PluginError("Error initializing plugin system: {}".format(err))
-
-    # Activate each plugin in turn.
-    for plugin in pman.getAllPlugins():
-        plugin_dot_name = '{p.category}.{p.name}'.format(p=plugin)
+    pman = LazyPluginManager(plugin_dirs, pav_cfg.get('working_dir'),
+                             pav_cfg.get('disable_plugins', []))
+    pman.scan()
 
-        if plugin_dot_name in pav_cfg.disable_plugins:
-            # Don't initialize these plugins.
-            continue
-
-        try:
-            plugin.plugin_object.activate()
-        except Exception as err:
-            raise PluginError("Error activating plugin {name}:\n{err}\n{tb}"
-                              .format(name=plugin.name, err=err,
-                                      tb=traceback.format_exc()))
+    # Command plugins have to be known to the argument parser before they're
+    # loaded. (Command names that are loaded will have registered themselves.)
+    for info_path in pman.unloaded('command'):
+        entry = pman.entries[info_path]
+        if not pman._disabled('command', entry):  # pylint: disable=protected-access
+            Command.register_lazy_plugin(entry['names'])
 
     # Some plugin types have core plugins that are built-in.
     for _, cat_obj in PLUGIN_CATEGORIES.items():
         if hasattr(cat_obj, 'register_core_plugins'):
             cat_obj.register_core_plugins()
 
+    # Let each plugin registry load the rest of the plugins as they're needed.
+    for category in PLUGIN_CATEGORIES:
+        lazy_plugins.set_loader(category, functools.partial(pman.load, category))
+
     _PLUGIN_MANAGER = pman
 
 
 def list_plugins():
-    """Get the list of plugins by category. These will be IPlugin objects.
+    """Get the list of plugins by category. These will be IPlugin objects. This
+    loads every plugin.
+
     :return: A dict of plugin categories, each with a dict of plugins by name.
     :raises RuntimeError: If you don't initialize the plugin system first
     """
@@ -112,10 +413,12 @@ def list_plugins():
         raise RuntimeError("Plugin system has not been initialized.")
 
     plugins = {}
-    for category in _PLUGIN_MANAGER.getCategories():
+    for category in PLUGIN_CATEGORIES:
+        _PLUGIN_MANAGER.load(category)
         plugins[category] = {}
-        for plugin in _PLUGIN_MANAGER.getPluginsOfCategory(category):
-            plugins[category][plugin.name] = plugin
+
+    for plugin in _PLUGIN_MANAGER.plugins:
+        plugins[plugin.category][plugin.name] = plugin
 
     return plugins
 
@@ -127,6 +430,7 @@ def _reset_plugins():
     global _PLUGIN_MANAGER  # pylint: disable=W0603
 
     _PLUGIN_MANAGER = None
+    lazy_plugins.clear_loaders()
 
     for _, cat_obj in PLUGIN_CATEGORIES.items():
         module = inspect.getmodule(cat_obj)
@@ -16,11 +16,15 @@ import pprint
 import re
 import uuid
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
-from typing import List, IO, Dict
+from typing import List, IO, Dict, Tuple, Union
 
+import pavilion.config
 import yc_yaml
 from pavilion import output, variables
+from pavilion import parsers
 from pavilion import pavilion_variables
 from pavilion import resolve
 from pavilion import schedulers
@@ -31,6 +35,7 @@ from pavilion.test_config import file_format
 from pavilion.test_config.file_format import (TEST_NAME_RE,
                                               KEY_NAME_RE)
 from pavilion.test_config.file_format import TestConfigLoader, TestSuiteLoader
+from pavilion.test_config.cache import ConfigCache
 from pavilion.utils import union_dictionary
 from yaml_config import RequiredError
 
@@ -60,6 +65,12 @@ class TestConfigResolver:
     def __init__(self, pav_cfg):
         self.pav_cfg = pav_cfg
 
+        cache_dir = pav_cfg.get('working_dir') if pav_cfg.get('config_cache', True) else None
+        self._cache = ConfigCache(cache_dir, pavilion.config.get_version())
+
+        parsers.PARSE_CACHE.resize(
+            pav_cfg.get('parse_cache_size', parsers.ParseCache.DEFAULT_SIZE))
+
         self.base_var_man = variables.VariableSetManager()
 
         try:
@@ -76,7 +87,7 @@ class TestConfigResolver:
             'pav', pavilion_variables.PavVars()
         )
 
-    def build_variable_manager(self, raw_test_cfg):
+    def build_variable_manager(self, raw_test_cfg, sched_var_set=None):
         """Get all of the different kinds of Pavilion variables into a single
         variable set manager for this test.
 
@@ -88,6 +99,8 @@ class TestConfigResolver:
 
         :param raw_test_cfg: A raw test configuration. It should be from before
             any variables are resolved.
+        :param sched_var_set: The test's 'sched' variable set, as from
+            get_sched_var_set(). It's gotten from the scheduler if not given.
         :rtype: variables.VariableSetManager
         """
 
@@ -103,6 +116,31 @@ class TestConfigResolver:
             raise TestConfigError("Error in variables section for test '{}': {}"
                                   .format(test_name, err))
 
+        if sched_var_set is None:
+            sched_var_set = self._get_sched_vars(raw_test_cfg, var_man)
+
+        var_man.add_var_set('sched', sched_var_set)
+
+        return var_man
+
+    def get_sched_var_set(self, raw_test_cfg) -> variables.VariableSet:
+        """Get the 'sched' variable set for the given raw test. This sets up (and
+        caches) per-test state on the scheduler plugin, which isn't thread safe and
+        has to exist in this process to later schedule the test. The rest of the
+        test's variable manager can be built anywhere (see build_variable_manager()).
+
+        :param raw_test_cfg: A raw test configuration. It should be from before
+            any variables are resolved.
+        """
+
+        return self.build_variable_manager(raw_test_cfg).variable_sets['sched']
+
+    def _get_sched_vars(self, raw_test_cfg, var_man: variables.VariableSetManager) \
+            -> schedulers.SchedulerVariables:
+        """Get the scheduler variables for the given raw test, resolving its
+        schedule section with the given (sys, pav and var only) variable manager."""
+
+        test_name = raw_test_cfg.get('name', '<no name>')
         scheduler = raw_test_cfg.get('scheduler', '<undefined>')
         try:
             sched = schedulers.get_plugin(scheduler)
@@ -120,7 +158,7 @@ class TestConfigResolver:
         schedule_cfg = resolve.test_vars(schedule_cfg, var_man)
 
         try:
-            sched_vars = sched.get_initial_vars(schedule_cfg)
+            return sched.get_initial_vars(schedule_cfg, self.pav_cfg)
         except schedulers.SchedulerPluginError as err:
             # Errors should generally be deferred here, but just in case.
             raise TestConfigError(
@@ -128,10 +166,6 @@ class TestConfigResolver:
                 "Scheduler Config: \n{}"
                 .format(scheduler, test_name, err.args[0], pprint.pformat(schedule_cfg)))
 
-        var_man.add_var_set('sched', sched_vars)
-
-        return var_man
-
     def check_required_variables(self, raw_tests: List[Dict]):
         """Check all the variables defined as defaults with a null value to
         make sure they were actually defined."""
@@ -221,29 +255,9 @@ class TestConfigResolver:
                 else:
                     suites[suite_name]['supersedes'].append(file)
 
-                # It's ok if the tests aren't completely validated. They
-                # may have been written to require a real host/mode file.
-                with file.open('r') as suite_file:
-                    try:
-                        suite_cfg = TestSuiteLoader().load(suite_file,
-                                                           partial=True)
-                    except (
-                            TypeError,
-                            KeyError,
-                            ValueError,
-                            yc_yaml.YAMLError,
-                    ) as err:
-                        suites[suite_name]['err'] = err
-                        continue
-
-                base = TestConfigLoader().load_empty()
-
                 try:
-                    suite_cfgs = self.resolve_inheritance(
-                        base_config=base,
-                        suite_cfg=suite_cfg,
-                        suite_path=file
-                    )
+                    suite_cfgs = self._cache.load(
+                        'suite_info', [file], partial(self._load_suite_info, file))
                 except Exception as err:  # pylint: disable=W0703
                     suites[suite_name]['err'] = err
                     continue
@@ -264,6 +278,30 @@ class TestConfigResolver:
                     }
         return suites
 
+    def _load_suite_info(self, suite_path: Path) -> Dict[str, dict]:
+        """Load the given suite file and resolve inheritance for each of its
+        tests, without any host or mode configs applied."""
+
+        # It's ok if the tests aren't completely validated. They
+        # may have been written to require a real host/mode file.
+        with suite_path.open('r') as suite_file:
+            suite_cfg = TestSuiteLoader().load(suite_file, partial=True)
+
+        base = TestConfigLoader().load_empty()
+
+        return self.resolve_inheritance(
+            base_config=base,
+            suite_cfg=suite_cfg,
+            suite_path=suite_path
+        )
+
+    @staticmethod
+    def _load_config_file(path: Path) -> dict:
+        """Load (and fully validate) the given host or mode config file."""
+
+        with path.open() as config_file:
+            return file_format.TestConfigLoader().load(config_file)
+
     def find_all_configs(self, conf_type):
         """ Find all configs (host/modes) within known config directories.
 
@@ -298,9 +336,8 @@ class TestConfigResolver:
 
                     full_path = file
                     try:
-                        with file.open() as config_file:
-                            config = file_format.TestConfigLoader().load(
-                                config_file)
+                        config = self._cache.load(
+                            'config', [file], partial(self._load_config_file, file))
                         configs[name]['path'] = full_path
                         configs[name]['config'] = config
                         configs[name]['status'] = ''
@@ -359,8 +396,6 @@ class TestConfigResolver:
                     raw_test['not_if'], conditions['not_if']
                 )
 
-        resolved_tests = []
-
         for raw_test in raw_tests:
             # Apply the overrides to each of the config values.
             try:
@@ -372,41 +407,10 @@ class TestConfigResolver:
 
         self.check_required_variables(raw_tests)
 
-        complete = 0
-
-        if len(raw_tests) == 0:
+        if not raw_tests:
             return []
-        elif len(raw_tests) == 1:
-            base_var_man = self.build_variable_manager(raw_tests[0])
-            return self.resolve(raw_tests[0], base_var_man)
-        else:
-            async_results = []
-            proc_count = min(self.pav_cfg['max_cpu'], len(raw_tests))
-            with mp.Pool(processes=proc_count) as pool:
-                for raw_test in raw_tests:
-                    base_var_man = self.build_variable_manager(raw_test)
-                    async_results.append(
-                        pool.apply_async(self.resolve, (raw_test, base_var_man))
-                    )
-
-                while async_results:
-                    for aresult in list(async_results):
-                        if aresult.ready():
-                            async_results.remove(aresult)
 
-                            resolved_tests.extend(aresult.get())
-
-                            complete += 1
-                            progress = len(raw_tests) - complete
-                            progress = (1 - progress/len(raw_tests))
-                            output.fprint(outfile,
-                                          "Resolving Test Configs: {:.0%}".format(progress),
-                                          end='\r')
-
-                    try:
-                        aresult.wait(0.5)
-                    except TimeoutError:
-                        pass
+        resolved_tests = self._resolve_raw_tests(raw_tests, outfile)
 
         if outfile:
             output.fprint(outfile, '')
@@ -416,6 +420,95 @@ class TestConfigResolver:
 
         return resolved_tests
 
+    RESOLVE_SERIAL_MAX = 2
+    """Resolve this many raw tests (or fewer) serially."""
+    RESOLVE_THREAD_MAX = 16
+    """Resolve this many raw tests (or fewer) with a thread pool. This avoids the cost
+    of starting processes (and shipping results between them) when that would
+    outweigh the parallelism gained. More tests than this are resolved in a process
+    pool."""
+
+    def resolve_mode(self, count: int) -> str:
+        """Pick how to resolve the given number of raw tests: 'serial', 'thread' or
+        'process'."""
+
+        if count <= self.RESOLVE_SERIAL_MAX or self.pav_cfg['max_cpu'] == 1:
+            return 'serial'
+        elif (count <= self.RESOLVE_THREAD_MAX
+              # Daemonic processes aren't allowed to have children.
+              or mp.current_process().daemon):
+            return 'thread'
+        else:
+            return 'process'
+
+    def _resolve_raw_tests(self, raw_tests: List[dict], outfile: IO[str]) \
+            -> List[ProtoTest]:
+        """Resolve each of the given raw tests into ProtoTests, serially or in
+        parallel as makes sense (see resolve_mode()). Progress is written to
+        outfile as each raw test is completed. The resolved tests are returned in the
+        order of the raw tests they came from."""
+
+        mode = self.resolve_mode(len(raw_tests))
+
+        if mode == 'serial':
+            return [ptest for raw_test in raw_tests
+                    for ptest in self.resolve_raw(raw_test)]
+
+        # Getting the scheduler variables sets up (and caches) per-test state on the
+        # scheduler plugins, which isn't thread safe and has to exist in this
+        # process to later schedule the tests. Everything else is done in parallel.
+        sched_var_sets = [self.get_sched_var_set(raw_test) for raw_test in raw_tests]
+
+        results = [None] * len(raw_tests)
+
+        if mode == 'thread':
+            with ThreadPoolExecutor(max_workers=self.pav_cfg['max_threads']) as pool:
+                futures = {pool.submit(self.resolve_raw, raw_test, sched_var_set): i
+                           for i, (raw_test, sched_var_set)
+                           in enumerate(zip(raw_tests, sched_var_sets))}
+
+                for complete, future in enumerate(as_completed(futures), 1):
+                    results[futures[future]] = future.result()
+                    self._resolve_progress(outfile, complete, len(raw_tests))
+        else:
+            # Only the raw test configs, their 'sched' variable sets (and their
+            # index) are sent to the workers. Each worker has its own resolver, whose
+            # base variable manager provides the rest.
+            proc_count = min(self.pav_cfg['max_cpu'], len(raw_tests))
+            chunksize = max(1, len(raw_tests)//(proc_count*4))
+            items = [(i, raw_test, sched_var_set) for i, (raw_test, sched_var_set)
+                     in enumerate(zip(raw_tests, sched_var_sets))]
+            with mp.Pool(processes=proc_count, initializer=_init_resolve_worker,
+                         initargs=(self.pav_cfg,)) as pool:
+                worker_results = pool.imap_unordered(
+                    _resolve_in_worker, items, chunksize=chunksize)
+
+                for complete, (i, ptests) in enumerate(worker_results, 1):
+                    results[i] = ptests
+                    self._resolve_progress(outfile, complete, len(raw_tests))
+
+        return [ptest for ptests in results for ptest in ptests]
+
+    @staticmethod
+    def _resolve_progress(outfile: IO[str], complete: int, total: int):
+        """Print the test resolution progress."""
+
+        output.fprint(outfile, "Resolving Test Configs: {:.0%}".format(complete/total),
+                      end='\r')
+
+    def resolve_raw(self, raw_test: dict, sched_var_set: variables.VariableSet = None) \
+            -> List[ProtoTest]:
+        """Build the variable manager for the given raw test, and resolve it
+        (and its permutations).
+
+        :param raw_test: The raw test config.
+        :param sched_var_set: The test's 'sched' variable set, if already gotten
+            (see get_sched_var_set()).
+        """
+
+        base_var_man = self.build_variable_manager(raw_test, sched_var_set)
+        return self.resolve(raw_test, base_var_man)
+
     def resolve(self, test_cfg: dict, base_var_man: variables.VariableSetManager):
         """Resolve one test config, and apply the given overrides."""
 
@@ -488,12 +581,16 @@ class TestConfigResolver:
         base_config = test_config_loader.load_empty()
 
         base_config = self.apply_host(base_config, host)
+        host_sources = []
+        if host is not None:
+            _, host_cfg_path = self.find_config(CONF_HOST, host)
+            if host_cfg_path is not None:
+                host_sources.append(host_cfg_path)
 
         # A dictionary of test suites to a list of subtests to run in that
         # suite.
         all_tests = defaultdict(dict)
         picked_tests = []
-        test_suite_loader = TestSuiteLoader()
 
         total_tests = []
         # Make sue we get the correct amount of tests
@@ -590,43 +687,10 @@ class TestConfigResolver:
                         "locations: {}"
                         .format(test_suite, cdirs))
 
-                try:
-                    with test_suite_path.open() as test_suite_file:
-                        # We're loading this in raw mode, because the defaults
-                        # will have already been provided.
-                        # Each test config will be individually validated later.
-                        test_suite_cfg = test_suite_loader.load_raw(
-                            test_suite_file)
-
-                except (IOError, OSError, ) as err:
-                    raise TestConfigError(
-                        "Could not open test suite config {}: {}"
-                        .format(test_suite_path, err))
-                except ValueError as err:
-                    raise TestConfigError(
-                        "Test suite '{}' has invalid value. {}"
-                        .format(test_suite_path, err))
-                except KeyError as err:
-                    raise TestConfigError(
-                        "Test suite '{}' has an invalid key. {}"
-                        .format(test_suite_path, err))
-                except yc_yaml.YAMLError as err:
-                    raise TestConfigError(
-                        "Test suite '{}' has a YAML Error: {}"
-                        .format(test_suite_path, err)
-                    )
-                except TypeError as err:
-                    # All config elements in test configs must be strings,
-                    # and just about everything converts cleanly to a string.
-                    raise RuntimeError(
-                        "Test suite '{}' raised a type error, but that "
-                        "should never happen. {}".format(test_suite_path, err))
-
-                suite_tests = self.resolve_inheritance(
-                    base_config,
-                    test_suite_cfg,
-                    test_suite_path
-                )
+                # The resolved suite depends on the host config as well.
+                suite_tests = self._cache.load(
+                    'suite', [test_suite_path] + host_sources,
+                    partial(self._load_suite, test_suite_path, base_config))
 
                 # Add some basic information to each test config.
                 for test_cfg_name, test_cfg in suite_tests.items():
@@ -675,6 +739,48 @@ class TestConfigResolver:
 
         return picked_tests
 
+    def _load_suite(self, test_suite_path: Path, base_config: dict) -> Dict[str, dict]:
+        """Load the given suite file, and resolve inheritance for each of its tests
+        on top of the given base config."""
+
+        try:
+            with test_suite_path.open() as test_suite_file:
+                # We're loading this in raw mode, because the defaults
+                # will have already been provided.
+                # Each test config will be individually validated later.
+                test_suite_cfg = TestSuiteLoader().load_raw(
+                    test_suite_file)
+
+        except (IOError, OSError, ) as err:
+            raise TestConfigError(
+                "Could not open test suite config {}: {}"
+                .format(test_suite_path, err))
+        except ValueError as err:
+            raise TestConfigError(
+                "Test suite '{}' has invalid value. {}"
+                .format(test_suite_path, err))
+        except KeyError as err:
+            raise TestConfigError(
+                "Test suite '{}' has an invalid key. {}"
+                .format(test_suite_path, err))
+        except yc_yaml.YAMLError as err:
+            raise TestConfigError(
+                "Test suite '{}' has a YAML Error: {}"
+                .format(test_suite_path, err)
+            )
+        except TypeError as err:
+            # All config elements in test configs must be strings,
+            # and just about everything converts cleanly to a string.
+            raise RuntimeError(
+                "Test suite '{}' raised a type error, but that "
+                "should never happen. {}".format(test_suite_path, err))
+
+        return self.resolve_inheritance(
+            base_config,
+            test_suite_cfg,
+            test_suite_path
+        )
+
     def verify_version_range(self, comp_versions):
         """Validate a version range value."""
 
@@ -736,41 +842,12 @@ class TestConfigResolver:
     def apply_host(self, test_cfg, host):
         """Apply the host configuration to the given config."""
 
-        test_config_loader = TestConfigLoader()
-
         if host is not None:
             _, host_cfg_path = self.find_config(CONF_HOST, host)
 
             if host_cfg_path is not None:
-                try:
-                    with host_cfg_path.open() as host_cfg_file:
-                        # Load the host test config defaults.
-                        test_cfg = test_config_loader.load_merge(
-                            test_cfg,
-                            host_cfg_file,
-                            partial=True)
-                except (IOError, OSError) as err:
-                    raise TestConfigError("Could not open host config '{}': {}"
-                                          .format(host_cfg_path, err))
-                except ValueError as err:
-                    raise TestConfigError(
-                        "Host config '{}' has invalid value. {}"
-                        .format(host_cfg_path, err))
-                except KeyError as err:
-                    raise TestConfigError(
-                        "Host config '{}' has an invalid key. {}"
-                        .format(host_cfg_path, err))
-                except yc_yaml.YAMLError as err:
-                    raise TestConfigError(
-                        "Host config '{}' has a YAML Error: {}"
-                        .format(host_cfg_path, err)
-                    )
-                except TypeError as err:
-                    # All config elements in test configs must be strings,
-                    # and just about everything converts cleanly to a string.
-                    raise RuntimeError(
-                        "Host config '{}' raised a type error, but that "
-                        "should never happen. {}".format(host_cfg_path, err))
+                # Load the host test config defaults.
+                test_cfg = self._load_merge(test_cfg, host_cfg_path, 'Host')
 
             test_cfg = resolve.cmd_inheritance(test_cfg)
 
@@ -782,8 +859,6 @@ class TestConfigResolver:
         :param list modes: A list of mode names.
         """
 
-        test_config_loader = TestConfigLoader()
-
         for mode in modes:
             _, mode_cfg_path = self.find_config(CONF_MODE, mode)
 
@@ -792,39 +867,56 @@ class TestConfigResolver:
                     "Could not find {} config file for {}."
                     .format(CONF_MODE, mode))
 
-            try:
-                with mode_cfg_path.open() as mode_cfg_file:
-                    # Load this mode_config and merge it into the base_config.
-                    test_cfg = test_config_loader.load_merge(test_cfg,
-                                                             mode_cfg_file,
-                                                             partial=True)
-            except (IOError, OSError) as err:
-                raise TestConfigError("Could not open mode config '{}': {}"
-                                      .format(mode_cfg_path, err))
-            except ValueError as err:
-                raise TestConfigError(
-                    "Mode config '{}' has invalid value. {}"
-                    .format(mode_cfg_path, err))
-            except KeyError as err:
-                raise TestConfigError(
-                    "Mode config '{}' has an invalid key. {}"
-                    .format(mode_cfg_path, err))
-            except yc_yaml.YAMLError as err:
-                raise TestConfigError(
-                    "Mode config '{}' has a YAML Error: {}"
-                    .format(mode_cfg_path, err)
-                )
-            except TypeError as err:
-                # All config elements in test configs must be strings, and just
-                # about everything converts cleanly to a string.
-                raise RuntimeError(
-                    "Mode config '{}' raised a type error, but that "
-                    "should never happen. {}".format(mode_cfg_path, err))
+            # Load this mode_config and merge it into the base_config.
+            test_cfg = self._load_merge(test_cfg, mode_cfg_path, 'Mode')
 
             test_cfg = resolve.cmd_inheritance(test_cfg)
 
         return test_cfg
 
+    def _load_merge(self, test_cfg: dict, cfg_path: Path, cfg_type: str) -> dict:
+        """Load the given host or mode config and merge it into test_cfg. This
+        is equivalent to TestConfigLoader.load_merge(), except that the raw
+        config data is cached.
+
+        :param cfg_type: The type of config ('Host' or 'Mode'), for errors.
+        """
+
+        test_config_loader = TestConfigLoader()
+
+        def load_raw():
+            """Load the raw config data from file."""
+            with cfg_path.open() as cfg_file:
+                return test_config_loader.load_raw(cfg_file)
+
+        try:
+            raw_cfg = self._cache.load('raw', [cfg_path], load_raw)
+            values = test_config_loader.normalize(raw_cfg)
+            return test_config_loader.validate(
+                test_config_loader.merge(test_cfg, values), partial=True)
+        except (IOError, OSError) as err:
+            raise TestConfigError("Could not open {} config '{}': {}"
+                                  .format(cfg_type.lower(), cfg_path, err))
+        except ValueError as err:
+            raise TestConfigError(
+                "{} config '{}' has invalid value. {}"
+                .format(cfg_type, cfg_path, err))
+        except KeyError as err:
+            raise TestConfigError(
+                "{} config '{}' has an invalid key. {}"
+                .format(cfg_type, cfg_path, err))
+        except yc_yaml.YAMLError as err:
+            raise TestConfigError(
+                "{} config '{}' has a YAML Error: {}"
+                .format(cfg_type, cfg_path, err)
+            )
+        except TypeError as err:
+            # All config elements in test configs must be strings, and just
+            # about everything converts cleanly to a string.
+            raise RuntimeError(
+                "{} config '{}' raised a type error, but that "
+                "should never happen. {}".format(cfg_type, cfg_path, err))
+
     def resolve_inheritance(self, base_config, suite_cfg, suite_path):
         """Resolve inheritance between tests in a test suite. There's potential
         for loops in the inheritance hierarchy, so we have to be careful of
@@ -1149,3 +1241,26 @@ class TestConfigResolver:
                     for k, v in value.items()}
         else:
             raise ValueError("Invalid type in override value: {}".format(value))
+
+
+_WORKER_RESOLVER = None  # type: Union[TestConfigResolver, None]
+
+
+def _init_resolve_worker(pav_cfg):
+    """Create the resolver (and with it the sys vars) for a resolution worker
+    process. This is done once per worker, rather than once per test."""
+
+    global _WORKER_RESOLVER  # pylint: disable=global-statement
+
+    _WORKER_RESOLVER = TestConfigResolver(pav_cfg)
+
+
+def _resolve_in_worker(item: Tuple[int, dict, variables.VariableSet]) \
+        -> Tuple[int, List[ProtoTest]]:
+    """Resolve the given (index, raw_test, sched_var_set) item in a worker process.
+    The index is returned along with the results so that the original order can be
+    restored."""
+
+    index, raw_test, sched_var_set = item
+
+    return index, _WORKER_RESOLVER.resolve_raw(raw_test, sched_var_set)
@@ -14,8 +14,10 @@ from pavilion import utils
 from ..result_parsers import base_classes
 from .base import base_results, BASE_RESULTS, RESULT_ERRORS
 from .common import ResultError
-from .evaluations import check_expression, evaluate_results, StringParserError
-from .parse import parse_results, DEFAULT_KEY
+from .evaluations import (check_expression, evaluate_results, evaluate_results_many,
+                          StringParserError)
+from .parse import parse_results, DEFAULT_KEY, ResultPool
+from .store import ResultStore
 
 
 def check_config(parser_conf, evaluate_conf):
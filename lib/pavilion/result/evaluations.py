@@ -1,17 +1,18 @@
 """Handles performing evaluations on results."""
 
-from typing import Dict
+from typing import Dict, List, Tuple, Union
 
 import lark as _lark
 from pavilion import utils
 from pavilion.parsers import (check_expression, StringParserError,
-                              get_expr_parser,
-                              EvaluationExprTransformer,
-                              VarRefVisitor, match_examples,
-                              BAD_EXAMPLES, ParserValueError)
+                              get_expr_parser, get_evaluation_plan, EvaluationPlan,
+                              match_examples, BAD_EXAMPLES, ParserValueError)
 from .base import BASE_RESULTS
 from .common import ResultError
 
+DEFAULT_RESULT = 'return_value == 0'
+"""The result evaluation for tests that don't evaluate their own 'result'."""
+
 
 def check_evaluations(evaluations: Dict[str, str]):
     """Check all evaluations for basic errors.
@@ -51,7 +52,7 @@ def evaluate_results(results: dict, evaluations: Dict[str, str],
     log = utils.IndentedLog()
 
     if 'result' not in results and 'result' not in evaluations:
-        evaluations['result'] = 'return_value == 0'
+        evaluations['result'] = DEFAULT_RESULT
 
     try:
         parse_evaluation_dict(evaluations, results, log)
@@ -64,27 +65,73 @@ def evaluate_results(results: dict, evaluations: Dict[str, str],
         base_log.indent(log)
 
 
-def parse_evaluation_dict(eval_dict: Dict[str, str], results: dict,
-                          log: utils.IndentedLog) -> None:
-    """Parse the dictionary of evaluation expressions, given that some of them
-    may contain references to each other. Each evaluated value will be stored
-    under its corresponding key in the results dict.
+def evaluate_results_many(results_list: List[dict], evaluations: Dict[str, str]) \
+        -> List[Union[ResultError, None]]:
+    """Perform the given evaluations on each of the given result dicts, as with
+    evaluate_results(). Each expression is evaluated for all of the result dicts at
+    once (see EvaluationPlan.evaluate_many()).
 
-    :raises StringParserError: When there's an error parsing or resolving
-        one of the expressions. The error will already contain key information.
-    :raises ValueError: When there's a reference loop.
+    :param results_list: The result dicts. Each will be modified in place.
+    :param evaluations: A dictionary of evals to perform.
+    :returns: For each result dict, None if it was fully evaluated, otherwise the
+        error for the first evaluation that failed for it.
+    :raises ResultError: For errors that apply to every result dict, like syntax
+        errors and reference loops.
+    """
+
+    log = utils.IndentedLog()
+    errors = [None] * len(results_list)  # type: List[Union[ResultError, None]]
+
+    try:
+        plans = _get_plans(evaluations, log)
+        order = _resolution_order(plans)
+    except StringParserError as err:
+        raise ResultError("\n".join([err.message, err.context]))
+    except ValueError as err:
+        raise ResultError(err.args[0])
+
+    steps = [(key, plans[key][0], plans[key][2]) for key in order]
+    if 'result' not in evaluations:
+        steps.insert(0, ('result', get_evaluation_plan(DEFAULT_RESULT), DEFAULT_RESULT))
+
+    for key, plan, expr in steps:
+        indices = [i for i in range(len(results_list)) if errors[i] is None]
+        if key == 'result' and key not in evaluations:
+            # As with evaluate_results(), this is only for those without a result.
+            indices = [i for i in indices if 'result' not in results_list[i]]
+
+        values = plan.evaluate_many([results_list[i] for i in indices])
+
+        for i, value in zip(indices, values):
+            if isinstance(value, ParserValueError):
+                errors[i] = ResultError("\n".join([value.args[0], value.get_context(expr)]))
+            elif isinstance(value, Exception):
+                errors[i] = ResultError(
+                    "Error evaluating expression '{}' for key '{}': {}"
+                    .format(expr, key, value))
+            else:
+                results_list[i][key] = value
+
+    return errors
+
+
+def _get_plans(eval_dict: Dict[str, str], log: utils.IndentedLog) \
+        -> Dict[str, Tuple[EvaluationPlan, List[str], str]]:
+    """Get the (plan, var_refs, expr) for each of the given evaluations.
+
+    :raises StringParserError: When an expression can't be parsed.
     """
 
     parser = get_expr_parser()
-    transformer = EvaluationExprTransformer(results)
-    var_ref_visitor = VarRefVisitor()
 
-    unresolved = {}
+    plans = {}
 
     for key, expr in eval_dict.items():
         log("Parsing the evaluate expression '{}'".format(expr))
         try:
-            tree = parser.parse(expr)
+            # Plans are cached, so each expression is only compiled once no matter
+            # how many tests it's evaluated for.
+            plan = get_evaluation_plan(expr)
         except (_lark.UnexpectedCharacters, _lark.UnexpectedToken) as err:
             # Try to figure out why the error happened based on examples.
             err_type = match_examples(err, parser.parse, BAD_EXAMPLES, expr)
@@ -95,30 +142,29 @@ def parse_evaluation_dict(eval_dict: Dict[str, str], results: dict,
                 "Error evaluating expression '{}' for key '{}':\n{}"
                 .format(expr, key, err_type), err.get_context(expr))
 
-        var_refs = var_ref_visitor.visit(tree)
+        plans[key] = (plan, plan.var_refs, expr)
 
-        unresolved[key] = (tree, var_refs, expr)
+    return plans
 
-    log("Resolving evaluations.")
+
+def _resolution_order(plans: Dict[str, Tuple[EvaluationPlan, List[str], str]]) \
+        -> List[str]:
+    """Order the evaluation keys so that each comes after any others it references.
+
+    :raises ValueError: When there's a reference loop.
+    """
+
+    unresolved = dict(plans)
+    order = []
 
     while unresolved:
         resolved = []
-        for key, (tree, var_refs, expr) in unresolved.items():
+        for key, (_, var_refs, _) in unresolved.items():
             for var in var_refs:
                 if var in unresolved:
                     break
             else:
-                log("Resolving evaluation '{}': '{}'".format(key, expr))
-                try:
-                    results[key] = transformer.transform(tree)
-                except ParserValueError as err:
-                    log("Error resolving evaluation: {}".format(err.args[0]))
-                    log(err.get_context(expr))
-
-                    # Any value errors should be converted to this error type.
-                    raise StringParserError(err.args[0], err.get_context(expr))
                 resolved.append(key)
-                log("Value resolved to: '{}'".format(results[key]))
 
         if not resolved:
             # Pass up the unresolved
@@ -127,5 +173,37 @@ def parse_evaluation_dict(eval_dict: Dict[str, str], results: dict,
 
         for key in resolved:
             del unresolved[key]
+        order.extend(resolved)
+
+    return order
+
+
+def parse_evaluation_dict(eval_dict: Dict[str, str], results: dict,
+                          log: utils.IndentedLog) -> None:
+    """Parse the dictionary of evaluation expressions, given that some of them
+    may contain references to each other. Each evaluated value will be stored
+    under its corresponding key in the results dict.
+
+    :raises StringParserError: When there's an error parsing or resolving
+        one of the expressions. The error will already contain key information.
+    :raises ValueError: When there's a reference loop.
+    """
+
+    plans = _get_plans(eval_dict, log)
+
+    log("Resolving evaluations.")
+
+    for key in _resolution_order(plans):
+        plan, _, expr = plans[key]
+        log("Resolving evaluation '{}': '{}'".format(key, expr))
+        try:
+            results[key] = plan.evaluate(results)
+        except ParserValueError as err:
+            log("Error resolving evaluation: {}".format(err.args[0]))
+            log(err.get_context(expr))
+
+            # Any value errors should be converted to this error type.
+            raise StringParserError(err.args[0], err.get_context(expr))
+        log("Value resolved to: '{}'".format(results[key]))
 
     log("Finished resolving expressions")
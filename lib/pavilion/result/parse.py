@@ -2,13 +2,16 @@
 from collections import defaultdict, OrderedDict
 import glob
 import inspect
+import io
+import math
+import mmap
 import pprint
 import re
 import traceback
-from io import StringIO
+from contextlib import contextmanager
 from multiprocessing import Pool
 from pathlib import Path
-from typing import List, Union, Dict, Any, TextIO, Pattern, Tuple, NewType
+from typing import List, Union, Dict, Any, Iterable, Iterator, Pattern, Tuple, NewType
 
 from pavilion.result_parsers import ResultParser, get_plugin
 from pavilion.utils import IndentedLog
@@ -61,17 +64,81 @@ DEFAULT_KEY = '_defaults'
 
 
 class KeySet:
-    """Everything needed to parse a result key from a file."""
+    """Everything needed to parse a result key from a file. A key set is created
+    once per key and shared by every file parsed for that key, so its condition
+    regexes are compiled and its parser arguments checked just once. Key sets
+    are pickled (without the parser plugin object) when handed to worker
+    processes.
+
+    :ivar List[Pattern] conds: The 'preceded_by' regexes followed by the
+        'for_lines_matching' regex.
+    :ivar dict args: The checked, parser specific arguments.
+    :ivar match_idx: The match_select value, as an index when it is one.
+    :ivar Union[str, None] error: Why this key can't be parsed, if it can't.
+    :ivar IndentedLog log: Notes from setting up the key set.
+    """
+
     def __init__(self, parser_name: str, key: str, config: dict):
         self.parser_name = parser_name
         self.key = key
         self.config = config
+        self.conds = []  # type: List[Pattern]
+        self.args = {}
+        self.error = None  # type: Union[str, None]
+        self.log = IndentedLog()
+        self._parser = None
+
+        config = config.copy()
+        if key == 'result' and config['action'] not in (ACTION_FALSE, ACTION_TRUE):
+            config['action'] = ACTION_TRUE
+            self.log("Forcing action to '{}' for the 'result' key.".format(ACTION_TRUE))
+
+        # Get the idx value from the match_select option if it's a keyword, otherwise
+        # just use the value directly.
+        match_select = config['match_select']
+        match_idx = MATCH_CHOICES.get(match_select, match_select)
+        if match_idx is None:
+            match_idx = match_select
+        else:
+            match_idx = int(match_idx)
+        self.match_idx = match_idx
+
+        # Compile the regexes for finding the appropriate lines on which to
+        # call the result parser.
+        try:
+            self.conds = [re.compile(cond) for cond in config['preceded_by']]
+            self.conds.append(re.compile(config['for_lines_matching']))
+        except re.error as err:
+            self.error = ("Invalid 'preceded_by' or 'for_lines_matching' regex: {}"
+                          .format(err))
+            return
+
+        # Check the arguments and remove any that aren't specific to this result
+        # parser.
+        try:
+            self.args = self.parser.check_args(**config)
+        except ResultError as err:
+            self.error = err.args[0]
+
+    @property
+    def parser(self) -> ResultParser:
+        """The result parser plugin object."""
+
+        if self._parser is None:
+            self._parser = get_plugin(self.parser_name)
+        return self._parser
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_parser'] = None
+        return state
 
 
 ProcessFileArgs = NewType('ProcessFileArgs', Tuple[Path, List[KeySet]])
 
 
-def parse_results(pav_cfg, test, results: Dict, base_log: IndentedLog) -> None:
+def parse_results(pav_cfg, test, results: Dict, base_log: IndentedLog,
+                  pool: 'ResultPool' = None) -> None:
     """Parse the results of the given test using all the result parsers
 configured for that test.
 
@@ -87,136 +154,272 @@ configured for that test.
 :param results: The dictionary of default result values. This will be
     updated in place.
 :param base_log: The logging callable from 'result.get_result_logger'.
+:param pool: A result pool to parse the files with. The test may have already
+    been submitted to it.
 """
 
     base_log("Starting result parsing.")
 
-    log = IndentedLog()
-
-    parser_configs = test.config['result_parse']
-
-    log("Got result parser configs:")
-    log.indent(pprint.pformat(parser_configs))
-    log("---------------")
-
-    # For each file to parse, the list of keys and parsing configurations
-    file_key_sets = defaultdict(lambda: [])
-    # For each key, the list of files to parse in the order found.
-    file_order = defaultdict(lambda: [])
-    # Per-file values by key.
-    per_file = {}
-    # Action values by key
-    actions = {}
-
-    # A list of encountered error messages.
-    errors = []
-
-    for parser_name in parser_configs.keys():
-        parser = get_plugin(parser_name)
-
-        for key, rconf in parser_configs[parser_name].items():
-            defaults = parser_configs[parser_name].get(DEFAULT_KEY, {})
-            rconf = parser.set_parser_defaults(rconf, defaults)
-
-            per_file[key] = rconf['per_file']
-            actions[key] = rconf['action']
-
-            for file_glob in rconf['files']:
-                base_glob = file_glob
-                if not file_glob.startswith('/'):
-                    file_glob = '{}/build/{}'.format(test.path, file_glob)
-
-                paths_found = glob.glob(file_glob)
-                # Globbing returns the paths in a backwards order
-                paths_found.sort()
-                for path in paths_found:
-                    path = Path(path)
-                    # Only add each key/path once
-                    if path not in file_order[key]:
-                        # Track the order in which files are read for each key
-                        file_order[key].append(path)
-                        # Add our argument set for this file, so we can process all
-                        # keys for a given file together.
-                        file_key_sets[path].append(KeySet(parser_name, key, rconf))
-
-                if not paths_found:
-                    log("Setting a non match result for unmatched glob '{}'"
-                        .format(file_glob))
-                    errors.append(
-                        "No files found for file glob '{}' under key '{}'"
-                        .format(base_glob, key))
-
-    log("Found these files for each key.")
-    log.indent(pprint.pformat(dict(file_order)))
-
-    # Setup up the argument tuples for mapping to multiple processes.
-    file_tuples = [ProcessFileArgs((file, parse_tuples))
-                   for file, parse_tuples in file_key_sets.items()]
-
-    # Start result parsing from each file in a separate thread.
-    max_cpus = min(len(file_key_sets), pav_cfg['max_cpu'])
-    # Don't fork if there's only one file to muck with.
-    if max_cpus > 1:
-        log("Processing results with {} processes.".format(max_cpus))
-        with Pool(max_cpus) as pool:
-            mapped_results = pool.map(process_file, file_tuples)
+    if pool is not None:
+        plan, mapped_results = pool.collect(test)
     else:
-        log("Processing results in a single process.")
-        mapped_results = map(process_file, file_tuples)
+        plan = ParsePlan(test)
+        log = plan.log
+
+        # Start result parsing from each file in a separate thread.
+        max_cpus = min(len(plan.file_tuples), pav_cfg['max_cpu'])
+        # Don't fork if there's only one file to muck with.
+        if max_cpus > 1:
+            log("Processing results with {} processes.".format(max_cpus))
+            with Pool(max_cpus) as proc_pool:
+                mapped_results = proc_pool.map(process_file, plan.file_tuples)
+        else:
+            log("Processing results in a single process.")
+            mapped_results = map(process_file, plan.file_tuples)
 
-    # Organize the results by key and file.
-    filed_results = defaultdict(lambda: {})
-    ordered_filed_results = defaultdict(OrderedDict)
-    for mresult in mapped_results:
-        parsed_results, mlog = mresult
+    plan.apply(mapped_results, results)
 
-        log.indent(mlog)
+    base_log.indent(plan.log)
 
-        # Errors are returned under the RESULT_ERRORS key.
-        for p_result in parsed_results:
-            if p_result.key == RESULT_ERRORS:
-                errors.append(p_result.value)
-            else:
-                filed_results[p_result.key][p_result.path] = p_result.value
 
-    # Generate the dict of filed results, this time in the order the files were given.
-    for key in file_order:
-        for path in file_order[key]:
-            if key in filed_results and path in filed_results[key]:
-                ordered_filed_results[key][path] = filed_results[key][path]
+class ParsePlan:
+    """The files to parse for a test, and the keys to parse from each of them.
+
+    :ivar List[ProcessFileArgs] file_tuples: The arguments for process_file() for
+        each file.
+    :ivar IndentedLog log: The result parsing log.
+    """
 
-    # Transform the results for each key according to the per-file and action
-    # options.
-    for key, per_file_name in per_file.items():
-        per_file_func = PER_FILES[per_file_name]  # type: per_first
-        action_name = actions[key]
-        presults = ordered_filed_results[key]
+    def __init__(self, test):
+        """
+        :param pavilion.test_run.TestRun test: The pavilion test run to gather
+            results for.
+        """
 
-        try:
-            log("Applying per-file option '{}' and action '{}' to key '{}'."
-                .format(per_file_name, action_name, key))
-            # Call the per-file function (which will also call the action function)
-            per_file_errors = per_file_func(
-                results=results,
-                key=key,
-                file_vals=presults,
-                action=ACTIONS[action_name]
-            )
-
-            for error in per_file_errors:
-                errors.append(error)
-                log(error)
+        log = self.log = IndentedLog()
+
+        parser_configs = test.config['result_parse']
+
+        log("Got result parser configs:")
+        log.indent(pprint.pformat(parser_configs))
+        log("---------------")
+
+        # For each file to parse, the list of keys and parsing configurations
+        file_key_sets = defaultdict(lambda: [])
+        # For each key, the list of files to parse in the order found.
+        file_order = self._file_order = defaultdict(lambda: [])
+        # Per-file values by key.
+        per_file = self._per_file = {}
+        # Action values by key
+        actions = self._actions = {}
+
+        # A list of encountered error messages.
+        errors = self._errors = []
+
+        for parser_name in parser_configs.keys():
+            parser = get_plugin(parser_name)
+
+            for key, rconf in parser_configs[parser_name].items():
+                defaults = parser_configs[parser_name].get(DEFAULT_KEY, {})
+                rconf = parser.set_parser_defaults(rconf, defaults)
+                key_set = None
+
+                per_file[key] = rconf['per_file']
+                actions[key] = rconf['action']
+
+                for file_glob in rconf['files']:
+                    base_glob = file_glob
+                    if not file_glob.startswith('/'):
+                        file_glob = '{}/build/{}'.format(test.path, file_glob)
+
+                    paths_found = glob.glob(file_glob)
+                    # Globbing returns the paths in a backwards order
+                    paths_found.sort()
+                    for path in paths_found:
+                        path = Path(path)
+                        # Only add each key/path once
+                        if path not in file_order[key]:
+                            # Track the order in which files are read for each key
+                            file_order[key].append(path)
+                            # Add our argument set for this file, so we can process
+                            # all keys for a given file together. Every file for this
+                            # key shares the same key set.
+                            if key_set is None:
+                                key_set = KeySet(parser_name, key, rconf)
+                            file_key_sets[path].append(key_set)
+
+                    if not paths_found:
+                        log("Setting a non match result for unmatched glob '{}'"
+                            .format(file_glob))
+                        errors.append(
+                            "No files found for file glob '{}' under key '{}'"
+                            .format(base_glob, key))
+
+        log("Found these files for each key.")
+        log.indent(pprint.pformat(dict(file_order)))
+
+        # Setup up the argument tuples for mapping to multiple processes.
+        self.file_tuples = [ProcessFileArgs((file, parse_tuples))
+                            for file, parse_tuples in file_key_sets.items()]
+
+    def apply(self, mapped_results: Iterable[Tuple[List['ProcessedKey'], IndentedLog]],
+              results: Dict) -> None:
+        """Combine the results parsed from each file (as returned by process_file()
+        for each of the file_tuples), and add them to the results dict.
+
+        :param mapped_results: The process_file() output for each file.
+        :param results: The dictionary of default result values. This will be
+            updated in place.
+        """
 
-        except ResultError as err:
-            msg = ("Error handling results with per_file and action options.\n{}"
-                   .format(err.args[0]))
+        log = self.log
+        errors = self._errors
+        file_order = self._file_order
+
+        # Organize the results by key and file.
+        filed_results = defaultdict(lambda: {})
+        ordered_filed_results = defaultdict(OrderedDict)
+        for mresult in mapped_results:
+            parsed_results, mlog = mresult
+
+            log.indent(mlog)
+
+            # Errors are returned under the RESULT_ERRORS key.
+            for p_result in parsed_results:
+                if p_result.key == RESULT_ERRORS:
+                    errors.append(p_result.value)
+                else:
+                    filed_results[p_result.key][p_result.path] = p_result.value
+
+        # Generate the dict of filed results, this time in the order the files were
+        # given.
+        for key in file_order:
+            for path in file_order[key]:
+                if key in filed_results and path in filed_results[key]:
+                    ordered_filed_results[key][path] = filed_results[key][path]
+
+        # Transform the results for each key according to the per-file and action
+        # options.
+        for key, per_file_name in self._per_file.items():
+            per_file_func = PER_FILES[per_file_name]  # type: per_first
+            action_name = self._actions[key]
+            presults = ordered_filed_results[key]
+
+            try:
+                log("Applying per-file option '{}' and action '{}' to key '{}'."
+                    .format(per_file_name, action_name, key))
+                # Call the per-file function (which will also call the action
+                # function)
+                per_file_errors = per_file_func(
+                    results=results,
+                    key=key,
+                    file_vals=presults,
+                    action=ACTIONS[action_name]
+                )
+
+                for error in per_file_errors:
+                    errors.append(error)
+                    log(error)
+
+            except ResultError as err:
+                msg = ("Error handling results with per_file and action options.\n{}"
+                       .format(err.args[0]))
+
+                errors.append(msg)
+                log(msg)
+
+        results[RESULT_ERRORS].extend(errors)
+
+
+class ResultPool:
+    """A long lived pool of result parsing processes, for gathering the results of
+    many tests at once. Submit every test up front, then pass the pool to
+    ``TestRun.gather_results()`` for each test in turn; that waits on just the
+    given test's files. The files of every submitted test are spread, in chunks,
+    across the same processes, so the pool is only started once and parsing for
+    later tests overlaps with the evaluation of earlier ones.
+
+    Use as a context manager, or call ``close()`` when done.
+    """
+
+    CHUNKS_PER_PROC = 4
+    """How many chunks to split each test's files into, per process."""
+
+    def __init__(self, max_cpus: int):
+        """
+        :param max_cpus: The number of processes to use. With just one, files
+            are parsed in this process, when their test is collected.
+        """
+
+        self.max_cpus = max(1, max_cpus)
+        self._pool = None
+        # The submitted tests, their plans, and the pending results, by test
+        # object id.
+        self._pending = {}
+
+    def submit(self, test) -> None:
+        """Find the files to parse for the given test, and start parsing them.
+
+        :param pavilion.test_run.TestRun test: The test to parse results for.
+        """
 
-            errors.append(msg)
-            log(msg)
+        plan = ParsePlan(test)
 
-    results[RESULT_ERRORS].extend(errors)
+        if self.max_cpus > 1 and plan.file_tuples:
+            if self._pool is None:
+                self._pool = Pool(self.max_cpus)
 
-    base_log.indent(log)
+            chunksize = math.ceil(len(plan.file_tuples)
+                                  / (self.max_cpus * self.CHUNKS_PER_PROC))
+            pending = self._pool.map_async(process_file, plan.file_tuples, chunksize)
+        else:
+            pending = None
+
+        self._pending[id(test)] = test, plan, pending
+
+    def collect(self, test) -> Tuple[ParsePlan, List[Tuple[List['ProcessedKey'],
+                                                            IndentedLog]]]:
+        """Wait for the files for the given test to be parsed, and return the
+        test's parse plan and the process_file() output for each of its files. The
+        test is submitted first, if it wasn't already.
+
+        :param pavilion.test_run.TestRun test: The test to collect results for.
+        """
+
+        if id(test) not in self._pending:
+            self.submit(test)
+
+        _, plan, pending = self._pending.pop(id(test))
+
+        if pending is None:
+            plan.log("Processing results in a single process.")
+            return plan, [process_file(args) for args in plan.file_tuples]
+
+        plan.log("Processing results with a shared pool of {} processes."
+                 .format(self.max_cpus))
+        return plan, pending.get()
+
+    def close(self, terminate: bool = False):
+        """Shut down the pool's processes.
+
+        :param terminate: Stop any work in progress, rather than waiting for it.
+        """
+
+        if self._pool is not None:
+            if terminate:
+                self._pool.terminate()
+            else:
+                self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+        self._pending = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close(terminate=exc_type is not None)
 
 
 class ProcessedKey:
@@ -230,7 +433,11 @@ class ProcessedKey:
 def process_file(args: Tuple[Path, List[KeySet]]) -> \
         Tuple[List[ProcessedKey], IndentedLog]:
     """Given a file and list of Key/Parser items, parse the file for each
-    key. Returns the list of results as a (key, file, value) tuple, and the log data."""
+    key. Returns the list of results as a (key, file, value) tuple, and the log data.
+
+    The file is memory mapped and walked just once, with the line matching for
+    every key done together. The walk ends early once every key has all the
+    matches it needs."""
     path, key_sets = args
 
     log = IndentedLog()
@@ -239,222 +446,354 @@ def process_file(args: Tuple[Path, List[KeySet]]) -> \
 
     log("Parsing each key for file {}".format(path.as_posix()))
 
-    with path.open() as file:
-        # If we have to go through the file more than once, just read the whole thing
-        #  memory.
-        if len(key_sets) > 1:
-            log("Reading entire file for in-memory processing.")
-            file = StringIO(file.read())
-
-        for key_set in key_sets:
-            parser = get_plugin(key_set.parser_name)
+    key_parsers = [KeyParser(key_set) for key_set in key_sets]
 
-            log("Parsing results for key '{}'".format(key_set.key))
+    try:
+        with map_file(path) as data:
+            scan_file(data, path, key_parsers)
+    except OSError as err:
+        for key_parser in key_parsers:
+            key_parser.fail("Error reading file: {}".format(err))
 
-            # Seek to the beginning of the file for each parse action.
-            file.seek(0)
+    for key_parser in key_parsers:
+        log("Parsing results for key '{}'".format(key_parser.key))
 
-            # Get the result for a single key and file.
-            result, rlog = parse_result(key_set.key, key_set.config, file, parser)
-            log.indent(rlog)
+        # Get the result for a single key and file.
+        result = key_parser.result()
+        log.indent(key_parser.log)
 
-            if isinstance(result, ParseErrorMsg):
-                result.path = path
-                file_results.append(ProcessedKey(RESULT_ERRORS, path, str(result)))
-                # Add a None/NULL result for the key on an error.
-                file_results.append(ProcessedKey(key_set.key, path, None))
-            else:
-                file_results.append(ProcessedKey(key_set.key, path, result))
+        if isinstance(result, ParseErrorMsg):
+            result.path = path
+            file_results.append(ProcessedKey(RESULT_ERRORS, path, str(result)))
+            # Add a None/NULL result for the key on an error.
+            file_results.append(ProcessedKey(key_parser.key, path, None))
+        else:
+            file_results.append(ProcessedKey(key_parser.key, path, result))
 
     return file_results, log
 
 
-def parse_result(key: str, parser_cfg: Dict, file: TextIO, parser: ResultParser) \
-        -> Tuple[Union[ParseErrorMsg, str], IndentedLog]:
-    """Use a result parser and it's settings to parse a single value from a file.
+@contextmanager
+def map_file(path: Path) -> Iterator[Union[mmap.mmap, bytes]]:
+    """Memory map the given file (read only). Files that can't be mapped (empty
+    files, and special files like those under /proc) are just read instead."""
 
-    :param key: The key we're parsing.
-    :param parser_cfg: The parser config dict.
-    :param file: The file from which to extract the result.
-    :param parser: The result parser plugin object.
-    :returns: The parsed value
-    """
+    with path.open('rb') as file:
+        try:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            data = file.read()
 
-    log = IndentedLog()
+        try:
+            yield data
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
 
-    # Grab these for local use.
-    action_name = parser_cfg['action']
-    if key == 'result' and action_name not in (ACTION_FALSE, ACTION_TRUE):
-        parser_cfg['action'] = ACTION_TRUE
-        log("Forcing action to '{}' for the 'result' key.")
-
-    # Get the idx value from the match_select option if it's a keyword, otherwise just
-    # use the value directly.
-    match_select = parser_cfg['match_select']
-    match_idx = MATCH_CHOICES.get(match_select, match_select)
-    if match_idx is None:
-        match_idx = match_select
-    else:
-        match_idx = int(match_idx)
 
-    # Compile the regexes for finding the appropriate lines on which to
-    # call the result parser.
-    match_cond_rex = [re.compile(cond) for cond in parser_cfg['preceded_by']]
-    match_cond_rex.append(re.compile(parser_cfg['for_lines_matching']))
+class ResultFile:
+    """A read only, text mode file object over the (mapped) data of a result file.
+    Each result parser call gets its own ResultFile, so parsers can read as far
+    ahead as they like without disturbing the scan for other matches. Positions
+    are byte offsets into the file."""
 
-    # Check the arguments and remove any that aren't specific to this result
-    # parser.
-    try:
-        stripped_cfg = parser.check_args(**parser_cfg.copy())
-    except ResultError as err:
-        return ParseErrorMsg(parser, err.args[0], key), log
+    def __init__(self, data: Union[mmap.mmap, bytes], name: str = None, pos: int = 0):
+        """
+        :param data: The file contents.
+        :param name: The path to the file.
+        :param pos: The position to start reading from.
+        """
 
-    try:
-        res, elog = extract_result(
-            file=file,
-            parser=parser, parser_args=stripped_cfg,
-            pos_regexes=match_cond_rex,
-            match_idx=match_idx,
-        )
+        self._data = data
+        self._pos = pos
+        self.name = name
 
-        log("Got result '{}' for key '{}'".format(res, key))
-        log.indent(elog)
+    @staticmethod
+    def decode(raw: bytes) -> str:
+        """Decode raw file data, translating line endings like a text mode file
+        would."""
 
-        # Add the key information if there was an error.
-        if isinstance(res, ParseErrorMsg):
-            res.key = key
+        text = raw.decode(errors='replace')
+        if '\r' in text:
+            text = text.replace('\r\n', '\n')
+        return text
 
-        return res, log
-    except OSError as err:
-        msg = "Error reading file: {}".format(err)
-        log(msg)
-        return ParseErrorMsg(parser, msg, key), log
-    except Exception as err:  # pylint: disable=W0703
-        msg = "UnexpectedError: {}".format(err)
-        log(msg)
-        return ParseErrorMsg(parser, msg, key), log
-
-
-def extract_result(file: TextIO, parser: ResultParser, parser_args: dict,
-                   match_idx: Union[int, str],
-                   pos_regexes: List[Pattern]) -> Tuple[Any, IndentedLog]:
-    """Parse a result from a result file.
-
-    :return: A list of all matching results found. Will be cut short if
-        we only need the first result.
+    def readable(self) -> bool:
+        """These are always readable."""
+        return True
+
+    def tell(self) -> int:
+        """Return the current position."""
+        return self._pos
+
+    def seek(self, pos: int, whence: int = io.SEEK_SET) -> int:
+        """Seek to the given position."""
+
+        if whence == io.SEEK_CUR:
+            pos += self._pos
+        elif whence == io.SEEK_END:
+            pos += len(self._data)
+        self._pos = min(max(pos, 0), len(self._data))
+        return self._pos
+
+    def read(self, size: int = -1) -> str:
+        """Read (and decode) the given number of bytes, or the rest of the file."""
+
+        end = len(self._data) if size is None or size < 0 else self._pos + size
+        raw = self._data[self._pos:end]
+        self._pos += len(raw)
+        return self.decode(raw)
+
+    def readline(self, size: int = -1) -> str:
+        """Read the next line. Returns an empty string at the end of the file."""
+
+        end = self._data.find(b'\n', self._pos)
+        end = len(self._data) if end == -1 else end + 1
+        if size is not None and size >= 0:
+            end = min(end, self._pos + size)
+        raw = self._data[self._pos:end]
+        self._pos = end
+        return self.decode(raw)
+
+    def readlines(self) -> List[str]:
+        """Return the remaining lines in the file."""
+        return list(self)
+
+    def close(self):
+        """Nothing to close, the mapping belongs to the scan."""
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class KeyParser:
+    """The parsing state for a single key in a single file.
+
+    :ivar IndentedLog log: The parsing log for this key.
+    :ivar List[Pattern] conds: The 'preceded_by' regexes followed by the
+        'for_lines_matching' regex. The result parser is called on the last of each
+        sequence of consecutive lines that match these, one-to-one and in order.
+    :ivar bool done: Whether this key needs to look at more lines.
     """
 
-    log = IndentedLog()
+    def __init__(self, key_set: KeySet):
+        """
+        :param key_set: The (shared) key set for the key being parsed.
+        """
+
+        self.key = key_set.key
+        self.parser = key_set.parser
+        self.conds = key_set.conds
+        self.log = IndentedLog()
+        self.log.lines.extend(key_set.log.lines)
+        self.done = False
 
-    matches = []
+        self._error = None  # type: Union[ParseErrorMsg, None]
+        self._matches = []
+        self._args = key_set.args
+        self._match_idx = key_set.match_idx
 
-    # Find the next position that matches our position regexes.
-    next_pos = advance_file(file, pos_regexes)
+        if key_set.error is not None:
+            self.fail(key_set.error)
+
+    def fail(self, msg: str):
+        """Give up on this key with the given error (unless it already has one)."""
+
+        if self._error is None:
+            self.log(msg)
+            self._error = ParseErrorMsg(self.parser, msg, self.key)
+        self.done = True
+
+    def call(self, file: ResultFile):
+        """Call the result parser on the given file (at the start of the matched
+        line), and record the result."""
+
+        if self.conds[-1].pattern != '':
+            self.log("Found potential match at pos {} in file.".format(file.tell()))
 
-    while next_pos is not None:
-        if pos_regexes[-1].pattern != '':
-            log("Found potential match at pos {} in file."
-                .format(file.tell()))
         try:
             # Apply to the parser to that file starting on that line.
-            res = parser(file, **parser_args)
+            res = self.parser(file, **self._args)
         except (ValueError, LookupError, OSError) as exc:
-            log("Error calling result parser {}.".format(parser.name))
-            log(traceback.format_exc())
-            return ParseErrorMsg(parser, "Parser error in {} parser: {}."
-                                         .format(parser.name, exc)), log
+            self.log("Error calling result parser {}.".format(self.parser.name))
+            self.log(traceback.format_exc())
+            self.fail("Parser error in {} parser: {}.".format(self.parser.name, exc))
+            return
+        except Exception as err:  # pylint: disable=W0703
+            self.fail("UnexpectedError: {}".format(err))
+            return
+
+        match_idx = self._match_idx
+        if res is not None and not (match_idx == MATCH_UNIQ and res in self._matches):
+            self._matches.append(res)
+            self.log("Parser extracted result '{}'".format(res))
 
-        file.seek(next_pos)
+        # Stop extracting when we get to the asked for match index.
+        if isinstance(match_idx, int) and 0 <= match_idx < len(self._matches):
+            self.log("Got needed number of results, ending search.")
+            self.done = True
 
-        if res is not None and not (match_idx == MATCH_UNIQ and res in matches):
-            matches.append(res)
-            log("Parser extracted result '{}'".format(res))
+    def result(self) -> Any:
+        """Return the parsed value (or error) for this key."""
 
-        # Stop extracting when we get to the asked for match index.
-        if isinstance(match_idx, int) and 0 <= match_idx < len(matches):
-            log("Got needed number of results, ending search.")
-            break
+        if self._error is not None:
+            return self._error
 
-        next_pos = advance_file(file, pos_regexes)
+        match_idx = self._match_idx
+        if match_idx in (MATCH_ALL, MATCH_UNIQ):
+            res = self._matches
+        else:
+            try:
+                res = self._matches[match_idx]
+            except IndexError:
+                self.log("Match select index '{}' out of range. There were only {} "
+                         "matches.".format(match_idx, len(self._matches)))
+                res = None
 
-    if match_idx in (MATCH_ALL, MATCH_UNIQ):
-        return matches, log
-    else:
-        try:
-            return matches[match_idx], log
-        except IndexError:
-            log("Match select index '{}' out of range. There were only {} "
-                "matches.".format(match_idx, len(matches)))
-            return one, log
-
-
-def advance_file(file: TextIO, conds: List[Pattern]) -> Union[int, None]:
-    """Find the next sequence of lines that satisfy, one-to-one and in order,
-    the list of condition regex. Then rewind the file to the start of
-    the last of these matched lines. It returns the position of the
-    start of next line (from which point we will presumably look for
-    matches again).
-
-    Given a file that contains:
-
-    .. code-block: text
-
-         data1
-         data2
-         sweet spot
-         data3
-         data4
-
-    and conditions (as compiled re's) ``['^data\\d+', '^sweet']``
-
-    This would advance the file to the beginning of the 'sweet spot' line,
-    and return the pos for the start of the data3 line.
-    If called again on the same file with the same conditions, this would
-    return None, as not further matching positions exist.
-
-    :param file: The file to search, presumably pointing to the start of
-        a line. The file cursor will be advanced to the start of the last
-        of a sequence of lines that satisfy the conditions (or the end of
-        the file if no such position exists).
-    :param conds:
-    :return: The position of the start of the line after the one advanced
-        to. If None, then no matched position was found.
+        self.log("Got result '{}' for key '{}'".format(res, self.key))
+        return res
+
+
+class LineMatcher:
+    """Finds the lines on which to call the result parsers for all the keys that
+    share a set of conditions.
+
+    Matching is done incrementally, a line at a time. We track the length of every
+    partial sequence of condition matches that ends on the current line, so a
+    mismatch never requires re-reading any lines. Once a full sequence matches,
+    the search starts over on the following line.
+
+    :ivar List[int] cond_ids: The index of each condition in the scan's list of
+        condition regexes.
+    :ivar List[KeyParser] key_parsers: The key parsers that use these conditions.
     """
 
-    # Tracks the file pos that would follow a set of matches.
-    next_pos = file.tell()
-    # Tracks the line after the first matched line in the sequence
-    # of matches. If we match 3/5 conditions, we'll want to rewind
-    # to the start of the second of those lines and start matching again.
-    restart_pos = None
-    # The current condition we're comparing against.
-    cond_idx = 0
-    # After matching against all conditions against lines, we
-    # rewind the file to the start of the last matched line. (this pos)
-    rewind_pos = None
-
-    while cond_idx < len(conds):
-        rewind_pos = next_pos
-
-        line = file.readline()
-
-        # We're out of file, but haven't matched all conditions.
-        if line == '':
-            return None
-
-        next_pos = file.tell()
-        # We'll restart at this line on if not all conditions match.
-        if cond_idx == 0:
-            restart_pos = next_pos
-
-        # When we match a condition, advance to the next one, otherwise reset.
-        if conds[cond_idx].search(line) is not None:
-            cond_idx += 1
-        else:
-            cond_idx = 0
-            file.seek(restart_pos)
+    def __init__(self, cond_ids: List[int]):
+        self.cond_ids = cond_ids
+        self.key_parsers = []  # type: List[KeyParser]
+        # The lengths of the partial condition sequences matched so far,
+        # in ascending order.
+        self._partial = []  # type: List[int]
+
+    def feed(self, found: List[bool]) -> bool:
+        """Advance the matching by a line. Returns True if that line completed a
+        sequence of matching lines.
+
+        :param found: Whether each of the scan's condition regexes matched the line.
+        """
+
+        cond_ids = self.cond_ids
+        if len(cond_ids) == 1:
+            return found[cond_ids[0]]
+
+        partial = [matched + 1 for matched in [0] + self._partial
+                   if found[cond_ids[matched]]]
+
+        if partial and partial[-1] == len(cond_ids):
+            self._partial = []
+            return True
+
+        self._partial = partial
+        return False
+
 
-    # Go back to the start of the last matched line.
-    file.seek(rewind_pos)
+def _group_matchers(key_parsers: List[KeyParser]) \
+        -> Tuple[List[Pattern], List[LineMatcher]]:
+    """Group the given (unfinished) key parsers by their conditions. Returns the
+    distinct condition regexes, and a line matcher for each set of conditions."""
+
+    conds = []
+    cond_ids = {}
+    matchers = {}
+
+    for key_parser in key_parsers:
+        if key_parser.done:
+            continue
+
+        ids = []
+        for cond in key_parser.conds:
+            cond_key = (cond.pattern, cond.flags)
+            if cond_key not in cond_ids:
+                cond_ids[cond_key] = len(conds)
+                conds.append(cond)
+            ids.append(cond_ids[cond_key])
+
+        matcher = matchers.get(tuple(ids))
+        if matcher is None:
+            matcher = matchers[tuple(ids)] = LineMatcher(ids)
+        matcher.key_parsers.append(key_parser)
+
+    return conds, list(matchers.values())
+
+
+def _prune_matchers(conds: List[Pattern], matchers: List[LineMatcher]) \
+        -> Tuple[List[Pattern], List[LineMatcher]]:
+    """Drop the finished key parsers, the matchers left without any, and the
+    conditions no remaining matcher needs. Returns the remaining conditions and
+    matchers."""
+
+    remaining = []
+    for matcher in matchers:
+        matcher.key_parsers = [key_parser for key_parser in matcher.key_parsers
+                               if not key_parser.done]
+        if matcher.key_parsers:
+            remaining.append(matcher)
+
+    used = sorted({cond_id for matcher in remaining for cond_id in matcher.cond_ids})
+    new_ids = {cond_id: i for i, cond_id in enumerate(used)}
+    for matcher in remaining:
+        matcher.cond_ids = [new_ids[cond_id] for cond_id in matcher.cond_ids]
+
+    return [conds[cond_id] for cond_id in used], remaining
+
+
+def scan_file(data: Union[mmap.mmap, bytes], path: Path,
+              key_parsers: List[KeyParser]) -> None:
+    """Walk through the lines of the given file data once, calling the result
+    parser for each key wherever that key's conditions match. Each distinct
+    condition regex is checked just once per line, no matter how many keys use it.
+    The walk ends as soon as every key is done.
+
+    :param data: The (mapped) file contents.
+    :param path: The path to the file.
+    :param key_parsers: The key parsers to feed.
+    """
 
-    return next_pos
+    name = path.as_posix()
+    conds, matchers = _group_matchers(key_parsers)
+    searches = [cond.search for cond in conds]
+    size = len(data)
+    pos = 0
+
+    while matchers and pos < size:
+        end = data.find(b'\n', pos)
+        next_pos = size if end == -1 else end + 1
+        line = ResultFile.decode(data[pos:next_pos])
+        found = [search(line) is not None for search in searches]
+
+        finished = False
+        for matcher in matchers:
+            if matcher.feed(found):
+                for key_parser in matcher.key_parsers:
+                    if not key_parser.done:
+                        key_parser.call(ResultFile(data, name, pos))
+                        finished = finished or key_parser.done
+
+        # Stop checking conditions that no unfinished key needs.
+        if finished:
+            conds, matchers = _prune_matchers(conds, matchers)
+            searches = [cond.search for cond in conds]
+
+        pos = next_pos
@@ -0,0 +1,270 @@
+"""A per working_dir store of test run results, so that commands like ``pav result``
+and ``pav graph`` can get the results of many test runs with a few queries, rather
+than by loading each test run and reading its results file.
+
+The store is an SQLite database with a row for each top level result key of each
+test run, keyed by the test run's uuid and the key name. Test runs add their
+results as they save them. Stored results are only used while the test run's
+results file is unchanged since they were stored; results for any other test runs
+are loaded from the test runs themselves. ``pav maint result_store`` brings the
+store up to date with the existing test runs in each working_dir.
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple, Union
+
+from .common import ResultError
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    uuid TEXT PRIMARY KEY,
+    test_id INTEGER NOT NULL,
+    stamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_test_id ON runs (test_id);
+CREATE TABLE IF NOT EXISTS results (
+    uuid TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (uuid, key)
+) WITHOUT ROWID;
+'''
+
+
+class ResultStore:
+    """The result store for a single working directory.
+
+    :ivar Path path: The path to the store's database.
+    """
+
+    STORE_FN = 'result_store.db'
+    """The store database, under the working_dir."""
+
+    TIMEOUT = 30
+    """How long to wait on other processes writing to the store."""
+
+    MAX_VARS = 900
+    """The most parameters to use in a single query. SQLite (depending on how it
+    was built) may limit us to as few as 999."""
+
+    def __init__(self, working_dir: Path):
+        """
+        :param working_dir: The working_dir whose test runs this stores results for.
+        """
+
+        self.working_dir = Path(working_dir)
+        self.path = self.working_dir/self.STORE_FN
+
+    def _connect(self) -> sqlite3.Connection:
+        """Connect to (and if needed, create) the store database."""
+
+        new = not self.path.exists()
+
+        try:
+            conn = sqlite3.connect(self.path.as_posix(), timeout=self.TIMEOUT)
+            conn.executescript(SCHEMA)
+        except sqlite3.Error as err:
+            raise ResultError("Could not open result store at '{}': {}"
+                              .format(self.path, err))
+
+        if new:
+            try:
+                self.path.chmod(0o664)
+            except OSError:
+                pass
+
+        return conn
+
+    @staticmethod
+    def results_stamp(test_path: Path) -> Union[str, None]:
+        """Return a stamp that changes whenever the results file of the test run
+        at the given path is rewritten, or None if it has no results file."""
+
+        try:
+            stat = (test_path/'results.json').stat()
+        except OSError:
+            return None
+
+        return '{}-{}-{}'.format(stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def add(self, test_path: Path, results: dict):
+        """Add (or replace) the results of the test run at the given path. These
+        should be the results that were just saved to its results file.
+
+        :raises ResultError: When the results can't be stored.
+        """
+
+        stamp = self.results_stamp(test_path)
+        if stamp is None:
+            raise ResultError("Test run at '{}' has no results file.".format(test_path))
+
+        self._add_many([(test_path, results, stamp)])
+
+    def _add_many(self, entries: List[Tuple[Path, dict, str]]):
+        """Store the results for each (test path, results, results stamp) entry in
+        a single transaction. Results without a uuid (from very old test runs)
+        are skipped."""
+
+        conn = self._connect()
+        try:
+            with conn:
+                for test_path, results, stamp in entries:
+                    uuid = results.get('uuid')
+                    if uuid is None:
+                        continue
+
+                    conn.execute('DELETE FROM results WHERE uuid = ?', (uuid,))
+                    conn.executemany(
+                        'INSERT INTO results (uuid, key, value) VALUES (?, ?, ?)',
+                        [(uuid, key, json.dumps(value)) for key, value in results.items()])
+                    conn.execute(
+                        'INSERT OR REPLACE INTO runs (uuid, test_id, stamp) '
+                        'VALUES (?, ?, ?)', (uuid, int(test_path.name), stamp))
+        except (sqlite3.Error, TypeError, ValueError) as err:
+            raise ResultError("Could not add results to the result store at '{}': {}"
+                              .format(self.path, err))
+        finally:
+            conn.close()
+
+    def get(self, test_paths: Iterable[Path], keys: Iterable[str] = None) \
+            -> Dict[Path, dict]:
+        """Get the stored results for the test runs at the given paths, which
+        should all be in this working_dir. Test runs whose results file has changed
+        since their results were stored (or that were never stored) are left out.
+
+        :param test_paths: The test run paths.
+        :param keys: Only get these top level result keys, rather than all of them.
+        :returns: The results for each found test run, by test path.
+        :raises ResultError: When the store can't be read.
+        """
+
+        if not self.path.exists():
+            return {}
+
+        paths_by_stamp = {}
+        for test_path in test_paths:
+            try:
+                test_id = int(test_path.name)
+            except ValueError:
+                continue
+
+            stamp = self.results_stamp(test_path)
+            if stamp is not None:
+                paths_by_stamp[(test_id, stamp)] = test_path
+
+        keys = sorted(set(keys)) if keys is not None else None
+
+        found = {}
+        conn = self._connect()
+        try:
+            paths_by_uuid = {}
+            test_ids = sorted({test_id for test_id, _ in paths_by_stamp})
+            for batch in self._batches(test_ids):
+                rows = conn.execute(
+                    'SELECT uuid, test_id, stamp FROM runs WHERE test_id IN ({})'
+                    .format(','.join('?'*len(batch))), batch)
+                for uuid, test_id, stamp in rows:
+                    test_path = paths_by_stamp.get((test_id, stamp))
+                    if test_path is not None:
+                        paths_by_uuid[uuid] = test_path
+                        found[test_path] = {}
+
+            for batch in self._batches(list(paths_by_uuid), len(keys or [])):
+                query = ('SELECT uuid, key, value FROM results WHERE uuid IN ({})'
+                         .format(','.join('?'*len(batch))))
+                if keys is not None:
+                    query += ' AND key IN ({})'.format(','.join('?'*len(keys)))
+                    batch = batch + keys
+
+                for uuid, key, value in conn.execute(query, batch):
+                    found[paths_by_uuid[uuid]][key] = json.loads(value)
+        except (sqlite3.Error, ValueError) as err:
+            raise ResultError("Could not read from the result store at '{}': {}"
+                              .format(self.path, err))
+        finally:
+            conn.close()
+
+        return found
+
+    def _batches(self, items: list, extra_vars: int = 0) -> List[list]:
+        """Split the items into batches small enough to use as query parameters."""
+
+        size = max(1, self.MAX_VARS - extra_vars)
+        return [items[i:i + size] for i in range(0, len(items), size)]
+
+    def sync(self, batch_size: int = 1000) -> Tuple[int, int]:
+        """Bring the store up to date with the test runs in the working_dir. Results
+        that are missing or out of date are added, and those of test runs that no
+        longer exist (or whose results changed) are removed.
+
+        :param batch_size: How many test runs to add per transaction.
+        :returns: The number of test runs added and removed.
+        :raises ResultError: When the store can't be updated.
+        """
+
+        runs_dir = self.working_dir/'test_runs'
+        try:
+            test_paths = [path for path in runs_dir.iterdir() if path.name.isdigit()]
+        except OSError as err:
+            raise ResultError("Could not list test runs in '{}': {}"
+                              .format(runs_dir, err))
+
+        current = self.get(test_paths, keys=['uuid'])
+
+        added = 0
+        entries = []
+        for test_path in test_paths:
+            if test_path in current:
+                continue
+
+            # Get the stamp first, so we'll notice if the results change as we read.
+            stamp = self.results_stamp(test_path)
+            if stamp is None:
+                continue
+
+            try:
+                with (test_path/'results.json').open() as results_file:
+                    results = json.load(results_file)
+            except (OSError, ValueError):
+                continue
+
+            if not isinstance(results, dict) or 'uuid' not in results:
+                continue
+
+            entries.append((test_path, results, stamp))
+            if len(entries) >= batch_size:
+                self._add_many(entries)
+                added += len(entries)
+                entries = []
+
+        if entries:
+            self._add_many(entries)
+            added += len(entries)
+
+        valid_stamps = set()
+        for test_path in test_paths:
+            stamp = self.results_stamp(test_path)
+            if stamp is not None:
+                valid_stamps.add((int(test_path.name), stamp))
+
+        conn = self._connect()
+        try:
+            stale = [uuid for uuid, test_id, stamp
+                     in conn.execute('SELECT uuid, test_id, stamp FROM runs')
+                     if (test_id, stamp) not in valid_stamps]
+            with conn:
+                for batch in self._batches(stale):
+                    marks = ','.join('?'*len(batch))
+                    conn.execute('DELETE FROM results WHERE uuid IN ({})'.format(marks),
+                                 batch)
+                    conn.execute('DELETE FROM runs WHERE uuid IN ({})'.format(marks),
+                                 batch)
+        except sqlite3.Error as err:
+            raise ResultError("Could not prune the result store at '{}': {}"
+                              .format(self.path, err))
+        finally:
+            conn.close()
+
+        return added, len(stale)
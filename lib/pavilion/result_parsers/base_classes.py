@@ -9,6 +9,7 @@ from typing import List
 
 import pavilion.deferred
 import yaml_config as yc
+from pavilion import lazy_plugins
 from pavilion.result.common import ResultError
 from pavilion.result.options import (PER_FIRST, PER_LAST, PER_NAME, PER_LIST,
                                      PER_NAME_LIST, PER_ALL, PER_ANY, PER_FILES, MATCH_UNIQ,
@@ -32,12 +33,16 @@ def get_plugin(name):
 :rtype: ResultParser
 """
 
+    lazy_plugins.load('result', name)
+
     return _RESULT_PARSERS[name]
 
 
 def list_plugins():
     """Return a list of result parser plugin names."""
 
+    lazy_plugins.load('result')
+
     return list(_RESULT_PARSERS.keys())
 
 
@@ -41,6 +41,17 @@ class Json(base_classes.ResultParser):
         )
 
 
+    def _check_args(self, **kwargs):
+
+        if kwargs.get('stop_at') is not None:
+            try:
+                kwargs['stop_at'] = re.compile(kwargs['stop_at'])
+            except (ValueError, re.error) as err:
+                raise base_classes.ResultError(
+                    "Invalid 'stop_at' regular expression: {}".format(err))
+
+        return kwargs
+
     # pylint: disable=arguments-differ
     def __call__(self, file, include_only=None, exclude=None, stop_at=None):
 
@@ -70,7 +81,7 @@ class Json(base_classes.ResultParser):
         else:
             lines = []
             for line in file:
-                if re.search(stop_at, line):
+                if stop_at.search(line):
                     break
                 lines.append(line)
             json_string = ''.join(lines)
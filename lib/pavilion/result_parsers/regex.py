@@ -53,17 +53,15 @@ class Regex(ResultParser):
     # pylint: disable=arguments-differ
     def __call__(self, file, regex=None):
 
-        cregex = re.compile(regex)
-
         line = file.readline()
-        match = cregex.search(line)
+        match = regex.search(line)
 
         if match is None:
             return None
 
-        if cregex.groups == 0:
+        if regex.groups == 0:
             return match.group()
-        elif cregex.groups == 1:
+        elif regex.groups == 1:
             return match.groups()[0]
         else:
             return list(match.groups())
@@ -1,12 +1,17 @@
 """A collection of utilities for getting the results of current and past
 test runs and series."""
 
+from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor
-from typing import List
+from pathlib import Path
+from typing import List, TextIO
 import datetime
 
+from pavilion import cmd_utils
 from pavilion import output
 from pavilion.errors import TestRunError, TestRunNotFoundError, DeferredError
+from pavilion.result import ResultStore
+from pavilion.result.common import ResultError
 from pavilion.test_run import (TestRun)
 
 # I suppose these are all the keys of the TestRun.results dict and the essential ones.
@@ -50,6 +55,46 @@ def get_results(pav_cfg, tests: List[TestRun]) -> List[dict]:
         return list(pool.map(get_result, tests))
 
 
+def get_results_by_paths(pav_cfg, test_paths: List[Path], errfile: TextIO,
+                         keys: List[str] = None) -> List[dict]:
+    """Return the results for the tests at the given paths, in order. Results are
+    read from the result store of each test's working_dir where possible. Only the
+    tests that aren't in a result store are loaded.
+
+    :param pav_cfg: The Pavilion configuration.
+    :param test_paths: The test run paths.
+    :param errfile: Where to print warnings or errors.
+    :param keys: The top level result keys needed. Results from a result store will
+        only have these (and 'results_log'). Defaults to all of them.
+    """
+
+    test_paths = [path.resolve() for path in test_paths]
+
+    found = {}
+    if pav_cfg.get('result_store', True):
+        by_working_dir = defaultdict(list)
+        for path in test_paths:
+            by_working_dir[path.parents[1]].append(path)
+
+        for working_dir, paths in by_working_dir.items():
+            try:
+                found.update(ResultStore(working_dir).get(paths, keys))
+            except ResultError as err:
+                output.fprint(errfile, "{}\nLoading those results from the tests "
+                                       "instead.".format(err), color=output.YELLOW)
+
+        for path, results in found.items():
+            results['results_log'] = (path/'results.log').as_posix()
+
+    missing = [path for path in test_paths if path not in found]
+    if missing:
+        tests = cmd_utils.get_tests_by_paths(pav_cfg, missing, errfile)
+        for test, results in zip(tests, get_results(pav_cfg, tests)):
+            found[test.path.resolve()] = results
+
+    return [found[path] for path in test_paths if path in found]
+
+
 def make_key_table(flat_keys):
     table_keys=[]
     while any(flat_keys.values()):
@@ -8,6 +8,7 @@ from .basic import SchedulerPluginBasic
 from .config import validate_config
 from .scheduler import (SchedulerPluginError, SchedulerPlugin, KickoffScriptHeader,
                         _SCHEDULER_PLUGINS)
+from .. import lazy_plugins
 from ..types import NodeInfo, Nodes, NodeList, NodeSet
 from .vars import SchedulerVariables
 
@@ -38,6 +39,8 @@ def get_plugin(name) -> Union[SchedulerPluginBasic,
     if _SCHEDULER_PLUGINS is None:
         raise SchedulerPluginError("No scheduler plugins loaded.")
 
+    lazy_plugins.load('sched', name)
+
     if name not in _SCHEDULER_PLUGINS:
         raise SchedulerPluginError(
             "Scheduler plugin not found: '{}'".format(name))
@@ -53,4 +56,6 @@ def list_plugins():
     if _SCHEDULER_PLUGINS is None:
         raise SchedulerPluginError("Scheduler Plugins aren't loaded.")
 
+    lazy_plugins.load('sched')
+
     return list(_SCHEDULER_PLUGINS.keys())
@@ -2,16 +2,23 @@
 algorithms, and other advanced features."""
 
 import collections
+import os
+import pickle
 import pprint
+import tempfile
+import time
 from abc import ABC
-from typing import Tuple, List, Any, Union, Dict, FrozenSet, NewType
+from pathlib import Path
+from typing import Tuple, List, Any, Union, Dict, FrozenSet, NewType, Callable
 
-from pavilion.jobs import Job, JobError
+from pavilion import lockfile
+from pavilion import sys_vars
+from pavilion.jobs import Job, JobError, JobInfo, NodeSnapshot
 from pavilion.status_file import STATES
 from pavilion.test_run import TestRun
 from pavilion.types import NodeInfo, Nodes, NodeList, NodeSet, NodeRange
 from .config import validate_config, AVAILABLE, BACKFILL, calc_node_range
-from .scheduler import SchedulerPlugin, SchedulerPluginError
+from .scheduler import SchedulerPlugin, SchedulerPluginError, KickoffScriptHeader
 from .vars import SchedulerVariables
 
 ChunksBySelect = NewType('ChunksBySelect', Dict[str, List[NodeList]])
@@ -30,7 +37,13 @@ class SchedulerPluginAdvanced(SchedulerPlugin, ABC):
 
         self._nodes = None  # type: Union[Nodes, None]
         self._node_lists = []  # type: List[NodeList]
+        # The node list id for each (sorted) node list, by its nodes.
+        self._node_list_ids = {}  # type: Dict[Tuple[str, ...], int]
+        # The node list id and filter reasons for each set of node filter options.
+        self._filtered = {}  # type: Dict[tuple, Tuple[int, Dict[str, List[str]]]]
         self._chunks = ChunksByNodeListId({})  # type: ChunksByNodeListId
+        # The snapshot of our node info, by working directory.
+        self._node_snapshots = {}  # type: Dict[Path, NodeSnapshot]
 
     # These additional methods need to be defined for advanced schedulers.
 
@@ -77,19 +90,38 @@ class SchedulerPluginAdvanced(SchedulerPlugin, ABC):
 
         raise NotImplementedError("This must be implemented by the scheduler plugin.")
 
-    def _get_initial_vars(self, sched_config: dict) -> SchedulerVariables:
+    def _get_initial_vars(self, sched_config: dict, pav_cfg=None) -> SchedulerVariables:
         """Get initial variables (and chunks) for this scheduler."""
 
         if self._nodes is None:
-            self._nodes = self._get_system_inventory(sched_config)
-        filtered_nodes, filter_reasons = self._filter_nodes(sched_config)
-        filtered_nodes.sort()
+            self._nodes = self._get_system_inventory(sched_config, pav_cfg)
+
+        # Node filtering only depends on a few of the scheduler options, and those
+        # are usually the same for most of the tests we see.
+        filter_opts = self._get_options(sched_config, self.NODE_FILTER_OPTIONS)
+        if self._memoize_filters() and filter_opts in self._filtered:
+            node_list_id, filter_reasons = self._filtered[filter_opts]
+        else:
+            filtered_nodes, filter_reasons = self._filter_nodes(sched_config)
+            filtered_nodes.sort()
+
+            node_list_key = tuple(filtered_nodes)
+            node_list_id = self._node_list_ids.get(node_list_key)
+            if node_list_id is None:
+                node_list_id = len(self._node_lists)
+                self._node_lists.append(filtered_nodes)
+                self._node_list_ids[node_list_key] = node_list_id
+
+            self._filtered[filter_opts] = node_list_id, filter_reasons
+
+        filtered_nodes = self._node_lists[node_list_id]
 
         errors = []
 
         if sched_config['include_nodes']:
+            filtered_set = set(filtered_nodes)
             for node in sched_config['include_nodes']:
-                if node not in filtered_nodes:
+                if node not in filtered_set:
                     errors.append(
                         "Requested node (via 'schedule.include_nodes') was filtered "
                         "due to other filtering ")
@@ -120,12 +152,6 @@ class SchedulerPluginAdvanced(SchedulerPlugin, ABC):
                 .format(min_nodes, max_nodes, len(filtered_nodes),
                         reasons, pprint.pformat(sched_config)))
 
-        try:
-            node_list_id = self._node_lists.index(filtered_nodes)
-        except ValueError:
-            node_list_id = len(self._node_lists)
-            self._node_lists.append(filtered_nodes)
-
         chunks = self._get_chunks(node_list_id, sched_config)
 
         sched_vars = self.VAR_CLASS(sched_config, nodes=self._nodes, chunks=chunks,
@@ -137,24 +163,32 @@ class SchedulerPluginAdvanced(SchedulerPlugin, ABC):
         """Load our saved node data from kickoff time, and compute the final
         scheduler variables from that."""
 
+        # Get the list of allocation nodes, and then the info for just those nodes.
+        alloc_nodes = self._get_alloc_nodes(test.job)
         try:
-            nodes = test.job.load_sched_data()
+            nodes = test.job.load_sched_data(alloc_nodes)
         except JobError as err:
             raise SchedulerPluginError("Could not load node info: {}".format(err.args[0]))
 
-        # Get the list of allocation nodes
-        alloc_nodes = self._get_alloc_nodes(test.job)
-        nodes = Nodes({node: nodes[node] for node in alloc_nodes})
-
         sched_config = validate_config(test.config['schedule'])
 
         return self.VAR_CLASS(sched_config, nodes=nodes, deferred=False)
 
-    def _get_system_inventory(self, sched_config: dict) -> Union[Nodes, None]:
+    def _get_system_inventory(self, sched_config: dict, pav_cfg=None,
+                              refresh: bool = False) -> Union[Nodes, None]:
         """Returns a dictionary of node data, or None if the scheduler does not
-        support node data acquisition."""
+        support node data acquisition. When given the pavilion config, the raw node
+        data is shared through the node inventory cache.
+
+        :param refresh: Ignore (and update) any cached node inventory.
+        """
+
+        if pav_cfg is None:
+            raw_node_data, extra = self._get_raw_node_data(sched_config)
+        else:
+            raw_node_data, extra = self._get_cached_raw_node_data(
+                pav_cfg, sched_config, refresh=refresh)
 
-        raw_node_data, extra = self._get_raw_node_data(sched_config)
         if raw_node_data is None:
             return None
 
@@ -172,6 +206,169 @@ class SchedulerPluginAdvanced(SchedulerPlugin, ABC):
 
         return nodes
 
+    NODE_INVENTORY_DIR = 'node_inventory'
+    """Where node inventories are cached, under the working_dir."""
+
+    NODE_INVENTORY_LOCK_TIMEOUT = 60
+    """How long to wait for another process to finish refreshing the node
+    inventory before giving up and getting it ourselves."""
+
+    def _node_inventory_path(self, pav_cfg) -> Path:
+        """The path to this scheduler's cached node inventory. Working directories
+        may be shared by multiple clusters, so the system name is included."""
+
+        sys_name = sys_vars.get_vars(True)['sys_name']
+        return (pav_cfg.working_dir/self.NODE_INVENTORY_DIR/
+                '{}-{}.pkl'.format(self.name, sys_name))
+
+    @staticmethod
+    def _load_node_inventory(path: Path, ttl: float) -> Union[Tuple[Any, Any], None]:
+        """Load the raw node data and extra info from the node inventory cache.
+        Returns None if the cache doesn't exist, is broken, or is older than ttl."""
+
+        try:
+            if time.time() - path.stat().st_mtime > ttl:
+                return None
+
+            with path.open('rb') as inv_file:
+                return pickle.load(inv_file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError,
+                ImportError, ValueError):
+            return None
+
+    @staticmethod
+    def _save_node_inventory(path: Path, raw_node_data, extra):
+        """Atomically save the raw node data and extra info to the node inventory
+        cache. Failures just mean the next invocation will have to get it again."""
+
+        tmp_path = None
+        try:
+            path.parent.mkdir(exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent.as_posix(),
+                                            prefix='.' + path.name)
+            with os.fdopen(fd, 'wb') as inv_file:
+                pickle.dump((raw_node_data, extra), inv_file)
+            os.chmod(tmp_path, 0o664)
+            os.rename(tmp_path, path.as_posix())
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+    def _get_cached_raw_node_data(self, pav_cfg, sched_config: dict,
+                                  refresh: bool = False) -> Tuple[Any, Any]:
+        """Return the raw node data and extra info (as per _get_raw_node_data()),
+        using the shared node inventory cache in the working_dir when it's no older
+        than the 'node_inventory_ttl' in the pavilion config. Only one process
+        refreshes the cache at a time; the rest wait for and then use its result.
+
+        :param pav_cfg: The pavilion config.
+        :param sched_config: The scheduler config.
+        :param refresh: Always get new data and update the cache.
+        """
+
+        ttl = pav_cfg.get('node_inventory_ttl', 0)
+        if not ttl and not refresh:
+            return self._get_raw_node_data(sched_config)
+
+        path = self._node_inventory_path(pav_cfg)
+        if not refresh:
+            cached = self._load_node_inventory(path, ttl)
+            if cached is not None:
+                return cached
+
+        lock_path = path.with_name(path.name + '.lock')
+        try:
+            path.parent.mkdir(exist_ok=True)
+            with lockfile.LockFile(lock_path, group=pav_cfg.get('shared_group'),
+                                   timeout=self.NODE_INVENTORY_LOCK_TIMEOUT):
+                if not refresh:
+                    # Someone else may have refreshed it while we waited for the lock.
+                    cached = self._load_node_inventory(path, ttl)
+                    if cached is not None:
+                        return cached
+
+                raw_node_data, extra = self._get_raw_node_data(sched_config)
+                if raw_node_data is not None:
+                    self._save_node_inventory(path, raw_node_data, extra)
+                return raw_node_data, extra
+        except (TimeoutError, OSError):
+            return self._get_raw_node_data(sched_config)
+
+    def refresh_node_inventory(self, pav_cfg, sched_config: dict = None) \
+            -> Union[Nodes, None]:
+        """Get a new node inventory for this system, update the shared cache, and
+        return it. This can be used to pre-warm the cache.
+
+        :param pav_cfg: The pavilion config.
+        :param sched_config: The scheduler config to use. The defaults are
+            used if not given.
+        """
+
+        if sched_config is None:
+            sched_config = validate_config({})
+
+        return self._get_system_inventory(sched_config, pav_cfg, refresh=True)
+
+    # The scheduling options that affect node filtering. Node filtering results are
+    # reused for tests with the same values for all of these. Subclasses that filter
+    # on additional options (in _filter_custom) must add them here. Until they
+    # (re)define this, filtering results aren't reused for them at all (see
+    # _memoize_filters()). Separate multipart keys with a '.'.
+    NODE_FILTER_OPTIONS = ['partition', 'reservation', 'exclude_nodes', 'node_state']
+
+    @classmethod
+    def _memoize_filters(cls) -> bool:
+        """Whether node filtering results can be reused for tests with the same
+        NODE_FILTER_OPTIONS. That's only safe if NODE_FILTER_OPTIONS was defined
+        alongside (or after) any override of the node filtering methods, as
+        those may filter on options it doesn't include."""
+
+        def defined_in(attr):
+            for base in cls.__mro__:
+                if attr in base.__dict__:
+                    return base
+            return None
+
+        opts_cls = defined_in('NODE_FILTER_OPTIONS')
+        return all(issubclass(opts_cls, defined_in(attr))
+                   for attr in ('_filter_nodes', '_filter_custom'))
+
+    @staticmethod
+    def _get_options(sched_config: dict, opt_names: List[str]) -> tuple:
+        """Get the (hashable) values of the given options from the scheduler config.
+
+        :param sched_config: The scheduler config.
+        :param opt_names: Option names, with multipart keys separated by a '.'.
+        """
+
+        opts = []
+        for opt_name in opt_names:
+            opt = sched_config
+            for part in opt_name.split('.'):
+                if opt is not None and isinstance(opt, dict):
+                    opt = opt.get(part)
+            opts.append(convert_lists_to_tuples(opt))
+
+        return tuple(opts)
+
+    def _get_node_snapshot(self, pav_cfg) -> NodeSnapshot:
+        """Return the shared snapshot of our node info (saving it if needed) for jobs
+        to reference.
+
+        :raises JobError: When the snapshot can't be saved.
+        """
+
+        working_dir = pav_cfg['working_dir']
+        snapshot = self._node_snapshots.get(working_dir)
+        if snapshot is None or not snapshot.path.exists():
+            snapshot = NodeSnapshot.save(pav_cfg, self._nodes)
+            self._node_snapshots[working_dir] = snapshot
+
+        return snapshot
+
     def _filter_nodes(self, sched_config: Dict[str, Any]) \
             -> Tuple[NodeList, Dict[str, List[str]]]:
         """
@@ -189,7 +386,7 @@ class SchedulerPluginAdvanced(SchedulerPlugin, ABC):
 
         partition = sched_config.get('partition')
         reservation = sched_config.get('reservation')
-        exclude_nodes = sched_config['exclude_nodes']
+        exclude_nodes = set(sched_config['exclude_nodes'])
         node_state = sched_config['node_state']
 
         filter_reasons = collections.defaultdict(lambda: [])
@@ -271,12 +468,20 @@ class SchedulerPluginAdvanced(SchedulerPlugin, ABC):
             return self._chunks[chunk_id]
 
         chunks = []
-        for i in range(len(nodes)//chunk_size):
-            # Apply the selection function and get our chunk nodes.
-            chunk = self.NODE_SELECTION[node_select](nodes, chunk_size)
-            # Filter out any chosen from our node list.
-            nodes = [node for node in nodes if node not in chunk]
-            chunks.append(chunk)
+        if node_select == 'contiguous':
+            # Contiguous chunks are just slices of the node list.
+            chunk_count = len(nodes)//chunk_size
+            for i in range(chunk_count):
+                chunks.append(nodes[i*chunk_size:(i + 1)*chunk_size])
+            nodes = nodes[chunk_count*chunk_size:]
+        else:
+            for i in range(len(nodes)//chunk_size):
+                # Apply the selection function and get our chunk nodes.
+                chunk = self.NODE_SELECTION[node_select](nodes, chunk_size)
+                # Filter out any chosen from our node list.
+                chunk_set = set(chunk)
+                nodes = [node for node in nodes if node not in chunk_set]
+                chunks.append(chunk)
 
         if nodes and chunk_extra == BACKFILL:
             backfill = chunks[-1][:chunk_size - len(nodes)]
@@ -379,17 +584,8 @@ class SchedulerPluginAdvanced(SchedulerPlugin, ABC):
                 # run scripts.
                 min_nodes, max_nodes = calc_node_range(sched_config, len(chunk))
 
-                acq_opts = [(min_nodes, max_nodes)]
-
-                for opt_name in self.ALLOC_ACQUIRE_OPTIONS:
-                    opt = sched_config
-                    for part in opt_name.split('.'):
-                        if opt is not None and isinstance(opt, dict):
-                            opt = opt.get(part)
-                    opt = convert_lists_to_tuples(opt)
-                    acq_opts.append(opt)
-
-                acq_opts = tuple(acq_opts)
+                acq_opts = ((min_nodes, max_nodes),) + \
+                    self._get_options(sched_config, self.ALLOC_ACQUIRE_OPTIONS)
                 share_groups[acq_opts].append(test)
 
         # Pull out any 'shared' tests that would have run by themselves anyway.
@@ -415,6 +611,7 @@ class SchedulerPluginAdvanced(SchedulerPlugin, ABC):
 
         try:
             job = Job.new(pav_cfg, tests, self.KICKOFF_FN)
+            snapshot = self._get_node_snapshot(pav_cfg)
         except JobError as err:
             raise SchedulerPluginError("Error creating job: \n{}".format(err))
 
@@ -431,10 +628,10 @@ class SchedulerPluginAdvanced(SchedulerPlugin, ABC):
 
         if base_sched_config['chunking']['size'] in (0, None):
             picked_nodes = node_range
-            job.save_node_data({node: self._nodes[node] for node in chunk})
+            job.save_node_data({node: self._nodes[node] for node in chunk}, snapshot)
         else:
             picked_nodes = node_list[:node_range[1]]
-            job.save_node_data({node: self._nodes[node] for node in picked_nodes})
+            job.save_node_data({node: self._nodes[node] for node in picked_nodes}, snapshot)
 
         job_name = 'pav_{}'.format(','.join(test.name for test in tests[:4]))
         if len(tests) > 4:
@@ -469,12 +666,13 @@ class SchedulerPluginAdvanced(SchedulerPlugin, ABC):
         """Schedule tests in an individualized chunk that doesn't actually use
         chunking, leaving the node picking to the scheduler."""
 
+        kickoffs = []
         for test in tests:
             node_info = {node: self._nodes[node] for node in chunk}
 
             try:
                 job = Job.new(pav_cfg, [test], self.KICKOFF_FN)
-                job.save_node_data(node_info)
+                job.save_node_data(node_info, self._get_node_snapshot(pav_cfg))
             except JobError as err:
                 raise SchedulerPluginError("Error creating job: \n{}".format(err))
 
@@ -492,12 +690,11 @@ class SchedulerPluginAdvanced(SchedulerPlugin, ABC):
             script.command('pav _run {t.working_dir} {t.id}'.format(t=test))
             script.write(job.kickoff_path)
 
-            job.info = self._kickoff(pav_cfg, job, sched_config)
-            test.job = job
-            test.status.set(
-                STATES.SCHEDULED,
-                "Test kicked off (individually (flex)) under {} scheduler."
-                .format(self.name))
+            kickoffs.append((test, job, sched_config, script.header,
+                             "Test kicked off (individually (flex)) under {} scheduler."
+                             .format(self.name)))
+
+        self._kickoff_individual(pav_cfg, kickoffs)
 
     def _schedule_indi_chunk(self, pav_cfg, tests: List[TestRun],
                              sched_configs: Dict[str, dict], chunk: NodeSet):
@@ -523,6 +720,7 @@ class SchedulerPluginAdvanced(SchedulerPlugin, ABC):
             by_need.append((needed_nodes, test))
         by_need.sort(key=lambda tup: tup[0])
 
+        kickoffs = []
         for needed_nodes, test in by_need:
             try:
                 job = Job.new(pav_cfg, [test], self.KICKOFF_FN)
@@ -544,7 +742,8 @@ class SchedulerPluginAdvanced(SchedulerPlugin, ABC):
             picked_nodes = chunk_usage[:needed_nodes]
 
             try:
-                job.save_node_data({node: self._nodes[node] for node in picked_nodes})
+                job.save_node_data({node: self._nodes[node] for node in picked_nodes},
+                                   self._get_node_snapshot(pav_cfg))
             except JobError as err:
                 raise SchedulerPluginError("Error saving node info to job.: \n{}".format(err))
 
@@ -558,13 +757,68 @@ class SchedulerPluginAdvanced(SchedulerPlugin, ABC):
             script.command('pav _run {t.working_dir} {t.id}'.format(t=test))
             script.write(job.kickoff_path)
 
-            job.info = self._kickoff(pav_cfg, job, sched_config)
+            kickoffs.append((test, job, sched_config, script.header,
+                             "Test kicked off (individually) under {} scheduler with {} "
+                             "nodes.".format(self.name, len(test_chunk))))
+
+        self._kickoff_individual(pav_cfg, kickoffs)
+
+    def _kickoff_individual(
+            self, pav_cfg,
+            kickoffs: List[Tuple[TestRun, Job, dict, KickoffScriptHeader, str]]):
+        """Kick off the jobs for individually scheduled tests. Jobs whose kickoff
+        scripts ask for the same kind of allocation are kicked off together, via
+        _kickoff_batch().
+
+        :param pav_cfg: The pavilion config.
+        :param kickoffs: A (test, job, sched_config, kickoff script header, status
+            note) tuple for each test.
+        """
+
+        batches = collections.defaultdict(list)
+        by_job = {}
+        for kickoff in kickoffs:
+            test, job, _, header, note = kickoff
+            batches[header.get_batch_key()].append(kickoff)
+            by_job[job.name] = test, note
+
+        def submitted(job: Job, job_info: JobInfo):
+            """Record the job info as soon as each job is submitted, so the jobs
+            already kicked off are tracked even if a later submission fails."""
+
+            test, note = by_job[job.name]
+            job.info = job_info
             test.job = job
-            test.status.set(
-                STATES.SCHEDULED,
-                "Test kicked off (individually) under {} scheduler with {} nodes."
-                .format(self.name, len(test_chunk)))
+            test.status.set(STATES.SCHEDULED, note)
+
+        for batch in batches.values():
+            self._kickoff_batch(
+                pav_cfg,
+                jobs=[job for _, job, _, _, _ in batch],
+                sched_configs=[sched_config for _, _, sched_config, _, _ in batch],
+                header=batch[0][3],
+                submitted=submitted)
+
+    def _kickoff_batch(self, pav_cfg, jobs: List[Job], sched_configs: List[dict],
+                       header: KickoffScriptHeader,
+                       submitted: Callable[[Job, JobInfo], None]):
+        """Kick off the given single test jobs, whose kickoff scripts all ask for
+        the same kind of allocation. This kicks each off separately. Schedulers that
+        can submit many jobs at once (such as via job arrays) should override it.
+
+        :param pav_cfg: The pavilion config.
+        :param jobs: The jobs to kick off. Their kickoff scripts are already written.
+        :param sched_configs: The scheduler config for each job.
+        :param header: The kickoff script header of the first job. Apart from the
+            job name, it's the same for all of them.
+        :param submitted: Must be called with each job and its job info as soon as
+            that job is submitted.
+        """
+
+        _ = header
 
+        for job, sched_config in zip(jobs, sched_configs):
+            submitted(job, self._kickoff(pav_cfg, job, sched_config))
 
 def convert_lists_to_tuples(obj):
     """Replace any lists in the given ubject with tuples."""
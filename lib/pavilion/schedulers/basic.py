@@ -17,9 +17,11 @@ class SchedulerPluginBasic(SchedulerPlugin, ABC):
     """A Scheduler plugin that does not support automatic node inventories. It relies
     on manually set parameters in 'schedule.cluster_info'."""
 
-    def _get_initial_vars(self, sched_config: dict) -> SchedulerVariables:
+    def _get_initial_vars(self, sched_config: dict, pav_cfg=None) -> SchedulerVariables:
         """Get the initial variables for the basic scheduler."""
 
+        _ = pav_cfg
+
         return self.VAR_CLASS(sched_config)
 
     def get_final_vars(self, test: TestRun) -> SchedulerVariables:
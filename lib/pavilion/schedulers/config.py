@@ -4,6 +4,7 @@ from typing import Any, Dict, Union, List, Tuple
 import math
 
 import yaml_config as yc
+from pavilion import lazy_plugins
 from pavilion import utils
 
 
@@ -484,6 +485,8 @@ def validate_config(config: Dict[str, str],
     """
 
     if validators is None:
+        # Every scheduler plugin adds its own validators.
+        lazy_plugins.load('sched')
         validators = CONFIG_VALIDATORS
 
     if defaults is None:
@@ -4,19 +4,22 @@
 import math
 import os
 import re
+import shlex
 import shutil
 import subprocess
 import time
-from typing import List, Union, Any, Tuple
+from pathlib import Path
+from typing import List, Union, Any, Tuple, Dict, Callable
 
 import yaml_config as yc
 from pavilion import sys_vars
 from pavilion.jobs import Job, JobInfo
+from pavilion.scriptcomposer import ScriptComposer
 from pavilion.status_file import STATES, TestStatusInfo
 from pavilion.types import NodeInfo, NodeList
 from pavilion.var_dict import dfr_var_method
 from ..advanced import SchedulerPluginAdvanced
-from ..config import validate_list
+from ..config import validate_list, min_int
 from ..scheduler import SchedulerPluginError, KickoffScriptHeader
 from ..vars import SchedulerVariables
 
@@ -220,6 +223,9 @@ class Slurm(SchedulerPluginAdvanced):
     ALLOC_ACQUIRE_OPTIONS = SchedulerPluginAdvanced.ALLOC_ACQUIRE_OPTIONS + \
         ['slurm.sbatch_extra', 'slurm.features']
 
+    # Nodes are also filtered by their features.
+    NODE_FILTER_OPTIONS = SchedulerPluginAdvanced.NODE_FILTER_OPTIONS + ['slurm.features']
+
     MPI_CMD_SRUN = 'srun'
     MPI_CMD_MPIRUN = 'mpirun'
     MPI_CMD_OPTIONS = (MPI_CMD_SRUN, MPI_CMD_MPIRUN)
@@ -254,6 +260,12 @@ class Slurm(SchedulerPluginAdvanced):
                         sub_elem=yc.StrElem(),
                         help_text="Extra arguments to pass to srun as part of the "
                                   "'sched.test_cmd' variable."),
+            yc.StrElem(name='max_array_size',
+                       help_text="Individually scheduled tests that ask for the same "
+                                 "kind of allocation are submitted together as job "
+                                 "arrays of up to this many tests. This should be no "
+                                 "more than the cluster's 'MaxArraySize'. Set to 1 to "
+                                 "submit each test separately."),
             yc.ListElem(name='sbatch_extra',
                         sub_elem=yc.StrElem(),
                         help_text="Extra arguments to add as sbatch header lines."
@@ -281,6 +293,7 @@ class Slurm(SchedulerPluginAdvanced):
             'avail_states': ['IDLE', 'MAINT', 'MAINTENANCE', 'PLANNED'],
             'features': [],
             'reserved_states': ['RESERVED'],
+            'max_array_size': '1000',
             'sbatch_extra': [],
             'srun_extra': [],
             'mpi_cmd': self.MPI_CMD_SRUN,
@@ -294,6 +307,7 @@ class Slurm(SchedulerPluginAdvanced):
             'features': validate_features,
             'reserved_states': validate_slurm_states,
             'srun_extra': validate_list,
+            'max_array_size': min_int('slurm.max_array_size', min_val=1),
             'sbatch_extra': validate_list,
             'mpi_cmd': self.MPI_CMD_OPTIONS,
             'mpirun_bind_to': self.MPIRUN_BIND_OPTS,
@@ -576,14 +590,15 @@ class Slurm(SchedulerPluginAdvanced):
 
         return ret == 0
 
-    def _kickoff(self, pav_cfg, job: Job, sched_config: dict) -> JobInfo:
-        """Submit the kick off script using sbatch."""
+    @staticmethod
+    def _sbatch(script_path: Path, *args) -> str:
+        """Submit the given script with sbatch, and return the slurm job id.
 
-        _ = self
+        :param script_path: The script to submit.
+        :param args: Additional arguments to sbatch.
+        """
 
-        proc = subprocess.Popen(['sbatch',
-                                 '--output={}'.format(job.sched_log.as_posix()),
-                                 job.kickoff_path.as_posix()],
+        proc = subprocess.Popen(['sbatch'] + list(args) + [script_path.as_posix()],
                                 stdout=subprocess.PIPE,
                                 stderr=subprocess.PIPE)
         stdout, stderr = proc.communicate()
@@ -591,16 +606,102 @@ class Slurm(SchedulerPluginAdvanced):
         if proc.poll() != 0:
             raise SchedulerPluginError(
                 "Sbatch failed for kickoff script '{}': {}"
-                .format(job.kickoff_path, stderr.decode('utf8'))
+                .format(script_path, stderr.decode('utf8'))
             )
 
+        return stdout.decode('UTF-8').strip().split()[-1]
+
+    def _kickoff(self, pav_cfg, job: Job, sched_config: dict) -> JobInfo:
+        """Submit the kick off script using sbatch."""
+
+        job_id = self._sbatch(job.kickoff_path,
+                              '--output={}'.format(job.sched_log.as_posix()))
+
         sys_name = sys_vars.get_vars(True)['sys_name']
 
         return JobInfo({
-            'id': stdout.decode('UTF-8').strip().split()[-1],
+            'id': job_id,
             'sys_name': sys_name,
         })
 
+    ARRAY_KICKOFF_FN = 'kickoff.array'
+    """The job array script, in the directory of the first job in the array."""
+
+    ARRAY_LOG_FN = 'sched-{}.log'
+    """The sched log for each array task, in the directory of the first job."""
+
+    def _kickoff_batch(self, pav_cfg, jobs: List[Job], sched_configs: List[dict],
+                       header: KickoffScriptHeader,
+                       submitted: Callable[[Job, JobInfo], None]):
+        """Submit jobs that ask for the same kind of allocation as slurm job arrays,
+        rather than with an sbatch call each. Every test still has its own job (and
+        kickoff script). Each array task just runs one of those kickoff scripts."""
+
+        max_size = sched_configs[0]['slurm']['max_array_size']
+        if max_size < 2 or len(jobs) < 2:
+            super()._kickoff_batch(pav_cfg, jobs, sched_configs, header, submitted)
+            return
+
+        for start in range(0, len(jobs), max_size):
+            array_jobs = jobs[start:start + max_size]
+            if len(array_jobs) == 1:
+                job_infos = [self._kickoff(pav_cfg, array_jobs[0], sched_configs[start])]
+            else:
+                job_infos = self._kickoff_array(pav_cfg, array_jobs, header)
+
+            for job, job_info in zip(array_jobs, job_infos):
+                submitted(job, job_info)
+
+    def _kickoff_array(self, pav_cfg, jobs: List[Job],
+                       header: KickoffScriptHeader) -> List[JobInfo]:
+        """Submit a job array with a task for each of the given jobs. The array script
+        and the per-task sched logs are kept in the first job's directory. Each job's
+        sched log is a symlink to the one for its task.
+
+        :returns: The job info for each job. The job ids are those of the array tasks
+            ('<array_id>_<task_id>'), which slurm accepts anywhere a job id is.
+        """
+
+        base_job = jobs[0]
+        array_path = base_job.path/self.ARRAY_KICKOFF_FN
+
+        script = ScriptComposer(header=header)
+        script.comment("Each task in this job array runs the kickoff script of one "
+                       "Pavilion job.")
+        script.command('kickoffs=(')
+        for job in jobs:
+            script.command('    {}'.format(shlex.quote(job.kickoff_path.as_posix())))
+        script.command(')')
+        script.command('exec "${kickoffs[$SLURM_ARRAY_TASK_ID]}"')
+
+        try:
+            script.write(array_path)
+        except OSError as err:
+            raise SchedulerPluginError(
+                "Could not write job array script '{}': {}".format(array_path, err))
+
+        array_id = self._sbatch(
+            array_path,
+            '--array=0-{}'.format(len(jobs) - 1),
+            '--output={}'.format((base_job.path/self.ARRAY_LOG_FN.format('%a')).as_posix()))
+
+        sys_name = sys_vars.get_vars(True)['sys_name']
+
+        job_infos = []
+        for task_id, job in enumerate(jobs):
+            try:
+                job.sched_log.symlink_to(base_job.path/self.ARRAY_LOG_FN.format(task_id))
+            except OSError:
+                # This is just a convenience.
+                pass
+
+            job_infos.append(JobInfo({
+                'id': '{}_{}'.format(array_id, task_id),
+                'sys_name': sys_name,
+            }))
+
+        return job_infos
+
     SCONTROL_KEY_RE = re.compile(r'(?:^|\s+)([A-Z][a-zA-Z0-9:/]*)=')
     SCONTROL_WS_RE = re.compile(r'\s+')
 
@@ -757,21 +858,96 @@ class Slurm(SchedulerPluginAdvanced):
 
         # scontrol show returns a list. There should only be one item in that
         # list though.
-        if job_data:
-            job_data = job_data.pop(0)
-        else:
-            return TestStatusInfo(
-                state=STATES.SCHEDULED,
-                note=("Could not find info on slurm job '{}' in slurm."
-                      .format(job_info['id'])),
-                when=time.time())
+        job_data = job_data.pop(0)
+
+        return self._job_state_to_status(job_info['id'],
+                                         job_data.get('JobState', 'UNKNOWN'),
+                                         job_data.get('Reason'))
+
+    SQUEUE_FORMAT = '%i|%T|%r'
+
+    def _job_statuses(self, pav_cfg, job_infos: List[JobInfo]) -> List[TestStatusInfo]:
+        """Get the status of all the given jobs with a single squeue call."""
+
+        sys_name = sys_vars.get_vars(True)['sys_name']
+
+        job_ids = [job_info['id'] for job_info in job_infos
+                   if job_info['sys_name'] == sys_name]
+
+        job_data = {}
+        if job_ids:
+            try:
+                job_data = self._squeue_states(job_ids)
+            except ValueError:
+                # Squeue may refuse the whole query when some of the jobs are too
+                # old to know about. Ask about each individually instead.
+                return [self._job_status(pav_cfg, job_info) for job_info in job_infos]
+
+        statuses = []
+        for job_info in job_infos:
+            if job_info['sys_name'] != sys_name:
+                statuses.append(TestStatusInfo(
+                    STATES.SCHEDULED,
+                    "Job started on a different cluster ({}).".format(sys_name)))
+            elif job_info['id'] not in job_data:
+                statuses.append(TestStatusInfo(
+                    state=STATES.SCHED_ERROR,
+                    note="Could not find job {}".format(job_info['id']),
+                    when=time.time()))
+            else:
+                job_state, reason = job_data[job_info['id']]
+                statuses.append(self._job_state_to_status(job_info['id'], job_state,
+                                                          reason))
+
+        return statuses
+
+    def _squeue_states(self, job_ids: List[str], timeout=10) -> Dict[str, Tuple[str, str]]:
+        """Get the state and reason for each of the given jobs from squeue.
+
+        :param job_ids: The slurm job ids to look up.
+        :param int timeout: How long to wait for results.
+        :raises ValueError: When squeue fails.
+        :returns: A dict of (state, reason) tuples by job id. Jobs slurm doesn't
+            know about are left out.
+        """
+
+        # Job array tasks are only listed individually with '--array'.
+        cmd = ['squeue', '--noheader', '--states=all', '--array',
+               '--jobs={}'.format(','.join(job_ids)),
+               '--format={}'.format(self.SQUEUE_FORMAT)]
+
+        proc = subprocess.Popen(cmd,
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE)
+
+        try:
+            stdout, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            raise ValueError("Timed out waiting for squeue.")
+
+        if proc.poll() != 0:
+            raise ValueError(stderr.decode('utf8'))
+
+        states = {}
+        for line in stdout.decode('utf8').splitlines():
+            parts = line.strip().split('|', 2)
+            if len(parts) != 3:
+                continue
+            job_id, job_state, reason = parts
+            states[job_id] = job_state, reason
+
+        return states
+
+    def _job_state_to_status(self, job_id: str, job_state: str,
+                             reason: Union[str, None]) -> TestStatusInfo:
+        """Map a slurm job state to a Pavilion scheduler status."""
 
-        job_state = job_data.get('JobState', 'UNKNOWN')
         if job_state in self.SCHED_WAITING:
             return TestStatusInfo(
                 state=STATES.SCHEDULED,
                 note=("Job {} has state '{}', reason '{}'"
-                      .format(job_info['id'], job_state, job_info.get('Reason'))),
+                      .format(job_id, job_state, reason)),
                 when=time.time()
             )
         elif job_state in self.SCHED_RUN:
@@ -798,7 +974,7 @@ class Slurm(SchedulerPluginAdvanced):
         return TestStatusInfo(
             state=STATES.SCHEDULED,
             note="Job '{}' has unknown/unhandled job state '{}'. We have no"
-                 "idea what is going on.".format(job_info['id'], job_state),
+                 "idea what is going on.".format(job_id, job_state),
             when=time.time()
         )
 
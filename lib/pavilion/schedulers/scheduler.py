@@ -71,6 +71,18 @@ class KickoffScriptHeader(ScriptHeader):
 
         return lines
 
+    def get_batch_key(self) -> Tuple[str, ...]:
+        """Returns the header lines, but without the job name. Kickoff scripts with the
+        same batch key ask for the same kind of allocation, and so can be submitted
+        together by schedulers that support that."""
+
+        job_name = self._job_name
+        self._job_name = ''
+        try:
+            return tuple(self.get_lines())
+        finally:
+            self._job_name = job_name
+
     def _kickoff_lines(self) -> List[str]:
         """Override and use included information to write a kickoff script header
         for this kickoff script."""
@@ -126,7 +138,7 @@ class SchedulerPlugin(IPlugin.IPlugin):
         self.path = inspect.getfile(self.__class__)
         self._is_available = None
 
-        self._job_statuses = JobStatusDict({})  # type: JobStatusDict
+        self._job_status_cache = JobStatusDict({})  # type: JobStatusDict
 
         if self.VAR_CLASS is None:
             raise SchedulerPluginError("You must set the Var class for"
@@ -146,7 +158,7 @@ class SchedulerPlugin(IPlugin.IPlugin):
         """Override this to provide job status information given a job_info dict.
         The format of the job_info is scheduler dependent, and produced in the
         kickoff method. This can, optionally, set the job status for all jobs it can
-        at once in the _job_statuses dict, which would greatly reduce the number of
+        at once in the _job_status_cache dict, which would greatly reduce the number of
         calls to the scheduler. It will only be called if a status hasn't been
         recently cached.
 
@@ -165,6 +177,19 @@ class SchedulerPlugin(IPlugin.IPlugin):
 
         raise NotImplementedError
 
+    def _job_statuses(self, pav_cfg, job_infos: List[JobInfo]) \
+            -> List[Union[TestStatusInfo, None]]:
+        """Get the status of each of the given jobs. It should return a list of
+        statuses (or None, as per _job_status()) in the same order as the given job
+        infos.
+
+        By default, this calls _job_status() on each job. Plugins can override it
+        to get the status of many jobs at once, typically with a single call to
+        the scheduler.
+        """
+
+        return [self._job_status(pav_cfg, job_info) for job_info in job_infos]
+
     def cancel(self, job_info: JobInfo) -> Union[str, None]:
         """Do your best to cancel the given job.
 
@@ -176,7 +201,7 @@ class SchedulerPlugin(IPlugin.IPlugin):
     # These are all overridden by the Basic/Advanced classes, and don't need to be
     # defined by most plugins.
 
-    def _get_initial_vars(self, sched_config: dict) -> SchedulerVariables:
+    def _get_initial_vars(self, sched_config: dict, pav_cfg=None) -> SchedulerVariables:
         """Return the deferred scheduler variable object for the given scheduler
         config."""
 
@@ -195,11 +220,13 @@ class SchedulerPlugin(IPlugin.IPlugin):
 
     # The remaining methods are shared by all plugins.
 
-    def get_initial_vars(self, raw_sched_config: dict) -> SchedulerVariables:
+    def get_initial_vars(self, raw_sched_config: dict, pav_cfg=None) -> SchedulerVariables:
         """Queries the scheduler to auto-detect its current state, and returns the
         dictionary of scheduler variables for that test given its config.
 
         :param raw_sched_config: The raw scheduler config for a given test.
+        :param pav_cfg: The pavilion config. Without it, shared caches (like the
+            node inventory cache) won't be used.
         :returns: A tuple of the scheduler variables object and the node_list_id,
             which should be saved as part of the test config.
         """
@@ -214,7 +241,7 @@ class SchedulerPlugin(IPlugin.IPlugin):
             raise SchedulerPluginError(
                 "You must specify a value for schedule.nodes")
 
-        return self._get_initial_vars(sched_config)
+        return self._get_initial_vars(sched_config, pav_cfg)
 
     def available(self) -> bool:
         """Returns true if this scheduler is available on this host."""
@@ -242,25 +269,75 @@ class SchedulerPlugin(IPlugin.IPlugin):
         :return: A StatusInfo object representing the status.
         """
 
-        if test.job is None:
-            return TestStatusInfo(
-                STATES.SCHED_ERROR, "Test does not have an associated job.")
+        return self.job_statuses(pav_cfg, [test])[0]
 
-        try:
-            job_info = test.job.info
-        except JobError:
-            return TestStatusInfo(
-                STATES.SCHED_ERROR, "Could not retrieve job's scheduler info.")
+    def job_statuses(self, pav_cfg, tests: List[TestRun]) -> List[TestStatusInfo]:
+        """Get the job state for each of the given tests, as per job_status().
+        Statuses for jobs that weren't recently cached are all queried at once
+        via _job_statuses(). Tests that share a job are only queried once.
 
-        if test.job.name in self._job_statuses:
-            timestamp, status = self._job_statuses[test.job.name]
-            if time.time() < timestamp + self.JOB_STATUS_TIMEOUT:
-                return status
+        :param pav_cfg: The pavilion configuration.
+        :param tests: The tests we're checking on.
+        :return: A list of status objects, in the same order as the tests.
+        """
 
-        status = self._job_status(pav_cfg, job_info)
+        statuses = [None] * len(tests)  # type: List[Union[TestStatusInfo, None]]
+        # Job infos to query, by job name.
+        to_query = {}  # type: Dict[str, JobInfo]
+        job_infos = {}  # type: Dict[str, JobInfo]
+
+        now = time.time()
+        for i, test in enumerate(tests):
+            if test.job is None:
+                statuses[i] = TestStatusInfo(
+                    STATES.SCHED_ERROR, "Test does not have an associated job.")
+                continue
+
+            try:
+                job_info = test.job.info
+            except JobError:
+                statuses[i] = TestStatusInfo(
+                    STATES.SCHED_ERROR, "Could not retrieve job's scheduler info.")
+                continue
+
+            job_infos[test.job.name] = job_info
+            if test.job.name in self._job_status_cache:
+                timestamp, _ = self._job_status_cache[test.job.name]
+                if now < timestamp + self.JOB_STATUS_TIMEOUT:
+                    continue
+
+            to_query[test.job.name] = job_info
+
+        job_statuses = {}  # type: Dict[str, Union[TestStatusInfo, None]]
+        if to_query:
+            names = list(to_query.keys())
+            results = self._job_statuses(pav_cfg, [to_query[name] for name in names])
+
+            now = time.time()
+            for name, status in zip(names, results):
+                job_statuses[name] = status
+                if status is not None:
+                    self._job_status_cache[name] = now, status
+
+        for i, test in enumerate(tests):
+            if statuses[i] is not None:
+                continue
+
+            name = test.job.name
+            if name in job_statuses:
+                status = job_statuses[name]
+            else:
+                _, status = self._job_status_cache[name]
 
-        if status is not None:
-            self._job_statuses[test.job.name] = time.time(), status
+            statuses[i] = self._record_job_status(test, job_infos[name], status)
+
+        return statuses
+
+    @staticmethod
+    def _record_job_status(test: TestRun, job_info: JobInfo,
+                           status: Union[TestStatusInfo, None]) -> TestStatusInfo:
+        """Update the test's status file given the scheduler status of its job,
+        and return the status to report for the test."""
 
         if status is None:
             # We could not determine the test status, so check if it still thinks it's
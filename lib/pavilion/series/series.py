@@ -20,7 +20,7 @@ from pavilion.lockfile import LockFile
 from pavilion.output import fprint
 from pavilion.series_config import SeriesConfigLoader
 from pavilion.status_file import SeriesStatusFile, SERIES_STATES
-from pavilion.test_run import TestRun
+from pavilion.test_run import TestRun, TestWaiter
 from pavilion.types import ID_Pair
 from yaml_config import YAMLError, RequiredError
 from .errors import TestSeriesError, TestSeriesWarning
@@ -481,7 +481,15 @@ differentiate it from test ids."""
         while time.time() < end:
             if self.complete:
                 return
-            time.sleep(min(1, timeout or 1))
+
+            # Wait on the tests we know about. Once they're all done, we may still
+            # have to wait on the series to start the rest of its tests.
+            incomplete = [test for test in self.tests.values() if not test.complete]
+            if incomplete:
+                with TestWaiter(incomplete) as waiter:
+                    waiter.wait(timeout=None if end == math.inf else end - time.time())
+            else:
+                time.sleep(max(0, min(self.WAIT_INTERVAL, end - time.time())))
 
         raise TimeoutError("Series {} did not complete before timeout."
                            .format(self._id))
@@ -1,9 +1,10 @@
 """Test sets translate the specifications of which tests to run (with which options),
 into a set of ready to run tests. They are ephemeral, and are not tracked between
 Pavilion runs."""
+import os
 import threading
-import time
 from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
 from io import StringIO
 from typing import List, Dict, TextIO, Union, Set
 
@@ -12,7 +13,7 @@ from pavilion.build_tracker import MultiBuildTracker
 from pavilion.errors import TestRunError, TestConfigError
 from pavilion.resolver import TestConfigResolver
 from pavilion.status_file import SeriesStatusFile, STATES, SERIES_STATES
-from pavilion.test_run import TestRun
+from pavilion.test_run import TestRun, TestWaiter
 from pavilion.utils import str_bool
 
 S_STATES = SERIES_STATES
@@ -261,6 +262,17 @@ class TestSet:
 
     BUILD_STATUS_PREAMBLE = '{when:20s} {test_id:6} {state:{state_len}s}'
     BUILD_SLEEP_TIME = 0.1
+    """How often (in seconds) build status output is refreshed while waiting
+    on builds."""
+
+    @staticmethod
+    def _available_cpus() -> int:
+        """The number of cpus this process may use."""
+
+        try:
+            return len(os.sched_getaffinity(0))
+        except AttributeError:
+            return os.cpu_count() or 1
 
     def build(self, verbosity=0, outfile: TextIO = StringIO()):
         """Build all the tests in this Test Set in parallel. This handles user output
@@ -289,8 +301,6 @@ class TestSet:
             lambda t: t.build_local and not t.skipped, self.tests))
         remote_builds = list(filter(
             lambda t: not t.build_local and not t.skipped, self.tests))
-        test_threads = []  # type: List[Union[threading.Thread, None]]
-
         cancel_event = threading.Event()
 
         # Generate new build names for each test that is rebuilding.
@@ -304,88 +314,115 @@ class TestSet:
                 test.build_name = test.builder.name
                 test.save_attributes()
 
-        # We don't want to start threads that are just going to wait on a lock,
-        # so we'll rearrange the builds so that the unique build names go first.
-        # We'll use this as a stack, so tests that should build first go at
-        # the end of the list.
-        build_order = []
-        # If we've seen a build name, the build can go later.
-        seen_build_names = set()
-
+        # Group the tests by build, so that each unique build is performed just
+        # once. The other tests that share a build are only started (to copy it)
+        # once that build is done, rather than waiting on the build lock.
+        builds = {}  # type: Dict[str, List[TestRun]]
         trackers = {}
         tests_by_tracker = {}
 
         for test in local_builds:
-            # Don't try to build tests that are skipped
-
-            if test.builder.name not in seen_build_names:
-                build_order.append(test)
-                seen_build_names.add(test.builder.name)
-            else:
-                build_order.insert(0, test)
+            builds.setdefault(test.builder.name, []).append(test)
 
             tracker = self.mb_tracker.register(test.builder, test.status)
             trackers[test] = tracker
             tests_by_tracker[tracker] = test
 
+        build_order = [tests[0] for tests in builds.values()]
+        build_order.reverse()  # We pop builds from the end.
+        # The tests that will reuse each build, by build name.
+        build_waiters = {name: tests[1:] for name, tests in builds.items()}
+
+        # Limit the builds we run at once by the cpus they use, as well as by
+        # the number of build threads.
+        cpus = self._available_cpus()
+        build_jobs = {test: test.builder.build_jobs(cpus) for test in build_order}
+        jobs_running = 0
+
         # Keep track of what the last message printed per build was.
         # This is for double build verbosity.
         message_counts = {test.full_id: 0 for test in local_builds}
 
-        # Used to track which threads are for which tests.
-        test_by_threads = {}
+        # Used to track which futures are for which tests.
+        test_by_future = {}  # type: Dict[Future, TestRun]
 
         if verbosity > 0:
             output.fprint(outfile, self.BUILD_STATUS_PREAMBLE.format(
                 when='When', test_id='TestID',
                 state_len=STATES.max_length, state='State'), 'Message', width=None)
 
+        pool = ThreadPoolExecutor(max_workers=self.pav_cfg.build_threads)
+
         builds_running = 0
-        # Run and track <max_threads> build threads, giving output according
-        # to the verbosity level. As threads finish, new ones are started until
-        # either all builds complete or a build fails, in which case all tests
-        # are aborted.
-        while build_order or test_threads:
-            # Start a new thread if we haven't hit our limit.
-            if build_order and builds_running < self.pav_cfg.build_threads:
+        # Run and track builds, giving output according to the verbosity level.
+        # As builds finish, new ones are started (along with the tests that
+        # reuse the finished build) until either all builds complete or a build
+        # fails, in which case all tests are aborted.
+        while build_order or test_by_future:
+            # Start new builds while we have the threads and cpus for them. A
+            # build always starts if nothing else is building.
+            while (build_order and not cancel_event.is_set()
+                   and builds_running < self.pav_cfg.build_threads
+                   and (builds_running == 0
+                        or jobs_running + build_jobs[build_order[-1]] <= cpus)):
                 test = build_order.pop()
+                builds_running += 1
+                jobs_running += build_jobs[test]
+                future = pool.submit(test.build, cancel_event, trackers[test])
+                test_by_future[future] = test
+
+            done, _ = wait(list(test_by_future.keys()), timeout=self.BUILD_SLEEP_TIME,
+                           return_when=FIRST_COMPLETED)
+
+            for future in done:
+                test = test_by_future.pop(future)
 
-                test_thread = threading.Thread(
-                    target=test.build,
-                    args=(cancel_event, trackers[test])
-                )
-                test_threads.append(test_thread)
-                test_by_threads[test_thread] = test
-                test_thread.start()
-
-            # Check if all our threads are alive, and join those that aren't.
-            for i in range(len(test_threads)):
-                thread = test_threads[i]
-                if not thread.is_alive():
-                    thread.join()
+                try:
+                    built = future.result()
+                except Exception as err:  # pylint: disable=broad-except
+                    trackers[test].error("Unexpected error building test: {}"
+                                         .format(err))
+                    cancel_event.set()
+                    built = False
+
+                if test in build_jobs:
                     builds_running -= 1
-                    test_threads[i] = None
-                    test = test_by_threads[thread]
-                    del test_by_threads[thread]
-
-                    # Only output test status after joining a thread.
-                    if verbosity == 1:
-                        notes = self.mb_tracker.get_notes(test.builder)
-                        if notes:
-                            when, state, msg = notes[-1]
-                            when = output.get_relative_timestamp(when)
-                            preamble = (self.BUILD_STATUS_PREAMBLE
-                                        .format(when=when, test_id=test.full_id,
-                                                state_len=STATES.max_length,
-                                                state=state))
-                            output.fprint(outfile, preamble, msg, width=None,
-                                          wrap_indent=len(preamble))
-
-            test_threads = [thr for thr in test_threads if thr is not None]
+                    jobs_running -= build_jobs.pop(test)
+
+                    waiters = build_waiters.pop(test.builder.name, [])
+                    if cancel_event.is_set():
+                        pass
+                    elif built:
+                        # Start the tests that were waiting on this build.
+                        for waiter in waiters:
+                            waiter_future = pool.submit(
+                                waiter.build, cancel_event, trackers[waiter])
+                            test_by_future[waiter_future] = waiter
+                    elif waiters:
+                        # The build didn't happen, so let the next test try it.
+                        leader = waiters.pop(0)
+                        build_waiters[leader.builder.name] = waiters
+                        build_jobs[leader] = leader.builder.build_jobs(cpus)
+                        build_order.append(leader)
+
+                # Only output test status after a test's build completes.
+                if verbosity == 1:
+                    notes = self.mb_tracker.get_notes(test.builder)
+                    if notes:
+                        when, state, msg = notes[-1]
+                        when = output.get_relative_timestamp(when)
+                        preamble = (self.BUILD_STATUS_PREAMBLE
+                                    .format(when=when, test_id=test.full_id,
+                                            state_len=STATES.max_length,
+                                            state=state))
+                        output.fprint(outfile, preamble, msg, width=None,
+                                      wrap_indent=len(preamble))
 
             if cancel_event.is_set():
-                for thread in test_threads:
-                    thread.join()
+                # Don't bother starting anything that hasn't started yet.
+                for future in test_by_future:
+                    future.cancel()
+                pool.shutdown(wait=True)
 
                 for test in self.tests:
                     if (test.status.current().state not in
@@ -443,7 +480,7 @@ class TestSet:
                                       wrap_indent=len(preamble))
                     message_counts[test.full_id] += len(msgs)
 
-            time.sleep(self.BUILD_SLEEP_TIME)
+        pool.shutdown()
 
         if verbosity == 0:
             # Print a newline after our last status update.
@@ -567,29 +604,25 @@ class TestSet:
 
         return marked
 
-    TEST_WAIT_PERIOD = 0.5
-
-    def wait(self, wait_for_all=False, wait_period: int = TEST_WAIT_PERIOD) -> int:
+    def wait(self, wait_for_all=False, timeout: float = None) -> int:
         """Wait for tests to complete. Returns the number of tests that completed
         when one or more tests have completed.
 
         :param wait_for_all: Wait for all started tests to complete before returning.
-        :param wait_period: How long to sleep between test status checks.
+        :param timeout: The maximum time to wait, in seconds. None means forever.
         :return: The number of tests that completed.
         """
 
         marked = self.mark_completed()
 
         # No tests to wait for
-        if not self.started_tests:
-            return 0
+        if not self.started_tests or (marked and not wait_for_all):
+            return marked
 
-        while ((wait_for_all and self.started_tests) or
-               (not wait_for_all and marked)):
-            time.sleep(wait_period)
-            marked += self.mark_completed()
+        with TestWaiter(self.started_tests) as waiter:
+            waiter.wait(timeout=timeout, wait_for_all=wait_for_all)
 
-        return marked
+        return marked + self.mark_completed()
 
     @property
     def should_run(self) -> Union[bool, None]:
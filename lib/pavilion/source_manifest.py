@@ -0,0 +1,250 @@
+"""Content based hashing of source directories, backed by a persistent manifest.
+
+The manifest records the size, mtime, inode and content digest of every file in a
+source tree, along with the mtime and listing of every directory. When a tree is
+hashed again, directories whose mtime hasn't changed aren't re-listed, and files
+whose size, mtime and inode haven't changed aren't re-read. The resulting hash
+depends only on the names, types, permissions and contents of what's in the tree,
+so touching a file (or copying the whole tree elsewhere) doesn't change it.
+"""
+
+import hashlib
+import os
+import pickle
+import stat
+import time
+from pathlib import Path
+from typing import Dict, Tuple, Union
+
+# Entry kinds in directory listings.
+KIND_DIR = 'd'
+KIND_FILE = 'f'
+KIND_LINK = 'l'
+KIND_OTHER = 'o'
+
+
+class SourceManifest:
+    """Tracks the state of a single source directory. Use ``hash()`` to get the
+    content hash of the directory, and ``save()`` to write out the (updated)
+    manifest.
+
+    :ivar Path root: The source directory.
+    :ivar Path path: Where the manifest is stored.
+    :ivar bool changed: Whether the manifest needs to be saved.
+    """
+
+    MANIFEST_DIR = 'src_manifests'
+    """Where manifests are kept, under the working_dir."""
+
+    VERSION = 1
+
+    RACY_WINDOW = 2
+    """Things modified within this many seconds of when the manifest was last
+    updated are always rechecked, as their mtime may not have changed since."""
+
+    _BLOCK_SIZE = 4096*1024
+
+    def __init__(self, working_dir: Path, root: Path):
+        """Load the manifest for the directory 'root', if there is one.
+
+        :param working_dir: The working directory to keep the manifest in.
+        :param root: The source directory.
+        """
+
+        self.root = Path(root).resolve()
+        name = hashlib.sha256(str(self.root).encode()).hexdigest()[:32]
+        self.path = Path(working_dir)/self.MANIFEST_DIR/(name + '.pkl')
+        self.changed = False
+
+        # Relative dir path -> (mtime_ns, [(name, kind), ...])
+        self._dirs = {}  # type: Dict[str, Tuple[int, list]]
+        # Relative file path -> (size, mtime_ns, inode, mode, digest)
+        self._files = {}  # type: Dict[str, Tuple[int, int, int, int, bytes]]
+        # Relative link path -> link target
+        self._links = {}  # type: Dict[str, str]
+        self._updated = 0
+
+        self._load()
+
+    def _load(self):
+        """Load the saved manifest data, if it's there and usable."""
+
+        try:
+            with self.path.open('rb') as manifest_file:
+                data = pickle.load(manifest_file)
+
+            if data['version'] != self.VERSION or data['root'] != str(self.root):
+                return
+
+            self._dirs = data['dirs']
+            self._files = data['files']
+            self._links = data['links']
+            self._updated = data['updated']
+        except (OSError, pickle.UnpicklingError, EOFError, KeyError, TypeError,
+                AttributeError, ValueError):
+            self._dirs = {}
+            self._files = {}
+            self._links = {}
+
+    def save(self):
+        """Save the manifest, if it changed. Failing to save isn't an error;
+        we'll just have to do more work next time."""
+
+        if not self.changed:
+            return
+
+        data = {
+            'version': self.VERSION,
+            'root': str(self.root),
+            'updated': self._updated,
+            'dirs': self._dirs,
+            'files': self._files,
+            'links': self._links,
+        }
+
+        tmp_path = self.path.with_name('.{}.{}.tmp'.format(self.path.name, os.getpid()))
+        try:
+            self.path.parent.mkdir(exist_ok=True)
+            with tmp_path.open('wb') as tmp_file:
+                pickle.dump(data, tmp_file)
+            tmp_path.rename(self.path)
+            self.changed = False
+        except OSError:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+
+    def _file_digest(self, path: str) -> bytes:
+        """Return the content digest of the given file."""
+
+        hash_obj = hashlib.sha256()
+        with open(path, 'rb') as file:
+            chunk = file.read(self._BLOCK_SIZE)
+            while chunk:
+                hash_obj.update(chunk)
+                chunk = file.read(self._BLOCK_SIZE)
+
+        return hash_obj.digest()
+
+    @staticmethod
+    def _list_dir(path: str) -> list:
+        """List the given directory as (name, kind) tuples, sorted by name."""
+
+        entries = []
+        with os.scandir(path) as dir_entries:
+            for entry in dir_entries:
+                if entry.is_symlink():
+                    kind = KIND_LINK
+                elif entry.is_dir(follow_symlinks=False):
+                    kind = KIND_DIR
+                elif entry.is_file(follow_symlinks=False):
+                    kind = KIND_FILE
+                else:
+                    kind = KIND_OTHER
+                entries.append((entry.name, kind))
+
+        entries.sort()
+        return entries
+
+    def update(self):
+        """Bring the manifest up to date with the source directory, re-listing
+        changed directories and re-hashing changed files.
+
+        :raises OSError: When the source directory can't be read.
+        """
+
+        started = time.time()
+        # Anything modified at or after this time can't be trusted based on
+        # mtime alone.
+        racy_ns = int((self._updated - self.RACY_WINDOW) * 10**9)
+
+        dirs = {}
+        files = {}
+        links = {}
+        # Whether we had to recheck anything just because of its recent mtime.
+        racy = False
+
+        to_check = ['']
+        while to_check:
+            rel_dir = to_check.pop()
+            full_dir = os.path.join(str(self.root), rel_dir)
+
+            dir_mtime = os.stat(full_dir).st_mtime_ns
+            old_dir = self._dirs.get(rel_dir)
+            if old_dir is not None and old_dir[0] == dir_mtime and dir_mtime < racy_ns:
+                entries = old_dir[1]
+            else:
+                racy = racy or (old_dir is not None and old_dir[0] == dir_mtime)
+                entries = self._list_dir(full_dir)
+            dirs[rel_dir] = (dir_mtime, entries)
+
+            for name, kind in entries:
+                rel_path = os.path.join(rel_dir, name)
+                full_path = os.path.join(full_dir, name)
+
+                if kind == KIND_DIR:
+                    to_check.append(rel_path)
+                elif kind == KIND_LINK:
+                    links[rel_path] = os.readlink(full_path)
+                elif kind == KIND_FILE:
+                    file_stat = os.stat(full_path, follow_symlinks=False)
+                    old_file = self._files.get(rel_path)
+                    unchanged = (old_file is not None
+                                 and old_file[:3] == (file_stat.st_size,
+                                                      file_stat.st_mtime_ns,
+                                                      file_stat.st_ino))
+                    if unchanged and file_stat.st_mtime_ns < racy_ns:
+                        digest = old_file[4]
+                    else:
+                        racy = racy or unchanged
+                        digest = self._file_digest(full_path)
+
+                    files[rel_path] = (file_stat.st_size, file_stat.st_mtime_ns,
+                                       file_stat.st_ino, file_stat.st_mode, digest)
+
+        # Even if nothing changed, saving with a new update time will let us trust
+        # the mtimes that were too recent to trust this time.
+        if racy or (dirs, files, links) != (self._dirs, self._files, self._links):
+            self.changed = True
+
+        self._dirs = dirs
+        self._files = files
+        self._links = links
+        self._updated = started
+
+    def hash(self) -> bytes:
+        """Update the manifest, and return the content hash of the source directory.
+
+        :raises OSError: When the source directory can't be read.
+        """
+
+        self.update()
+
+        hash_obj = hashlib.sha256()
+        for rel_dir in sorted(self._dirs):
+            hash_obj.update(b'd' + rel_dir.encode(errors='surrogateescape') + b'\0')
+        for rel_path in sorted(self._files):
+            mode = self._files[rel_path][3]
+            hash_obj.update(b'f' + rel_path.encode(errors='surrogateescape') + b'\0')
+            # Only the executable bits matter to a build.
+            hash_obj.update(b'x' if mode & stat.S_IXUSR else b'-')
+            hash_obj.update(self._files[rel_path][4])
+        for rel_path in sorted(self._links):
+            hash_obj.update(b'l' + rel_path.encode(errors='surrogateescape') + b'\0')
+            hash_obj.update(self._links[rel_path].encode(errors='surrogateescape') + b'\0')
+
+        return hash_obj.digest()
+
+
+def hash_dir(working_dir: Union[Path, None], path: Path) -> bytes:
+    """Return the content hash of the given directory, using (and updating) its
+    manifest in the given working_dir.
+
+    :raises OSError: When the directory can't be read.
+    """
+
+    manifest = SourceManifest(working_dir, path)
+    dir_hash = manifest.hash()
+    manifest.save()
+    return dir_hash
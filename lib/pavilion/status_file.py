@@ -7,6 +7,12 @@ A test run will transition through several states (all available as part of the
 are saved as a 'state' in the status file. Each state is a single line of the
 file with a max size of 4096 bytes to ensure atomic writes.
 
+Status files may optionally be stored in a compact binary format instead. Each
+state is then a length-prefixed (and suffixed) record, again written with a
+single atomic append. A fixed size header at the start of the file summarizes
+the states ever seen, so that the current state and checking for a given state
+don't require reading the whole file. Either format is read transparently.
+
 The state of a test run represents where that run is in its lifecycle. It
 does not represent whether a test passed or failed. States are ephemeral and
 asynchronous, and should generally not be used to decide to do something with a
@@ -27,9 +33,11 @@ Usage: ::
 import datetime
 import os
 import pathlib
+import struct
 import time
+import zlib
 from io import BytesIO
-from typing import List, Union
+from typing import List, Union, Set, Tuple
 
 
 class StatusError(RuntimeError):
@@ -233,6 +241,31 @@ class TestStatusInfo:
 
         return '{} {} {}\n'.format(when, state, note).encode()
 
+    # Binary records are the total record length, the timestamp, the (null padded)
+    # state, the note, and then the record length again (so the file can be read
+    # backwards).
+    RECORD_HEAD = struct.Struct('<Hd16s')
+    RECORD_TAIL = struct.Struct('<H')
+
+    def status_record(self) -> bytes:
+        """Convert this to a binary status record, as it would be written to a
+        binary format status file."""
+
+        if not self.states_obj.validate(self.state):
+            note = '({}) {}'.format(self.state, self.note)
+            state = self.states_obj.INVALID
+        else:
+            state = self.state
+            note = self.note
+
+        note = note.encode()[:self.NOTE_MAX]
+        note = note.decode('utf-8', 'ignore').encode()
+
+        rec_len = self.RECORD_HEAD.size + len(note) + self.RECORD_TAIL.size
+        return (self.RECORD_HEAD.pack(rec_len, min([self.when, self.MAX_TS]),
+                                      state.encode())
+                + note + self.RECORD_TAIL.pack(rec_len))
+
     def __str__(self):
         return 'Status: {s.when} {s.state} {s.note}'.format(s=self)
 
@@ -268,16 +301,40 @@ appends of a size such that those writes should be atomic.
     states = STATES
     info_class = TestStatusInfo
 
-    def __init__(self, path: Union[pathlib.Path, None]):
+    FORMAT_TEXT = 'text'
+    FORMAT_BINARY = 'binary'
+    FORMATS = (FORMAT_TEXT, FORMAT_BINARY)
+
+    # The binary format header is the magic string, the file offset up to which the
+    # summary is accurate, the number of states seen, and a checksum. It's followed
+    # by the (null padded) names of the states seen, and then the records.
+    MAGIC = b'\x00PAVSTS\x01'
+    HEADER = struct.Struct('<8sQHI')
+    HEADER_SIZE = 1024
+    STATE_WIDTH = 16
+    MAX_SEEN = (HEADER_SIZE - HEADER.size) // STATE_WIDTH
+    # Stored as the seen count when more states have been seen than will fit.
+    SEEN_OVERFLOW = 0xffff
+
+    def __init__(self, path: Union[pathlib.Path, None], fmt: str = FORMAT_TEXT):
         """Create the status file object.
 
     :param path: The path to the status file. If Path is None, use a StringIO object.
+    :param fmt: The format to use when creating a new status file (either 'text'
+        or 'binary'). Existing files are always used in the format they were
+        written in.
     """
 
         self.path = path
         self._dummy = BytesIO() if path is None else None
+        self._binary = None  # type: Union[bool, None]
+
+        if fmt not in self.FORMATS:
+            raise StatusError("Invalid status file format '{}'".format(fmt))
 
         if self.path is not None and not self.path.is_file():
+            if fmt == self.FORMAT_BINARY:
+                self._create_binary()
             # Make sure we can open the file, and create it if it doesn't exist.
             self.set(self.states.STATUS_CREATED, 'Created status file.')
 
@@ -288,6 +345,142 @@ appends of a size such that those writes should be atomic.
             'note': False
         }
 
+    def _create_binary(self):
+        """Create a new, empty binary status file."""
+
+        header = self._pack_header(self.HEADER_SIZE, set())
+        try:
+            fd = os.open(self.path.as_posix(), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        except FileExistsError:
+            # Someone else created it first.
+            return
+        except OSError:
+            # The error will be reported when we try to set the first status.
+            return
+
+        try:
+            os.write(fd, header)
+        finally:
+            os.close(fd)
+
+    def _is_binary(self, status_file) -> bool:
+        """Check whether the given (open) status file is in the binary format. The
+        format can't change, so this is only checked once."""
+
+        if self._binary is None:
+            if self._dummy is not None:
+                self._binary = False
+            else:
+                magic = os.pread(status_file.fileno(), len(self.MAGIC), 0)
+                if not magic:
+                    # Empty files could be either.
+                    return False
+                self._binary = magic == self.MAGIC
+
+        return self._binary
+
+    def _pack_header(self, covered: int, seen: Set[str]) -> bytes:
+        """Create a binary format header."""
+
+        if len(seen) > self.MAX_SEEN:
+            count = self.SEEN_OVERFLOW
+            states = b''
+        else:
+            count = len(seen)
+            states = b''.join(state.encode().ljust(self.STATE_WIDTH, b'\0')
+                              for state in sorted(seen))
+
+        states = states.ljust(self.HEADER_SIZE - self.HEADER.size, b'\0')
+        checksum = zlib.crc32(struct.pack('<QH', covered, count) + states)
+
+        return self.HEADER.pack(self.MAGIC, covered, count, checksum) + states
+
+    def _read_header(self, fd: int) -> Union[Tuple[int, Set[str]], None]:
+        """Read the binary format header, returning the file offset it covers and
+        the states seen. Returns None if the header is damaged (or being written) or
+        the seen states overflowed the header."""
+
+        header = os.pread(fd, self.HEADER_SIZE, 0)
+        if len(header) < self.HEADER_SIZE:
+            return None
+
+        magic, covered, count, checksum = self.HEADER.unpack_from(header)
+        states = header[self.HEADER.size:]
+        if (magic != self.MAGIC or count == self.SEEN_OVERFLOW
+                or zlib.crc32(struct.pack('<QH', covered, count) + states) != checksum):
+            return None
+
+        seen = set()
+        for i in range(count):
+            state = states[i*self.STATE_WIDTH:(i+1)*self.STATE_WIDTH]
+            seen.add(state.rstrip(b'\0').decode('utf-8', 'ignore'))
+
+        return covered, seen
+
+    def _parse_records(self, data: bytes) -> List[TestStatusInfo]:
+        """Parse the binary status records in data. Parsing stops at the first
+        incomplete or damaged record."""
+
+        return [status for _, status in self._iter_records(data)]
+
+    def _iter_records(self, data: bytes):
+        """Yield a (record length, status) tuple for each binary status record
+        in data, stopping at the first incomplete or damaged record."""
+
+        head = self.info_class.RECORD_HEAD
+        tail = self.info_class.RECORD_TAIL
+
+        offset = 0
+        while offset + head.size + tail.size <= len(data):
+            rec_len, when, state = head.unpack_from(data, offset)
+            if (rec_len < head.size + tail.size or offset + rec_len > len(data)
+                    or tail.unpack_from(data, offset + rec_len - tail.size)[0] != rec_len):
+                return
+
+            note = data[offset + head.size:offset + rec_len - tail.size]
+            yield rec_len, self.info_class(
+                state=state.rstrip(b'\0').decode('utf-8', 'ignore'),
+                note=note.decode('utf-8', 'ignore'),
+                when=when)
+            offset += rec_len
+
+    def _seen_states(self, fd: int) -> Union[Set[str], None]:
+        """Return all the states seen in a binary status file. This reads the
+        header, and then just the records added since the header was last updated.
+        Returns None if the header couldn't be used."""
+
+        header = self._read_header(fd)
+        if header is None:
+            return None
+
+        covered, seen = header
+        size = os.fstat(fd).st_size
+        if size > covered:
+            tail = os.pread(fd, size - covered, covered)
+            seen.update(status.state for status in self._parse_records(tail))
+
+        return seen
+
+    def _update_header(self, fd: int):
+        """Update the summary header of a binary status file to include the states
+        appended since it was last updated. This isn't locked; a racing writer may
+        replace it with a header that covers less of the file, but never with
+        one that's wrong for the part it covers."""
+
+        header = self._read_header(fd)
+        if header is None:
+            covered, seen = self.HEADER_SIZE, set()
+        else:
+            covered, seen = header
+
+        size = os.fstat(fd).st_size
+        data = os.pread(fd, size - covered, covered)
+        for rec_len, status in self._iter_records(data):
+            seen.add(status.state)
+            covered += rec_len
+
+        os.pwrite(fd, self._pack_header(covered, seen), 0)
+
     def _parse_status_line(self, line) -> TestStatusInfo:
         """Parse a line of the status file. This assumes all sorts of things
 could be wrong with the file format."""
@@ -338,6 +531,15 @@ could be wrong with the file format."""
     def _read_history(self, status_file):
         """Read the history file and return all statuses."""
 
+        if self._is_binary(status_file):
+            try:
+                status_file.seek(self.HEADER_SIZE)
+                return self._parse_records(status_file.read())
+            except OSError as err:
+                return [self.info_class(
+                    self.states.STATUS_ERROR,
+                    "Error reading status file '{}': {}".format(self.path, err))]
+
         lines = []
 
         try:
@@ -354,7 +556,17 @@ could be wrong with the file format."""
         """Check if the given state is somewhere in the history of this
         status file."""
 
-        return any([state == h.state for h in self.history()])
+        if self.path is not None:
+            try:
+                with self.path.open('rb') as status_file:
+                    if self._is_binary(status_file):
+                        seen = self._seen_states(status_file.fileno())
+                        if seen is not None:
+                            return state in seen
+            except OSError:
+                pass
+
+        return any(state == h.state for h in self.history())
 
     def current(self) -> TestStatusInfo:
         """Return the most recent status object."""
@@ -372,6 +584,9 @@ could be wrong with the file format."""
 
     def _current(self, status_file):
 
+        if self._is_binary(status_file):
+            return self._current_binary(status_file)
+
         # We read a bit extra to avoid off-by-one errors
         end_read_len = self.info_class.LINE_MAX + 16
 
@@ -400,6 +615,39 @@ could be wrong with the file format."""
                                    "Error reading status file '{}': {}"
                                    .format(self.path, err))
 
+    def _current_binary(self, status_file):
+        """Get the last status from a binary status file, using the length stored at
+        the end of each record."""
+
+        tail = self.info_class.RECORD_TAIL
+        fd = status_file.fileno()
+
+        try:
+            size = os.fstat(fd).st_size
+            if size - self.HEADER_SIZE < tail.size:
+                return self.info_class(
+                    state=self.states.INVALID,
+                    note="Status file was empty.")
+
+            rec_len = tail.unpack(os.pread(fd, tail.size, size - tail.size))[0]
+            if size - rec_len >= self.HEADER_SIZE:
+                statuses = self._parse_records(os.pread(fd, rec_len, size - rec_len))
+                if statuses:
+                    return statuses[-1]
+
+            # The last record was damaged, so find the last good one the hard way.
+            statuses = self._read_history(status_file)
+            if statuses:
+                return statuses[-1]
+
+            return self.info_class(
+                state=self.states.INVALID,
+                note="Status file has no valid records.")
+        except OSError as err:
+            return self.info_class(self.states.STATUS_ERROR,
+                                   "Error reading status file '{}': {}"
+                                   .format(self.path, err))
+
     def set(self, state: str, note: str) -> TestStatusInfo:
         """Set the status and return the StatusInfo object. Well return a
         'STATUS_ERROR' status on write failures.
@@ -429,6 +677,17 @@ could be wrong with the file format."""
     def _set(self, status_file, stinfo) -> TestStatusInfo:
         """Do the actual status setting step, given a file and the status object."""
 
+        if self._binary is None and self._dummy is None:
+            # Appending files can't be read from, so check the format separately.
+            try:
+                with self.path.open('rb') as read_file:
+                    self._is_binary(read_file)
+            except OSError:
+                pass
+
+        if self._binary:
+            return self._set_binary(status_file, stinfo)
+
         status_line = stinfo.status_line()
 
         try:
@@ -440,6 +699,33 @@ could be wrong with the file format."""
 
         return stinfo
 
+    def _set_binary(self, status_file, stinfo) -> TestStatusInfo:
+        """Append a status record to a binary status file, and then update the
+        summary header."""
+
+        try:
+            # A single, unbuffered write so the append is atomic.
+            os.write(status_file.fileno(), stinfo.status_record())
+        except OSError as err:
+            return self.info_class(self.states.STATUS_ERROR,
+                                   "Could not write to status file at '{}': {}"
+                                   .format(self.path, err.args[0]))
+
+        try:
+            # The header has to be written in place, which can't be done with
+            # an append mode file.
+            fd = os.open(self.path.as_posix(), os.O_RDWR)
+            try:
+                self._update_header(fd)
+            finally:
+                os.close(fd)
+        except OSError:
+            # Readers will fall back to reading the records that aren't covered by
+            # the header.
+            pass
+
+        return stinfo
+
     def __eq__(self, other):
         return (
             isinstance(self, type(other)) and
@@ -3,14 +3,15 @@ and series."""
 
 import time
 from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict
 from functools import partial
-from typing import TextIO, List
+from typing import TextIO, List, Dict, Union
 
 from pavilion import output
 from pavilion import schedulers
 from pavilion.errors import TestRunError, TestRunNotFoundError, DeferredError
-from pavilion.status_file import STATES
-from pavilion.test_run import (TestRun)
+from pavilion.status_file import STATES, TestStatusInfo
+from pavilion.test_run import TestRun, TestSummary
 
 
 def format_mtime(mtime):
@@ -23,13 +24,69 @@ def format_mtime(mtime):
 RUNNING_UPDATE_TIMEOUT = 5
 
 
-def status_from_test_obj(pav_cfg: dict, test: TestRun):
+def needs_sched_status(test: TestRun) -> bool:
+    """Return whether we'll need to ask the scheduler about this test's status.
+    This is the case for 'running' tests that haven't updated their run log
+    recently."""
+
+    try:
+        status_f = test.status.current()
+    except (TestRunError, TestRunNotFoundError):
+        return False
+
+    if status_f.state != STATES.RUNNING:
+        return False
+
+    log_path = test.path/'run.log'
+    try:
+        mtime = log_path.stat().st_mtime
+    except OSError:
+        return True
+
+    return time.time() - mtime > RUNNING_UPDATE_TIMEOUT
+
+
+def get_sched_statuses(pav_cfg, tests: List[TestRun]) -> Dict[str, TestStatusInfo]:
+    """Get the scheduler status of each of the given tests that needs one, asking
+    each scheduler about all of its tests at once.
+
+    :param pav_cfg: The Pavilion config.
+    :param tests: The tests to check.
+    :return: A dict of scheduler statuses by test full_id.
+    """
+
+    with ThreadPoolExecutor(pav_cfg['max_threads']) as pool:
+        needed = list(pool.map(needs_sched_status, tests))
+
+    by_sched = defaultdict(list)
+    for test, need in zip(tests, needed):
+        if need:
+            by_sched[test.scheduler].append(test)
+
+    sched_statuses = {}
+    for sched_name, sched_tests in by_sched.items():
+        sched = schedulers.get_plugin(sched_name)
+        try:
+            statuses = sched.job_statuses(pav_cfg, sched_tests)
+        except (TestRunError, TestRunNotFoundError):
+            # These tests will be checked (and their errors reported) individually.
+            continue
+        for test, status in zip(sched_tests, statuses):
+            sched_statuses[test.full_id] = status
+
+    return sched_statuses
+
+
+def status_from_test_obj(pav_cfg: dict, test: Union[TestRun, TestSummary],
+                         sched_statuses: Dict[str, TestStatusInfo] = None):
 
     """Takes a test object or list of test objects and creates the dictionary
     expected by the print_status function.
 
 :param pav_cfg: Pavilion base configuration.
-:param test: Pavilion test object.
+:param test: Pavilion test object, or just its summary.
+:param sched_statuses: Scheduler statuses already fetched for tests (see
+    get_sched_statuses()), by test full_id.
 :return: List of dictionary objects containing the test ID, name,
          stat time of state update, and note associated with that state.
 :rtype: list(dict)
@@ -38,7 +95,10 @@ def status_from_test_obj(pav_cfg: dict, test: TestRun):
     status_f = test.status.current()
 
     if status_f.state == STATES.BUILDING:
-        last_update = test.builder.log_updated()
+        if isinstance(test, TestSummary):
+            last_update = test.build_log_updated()
+        else:
+            last_update = test.builder.log_updated()
         status_f.note = ' '.join([
             status_f.note, '\nLast updated: ',
             str(last_update) if last_update is not None else '<unknown>'])
@@ -50,8 +110,11 @@ def status_from_test_obj(pav_cfg: dict, test: TestRun):
             mtime = None
 
         if mtime is None or time.time() - mtime > RUNNING_UPDATE_TIMEOUT:
-            sched = schedulers.get_plugin(test.scheduler)
-            sched_status_f = sched.job_status(pav_cfg, test)
+            if sched_statuses is not None and test.full_id in sched_statuses:
+                sched_status_f = sched_statuses[test.full_id]
+            else:
+                sched = schedulers.get_plugin(test.scheduler)
+                sched_status_f = sched.job_status(pav_cfg, test)
             if sched_status_f.state != STATES.SCHED_RUNNING:
                 status_f = sched_status_f
         else:
@@ -59,15 +122,21 @@ def status_from_test_obj(pav_cfg: dict, test: TestRun):
             status_f.note = ' '.join([
                 status_f.note, '\nLast updated:', last_update])
 
-    try:
-        # Use the actual node count one the test is running.
-        nodes = test.var_man.get('sched.test_nodes', '')
-    except DeferredError:
-        # Otherwise use the chunk size when requesting all nodes
-        # or the requested size otherwise.
-        nodes = '({})'.format(test.var_man.get('sched.requested_nodes', '?'))
-
-    result = test.results.get('result', '') or ''
+    if isinstance(test, TestSummary):
+        nodes = test.nodes
+        partition = test.sched.get('partition')
+        result = test.result or ''
+    else:
+        try:
+            # Use the actual node count one the test is running.
+            nodes = test.var_man.get('sched.test_nodes', '')
+        except DeferredError:
+            # Otherwise use the chunk size when requesting all nodes
+            # or the requested size otherwise.
+            nodes = '({})'.format(test.var_man.get('sched.requested_nodes', '?'))
+        partition = test.var_man.get('sched.partition')
+        result = test.results.get('result', '') or ''
+
     series_id = test.series or ''
 
     return {
@@ -75,7 +144,7 @@ def status_from_test_obj(pav_cfg: dict, test: TestRun):
         'name':    test.name,
         'nodes':   nodes,
         'note':    status_f.note,
-        'part':    test.var_man.get('sched.partition'),
+        'part':    partition,
         'result':  result,
         'series':  series_id,
         'state':   status_f.state,
@@ -84,15 +153,17 @@ def status_from_test_obj(pav_cfg: dict, test: TestRun):
     }
 
 
-def get_status(test: TestRun, pav_conf):
+def get_status(test: Union[TestRun, TestSummary], pav_conf,
+               sched_statuses: Dict[str, TestStatusInfo] = None):
     """Return the status of a single test_id.
     Allows the statuses to be queried in parallel with map.
     :param test: The test id being queried.
     :param pav_conf: The Pavilion config.
+    :param sched_statuses: Pre-fetched scheduler statuses, by test full_id.
     """
 
     try:
-        test_status = status_from_test_obj(pav_conf, test)
+        test_status = status_from_test_obj(pav_conf, test, sched_statuses)
     except (TestRunError, TestRunNotFoundError) as err:
         test_status = {
             'job_id':  str(test.job) if test.job is not None else '',
@@ -116,7 +187,13 @@ def get_statuses(pav_cfg, tests: List[TestRun]):
     :param tests: A list of test ids to load.
     """
 
-    get_this_status = partial(get_status, pav_conf=pav_cfg)
+    tests = list(tests)
+    # Ask the schedulers about all the tests that need it up front, so that
+    # each scheduler is only queried once.
+    sched_statuses = get_sched_statuses(pav_cfg, tests)
+
+    get_this_status = partial(get_status, pav_conf=pav_cfg,
+                              sched_statuses=sched_statuses)
 
     with ThreadPoolExecutor(pav_cfg['max_threads']) as pool:
         return list(pool.map(get_this_status, tests))
@@ -10,6 +10,7 @@ import logging
 import re
 
 import pavilion.deferred
+from pavilion import lazy_plugins
 from yapsy import IPlugin
 
 LOGGER = logging.getLogger('pav.{}'.format(__name__))
@@ -54,6 +55,8 @@ for a given run of the pavilion command."""
         global _LOADED_PLUGINS
 
         if name not in self.data:
+            lazy_plugins.load('sys', name)
+
             if name not in _LOADED_PLUGINS:
                 raise KeyError("No system plugin named '{}'.".format(name))
 
@@ -69,6 +72,8 @@ for a given run of the pavilion command."""
 
         global _LOADED_PLUGINS
 
+        lazy_plugins.load('sys', name)
+
         if name not in _LOADED_PLUGINS:
             raise KeyError("No system plugin named '{}'.".format(name))
 
@@ -80,6 +85,8 @@ plugins.)"""
 
         global _LOADED_PLUGINS
 
+        lazy_plugins.load('sys')
+
         return _LOADED_PLUGINS.keys()
 
     def items(self):
@@ -99,6 +106,8 @@ plugins.)"""
 
         global _LOADED_PLUGINS
 
+        lazy_plugins.load('sys', key)
+
         return _LOADED_PLUGINS[key].help_text
 
 
@@ -1,3 +1,4 @@
 from . import file_format
+from .cache import ConfigCache
 from .file_format import TestConfigLoader, TestSuiteLoader
 from .utils import parse_timeout
@@ -0,0 +1,161 @@
+"""A persistent cache for parsed (and otherwise processed) config files. Parsing
+YAML is slow, and Pavilion may need to parse hundreds of suite files just to list
+the available tests. The cache lives in the working_dir, and each entry is keyed by
+the files it was generated from, the Pavilion version, and the current config
+format (which changes depending on which plugins are loaded).
+
+Entries are automatically invalidated when any of their source files changes. A
+file is considered unchanged when its mtime and size match what was recorded, or
+when its content hash still matches (such as when the file was merely touched).
+"""
+
+import hashlib
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Any, Callable, List, Union
+
+from .file_format import TestConfigLoader
+
+
+class ConfigCache:
+    """Caches the results of loading config files.
+
+    :ivar Path path: The cache directory. None if caching is disabled.
+    """
+
+    CACHE_DIR = 'config_cache'
+    """The cache directory, under the working_dir."""
+
+    RACY_WINDOW = 2
+    """Files modified less than this many seconds before their cache entry was
+    written always have their contents checked, as their mtime alone can't be
+    trusted to change."""
+
+    def __init__(self, working_dir: Union[Path, None], version: str):
+        """
+        :param working_dir: The working directory to keep the cache in. If None,
+            nothing is cached.
+        :param version: The current Pavilion version. Entries from other versions
+            are ignored.
+        """
+
+        self.path = None if working_dir is None else Path(working_dir)/self.CACHE_DIR
+        self.version = version
+        self._key_base = None
+
+    def _make_key(self, kind: str, sources: List[Path], extra: str) -> str:
+        """Generate the (file name safe) key for a cache entry."""
+
+        if self._key_base is None:
+            self._key_base = '{}\0{}'.format(self.version,
+                                             TestConfigLoader.format_signature())
+
+        key = '\0'.join([self._key_base, kind, extra] + [str(src) for src in sources])
+        return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+    @staticmethod
+    def _file_hash(path: Path) -> str:
+        """Return the content hash of the given file."""
+
+        hash_obj = hashlib.sha256()
+        with path.open('rb') as file:
+            for chunk in iter(lambda: file.read(1024**2), b''):
+                hash_obj.update(chunk)
+        return hash_obj.hexdigest()
+
+    def _source_info(self, path: Path) -> tuple:
+        """Return the (path, mtime, size, hash) info for a source file."""
+
+        stat = path.stat()
+        return str(path), stat.st_mtime_ns, stat.st_size, self._file_hash(path)
+
+    def _valid(self, entry: dict) -> bool:
+        """Check whether the given cache entry is still up to date."""
+
+        racy_time = (entry['written'] - self.RACY_WINDOW) * 10**9
+
+        for src_path, mtime, size, src_hash in entry['sources']:
+            try:
+                stat = os.stat(src_path)
+            except OSError:
+                return False
+
+            if stat.st_size != size:
+                return False
+
+            if stat.st_mtime_ns == mtime and mtime < racy_time:
+                continue
+
+            try:
+                if self._file_hash(Path(src_path)) != src_hash:
+                    return False
+            except OSError:
+                return False
+
+        return True
+
+    def load(self, kind: str, sources: List[Path], loader: Callable[[], Any],
+             extra: str = '') -> Any:
+        """Return the cached data for the given sources, or call loader() to
+        generate (and cache) it. Exceptions raised by the loader aren't cached,
+        and are passed through.
+
+        :param kind: The kind of data being cached. Different kinds of data
+            generated from the same files should have different kinds.
+        :param sources: The files the data is generated from.
+        :param loader: A function that generates the data from the source files.
+        :param extra: Any additional information that distinguishes this entry.
+        """
+
+        if self.path is None:
+            return loader()
+
+        sources = [Path(src) for src in sources]
+        entry_path = self.path/(self._make_key(kind, sources, extra) + '.pkl')
+
+        try:
+            with entry_path.open('rb') as entry_file:
+                entry = pickle.load(entry_file)
+
+            if self._valid(entry):
+                return entry['data']
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError,
+                ImportError, KeyError, TypeError, ValueError):
+            pass
+
+        # Record the state of the sources before loading them, so that changes
+        # made while loading will invalidate the entry.
+        written = time.time()
+        try:
+            source_info = [self._source_info(src) for src in sources]
+        except OSError:
+            source_info = None
+
+        data = loader()
+
+        if source_info is not None:
+            self._save(entry_path, {
+                'written': written,
+                'sources': source_info,
+                'data': data,
+            })
+
+        return data
+
+    def _save(self, entry_path: Path, entry: dict):
+        """Write the given cache entry. This is best effort; failures just mean
+        the data isn't cached."""
+
+        tmp_path = entry_path.with_name('.{}.{}.tmp'.format(entry_path.name, os.getpid()))
+        try:
+            self.path.mkdir(exist_ok=True)
+            with tmp_path.open('wb') as tmp_file:
+                pickle.dump(entry, tmp_file)
+            tmp_path.rename(entry_path)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
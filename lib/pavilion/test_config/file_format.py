@@ -10,6 +10,7 @@ from collections import OrderedDict
 from typing import List
 
 import yaml_config as yc
+from pavilion import lazy_plugins
 from pavilion.errors import TestConfigError
 
 TEST_NAME_RE_STR = r'^[a-zA-Z_][a-zA-Z0-9_-]*$'
@@ -422,6 +423,16 @@ expected to be added to by various plugins.
                               "these files instead of creating a symlink."
                               "They may include path glob wildcards, "
                               "including the recursive '**'."),
+                yc.StrElem(
+                    'copy_method',
+                    choices=['symlink', 'toplevel', 'hardlink', 'reflink'],
+                    help_text="How to copy the build into the test run. 'symlink' "
+                              "symlinks every file, 'toplevel' symlinks only the "
+                              "top level entries of the build (and the directories "
+                              "that hold copy_files), 'hardlink' hardlinks every file, "
+                              "and 'reflink' makes copy-on-write clones of every "
+                              "file. Defaults to the 'build_copy_method' in "
+                              "pavilion.yaml."),
                 PathCategoryElem(
                     'create_files',
                     key_case=PathCategoryElem.KC_MIXED,
@@ -666,6 +677,8 @@ expected to be added to by various plugins.
     def __init__(self):
         """Add the schedule config class and then init as normal."""
 
+        self.load_plugins()
+
         if self.SCHEDULE_CLASS is None:
             raise RuntimeError("The config's scheduler config class should have been "
                                "set by Pavilion's __init__.py file.")
@@ -678,6 +691,29 @@ expected to be added to by various plugins.
 
         super().__init__(name='<test_config>')
 
+    @staticmethod
+    def load_plugins():
+        """Scheduler and result parser plugins add to the test config format, so
+        make sure they're all loaded."""
+
+        lazy_plugins.load('sched')
+        lazy_plugins.load('result')
+
+    @classmethod
+    def format_signature(cls) -> str:
+        """Return a string that identifies the current test config format, which
+        varies with the scheduler and result parser plugins that are loaded."""
+
+        cls.load_plugins()
+
+        sched_sections = []
+        if cls.SCHEDULE_CLASS is not None:
+            sched_sections = sorted(elem.name for elem in cls.SCHEDULE_CLASS.ELEMENTS)
+
+        parsers = sorted(cls._RESULT_PARSERS.config_elems.keys())
+
+        return 'schedule:{};parsers:{}'.format(','.join(sched_sections), ','.join(parsers))
+
     @classmethod
     def add_result_parser_config(cls, name, config_items):
         """Add the given list of config items as a result parser
@@ -1,5 +1,7 @@
 """Contains test run object definition and helper functions."""
 
+from .summary import TestSummary
 from .test_attrs import TestAttributes, test_run_attr_transform
 from .test_run import TestRun
-from .utils import get_latest_tests, load_tests
+from .utils import get_latest_tests, load_tests, load_summaries
+from .waiter import TestWaiter
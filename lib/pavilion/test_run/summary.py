@@ -0,0 +1,173 @@
+"""Test run summaries are a single, small file in each test run directory that holds
+everything needed to list a test run (its attributes, result, and a few scheduler
+variables). Commands that only need to show rows of test information can load these
+instead of full TestRun objects, which requires reading the full test config,
+the variables, and creating a builder."""
+
+import json
+from pathlib import Path
+from typing import Union
+
+from pavilion import dir_db
+from pavilion.build_tracker import BUILD_LOG_NAME
+from pavilion.errors import TestRunError, DeferredError
+from pavilion.jobs import Job
+from pavilion.status_file import TestStatusFile
+from pavilion.types import ID_Pair
+from .test_attrs import TestAttributes
+
+
+def read_summary(path: Path) -> dict:
+    """Read the raw summary data for the test run at the given path.
+
+    :raises TestRunError: When the summary is missing or invalid.
+    """
+
+    summary_path = path/TestSummary.SUMMARY_FN
+    try:
+        with summary_path.open() as summary_file:
+            summary = json.load(summary_file)
+    except FileNotFoundError:
+        raise TestRunError("Test run at '{}' has no summary file.".format(path))
+    except (OSError, json.JSONDecodeError, UnicodeDecodeError) as err:
+        raise TestRunError("Could not load test run summary at '{}': {}"
+                           .format(summary_path, err))
+
+    if not isinstance(summary, dict) or not isinstance(summary.get('attributes'), dict):
+        raise TestRunError("Invalid test run summary at '{}'.".format(summary_path))
+
+    for key in 'cfg_label', 'scheduler':
+        if key not in summary:
+            raise TestRunError("Invalid test run summary at '{}': missing key '{}'"
+                               .format(summary_path, key))
+
+    summary.setdefault('sched', {})
+
+    return summary
+
+
+class TestSummary(TestAttributes):
+    """A lightweight, read only view of a test run, loaded from its summary file.
+    It provides the subset of the TestRun interface needed to report on a test
+    (including getting its status).
+
+    :ivar str cfg_label: The config label of the test.
+    :ivar str full_id: The test's full id (<cfg_label>.<id>).
+    :ivar str scheduler: The test's scheduler.
+    :ivar Path working_dir: The working directory the test lives in.
+    :ivar dict sched: The values of the SCHED_VARS scheduler variables.
+    """
+
+    SUMMARY_FN = 'summary'
+
+    SCHED_VARS = ('test_nodes', 'requested_nodes', 'partition')
+    """The scheduler variables saved in the summary."""
+
+    def __init__(self, path: Path):
+        """Load the summary for the test run at the given path.
+
+        :raises TestRunError: When the summary can't be loaded.
+        """
+
+        super().__init__(path, load=False)
+
+        summary = read_summary(self.path)
+
+        self._attrs = self._deserialize_attrs(summary['attributes'])
+        self._attrs.setdefault('warnings', [])
+        self.cfg_label = summary['cfg_label']
+        self.scheduler = summary['scheduler']
+        self.sched = summary['sched']
+
+        self.working_dir = self.path.parents[1]
+        self.full_id = '{}.{}'.format(self.cfg_label, self.id)
+        self.status = TestStatusFile(self.path/self.STATUS_FN)
+        self._job = None
+
+    @classmethod
+    def load(cls, working_dir: Path, test_id: int) -> 'TestSummary':
+        """Load the summary of the given test.
+
+        :raises TestRunError: When the summary can't be loaded.
+        """
+
+        return cls(dir_db.make_id_path(working_dir/cls.RUN_DIR, test_id))
+
+    @classmethod
+    def save(cls, test):
+        """Write the summary file for the given test run.
+
+        :param pavilion.test_run.TestRun test: The test to summarize.
+        """
+
+        sched = {}
+        if test.var_man is not None:
+            for var in cls.SCHED_VARS:
+                try:
+                    sched[var] = test.var_man.get('sched.' + var)
+                except DeferredError:
+                    sched[var] = None
+
+        summary = {
+            'attributes': test._serialize_attrs(),  # pylint: disable=protected-access
+            'cfg_label': test.cfg_label,
+            'scheduler': test.scheduler,
+            'sched': sched,
+        }
+
+        summary_path = test.path/cls.SUMMARY_FN
+        tmp_path = summary_path.with_suffix('.tmp')
+        with tmp_path.open('w') as summary_file:
+            json.dump(summary, summary_file)
+        tmp_path.rename(summary_path)
+
+    @property
+    def id_pair(self) -> ID_Pair:
+        """Returns an ID_pair (a tuple of the working dir and test id)."""
+        return ID_Pair((self.working_dir, self.id))
+
+    @property
+    def series(self) -> Union[str, None]:
+        """Return the series id that this test belongs to. Returns None if it doesn't
+        belong to any series."""
+
+        return self._get_series()
+
+    @property
+    def job(self) -> Union[Job, None]:
+        """The test's scheduler job, if it has one yet."""
+
+        if self._job is None:
+            job_path = self.path/self.JOB_FN
+            if job_path.exists():
+                self._job = Job(job_path)
+
+        return self._job
+
+    @property
+    def nodes(self) -> str:
+        """The nodes the test is running on, or (in parentheses) the number
+        of nodes requested."""
+
+        test_nodes = self.sched.get('test_nodes')
+        if test_nodes is None:
+            return '({})'.format(self.sched.get('requested_nodes') or '?')
+
+        return test_nodes
+
+    def build_log_updated(self) -> Union[float, None]:
+        """Return the last time the build log was updated, or None if it can't be
+        found. (This mirrors TestBuilder.log_updated().)"""
+
+        if self.build_name is None:
+            return None
+
+        build_path = self.working_dir/'builds'/self.build_name
+        for log_path in (build_path.with_suffix('.log'),
+                         build_path/BUILD_LOG_NAME):
+            try:
+                return log_path.stat().st_mtime
+            except OSError:
+                pass
+
+        return None
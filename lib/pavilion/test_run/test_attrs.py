@@ -1,7 +1,8 @@
 import json
 import os
+import time
 from pathlib import Path
-from typing import Callable, Any
+from typing import Callable, Any, Union
 
 from pavilion import utils
 from pavilion.errors import TestRunError
@@ -54,7 +55,14 @@ class TestAttributes:
         'suite_path': lambda p: Path(p) if p is not None else None,
     }
 
+    RUN_DIR = 'test_runs'
+    """The directory under the working_dir where test runs live."""
+
     COMPLETE_FN = 'RUN_COMPLETE'
+    STATUS_FN = 'status'
+    """File that tracks the tests's status."""
+    JOB_FN = 'job'
+    """Link to the test's scheduler job."""
 
     def __init__(self, path: Path, load=True):
         """Initialize attributes.
@@ -79,7 +87,17 @@ class TestAttributes:
 
         attr_path = self.path/self.ATTR_FILE_NAME
 
-        # Serialize all the values
+        attrs = self._serialize_attrs()
+
+        tmp_path = attr_path.with_suffix('.tmp')
+        with tmp_path.open('w') as attr_file:
+            json.dump(attrs, attr_file)
+        tmp_path.rename(attr_path)
+
+    def _serialize_attrs(self) -> dict:
+        """Return the attributes as a json-ready dict. Empty attributes are
+        left out."""
+
         attrs = {}
         for key in self.list_attrs():
             val = getattr(self, key)
@@ -94,10 +112,7 @@ class TestAttributes:
                     "'{}': {}".format(key, val, self.id, err.args[0])
                 )
 
-        tmp_path = attr_path.with_suffix('.tmp')
-        with tmp_path.open('w') as attr_file:
-            json.dump(attrs, attr_file)
-        tmp_path.rename(attr_path)
+        return attrs
 
     def load_attributes(self):
         """Load the attributes from file."""
@@ -117,6 +132,11 @@ class TestAttributes:
                     "Could not load attributes file: \n{}"
                     .format(err.args))
 
+        self._attrs = self._deserialize_attrs(attrs)
+
+    def _deserialize_attrs(self, attrs: dict) -> dict:
+        """Deserialize the values of a dict of attributes loaded from json."""
+
         for key, val in attrs.items():
             deserializer = self.deserializers.get(key)
             if deserializer is None:
@@ -124,12 +144,12 @@ class TestAttributes:
 
             try:
                 attrs[key] = deserializer(val)
-            except ValueError:
+            except ValueError as err:
                 self._add_warning(
                     "Error deserializing attribute '{}' value '{}' for test "
                     "run '{}': {}".format(key, val, self.id, err.args[0]))
 
-        self._attrs = attrs
+        return attrs
 
     def load_legacy_attributes(self, initial_attrs=None):
         """Try to load attributes in older Pavilion formats, primarily before
@@ -250,17 +270,64 @@ class TestAttributes:
     def complete(self) -> bool:
         """Returns whether the test is complete."""
 
+        return self.check_complete()
+
+    def check_complete(self, refresh: bool = True) -> bool:
+        """Check whether the test is complete.
+
+        :param refresh: If the completion file isn't found, force a meta-data
+            update on the test directory and look again. On network filesystems
+            this is needed to see files created by other hosts.
+        """
+
         if not self._complete:
             run_complete_path = self.path / self.COMPLETE_FN
-            # This will force a meta-data update on the directory.
-            list(self.path.iterdir())
 
             if run_complete_path.exists():
                 self._complete = True
-                return True
+            elif refresh:
+                # This will force a meta-data update on the directory.
+                os.listdir(self.path.as_posix())
+                self._complete = run_complete_path.exists()
 
         return self._complete
 
+    def set_run_complete(self):
+        """Write a file in the test directory that indicates that the test
+        has completed a run, one way or another. This should only be called
+        when we're sure their won't be any more status changes."""
+
+        if self.complete:
+            return
+
+        # Write the current time to the file. We don't actually use the contents
+        # of the file, but it's nice to have another record of when this was
+        # run.
+        complete_path = self.path/self.COMPLETE_FN
+        complete_tmp_path = complete_path.with_suffix('.tmp')
+        with complete_tmp_path.open('w') as run_complete:
+            json.dump(
+                {'complete': time.time()},
+                run_complete)
+        complete_tmp_path.rename(complete_path)
+
+        self._complete = True
+
+    def _get_series(self) -> Union[str, None]:
+        """Return the series id that this test belongs to, from the series link
+        in the test directory. Returns None if it doesn't belong to any series."""
+
+        series_path = self.path/'series'
+        if series_path.exists():
+            series = series_path.resolve().name
+            try:
+                series = int(series)
+            except ValueError:
+                return None
+            return 's{}'.format(series)
+        else:
+            return None
+
     build_only = basic_attr(
         name='build_only',
         doc="Only build this test, never run it.")
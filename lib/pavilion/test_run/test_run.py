@@ -13,7 +13,7 @@ import threading
 import time
 import uuid
 from pathlib import Path
-from typing import TextIO, Union, Dict
+from typing import TextIO, Union, Dict, List
 
 from pavilion.config import PavConfig
 from pavilion import builder
@@ -25,7 +25,7 @@ from pavilion import scriptcomposer
 from pavilion import utils
 from pavilion import create_files
 from pavilion import resolve
-from pavilion.build_tracker import BuildTracker, MultiBuildTracker
+from pavilion.build_tracker import BuildTracker, MultiBuildTracker, BUILD_LOG_NAME
 from pavilion.deferred import DeferredVariable
 from pavilion.errors import TestRunError, TestRunNotFoundError, TestConfigError
 from pavilion.jobs import Job
@@ -35,7 +35,11 @@ from pavilion.status_file import TestStatusFile, STATES
 from pavilion.test_config.file_format import NO_WORKING_DIR
 from pavilion.test_config.utils import parse_timeout
 from pavilion.types import ID_Pair
+from .summary import TestSummary, read_summary
 from .test_attrs import TestAttributes
+from .waiter import TestWaiter
+
+LOGGER = logging.getLogger('pav.' + __name__)
 
 
 class TestRun(TestAttributes):
@@ -79,24 +83,16 @@ class TestRun(TestAttributes):
     :ivar TestRunOptions opt: Test run options defined by OPTIONS_DEFAULTS
     """
 
-    RUN_DIR = 'test_runs'
-
     NO_LABEL = '_none'
 
-    STATUS_FN = 'status'
-    """File that tracks the tests's status."""
-
     CANCEL_FN = 'cancel'
     """File that indicates that the test was cancelled."""
 
-    JOB_FN = 'job'
-    """Link to the test's scheduler job."""
-
     BUILD_TEMPLATE_DIR = 'templates'
     """Directory that holds build templates."""
 
     def __init__(self, pav_cfg: PavConfig, config, var_man=None,
-                 _id=None, rebuild=False, build_only=False):
+                 _id=None, rebuild=False, build_only=False, _lazy: dict = None):
         """Create an new TestRun object. If loading an existing test
     instance, use the ``TestRun.from_id()`` method.
 
@@ -106,7 +102,10 @@ class TestRun(TestAttributes):
     :param bool rebuild: After determining the build name, deprecate it and
         select a new, non-deprecated build.
     :param int _id: The test id of an existing test. (You should be using
-        TestRun.load)."""
+        TestRun.load).
+    :param _lazy: The working_dir, cfg_label, scheduler and attributes of an existing
+        test that is being lazily loaded (see TestRun.load). The config is then
+        loaded on demand, so it may be None."""
 
         self.saved = False
 
@@ -114,20 +113,33 @@ class TestRun(TestAttributes):
 
         # Just about every method needs this
         self._pav_cfg = pav_cfg
-        self.scheduler = config['scheduler']
 
-        # Get the working dir specific to where this test came from.
-        if config.get('working_dir', NO_WORKING_DIR) == NO_WORKING_DIR:
-            self.working_dir = Path(self._pav_cfg['working_dir'])
+        # These are loaded or created on demand for lazily loaded tests.
+        self._lazy = _lazy is not None
+        self._config = config
+        self._var_man = None
+        self._builder = None
+        self._skip_reasons = None
+        self._permute_vars = None
+
+        if self._lazy:
+            self.scheduler = _lazy['scheduler']
+            self.working_dir = Path(_lazy['working_dir'])
+            self.cfg_label = _lazy['cfg_label']
         else:
-            self.working_dir = Path(config['working_dir'])
+            self.scheduler = config['scheduler']
 
-        self.cfg_label = config.get('cfg_label', self.NO_LABEL)
+            # Get the working dir specific to where this test came from.
+            if config.get('working_dir', NO_WORKING_DIR) == NO_WORKING_DIR:
+                self.working_dir = Path(self._pav_cfg['working_dir'])
+            else:
+                self.working_dir = Path(config['working_dir'])
 
-        tests_path = self.working_dir/self.RUN_DIR
+            self.cfg_label = config.get('cfg_label', self.NO_LABEL)
 
-        self.config = config
-        self._validate_config()
+            self._validate_config()
+
+        tests_path = self.working_dir/self.RUN_DIR
 
         # Get an id for the test, if we weren't given one.
         if new_test:
@@ -135,9 +147,7 @@ class TestRun(TestAttributes):
             id_tmp, run_path = dir_db.create_id_dir(tests_path)
             super().__init__(path=run_path, load=False)
             self._variables_path = self.path / 'variables'
-            self.var_man = None
             self.status = None
-            self.builder = None
             self.build_name = None
 
             # Set basic attributes
@@ -160,7 +170,13 @@ class TestRun(TestAttributes):
             self.var_man = var_man
         else:
             # Load the test info from the given id path.
-            super().__init__(path=dir_db.make_id_path(tests_path, _id))
+            path = dir_db.make_id_path(tests_path, _id)
+            if self._lazy and _lazy.get('attributes') is not None:
+                super().__init__(path=path, load=False)
+                self._attrs = self._deserialize_attrs(_lazy['attributes'])
+                self._attrs.setdefault('warnings', [])
+            else:
+                super().__init__(path=path)
             if not self.path.is_dir():
                 raise TestRunNotFoundError(
                     "No test with id '{}' could be found.".format(self.id))
@@ -169,60 +185,145 @@ class TestRun(TestAttributes):
             self.status = TestStatusFile(self.path / self.STATUS_FN)
             self.suite_path = self.suite_path
 
-            try:
-                self.var_man = VariableSetManager.load(self._variables_path)
-            except RuntimeError as err:
-                raise TestRunError(*err.args)
+            if not self._lazy:
+                self.var_man = self._load_var_man()
 
         # If the cfg label is actually something that exists, use it in the
         # test full_id. Otherwise give the test path.
         self.full_id = '{}.{}'.format(self.cfg_label, self.id)
 
-        self.sys_name = self.var_man.get('sys_name', '<unknown>')
-
-        self.test_version = config.get('test_version')
-
-        # Mark the run to build locally.
-        self.build_local = config.get('build', {}) \
-                                 .get('on_nodes', 'false').lower() != 'true'
-
-        run_timeout = config.get('run', {}).get('timeout', '300')
-        try:
-            self.run_timeout = parse_timeout(run_timeout)
-        except ValueError:
-            raise TestRunError("Invalid run timeout value '{}' for test {}"
-                               .format(run_timeout, self.name))
-
         self.run_log = self.path/'run.log'
         self.build_log = self.path/'build.log'
         self.results_log = self.path/'results.log'
         self.results_path = self.path/'results.json'
         self.build_origin_path = self.path/'build_origin'
 
-        # Use run.log as the default run timeout file
-        self.timeout_file = self.run_log
-        run_timeout_file = config.get('run', {}).get('timeout_file')
-        if run_timeout_file is not None:
-            self.timeout_file = self.path/run_timeout_file
-
-        self.permute_vars = self._get_permute_vars()
-
         self.build_script_path = self.path/'build.sh'  # type: Path
         self.build_path = self.path/'build'
 
         self.run_tmpl_path = self.path/'run.tmpl'
         self.run_script_path = self.path/'run.sh'
 
-        if not new_test:
-            self.builder = self._make_builder()
-
         # This will be set by the scheduler
         self._job = None
 
         self._results = None
 
-        self.skip_reasons = self._evaluate_skip_conditions()
-        self.skipped = len(self.skip_reasons) != 0
+        if not self._lazy:
+            # For lazily loaded tests, these are all left to be evaluated on demand
+            # (and the saved sys_name and skipped attributes are used as is).
+            self.sys_name = self.var_man.get('sys_name', '<unknown>')
+
+            # Make sure the run timeout is valid.
+            _ = self.run_timeout
+
+            self._permute_vars = self._get_permute_vars()
+
+            if not new_test:
+                self.builder = self._make_builder()
+
+            self._skip_reasons = self._evaluate_skip_conditions()
+            self.skipped = len(self._skip_reasons) != 0
+
+    @property
+    def config(self) -> dict:
+        """The test's configuration."""
+
+        if self._config is None:
+            self._config = self._load_config(self.path)
+
+        return self._config
+
+    @config.setter
+    def config(self, config: dict):
+        self._config = config
+
+    @property
+    def var_man(self) -> Union[VariableSetManager, None]:
+        """The test's variable set manager."""
+
+        if self._var_man is None and self._lazy:
+            self._var_man = self._load_var_man()
+
+        return self._var_man
+
+    @var_man.setter
+    def var_man(self, var_man: VariableSetManager):
+        self._var_man = var_man
+
+    def _load_var_man(self) -> VariableSetManager:
+        """Load the saved variables for this test."""
+
+        try:
+            return VariableSetManager.load(self._variables_path)
+        except RuntimeError as err:
+            raise TestRunError(*err.args)
+
+    @property
+    def builder(self) -> Union[builder.TestBuilder, None]:
+        """The test's builder. This is None for new tests until they are saved."""
+
+        if self._builder is None and self._lazy:
+            self._builder = self._make_builder()
+
+        return self._builder
+
+    @builder.setter
+    def builder(self, test_builder: builder.TestBuilder):
+        self._builder = test_builder
+
+    @property
+    def skip_reasons(self) -> List[str]:
+        """The reasons this test should be skipped, according to its skip
+        conditions (and any later calls to .skip())."""
+
+        if self._skip_reasons is None:
+            self._skip_reasons = self._evaluate_skip_conditions()
+
+        return self._skip_reasons
+
+    @property
+    def permute_vars(self) -> dict:
+        """The values of the variables this test was permuted on."""
+
+        if self._permute_vars is None:
+            self._permute_vars = self._get_permute_vars()
+
+        return self._permute_vars
+
+    @property
+    def test_version(self):
+        """The test config's version."""
+
+        return self.config.get('test_version')
+
+    @property
+    def build_local(self) -> bool:
+        """Whether this test is built locally (rather than on its allocation)."""
+
+        return self.config.get('build', {}).get('on_nodes', 'false').lower() != 'true'
+
+    @property
+    def run_timeout(self) -> Union[int, None]:
+        """The run timeout for this test, in seconds."""
+
+        run_timeout = self.config.get('run', {}).get('timeout', '300')
+        try:
+            return parse_timeout(run_timeout)
+        except ValueError:
+            raise TestRunError("Invalid run timeout value '{}' for test {}"
+                               .format(run_timeout, self.name))
+
+    @property
+    def timeout_file(self) -> Path:
+        """The file whose updates are watched for the run timeout. Defaults to
+        the run log."""
+
+        run_timeout_file = self.config.get('run', {}).get('timeout_file')
+        if run_timeout_file is not None:
+            return self.path/run_timeout_file
+
+        return self.run_log
 
     @property
     def id_pair(self) -> ID_Pair:
@@ -234,16 +335,7 @@ class TestRun(TestAttributes):
         """Return the series id that this test belongs to. Returns None if it doesn't
         belong to any series."""
 
-        series_path = self.path/'series'
-        if series_path.exists():
-            series = series_path.resolve().name
-            try:
-                series = int(series)
-            except ValueError:
-                return None
-            return 's{}'.format(series)
-        else:
-            return None
+        return self._get_series()
 
     def save(self):
         """Save the test configuration to file and create the builder. This
@@ -263,7 +355,9 @@ class TestRun(TestAttributes):
         self._save_config()
         self.var_man.save(self._variables_path)
         # Setup the initial status file.
-        self.status = TestStatusFile(self.path / self.STATUS_FN)
+        self.status = TestStatusFile(
+            self.path / self.STATUS_FN,
+            fmt=self._pav_cfg.get('status_format', TestStatusFile.FORMAT_TEXT))
         self.status.set(STATES.CREATED,
                         "Test directory and status file created.")
 
@@ -285,6 +379,13 @@ class TestRun(TestAttributes):
 
         self.saved = True
 
+    def save_attributes(self):
+        """Save the attributes to file in the test directory, and update the
+        test run summary to match."""
+
+        super().save_attributes()
+        TestSummary.save(self)
+
     def _make_builder(self):
 
         spack_config = (self.config.get('spack_config', {}) if self.spack_enabled()
@@ -381,22 +482,28 @@ class TestRun(TestAttributes):
         return ID_Pair((working_dir, test_id))
 
     @classmethod
-    def load_from_raw_id(cls, pav_cfg, raw_test_id: str) -> 'TestRun':
+    def load_from_raw_id(cls, pav_cfg, raw_test_id: str, lazy: bool = False) \
+            -> 'TestRun':
         """Load a test given a raw test id string, in the form
         [label].test_id. The optional label will allow us to look up the config
         path for the test."""
 
         working_dir, test_id = cls.parse_raw_id(pav_cfg, raw_test_id)
 
-        return cls.load(pav_cfg, working_dir, test_id)
+        return cls.load(pav_cfg, working_dir, test_id, lazy=lazy)
 
     @classmethod
-    def load(cls, pav_cfg, working_dir: Path, test_id: int) -> 'TestRun':
+    def load(cls, pav_cfg, working_dir: Path, test_id: int, lazy: bool = False) \
+            -> 'TestRun':
         """Load an old TestRun object given a test id.
 
         :param pav_cfg: The pavilion config
         :param working_dir: The working directory where this test run lives.
         :param int test_id: The test's id number.
+        :param lazy: Lazily load the test. The config, variables, builder and skip
+            reasons are only loaded/created when first accessed. This is much
+            faster for commands that only need a few bits of information about
+            each test. Loading errors for those components are deferred as well.
         :rtype: TestRun
         """
 
@@ -407,9 +514,26 @@ class TestRun(TestAttributes):
                                "at '{}' as expected."
                                .format(test_id, path))
 
-        config = cls._load_config(path)
+        if lazy:
+            # The test summary has everything we need up front (and saves us
+            # from reading the attributes file). Older tests won't have one.
+            try:
+                summary = read_summary(path)
+            except TestRunError:
+                config = cls._load_config(path)
+                summary = {
+                    'cfg_label': config.get('cfg_label', cls.NO_LABEL),
+                    'scheduler': config['scheduler'],
+                }
+            else:
+                config = None
+
+            summary['working_dir'] = working_dir
+            test_run = TestRun(pav_cfg, config, _id=test_id, _lazy=summary)
+        else:
+            config = cls._load_config(path)
+            test_run = TestRun(pav_cfg, config, _id=test_id)
 
-        test_run = TestRun(pav_cfg, config, _id=test_id)
         test_run.saved = True
         # Force the completion check to ensure that ._complete is populated.
 
@@ -600,7 +724,7 @@ class TestRun(TestAttributes):
                     pass
             build_result = False
 
-        self.build_log.symlink_to(self.build_path/'pav_build_log')
+        self.build_log.symlink_to(self.build_path/BUILD_LOG_NAME)
 
         if build_result:
             self.status.set(STATES.BUILD_DONE, "Build is complete.")
@@ -728,18 +852,7 @@ class TestRun(TestAttributes):
             raise RuntimeError("You must call the .save() method before run {} "
                                "can be marked complete.".format(self.full_id))
 
-        # Write the current time to the file. We don't actually use the contents
-        # of the file, but it's nice to have another record of when this was
-        # run.
-        complete_path = self.path/self.COMPLETE_FN
-        complete_tmp_path = complete_path.with_suffix('.tmp')
-        with complete_tmp_path.open('w') as run_complete:
-            json.dump(
-                {'complete': time.time()},
-                run_complete)
-        complete_tmp_path.rename(complete_path)
-
-        self._complete = True
+        super().set_run_complete()
 
     def cancel(self, reason: str):
         """Set the cancel file for this test, and denote in its status that it was
@@ -762,8 +875,6 @@ class TestRun(TestAttributes):
 
         return (self.path/self.CANCEL_FN).exists()
 
-    WAIT_INTERVAL = 0.5
-
     def wait(self, timeout=None):
         """Wait for the test run to be complete. This works across hosts, as
         it simply checks for files in the run directory.
@@ -773,21 +884,16 @@ class TestRun(TestAttributes):
         :raises TimeoutError: if the timeout expires.
         """
 
-        if timeout is not None:
-            timeout = time.time() + timeout
-
-        while 1:
-            if self.complete:
-                return
-
-            time.sleep(self.WAIT_INTERVAL)
+        with TestWaiter([self]) as waiter:
+            waiter.wait(timeout=timeout)
 
-            if timeout is not None and time.time() > timeout:
+            if waiter.remaining:
                 raise TimeoutError("Timed out waiting for test '{}' to "
                                    "complete".format(self.full_id))
 
     def gather_results(self, run_result: int, regather: bool = False,
-                       log_file: TextIO = None):
+                       log_file: TextIO = None,
+                       result_pool: 'result.ResultPool' = None):
         """Process and log the results of the test, including the default set
 of result keys.
 
@@ -795,6 +901,8 @@ of result keys.
 :param bool regather: Gather results without performing any changes to the
     test itself.
 :param IO[str] log_file: The file to save result logs to.
+:param result_pool: A result pool to parse result files with, when gathering
+    results for many tests at once.
 """
         if self.finished is None:
             raise RuntimeError(
@@ -821,7 +929,8 @@ of result keys.
                             .format(len(parser_configs)))
 
         try:
-            result.parse_results(self._pav_cfg, self, results, base_log=result_log)
+            result.parse_results(self._pav_cfg, self, results, base_log=result_log,
+                                 pool=result_pool)
         except ResultError as err:
             results['result'] = self.ERROR
             results['pav_result_errors'].append(
@@ -890,6 +999,13 @@ of result keys.
             pass
         results_tmp_path.rename(self.results_path)
 
+        if self._pav_cfg.get('result_store', True):
+            try:
+                result.ResultStore(self.working_dir).add(self.path, results)
+            except ResultError as err:
+                # Results missing from the store are just read from the results file.
+                LOGGER.warning("Test %s: %s", self.full_id, err)
+
         self.result = results.get('result')
         self.save_attributes()
 
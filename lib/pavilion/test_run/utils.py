@@ -1,12 +1,13 @@
 """Utility functions for test run objects."""
 
 from concurrent.futures import ThreadPoolExecutor
-from typing import List, TextIO
+from typing import List, TextIO, Union
 
 from pavilion import dir_db, output
 from pavilion.config import PavConfig
 from pavilion.errors import TestRunError
 from pavilion.types import ID_Pair
+from .summary import TestSummary
 from .test_run import TestRun
 
 
@@ -36,20 +37,22 @@ def get_latest_tests(pav_cfg: PavConfig, limit):
     return [test_id for _, test_id in test_dir_list[-limit:]]
 
 
-def _load_test(pav_cfg, id_pair: ID_Pair):
+def _load_test(pav_cfg, id_pair: ID_Pair, lazy: bool = False):
     """Load a test object from an ID_Pair."""
 
     test_wd, test_id = id_pair
 
-    return TestRun.load(pav_cfg, test_wd, test_id)
+    return TestRun.load(pav_cfg, test_wd, test_id, lazy=lazy)
 
 
 LOADED_TESTS = {}
 
 
-def load_tests(pav_cfg, id_pairs: List[ID_Pair], errfile: TextIO) -> List['TestRun']:
+def load_tests(pav_cfg, id_pairs: List[ID_Pair], errfile: TextIO,
+               lazy: bool = False) -> List['TestRun']:
     """Load a set of tests in parallel.
 
+    :param lazy: Lazily load the tests (see TestRun.load).
     :raises TestRunError: When loading a test fails
     """
 
@@ -68,7 +71,46 @@ def load_tests(pav_cfg, id_pairs: List[ID_Pair], errfile: TextIO) -> List['TestR
     with ThreadPoolExecutor(max_workers=pav_cfg['max_threads']) as pool:
         results = []
         for pair in id_filtered_pairs:
-            results.append(pool.submit(_load_test, pav_cfg, pair))
+            results.append(pool.submit(_load_test, pav_cfg, pair, lazy))
+
+        for result in results:
+            try:
+                tests.append(result.result())
+            except TestRunError as err:
+                output.fprint(errfile, "Error loading test: {}".format(err.args[0]),
+                              color=output.YELLOW)
+
+    return tests
+
+
+def _load_summary(pav_cfg, id_pair: ID_Pair) -> Union[TestSummary, TestRun]:
+    """Load a test summary from an ID_Pair. Tests that don't have a summary (those
+    created by older versions of Pavilion) are fully loaded instead."""
+
+    test_wd, test_id = id_pair
+
+    try:
+        return TestSummary.load(test_wd, test_id)
+    except TestRunError:
+        return TestRun.load(pav_cfg, test_wd, test_id, lazy=True)
+
+
+def load_summaries(pav_cfg, id_pairs: List[ID_Pair], errfile: TextIO) \
+        -> List[Union[TestSummary, TestRun]]:
+    """Load the summaries for a set of tests in parallel. This is much faster than
+    loading the full tests, but only provides enough information to report on them
+    (see TestSummary).
+    """
+
+    tests = []
+
+    # Skip duplicates, but keep the order.
+    id_pairs = list(dict.fromkeys(id_pairs))
+
+    with ThreadPoolExecutor(max_workers=pav_cfg['max_threads']) as pool:
+        results = []
+        for pair in id_pairs:
+            results.append(pool.submit(_load_summary, pav_cfg, pair))
 
         for result in results:
             try:
@@ -0,0 +1,317 @@
+"""Wait on test runs to complete without busy looping. Test run directories are
+watched with inotify (where available), so that local test completions and status
+changes are noticed immediately. Since inotify doesn't see changes made by other
+hosts on network filesystems (NFS, Lustre, etc.), the waiter also polls the
+remaining tests with an exponential backoff."""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from typing import Iterable, List, Dict, Union
+
+from .test_attrs import TestAttributes
+
+# Inotify event masks, from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+
+# Creating RUN_COMPLETE is a create or moved-to event in the test directory, and
+# status file updates are modify/close-write events.
+_WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+               | IN_DELETE_SELF | IN_ONLYDIR)
+
+_EVENT_STRUCT = struct.Struct('iIII')
+
+
+class _Inotify:
+    """A minimal ctypes wrapper around the Linux inotify interface."""
+
+    _libc = None
+
+    def __init__(self):
+        """Initialize the inotify instance.
+
+        :raises OSError: When inotify isn't available.
+        """
+
+        libc = self._get_libc()
+        if libc is None:
+            raise OSError(errno.ENOSYS, "Inotify is not available on this system.")
+
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+        self._poller = select.poll()
+        self._poller.register(self.fd, select.POLLIN)
+
+    @classmethod
+    def _get_libc(cls):
+        """Load libc, if it has inotify support."""
+
+        if not sys.platform.startswith('linux'):
+            return None
+
+        if cls._libc is None:
+            try:
+                libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6',
+                                   use_errno=True)
+                libc.inotify_init1.argtypes = [ctypes.c_int]
+                libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p,
+                                                   ctypes.c_uint32]
+                libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+            except (OSError, AttributeError):
+                return None
+            cls._libc = libc
+
+        return cls._libc
+
+    def add_watch(self, path: str, mask: int) -> int:
+        """Add a watch for the given path, and return the watch descriptor.
+
+        :raises OSError: On failure, such as running out of watches.
+        """
+
+        wdesc = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wdesc < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wdesc
+
+    def rm_watch(self, wdesc: int):
+        """Remove the given watch. Errors (such as the watch already being gone)
+        are ignored."""
+
+        self._libc.inotify_rm_watch(self.fd, wdesc)
+
+    def read(self, timeout: float) -> Union[List[tuple], None]:
+        """Wait up to timeout seconds for events, and return a list of
+        (wdesc, mask) tuples for them. An empty list means the wait timed out,
+        while None means the event queue overflowed (and events were lost)."""
+
+        if not self._poller.poll(max(0, int(timeout * 1000))):
+            return []
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset + _EVENT_STRUCT.size <= len(data):
+            wdesc, mask, _, name_len = _EVENT_STRUCT.unpack_from(data, offset)
+            offset += _EVENT_STRUCT.size + name_len
+            if mask & IN_Q_OVERFLOW:
+                return None
+            events.append((wdesc, mask))
+
+        return events
+
+    def close(self):
+        """Close the inotify file descriptor."""
+
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class TestWaiter:
+    """Waits for a set of test runs to complete. Use it as a context manager
+    (or call close()) to release the inotify watches. ::
+
+        with TestWaiter(tests) as waiter:
+            while waiter.remaining:
+                for test in waiter.wait(timeout=5, wait_for_all=False):
+                    ...
+
+    :ivar list completed: The tests that have completed, in the order they were noticed.
+    """
+
+    MIN_POLL_INTERVAL = 0.1
+    """The shortest (and initial) time between polls of the remaining tests."""
+
+    MAX_POLL_INTERVAL = 5.0
+    """The poll interval doubles each time a poll finds nothing new, up to this
+    maximum. Any completion or watched change resets it. Polls at the maximum
+    interval also force a refresh of each test directory's metadata, which is needed
+    to see changes from other hosts on some network filesystems."""
+
+    def __init__(self, tests: Iterable[TestAttributes], use_inotify: bool = True):
+        """Start watching the given tests.
+
+        :param tests: The tests to wait on. TestRun objects or just their
+            TestAttributes are both fine.
+        :param use_inotify: Whether to use inotify, when available. Otherwise only
+            polling is used.
+        """
+
+        self._remaining = {}  # type: Dict[int, TestAttributes]
+        self.completed = []  # type: List[TestAttributes]
+        self._watches = {}  # type: Dict[int, TestAttributes]
+        self._test_watches = {}  # type: Dict[int, int]
+        self._interval = self.MIN_POLL_INTERVAL
+
+        self._inotify = None
+        if use_inotify:
+            try:
+                self._inotify = _Inotify()
+            except OSError:
+                pass
+
+        for test in tests:
+            if test.complete:
+                self.completed.append(test)
+                continue
+
+            self._remaining[id(test)] = test
+            self._watch(test)
+
+    @property
+    def remaining(self) -> List[TestAttributes]:
+        """The tests that haven't completed yet."""
+
+        return list(self._remaining.values())
+
+    def _watch(self, test: TestAttributes):
+        """Add an inotify watch on the test's directory, if we can."""
+
+        if self._inotify is None:
+            return
+
+        try:
+            wdesc = self._inotify.add_watch(test.path.as_posix(), _WATCH_MASK)
+        except OSError:
+            # Most likely we ran out of watches (ENOSPC). Polling will handle it.
+            return
+
+        self._watches[wdesc] = test
+        self._test_watches[id(test)] = wdesc
+
+    def _unwatch(self, test: TestAttributes):
+        """Remove the watch on the given test, if any."""
+
+        wdesc = self._test_watches.pop(id(test), None)
+        if wdesc is not None:
+            self._watches.pop(wdesc, None)
+            self._inotify.rm_watch(wdesc)
+
+    def _check(self, tests: Iterable[TestAttributes], refresh: bool = False) \
+            -> List[TestAttributes]:
+        """Check the given tests for completion, and move any that are complete
+        to the completed list.
+
+        :param tests: The tests to check.
+        :param refresh: Force a metadata refresh of each test directory.
+        """
+
+        newly_completed = []
+        for test in tests:
+            if id(test) in self._remaining and test.check_complete(refresh=refresh):
+                del self._remaining[id(test)]
+                self.completed.append(test)
+                self._unwatch(test)
+                newly_completed.append(test)
+
+        return newly_completed
+
+    def wait(self, timeout: float = None, wait_for_all: bool = True) \
+            -> List[TestAttributes]:
+        """Wait for tests to complete, and return those that completed during
+        this call.
+
+        :param timeout: How long to wait, in seconds. None waits forever.
+        :param wait_for_all: When True, wait until all tests are complete (or the
+            timeout expires). Otherwise return as soon as any test completes.
+        """
+
+        end = None if timeout is None else time.time() + timeout
+        newly_completed = []
+        next_poll = 0
+
+        while self._remaining:
+            now = time.time()
+            if end is not None and now >= end:
+                break
+
+            # Poll every remaining test, as changes from other hosts won't
+            # generate inotify events.
+            if now >= next_poll:
+                found = self._check(self.remaining,
+                                    refresh=self._interval >= self.MAX_POLL_INTERVAL)
+                if found:
+                    self._interval = self.MIN_POLL_INTERVAL
+                else:
+                    self._interval = min(self._interval * 2, self.MAX_POLL_INTERVAL)
+                next_poll = now + self._interval
+                newly_completed.extend(found)
+
+                if newly_completed and not wait_for_all:
+                    break
+                if not self._remaining:
+                    break
+
+            sleep_until = next_poll if end is None else min(next_poll, end)
+            sleep_time = max(0, sleep_until - time.time())
+
+            if self._inotify is None or not self._watches:
+                time.sleep(sleep_time)
+                continue
+
+            events = self._inotify.read(sleep_time)
+            if events is None:
+                # Events were lost, so poll everything right away.
+                next_poll = 0
+                continue
+
+            touched = []
+            for wdesc, mask in events:
+                test = self._watches.get(wdesc)
+                if test is None:
+                    continue
+                if mask & (IN_IGNORED | IN_DELETE_SELF):
+                    # The test directory is gone. Leave it to polling.
+                    self._watches.pop(wdesc, None)
+                    self._test_watches.pop(id(test), None)
+                if test not in touched:
+                    touched.append(test)
+
+            if touched:
+                found = self._check(touched)
+                newly_completed.extend(found)
+                # Activity tends to come in bursts, so check back soon.
+                self._interval = self.MIN_POLL_INTERVAL
+                next_poll = min(next_poll, time.time() + self._interval)
+
+                if newly_completed and not wait_for_all:
+                    break
+
+        return newly_completed
+
+    def close(self):
+        """Remove all watches and release the inotify instance."""
+
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        self._watches = {}
+        self._test_watches = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -125,6 +125,8 @@ base class.
 
         raw_pav_cfg.working_dir = self.PAV_ROOT_DIR/'test'/'working_dir'
         raw_pav_cfg.user_config = False
+        # Tests frequently change scheduler node data, so don't cache it.
+        raw_pav_cfg.node_inventory_ttl = 0
 
         raw_pav_cfg.result_log = raw_pav_cfg.working_dir/'results.log'
 
@@ -404,7 +406,7 @@ The default config is: ::
         var_man.add_var_set('pav', self.pav_cfg.pav_vars)
 
         sched = pavilion.schedulers.get_plugin(cfg.get('scheduler', 'raw'))
-        sched_vars = sched.get_initial_vars(cfg.get('schedule', {}))
+        sched_vars = sched.get_initial_vars(cfg.get('schedule', {}), self.pav_cfg)
         var_man.add_var_set('sched', sched_vars)
 
         var_man.resolve_references()
@@ -59,14 +59,20 @@ Usage: ::
         # A dictionary of the known deferred variables.
         self.deferred = set()
 
+        # The names of the variable sets that may be shared with other
+        # variable set managers (see get_permutations). These are copied
+        # before they're modified.
+        self._shared_sets = set()
+
     def add_var_set(self, name, value_dict):
         """Add a new variable set to this variable set manager. Variables in
         the set can then be retrieved by complex key.
 
         :param str name: The name of the var set. Must be one of the reserved
             keys.
-        :param Union(dict,collections.UserDict) value_dict: A dictionary of
-            values to populate the var set.
+        :param Union(dict,collections.UserDict,VariableSet) value_dict: A
+            dictionary of values to populate the var set, or an already
+            populated variable set (from another variable set manager).
         :return: None
         :raises VariableError: On problems with the name or data.
         """
@@ -77,12 +83,16 @@ Usage: ::
             raise ValueError(
                 "Variable set '{}' already initialized.".format(name))
 
-        try:
-            var_set = VariableSet(name, value_dict=value_dict)
-        except VariableError as err:
-            # Update the error to include the var set.
-            err.var_set = name
-            raise err
+        if isinstance(value_dict, VariableSet):
+            var_set = value_dict.share_copy()
+            var_set.name = name
+        else:
+            try:
+                var_set = VariableSet(name, value_dict=value_dict)
+            except VariableError as err:
+                # Update the error to include the var set.
+                err.var_set = name
+                raise err
 
         for var, val in var_set.data.items():
             if isinstance(val, DeferredVariable):
@@ -96,6 +106,9 @@ return a new var_set manager that contains only a single value
 (possibly a complex one) for each permutation var, in every possible
 permutation.
 
+The permuted managers share all of their unchanged variables with this one
+(copy-on-write), so each only costs as much as the variables it permutes.
+
 :param list[(str, str)] used_per_vars: A set of permutation variable names that
     were used, as a tuple of (var_set, var_name).
 :return: A list of permuted variable managers.
@@ -123,14 +136,14 @@ permutation.
 
         # Create a new var set manager for each permutation.
         for perm in permutations:
-            var_man = copy.deepcopy(self)
+            var_man = self._share()
 
             for (var_set, var), idx in perm.items():
-                new_list = [self.variable_sets[var_set][var][idx]]
                 vlist = VariableList()
-                vlist.data = copy.deepcopy(new_list)
+                vlist.data = [self.variable_sets[var_set][var][idx]]
 
-                var_man.variable_sets[var_set].data[var] = vlist
+                # pylint: disable=protected-access
+                var_man._own_var_set(var_set).share_var(var, vlist)
 
             permuted_var_mans.append(var_man)
 
@@ -264,9 +277,6 @@ index, sub_var) tuple.
         # We only want to resolve variable references in the variable section
         var_vars = self.variable_sets['var']
         unresolved_vars = {}
-        parser = parsers.strings.get_string_parser()
-        var_visitor = parsers.strings.StringVarRefVisitor()
-        transformer = parsers.StringTransformer(self)
 
         # Find all the variable value strings that reference variables
         for var, var_list in var_vars.data.items():
@@ -275,13 +285,13 @@ index, sub_var) tuple.
             for idx in range(len(var_list.data)):
                 sub_var = var_list.data[idx]
                 for key, val in sub_var.data.items():
-                    tree = parser.parse(val)
-                    variables = var_visitor.visit(tree)
+                    template = parsers.compile_string(val)
+                    variables = template.variables
 
                     if variables:
                         # Unresolved variable reference that will be resolved
                         # below.
-                        unresolved_vars[('var', var, idx, key)] = (tree,
+                        unresolved_vars[('var', var, idx, key)] = (template,
                                                                    variables)
 
         # unresolved variables form a tree where the leaves should all be
@@ -290,7 +300,7 @@ index, sub_var) tuple.
         # tree until there are no unresolved variables left.
         while unresolved_vars:
             did_resolve = False
-            for uvar, (tree, variables) in unresolved_vars.copy().items():
+            for uvar, (template, variables) in unresolved_vars.copy().items():
                 for var_str in variables:
                     var_key = self.resolve_key(var_str)
                     # Set the index 0 if it is None
@@ -312,7 +322,7 @@ index, sub_var) tuple.
                     var_set, var_name, index, sub_var = uvar
 
                     try:
-                        res_val = transformer.transform(tree)
+                        res_val = template.render(self)
                     except DeferredError:
                         res_val = None
                     except (parsers.StringParserError, parsers.ParserValueError) as err:
@@ -376,7 +386,33 @@ index, sub_var) tuple.
 
         var_set, var, index, sub_var = self.resolve_key(key)
 
-        self.variable_sets[var_set].set_value(var, index, sub_var, value)
+        self._own_var_set(var_set).set_value(var, index, sub_var, value)
+
+    def _own_var_set(self, name: str) -> 'VariableSet':
+        """Return the named var set, first copying it if it may be shared with
+        another variable set manager."""
+
+        var_set = self.variable_sets[name]
+        if name in self._shared_sets:
+            var_set = var_set.share_copy()
+            self.variable_sets[name] = var_set
+            self._shared_sets.discard(name)
+
+        return var_set
+
+    def _share(self) -> 'VariableSetManager':
+        """Return a copy of this variable set manager that shares all of its
+        variable sets with this one. Both managers copy those sets (and the
+        variables within) before modifying them."""
+
+        var_man = VariableSetManager()
+        var_man.variable_sets = self.variable_sets.copy()
+        var_man.deferred = self.deferred.copy()
+        # pylint: disable=protected-access
+        var_man._shared_sets = set(self.variable_sets)
+        self._shared_sets = set(self.variable_sets)
+
+        return var_man
 
     def set_deferred(self, var_set, var, idx=None, sub_var=None):
         """Set the given variable as deferred. Variables may be deferred
@@ -579,8 +615,8 @@ index, sub_var) tuple.
                 continue
 
             # Replace the old value with the new.
-            var_set = self.variable_sets[d_var_set]
-            var_set.data[d_var] = new_vars.variable_sets[d_var_set].data[d_var]
+            var_set = self._own_var_set(d_var_set)
+            var_set.share_var(d_var, new_vars.variable_sets[d_var_set].data[d_var])
 
             # Remove this variable from or set of deferred.
             self.deferred.remove((d_var_set, d_var, d_idx, d_subvar))
@@ -611,14 +647,10 @@ index, sub_var) tuple.
                 )
 
     def __deepcopy__(self, memodict=None):
-        """Deeply copy this variable set manager."""
-
-        var_man = VariableSetManager()
+        """Copy this variable set manager. The variable data is copied
+        lazily, when either manager modifies it."""
 
-        var_man.variable_sets = copy.deepcopy(self.variable_sets)
-        var_man.deferred = copy.deepcopy(self.deferred)
-
-        return var_man
+        return self._share()
 
     def __contains__(self, item):
 
@@ -664,6 +696,10 @@ method.
         self.data = {}
         self.name = name
 
+        # Variables whose VariableList may be shared with another var set.
+        # These are copied before they're modified.
+        self._shared_vars = set()
+
         if value_dict is not None:
             self._init_from_config(value_dict)
 
@@ -693,8 +729,31 @@ name."""
     def set_value(self, var, index, sub_var, value):
         """Set the value at the given location to value."""
 
+        if var in self._shared_vars:
+            self.data[var] = copy.deepcopy(self[var])
+            self._shared_vars.discard(var)
+
         self[var].set_value(index, sub_var, value)
 
+    def share_var(self, var, var_list):
+        """Set the given variable to a variable list that may be shared with
+        other var sets."""
+
+        self.data[var] = var_list
+        self._shared_vars.add(var)
+
+    def share_copy(self) -> 'VariableSet':
+        """Return a copy of this var set that shares its variable lists with
+        this one. Both var sets copy those lists before modifying them."""
+
+        variable_set = VariableSet(name=self.name)
+        variable_set.data = self.data.copy()
+        # pylint: disable=protected-access
+        variable_set._shared_vars = set(self.data)
+        self._shared_vars = set(self.data)
+
+        return variable_set
+
     def __contains__(self, item):
         return item in self.data
 
@@ -17,10 +17,10 @@ class Dummy(schedulers.SchedulerPluginAdvanced):
     def __init__(self):
         super().__init__('dummy', 'I am dumb')
 
-    def get_initial_vars(self, raw_sched_config: dict):
+    def get_initial_vars(self, raw_sched_config: dict, pav_cfg=None):
         config = schedulers.validate_config(raw_sched_config)
 
-        sched_vars = super().get_initial_vars(raw_sched_config)
+        sched_vars = super().get_initial_vars(raw_sched_config, pav_cfg)
 
         if config['nodes'] == 42:
             sched_vars.add_errors([
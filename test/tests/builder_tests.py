@@ -3,6 +3,7 @@ import io
 import pathlib
 import shutil
 import stat
+import tarfile
 import threading
 import time
 import unittest
@@ -10,6 +11,8 @@ import uuid
 from pathlib import Path
 
 from pavilion import builder
+from pavilion import build_copy
+from pavilion import extract
 from pavilion import lockfile
 from pavilion import wget
 from pavilion.build_tracker import DummyTracker
@@ -159,6 +162,56 @@ class BuilderTests(PavTestCase):
             self._cmp_files(test_archives/file,
                             test.builder.path/file.name)
 
+    def test_extract_cache(self):
+        """Builds that share a source tarball should only extract it once."""
+
+        cache_dir = self.pav_cfg.working_dir/builder.TestBuilder.EXTRACT_CACHE_DIR
+        if cache_dir.exists():
+            shutil.rmtree(str(cache_dir))
+
+        original_tree = self.TEST_DATA_ROOT/'pav_config_dir'/'test_src'/'src'
+
+        for specificity in 'a', 'b':
+            config = self._quick_test_cfg()
+            config['build']['source_path'] = 'src.tar.gz'
+            config['build']['specificity'] = specificity
+            test = self._quick_test(config, build=False, finalize=False)
+            test.builder._setup_build_dir(test.builder.path, DummyTracker())
+            self._cmp_tree(test.builder.path, original_tree)
+
+            self.assertEqual(len(list(cache_dir.iterdir())), 1)
+
+        # Cleaned out cache entries are simply recreated.
+        shutil.rmtree(str(cache_dir))
+        config['build']['specificity'] = 'c'
+        test = self._quick_test(config, build=False, finalize=False)
+        test.builder._setup_build_dir(test.builder.path, DummyTracker())
+        self._cmp_tree(test.builder.path, original_tree)
+        self.assertEqual(len(list(cache_dir.iterdir())), 1)
+
+    def test_extract_duplicates(self):
+        """When a tarball has multiple members with the same path, the last one
+        should always win."""
+
+        tar_path = self.pav_cfg.working_dir/'dups.tar'
+        with tarfile.open(tar_path.as_posix(), 'w') as tar:
+            for i in range(50):
+                for name in 'a', 'b', 'c':
+                    data = '{}-{}'.format(name, i).encode() * (i + 1)
+                    info = tarfile.TarInfo('dups/{}'.format(name))
+                    info.size = len(data)
+                    tar.addfile(info, io.BytesIO(data))
+            info = tarfile.TarInfo('dups/c')
+            info.type = tarfile.SYMTYPE
+            info.linkname = 'a'
+            tar.addfile(info)
+
+        dest = self.pav_cfg.working_dir/'dups'
+        self.assertIsNone(extract.extract_tarball(tar_path, dest, 0o002))
+        self.assertEqual((dest/'a').read_bytes(), b'a-49' * 50)
+        self.assertEqual((dest/'b').read_bytes(), b'b-49' * 50)
+        self.assertTrue((dest/'c').is_symlink())
+
     def test_create_file(self):
         """Check that build time file creation is working correctly."""
 
@@ -265,6 +318,49 @@ class BuilderTests(PavTestCase):
             self.assertTrue(sym.is_symlink(),
                             msg="{} is not a symlink".format(sym))
 
+    def test_copy_methods(self):
+        """Check each of the build copy methods."""
+
+        config = self._quick_test_cfg()
+        config['build']['source_path'] = 'file_tests.tgz'
+        config['build']['copy_files'] = ['real.txt', 'rec/rec2/real*']
+
+        for method in build_copy.COPY_METHODS:
+            config['build']['copy_method'] = method
+            test = self._quick_test(config)
+            build_path = test.path/'build'
+            notes = [status.note for status in test.status.history()
+                     if status.state == STATES.BUILD_COPIED]
+            self.assertTrue(notes and notes[0].startswith(
+                "Performed {} copy".format(method)), msg=notes)
+
+            for real in 'real.txt', 'rec/rec2/real_r2.txt':
+                real = build_path/real
+                self.assertTrue(real.is_file() and not real.is_symlink(),
+                                msg="{} wasn't copied with {}".format(real, method))
+                self.assertTrue(real.stat().st_mode & stat.S_IWUSR)
+
+            sym_txt = build_path/'sym.txt'
+            orig_sym_txt = test.builder.path/'sym.txt'
+            if method == 'toplevel':
+                # Only directories with copied files are recreated.
+                self.assertTrue((build_path/'wild').is_symlink())
+                self.assertFalse((build_path/'rec').is_symlink())
+                self.assertFalse((build_path/'rec'/'rec2').is_symlink())
+                self.assertTrue((build_path/'rec'/'sym_r1.txt').is_symlink())
+                self.assertTrue(sym_txt.is_symlink())
+            elif method == 'hardlink' and not sym_txt.is_symlink():
+                self.assertTrue(sym_txt.samefile(orig_sym_txt))
+                self.assertFalse(sym_txt.stat().st_mode & stat.S_IWUSR)
+            elif method == 'reflink' and not sym_txt.is_symlink():
+                self.assertFalse(sym_txt.samefile(orig_sym_txt))
+                self.assertEqual(sym_txt.read_bytes(), orig_sym_txt.read_bytes())
+            else:
+                # Symlinks, or the fallback to them.
+                self.assertTrue(sym_txt.is_symlink())
+                self.assertFalse((build_path/'wild').is_symlink())
+                self.assertTrue((build_path/'wild'/'sym.dat').is_symlink())
+
     @unittest.skipIf(wget.missing_libs(),
                      "The wget module is missing required libs.")
     def test_src_urls(self):
@@ -463,3 +559,49 @@ class BuilderTests(PavTestCase):
 
         with self.assertRaises(TestRunError):
             self._quick_test(cfg)
+
+    def test_source_dir_hash(self):
+        """Source directories should be hashed by content."""
+
+        src_dir = self.pav_cfg.working_dir/'hash_src'
+        if src_dir.exists():
+            shutil.rmtree(str(src_dir))
+        (src_dir/'sub').mkdir(parents=True)
+        (src_dir/'sub'/'a.c').write_text('int main() {}')
+        (src_dir/'build.sh').write_text('make')
+
+        cfg = self._quick_test_cfg()
+        cfg['build']['source_path'] = str(src_dir)
+
+        name = self._quick_test(cfg, build=False, finalize=False).builder.name
+        # Touching a file doesn't change the build.
+        (src_dir/'build.sh').touch()
+        self.assertEqual(self._quick_test(cfg, build=False, finalize=False).builder.name,
+                         name)
+
+        # Neither does hashing an identical copy.
+        copy_dir = self.pav_cfg.working_dir/'hash_src_copy'
+        if copy_dir.exists():
+            shutil.rmtree(str(copy_dir))
+        shutil.copytree(str(src_dir), str(copy_dir))
+        copy_cfg = copy.deepcopy(cfg)
+        copy_cfg['build']['source_path'] = str(copy_dir)
+        self.assertEqual(
+            self._quick_test(copy_cfg, build=False, finalize=False).builder.name, name)
+
+        # Changing a file's contents (even keeping the same size) does.
+        (src_dir/'sub'/'a.c').write_text('int main() {1}')
+        changed = self._quick_test(cfg, build=False, finalize=False).builder.name
+        self.assertNotEqual(changed, name)
+
+        (src_dir/'sub'/'a.c').write_text('int main() {2}')
+        self.assertNotEqual(self._quick_test(cfg, build=False, finalize=False).builder.name,
+                            changed)
+
+        # As do new files and executable bits.
+        (src_dir/'new').write_text('')
+        new_name = self._quick_test(cfg, build=False, finalize=False).builder.name
+        self.assertNotEqual(new_name, changed)
+        (src_dir/'new').chmod(0o755)
+        self.assertNotEqual(self._quick_test(cfg, build=False, finalize=False).builder.name,
+                            new_name)
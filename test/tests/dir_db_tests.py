@@ -2,7 +2,9 @@
 
 import io
 import json
+import os
 import shutil
+import time
 from pathlib import Path
 
 from pavilion import dir_db
@@ -85,6 +87,66 @@ class DirDBTests(unittest.PavTestCase):
 
         shutil.rmtree(index_path.as_posix())
 
+    def test_index_change_detection(self):
+        """Check that unchanged directories and entries aren't rescanned or
+        re-transformed."""
+
+        index_path = self.pav_cfg.working_dir/'test_index_changes'  # type: Path
+        shutil.rmtree(index_path, ignore_errors=True)
+        index_path.mkdir()
+
+        entries = {}
+        for i in range(10):
+            entries[i] = self._make_entry(index_path, i, complete=bool(i % 2))
+
+        # Push all the mtimes into the past, so they're trusted as unchanged.
+        past = time.time() - 60
+        for path in list(index_path.iterdir()) + [index_path]:
+            os.utime(path.as_posix(), (past, past))
+
+        def do_index():
+            verbose = io.StringIO()
+            idx = dir_db.index(self.pav_cfg, id_dir=index_path, idx_name='test',
+                               transform=entry_transform, refresh_period=0,
+                               verbose=verbose)
+            return idx, verbose.getvalue()
+
+        idx, msgs = do_index()
+        self.assertEqual(idx, entries)
+        self.assertIn("10 entries transformed, 0 served from the index", msgs)
+
+        # Creating the index changed the directory mtime, so undo that.
+        os.utime(index_path.as_posix(), (past, past))
+        idx, msgs = do_index()
+        self.assertEqual(idx, entries)
+        self.assertIn("0 entries transformed, 10 served from the index", msgs)
+
+        # Nothing changed, so nothing should be transformed or scanned.
+        idx, msgs = do_index()
+        self.assertEqual(idx, entries)
+        self.assertIn("0 entries transformed, 10 served from the index", msgs)
+        self.assertIn("scan skipped", msgs)
+
+        # Changing an incomplete entry should cause just that entry to update.
+        entries[2] = self._make_entry(index_path, 2, complete=False, d=1)
+        self._make_entry(index_path, 3, d=1)
+        past += 1
+        for i in 2, 3:
+            os.utime((index_path/str(i)).as_posix(), (past, past))
+        os.utime(index_path.as_posix(), (past - 1, past - 1))
+        idx, msgs = do_index()
+        self.assertEqual(idx, entries)
+        self.assertIn("1 entries transformed, 9 served from the index", msgs)
+        self.assertIn("scan skipped", msgs)
+
+        # New entries change the directory mtime, which forces a scan.
+        entries[20] = self._make_entry(index_path, 20)
+        idx, msgs = do_index()
+        self.assertEqual(idx, entries)
+        self.assertNotIn("scan skipped", msgs)
+
+        shutil.rmtree(index_path.as_posix())
+
     def _make_entry(self, index_path, id_, complete=True, d=0):
         value = {'a': id_ * 2,
                  'id': id_,
@@ -100,3 +162,62 @@ class DirDBTests(unittest.PavTestCase):
             json.dump(value, data_file)
 
         return value
+
+    def test_select_index_filters(self):
+        """Check that index column filters and ordering give the same results as
+        plain filter and order functions."""
+
+        index_path = self.pav_cfg.working_dir/'test_select_index'  # type: Path
+        shutil.rmtree(index_path, ignore_errors=True)
+        index_path.mkdir()
+
+        for i in range(30):
+            self._make_entry(index_path, i, complete=bool(i % 3))
+
+        def order_func(data):
+            return data['a']
+
+        def filter_func(data):
+            return data['complete'] and data['3']
+
+        expected = dir_db.select(
+            self.pav_cfg, index_path,
+            transform=entry_transform,
+            filter_func=filter_func,
+            order_func=order_func,
+            order_asc=False,
+            use_index=False,
+            limit=5)
+
+        selected = dir_db.select(
+            self.pav_cfg, index_path,
+            transform=entry_transform,
+            filter_func=filter_func,
+            order_func=order_func,
+            order_asc=False,
+            idx_filters=[dir_db.IndexFilter('complete', '=', True),
+                         dir_db.IndexFilter('id', '>', 2)],
+            limit=5)
+
+        self.assertEqual(selected.data, expected.data)
+        self.assertEqual(selected.paths, expected.paths)
+
+        # Sorting by an index column should give the same results as sorting in python.
+        selected = dir_db.select(
+            self.pav_cfg, index_path,
+            transform=entry_transform,
+            filter_func=filter_func,
+            order_func=lambda d: d['id'],
+            order_asc=False,
+            idx_order='id',
+            use_index='test_select_index',
+            limit=5)
+
+        self.assertEqual(selected.data, expected.data)
+        self.assertEqual(selected.paths, expected.paths)
+
+        with self.assertRaises(ValueError):
+            dir_db.select(self.pav_cfg, index_path, transform=entry_transform,
+                          idx_filters=[dir_db.IndexFilter('bad; column', '=', 1)])
+
+        shutil.rmtree(index_path.as_posix())
@@ -50,7 +50,8 @@ class ResolverTests(PavTestCase):
 
         x_eval = {'x': args.x}
         y_evals = {'y' + str(i): args.y[i] for i in range(len(args.y))}
-        eval_res = graph_cmd.gather_graph_data(x_eval, y_evals, results)
+        eval_res, errors = graph_cmd.gather_graph_data(x_eval, y_evals, [results])
+        self.assertEqual(errors, [])
 
         eval_expected = {
             235: {'y0': 123424}
@@ -58,6 +59,10 @@ class ResolverTests(PavTestCase):
 
         self.assertEqual(eval_res, eval_expected)
 
+        # Only the result keys used by the evaluations need to be loaded.
+        self.assertEqual(graph_cmd.get_result_keys({'x': 'id', 'y0': 'Info.*'}),
+                         ['Info', 'id', 'result', 'return_value'])
+
         # Get multiple values out of results.
         args = arg_parser.parse_args([
             'graph',
@@ -68,7 +73,8 @@ class ResolverTests(PavTestCase):
 
         x_eval = {'x': args.x}
         y_evals = {'y' + str(i): args.y[i] for i in range(len(args.y))}
-        eval_res = graph_cmd.gather_graph_data(x_eval, y_evals, results)
+        eval_res, errors = graph_cmd.gather_graph_data(x_eval, y_evals, [results])
+        self.assertEqual(errors, [])
 
         eval_expected = {
             235: {'y0': [123424, 14214]}
@@ -106,7 +112,8 @@ class ResolverTests(PavTestCase):
 
         x_eval = {'x': args.x}
         y_evals = {'y' + str(i): args.y[i] for i in range(len(args.y))}
-        eval_res = graph_cmd.gather_graph_data(x_eval, y_evals, results)
+        eval_res, errors = graph_cmd.gather_graph_data(x_eval, y_evals, [results])
+        self.assertEqual(errors, [])
 
         eval_expected = {
             1: {'y0': 123424},
@@ -127,7 +134,8 @@ class ResolverTests(PavTestCase):
 
         x_eval = {'x': args.x}
         y_evals = {'y' + str(i): args.y[i] for i in range(len(args.y))}
-        eval_res = graph_cmd.gather_graph_data(x_eval, y_evals, results)
+        eval_res, errors = graph_cmd.gather_graph_data(x_eval, y_evals, [results])
+        self.assertEqual(errors, [])
 
         eval_expected = {
             1: {'y0': 123424, 'y1': 14214},
@@ -137,6 +145,14 @@ class ResolverTests(PavTestCase):
 
         self.assertEqual(eval_res, eval_expected)
 
+        # Tests whose results can't be evaluated are left out.
+        bad_results = {'test': 'Test2', 'result': 'PASS', 'id': 236}
+        eval_res, errors = graph_cmd.gather_graph_data(x_eval, y_evals,
+                                                       [bad_results, results])
+        self.assertEqual(eval_res, eval_expected)
+        self.assertEqual(len(errors), 1)
+        self.assertIn('236', errors[0])
+
     @unittest.skipIf(not has_matplotlib(), "matplotlib not found.")
     def test_graph_cmd(self):
         """Test the full graph command."""
@@ -5,6 +5,8 @@ from pathlib import Path
 
 from pavilion import arguments
 from pavilion import commands
+from pavilion import result
+from pavilion import schedulers
 from pavilion.unittest import PavTestCase
 
 
@@ -57,3 +59,48 @@ class MaintCmdTest(PavTestCase):
         self.assertEqual(err, '')
 
         self._cmp_files(tmp_path, self.pav_cfg.result_log)
+
+    def test_node_inventory(self):
+        """Check that we can pre-warm the node inventory cache."""
+
+        maint_cmd = commands.get_command('maint')
+        maint_cmd.silence()
+
+        parser = arguments.get_parser()
+        args = parser.parse_args(['maint', 'node_inventory', 'dummy'])
+
+        self.assertEqual(maint_cmd.run(self.pav_cfg, args), 0)
+        out, err = maint_cmd.clear_output()
+        self.assertEqual(err, '')
+        self.assertIn('dummy', out)
+
+        dummy = schedulers.get_plugin('dummy')
+        inv_path = dummy._node_inventory_path(self.pav_cfg)
+        self.assertTrue(inv_path.exists())
+        inv_path.unlink()
+
+    def test_result_store(self):
+        """Check that we can bring the result store up to date."""
+
+        test = self._quick_test()
+        results = test.gather_results(test.run())
+        # Save the results without adding them to the store.
+        test._pav_cfg = test._pav_cfg.copy()
+        test._pav_cfg['result_store'] = False
+        test.save_results(results)
+
+        store = result.ResultStore(self.pav_cfg.working_dir)
+        test_path = test.path.resolve()
+        self.assertNotIn(test_path, store.get([test_path]))
+
+        maint_cmd = commands.get_command('maint')
+        maint_cmd.silence()
+
+        parser = arguments.get_parser()
+        args = parser.parse_args(['maint', 'result_store'])
+
+        self.assertEqual(maint_cmd.run(self.pav_cfg, args), 0)
+        out, err = maint_cmd.clear_output()
+        self.assertEqual(err, '')
+
+        self.assertEqual(store.get([test_path])[test_path], results)
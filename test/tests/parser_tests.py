@@ -330,3 +330,94 @@ class ParserTests(unittest.PavTestCase):
                 self.fail(
                     "Failed to fail on '{}', parsed to: '{}'"
                     .format(string, result))
+
+    def test_parse_cache(self):
+        """Check that cached parse results are reused, bounded, and render
+        the same way every time."""
+
+        cache = parsers.ParseCache(size=2)
+        calls = []
+
+        def parse(text):
+            calls.append(text)
+            return text.upper()
+
+        self.assertEqual(cache.get('kind', 'a', parse), 'A')
+        self.assertEqual(cache.get('kind', 'a', parse), 'A')
+        self.assertEqual(cache.get('other', 'a', parse), 'A')
+        self.assertEqual(calls, ['a', 'a'])
+        # 'kind' was used least recently, so it gets evicted.
+        cache.get('kind', 'b', parse)
+        cache.get('other', 'a', parse)
+        cache.get('kind', 'a', parse)
+        self.assertEqual(calls, ['a', 'a', 'b', 'a'])
+        self.assertEqual(cache.stats(),
+                         {'size': 2, 'entries': 2, 'hits': 2, 'misses': 4})
+
+        cache.resize(0)
+        cache.get('kind', 'a', parse)
+        cache.get('kind', 'a', parse)
+        self.assertEqual(cache.stats()['entries'], 0)
+        self.assertEqual(len(calls), 6)
+
+        # Resolving the same strings repeatedly (and so through the cached
+        # templates) should give the same results each time.
+        strings = {
+            r'\{{ {{str1}} \~': '{{ hello ~',
+            '[~{{more_ints}}-{{"ab"}}~_]': '0-ab_1-ab',
+            '{{ len("hi") + int1 }} {{ints.2}}': '3 2',
+        }
+        for _ in range(3):
+            for string, expected in strings.items():
+                self.assertEqual(parsers.parse_text(string, self.var_man), expected)
+
+        self.assertIs(parsers.compile_string('{{ints.2}}'),
+                      parsers.compile_string('{{ints.2}}'))
+        self.assertEqual(parsers.compile_string('a {{ints.2}} [~{{floats}}~]').variables,
+                         ['ints.2', 'floats'])
+
+    def test_evaluation_plan(self):
+        """Check that compiled evaluation plans give the same values (and errors)
+        as transforming the parse tree."""
+
+        results_list = [
+            {'a': 1, 'b': 2.5, 'c': 'hello', 'd': True,
+             'per_file': {'n1': {'x': 3, 'y': '4'}, 'n2': {'x': 5, 'y': '6'}},
+             'l': [1, 2, 3]},
+            {'a': 0, 'b': -1.0, 'c': 'bye', 'd': False,
+             'per_file': {'n1': {'x': 7, 'y': '8'}}, 'l': [4, 5, 6]},
+            # Missing keys and bad types.
+            {'a': 'nope', 'per_file': {'n1': {}}, 'l': []},
+        ]
+
+        expressions = [
+            '', 'a', 'a + b * 2', '(a + b) ^ 2', '-a', 'not d', 'a < b <= 3',
+            'a == 1 or c == "bye"', 'a and d', 'per_file.*.x', 'sum(per_file.*.x)',
+            'avg(per_file.*.x) > 4', 'int("10", 2) + per_file.n1.y // 2', 'l.1 % 2',
+            '[a, b, 3] * 2', 'len(c)', 'a / 0', 'l.5', 'missing', 'a.*',
+        ]
+
+        for expr in expressions:
+            tree = parsers.parse_expression(expr)
+            plan = parsers.get_evaluation_plan(expr)
+            self.assertIs(plan, parsers.get_evaluation_plan(expr))
+            self.assertEqual(plan.var_refs, parsers.VarRefVisitor().visit(tree))
+
+            expected = []
+            for results in results_list:
+                try:
+                    expected.append(
+                        parsers.EvaluationExprTransformer(results).transform(tree))
+                except (parsers.ParserValueError, TypeError, ValueError) as err:
+                    expected.append(err)
+
+            values = plan.evaluate_many(results_list)
+            for results, value, exp_value in zip(results_list, values, expected):
+                if isinstance(exp_value, Exception):
+                    self.assertIsInstance(value, type(exp_value), msg=expr)
+                    self.assertEqual(str(value), str(exp_value), msg=expr)
+                    with self.assertRaises(type(exp_value)):
+                        plan.evaluate(results)
+                else:
+                    self.assertEqual(value, exp_value, msg=expr)
+                    self.assertEqual(plan.evaluate(results), exp_value, msg=expr)
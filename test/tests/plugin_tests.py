@@ -77,6 +77,71 @@ class PluginTests(PavTestCase):
 
         plugins._reset_plugins()
 
+    def test_lazy_plugins(self):
+        """Plugins in the plugin manifest should only be loaded when needed."""
+
+        pav_cfg = self.make_pav_config(config_dirs=[
+            self.TEST_DATA_ROOT/'pav_config_dir',
+            self.TEST_DATA_ROOT/'pav_config_dir2'])
+
+        # The first initialization will populate the manifest.
+        plugins.initialize_plugins(pav_cfg)
+        plugins._reset_plugins()
+        arguments.get_parser()
+
+        plugins.initialize_plugins(pav_cfg)
+        pman = plugins._PLUGIN_MANAGER
+        self.assertTrue(pman.unloaded('sys', 'dumb_os'))
+        self.assertTrue(pman.unloaded('command', 'poof'))
+
+        # Plugins are loaded when looked up by name.
+        self.assertEqual(sys_vars.SysVarDict(unique=True)['dumb_os'], 'bieber')
+        self.assertFalse(pman.unloaded('sys', 'dumb_os'))
+        self.assertTrue(pman.unloaded('sys'))
+
+        parser = argparse.ArgumentParser()
+        commands.get_command('poof').run(pav_cfg, parser.parse_args([]))
+        self.assertFalse(pman.unloaded('command', 'poof'))
+
+        # Or when they're all needed.
+        self.assertIn('dumb_user', sys_vars.SysVarDict(unique=True).keys())
+        self.assertFalse(pman.unloaded('sys'))
+
+        plugins._reset_plugins()
+
+    def test_lazy_plugin_override(self):
+        """Unloaded plugins that override a core plugin should still take
+        precedence over it."""
+
+        cfg_dir = self.pav_cfg.working_dir/'override_config'
+        sys_dir = cfg_dir/'plugins'/'sys'
+        sys_dir.mkdir(parents=True, exist_ok=True)
+        (cfg_dir/'config.yaml').write_text('')
+        (sys_dir/'my_sys_name.yapsy-plugin').write_text(
+            "[Core]\nName = My Sys Name\nModule = my_sys_name\n")
+        (sys_dir/'my_sys_name.py').write_text(
+            "from pavilion.sys_vars import base_classes\n\n"
+            "class MySysName(base_classes.SystemPlugin):\n"
+            "    def __init__(self):\n"
+            "        super().__init__(name='sys_name', description='mine',\n"
+            "                         priority=self.PRIO_USER)\n\n"
+            "    def _get(self):\n"
+            "        return 'overridden'\n")
+
+        pav_cfg = self.make_pav_config(config_dirs=[
+            self.TEST_DATA_ROOT/'pav_config_dir', cfg_dir])
+
+        # The first initialization will populate the manifest.
+        plugins.initialize_plugins(pav_cfg)
+        plugins._reset_plugins()
+        arguments.get_parser()
+
+        plugins.initialize_plugins(pav_cfg)
+        self.assertTrue(plugins._PLUGIN_MANAGER.unloaded('sys', 'sys_name'))
+        self.assertEqual(sys_vars.SysVarDict(unique=True)['sys_name'], 'overridden')
+
+        plugins._reset_plugins()
+
     def test_plugin_conflicts(self):
 
         pav_cfg = self.make_pav_config(config_dirs=[
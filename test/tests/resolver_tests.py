@@ -6,6 +6,7 @@ import random
 
 from pavilion import arguments
 from pavilion import commands
+from pavilion import config
 from pavilion import plugins
 from pavilion import resolve
 from pavilion import resolver
@@ -16,6 +17,7 @@ from pavilion.errors import TestConfigError, TestRunError
 from pavilion.pavilion_variables import PavVars
 from pavilion.resolver import variables
 from pavilion.sys_vars import base_classes
+from pavilion.test_config import ConfigCache
 from pavilion.unittest import PavTestCase
 
 
@@ -736,3 +738,126 @@ class ResolverTests(PavTestCase):
 
         # This test should be fine.
         self.resolver.load(['sched_errors.d_no_nodes'])
+
+    def test_resolve_modes(self):
+        """Check that each of the resolution modes gives the same tests, in
+        the same order."""
+
+        expected = None
+        for mode in 'serial', 'thread', 'process':
+            res = resolver.TestConfigResolver(self.pav_cfg)
+            res.RESOLVE_SERIAL_MAX = 100 if mode == 'serial' else 0
+            res.RESOLVE_THREAD_MAX = 100 if mode == 'thread' else 0
+            if self.pav_cfg['max_cpu'] > 1:
+                self.assertEqual(res.resolve_mode(3), mode)
+
+            ptests = res.load(['hello_world'], host='this')
+            results = [(ptest.config['name'], ptest.var_man.as_dict())
+                       for ptest in ptests]
+            if expected is None:
+                expected = results
+            else:
+                self.assertEqual(results, expected, mode)
+
+        # Errors in the workers should still make it back to us.
+        res = resolver.TestConfigResolver(self.pav_cfg)
+        res.RESOLVE_SERIAL_MAX = res.RESOLVE_THREAD_MAX = 0
+        with self.assertRaises(TestConfigError):
+            res.load(['sched_errors'])
+
+    def test_resolve_modes_advanced(self):
+        """Check that tests for an advanced scheduler resolved in parallel can
+        still be scheduled, since the scheduler keeps per-test node info."""
+
+        base_raw = self.resolver.load_raw_configs(['hello_world.narf'], 'this', [])[0]
+        node_selects = ('contiguous', 'random', 'distributed', 'rand_dist')
+
+        raw_tests = []
+        for i in range(20):
+            raw_test = copy.deepcopy(base_raw)
+            raw_test['name'] = 'narf{}'.format(i)
+            raw_test['schedule'] = {
+                'nodes': str(i % 4 + 1),
+                'partition': 'baz' if i % 2 else 'foo',
+                'share_allocation': 'False',
+                'chunking': {
+                    'size': str(i % 3 * 10),
+                    'node_selection': node_selects[i % 4],
+                    'extra': 'discard' if i % 5 else 'backfill',
+                },
+            }
+            if i % 3 == 2:
+                raw_test['schedule']['exclude_nodes'] = ['node0{}'.format(i % 10)]
+            raw_tests.append(raw_test)
+
+        dummy = schedulers.get_plugin('dummy')
+
+        for mode in 'thread', 'process':
+            res = resolver.TestConfigResolver(self.pav_cfg)
+            res.RESOLVE_SERIAL_MAX = 0
+            res.RESOLVE_THREAD_MAX = 100 if mode == 'thread' else 0
+            if self.pav_cfg['max_cpu'] > 1:
+                self.assertEqual(res.resolve_mode(len(raw_tests)), mode)
+
+            ptests = res._resolve_raw_tests(copy.deepcopy(raw_tests), io.StringIO())
+            self.assertEqual([ptest.config['name'] for ptest in ptests],
+                             [raw_test['name'] for raw_test in raw_tests])
+
+            tests = []
+            for ptest in ptests:
+                test = test_run.TestRun(self.pav_cfg, ptest.config, var_man=ptest.var_man)
+                test.save()
+                test.build()
+                tests.append(test)
+
+            dummy.schedule_tests(self.pav_cfg, tests)
+
+            for test in tests:
+                test.wait(timeout=20)
+                self.assertEqual(test.results['result'], 'PASS', mode)
+
+    def test_config_cache(self):
+        """Check that cached configs are reused, and invalidated when their source
+        files change."""
+
+        cache = ConfigCache(self.pav_cfg.working_dir, config.get_version())
+        src_path = self.pav_cfg.working_dir/'cache_test.yaml'
+        src_path.write_text('a: 1\n')
+
+        loads = []
+
+        def loader():
+            loads.append(1)
+            return src_path.read_text()
+
+        self.assertEqual(cache.load('test', [src_path], loader), 'a: 1\n')
+        self.assertEqual(cache.load('test', [src_path], loader), 'a: 1\n')
+        self.assertEqual(len(loads), 1)
+        # Different kinds of data from the same file are cached separately.
+        cache.load('test2', [src_path], loader)
+        self.assertEqual(len(loads), 2)
+
+        # Same size, and likely the same mtime.
+        src_path.write_text('a: 2\n')
+        self.assertEqual(cache.load('test', [src_path], loader), 'a: 2\n')
+        self.assertEqual(len(loads), 3)
+
+        # Errors aren't cached.
+        def bad_loader():
+            raise ValueError("oops")
+
+        with self.assertRaises(ValueError):
+            cache.load('bad', [src_path], bad_loader)
+        self.assertEqual(cache.load('bad', [src_path], loader), 'a: 2\n')
+
+        # Resolving with a warm cache should give the same results.
+        res = resolver.TestConfigResolver(self.pav_cfg)
+        cold = res.find_all_tests()
+        warm = res.find_all_tests()
+        self.assertEqual(sorted(cold.keys()), sorted(warm.keys()))
+        for suite_name in cold:
+            self.assertEqual(cold[suite_name]['tests'], warm[suite_name]['tests'])
+
+        cold = [ptest.config for ptest in res.load(['hello_world'], host='this')]
+        warm = [ptest.config for ptest in res.load(['hello_world'], host='this')]
+        self.assertEqual(cold, warm)
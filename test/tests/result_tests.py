@@ -2,8 +2,10 @@
 
 import copy
 import datetime
+import io
 import json
 import logging
+import pickle
 import pprint
 from collections import OrderedDict
 
@@ -14,8 +16,10 @@ from pavilion import arguments
 from pavilion import commands
 from pavilion import config
 from pavilion import result
+from pavilion import result_parsers
+from pavilion import result_utils
 from pavilion import utils
-from pavilion.result import ResultError, base
+from pavilion.result import ResultError, base, parse
 from pavilion.result_parsers import base_classes
 from pavilion.test_run import TestRun
 from pavilion.unittest import PavTestCase
@@ -234,6 +238,113 @@ class ResultParserTests(PavTestCase):
                          msg="All hidden ('_' prefixed) result keys were "
                              "supposed to be deleted.")
 
+    def test_process_file(self):
+        """Check that parsing many keys from a file in a single pass gets the same
+        results as parsing each separately would."""
+
+        path = self.pav_cfg.working_dir/'process_file_test.log'
+        # The last line has no trailing newline.
+        path.write_text('\n'.join([
+            'A: 1', 'B: 2', 'B: 3', 'C: 4', 'B: 5', 'B: 6', 'C: 7', 'D: 8', 'B: 2']))
+
+        regex = result_parsers.get_plugin('regex')
+        key_confs = {
+            'first_b': {'for_lines_matching': '^B:'},
+            'all_b': {'for_lines_matching': '^B:', 'match_select': 'all'},
+            'uniq_b': {'for_lines_matching': '^B:', 'match_select': 'uniq'},
+            'last_b': {'for_lines_matching': '^B:', 'match_select': 'last'},
+            # Overlapping partial matches of the conditions.
+            'bbc': {'preceded_by': ['^B:', '^B:'], 'for_lines_matching': '^C:',
+                    'match_select': 'all'},
+            'bb': {'preceded_by': ['^B:'], 'for_lines_matching': '^B:',
+                   'match_select': 'all'},
+            'out_of_range': {'for_lines_matching': '^C:', 'match_select': '5'},
+            'nothing': {'for_lines_matching': '^E:', 'match_select': 'all'},
+            'result': {'for_lines_matching': '^D:', 'action': 'true'},
+            'bad_regex': {'for_lines_matching': '^(B:'},
+        }
+        key_sets = []
+        for key, conf in key_confs.items():
+            conf['regex'] = r'.: (\d)'
+            key_sets.append(parse.KeySet('regex', key, regex.set_parser_defaults(conf, {})))
+
+        file_results, _ = parse.process_file((path, key_sets))
+        results = {p_result.key: p_result.value for p_result in file_results}
+
+        expected = {
+            'first_b': '2',
+            'all_b': ['2', '3', '5', '6', '2'],
+            'uniq_b': ['2', '3', '5', '6'],
+            'last_b': '2',
+            'bbc': ['4', '7'],
+            'bb': ['3', '6'],
+            'out_of_range': None,
+            'nothing': [],
+            'result': '8',
+            'bad_regex': None,
+        }
+        for key, value in expected.items():
+            self.assertEqual(results[key], value, msg="Difference for key {}".format(key))
+        self.assertIn("Invalid 'preceded_by' or 'for_lines_matching' regex",
+                      results[result.RESULT_ERRORS])
+
+        # Key sets are pickled, without their parser plugin, when sent to worker
+        # processes.
+        key_sets = pickle.loads(pickle.dumps(key_sets))
+        file_results, _ = parse.process_file((path, key_sets))
+        self.assertEqual({p_result.key: p_result.value for p_result in file_results},
+                         results)
+
+    def test_result_pool(self):
+        """Check that gathering results for several tests through a shared result
+        pool gets the same results as gathering them one at a time."""
+
+        cfg = self._quick_test_cfg()
+        cfg['run']['cmds'] = [
+            'for i in 1 2 3 4 5; do echo "val: $i" > out$i.log; done',
+            'echo "val: 6" >> out5.log',
+        ]
+        cfg['result_parse'] = {
+            'regex': {
+                'vals': {
+                    'files': ['out*.log'],
+                    'regex': r'val: (\d)',
+                    'per_file': base_classes.PER_LIST,
+                },
+                'last': {
+                    'files': ['out*.log'],
+                    'regex': r'val: (\d)',
+                    'match_select': base_classes.MATCH_LAST,
+                    'per_file': base_classes.PER_NAME,
+                },
+                'missing': {
+                    'files': ['nope*.log'],
+                    'regex': r'val',
+                },
+            }
+        }
+
+        tests = [self._quick_test(cfg, 'result_pool_{}'.format(i)) for i in range(3)]
+        for test in tests:
+            test.run()
+
+        expected = [test.gather_results(0, regather=True) for test in tests]
+
+        with result.ResultPool(2) as result_pool:
+            for test in tests:
+                result_pool.submit(test)
+
+            pooled = [test.gather_results(0, regather=True, result_pool=result_pool)
+                      for test in tests]
+
+            # Tests that weren't submitted get collected too.
+            pooled.append(tests[0].gather_results(0, regather=True,
+                                                  result_pool=result_pool))
+
+        self.assertEqual(pooled, expected + expected[:1])
+        self.assertEqual(pooled[0]['vals'], [1, 2, 3, 4, 5])
+        self.assertEqual(pooled[0]['per_file']['out5']['last'], 6)
+
     def test_check_config(self):
 
         # A list of regex
@@ -684,6 +795,41 @@ class ResultParserTests(PavTestCase):
             with self.assertRaises(pavilion.result.common.ResultError):
                 result.evaluate_results({}, error_conf, utils.IndentedLog())
 
+    def test_evaluate_many(self):
+        """Evaluating many result dicts at once should give the same values as
+        evaluating each, and only fail for the result dicts with errors."""
+
+        evaluations = {
+            'val_b': 'val_a + val_c',
+            'val_c': 'val_a*2',
+        }
+        results_list = [{'val_a': 1, 'return_value': 0},
+                        {'return_value': 1},
+                        {'val_a': 3, 'result': 'PASS'}]
+
+        expected = []
+        for results in results_list:
+            results = copy.deepcopy(results)
+            try:
+                result.evaluate_results(results, evaluations.copy())
+            except ResultError:
+                results = None
+            expected.append(results)
+
+        errors = result.evaluate_results_many(results_list, evaluations)
+        self.assertEqual([err is None for err in errors], [True, False, True])
+        self.assertIsInstance(errors[1], ResultError)
+        self.assertEqual(results_list[0], expected[0])
+        self.assertEqual(results_list[2], expected[2])
+        self.assertIsNone(expected[1])
+
+        # Errors that apply to every result dict are raised.
+        with self.assertRaises(ResultError):
+            result.evaluate_results_many(results_list, {'val_d': 'parse_error ++'})
+        with self.assertRaises(ResultError):
+            result.evaluate_results_many(results_list,
+                                         {'val_d': 'val_e + 3', 'val_e': 'val_d + 1'})
+
     def test_result_command(self):
         """Make sure the result command works as expected, including the
         re-run option."""
@@ -931,3 +1077,42 @@ class ResultParserTests(PavTestCase):
 
         self.assertEqual(flattened, answer)
         self.assertEqual(unflattened, answer)
+
+    def test_result_store(self):
+        """Check that results are saved to and loaded from the result store."""
+
+        tests = [self._quick_test(name='result_store{}'.format(i)) for i in range(3)]
+        for test in tests:
+            test.save_results(test.gather_results(test.run()))
+
+        store = result.ResultStore(self.pav_cfg.working_dir)
+        paths = [test.path.resolve() for test in tests]
+
+        stored = store.get(paths)
+        for path, test in zip(paths, tests):
+            self.assertEqual(stored[path], test.load_results())
+
+        stored = store.get(paths, keys=['id', 'result'])
+        for path, test in zip(paths, tests):
+            self.assertEqual(stored[path], {'id': test.id, 'result': test.result})
+
+        # Results that were changed outside of Pavilion aren't used.
+        test = tests[0]
+        results = test.load_results()
+        results['result'] = TestRun.FAIL
+        tmp_path = test.results_path.with_suffix('.tmp')
+        with tmp_path.open('w') as results_file:
+            json.dump(results, results_file)
+        tmp_path.rename(test.results_path)
+        self.assertNotIn(paths[0], store.get(paths))
+
+        # But will still be found.
+        found = result_utils.get_results_by_paths(self.pav_cfg, paths, io.StringIO())
+        self.assertEqual([res['id'] for res in found], [test.id for test in tests])
+        self.assertEqual(found[0]['result'], TestRun.FAIL)
+        self.assertEqual(found[1]['results_log'], tests[1].results_log.as_posix())
+
+        # Syncing the store should add the changed test back.
+        added, _ = store.sync()
+        self.assertGreaterEqual(added, 1)
+        self.assertEqual(store.get(paths[:1])[paths[0]], results)
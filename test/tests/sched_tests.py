@@ -1,11 +1,16 @@
 import copy
 import inspect
+import os
+import time
 
 import pavilion.schedulers
+from pavilion import clean
 from pavilion import output
+from pavilion.jobs import Job, JobError, NodeSnapshot
 from pavilion import schedulers
 from pavilion.schedulers import SchedulerPluginAdvanced
 from pavilion.schedulers import config as sconfig
+from pavilion.status_file import STATES
 from pavilion.types import NodeInfo, Nodes, NodeSet
 from pavilion.unittest import PavTestCase
 
@@ -222,6 +227,227 @@ class SchedTests(PavTestCase):
         svars = dummy.get_initial_vars({'include_nodes': ['node00']})
         self.assertEqual(len(svars['errors']), 1, msg="There should be an error here.")
 
+    def test_node_filtering_memo(self):
+        """Check that node filtering results are reused across tests with the same
+        filter options, and that chunks are carved correctly."""
+
+        dummy = type(pavilion.schedulers.get_plugin('dummy'))()  # type: SchedulerPluginAdvanced
+
+        filter_calls = []
+        orig_filter = dummy._filter_nodes
+
+        def count_filter(sched_config):
+            filter_calls.append(sched_config)
+            return orig_filter(sched_config)
+
+        dummy._filter_nodes = count_filter
+
+        list_id = dummy.get_initial_vars({'nodes': '1'})['node_list_id']
+        # Options that don't affect filtering shouldn't filter again.
+        self.assertEqual(
+            dummy.get_initial_vars({'nodes': '5', 'chunking': {'size': '10'}})['node_list_id'],
+            list_id)
+        self.assertEqual(len(filter_calls), 1)
+
+        # Filtering with different options that gives the same nodes should give
+        # the same node list.
+        self.assertEqual(
+            dummy.get_initial_vars({'nodes': '1', 'exclude_nodes': ['node00']})
+            ['node_list_id'], list_id)
+        self.assertEqual(len(filter_calls), 2)
+
+        self.assertNotEqual(
+            dummy.get_initial_vars({'nodes': '1', 'partition': 'baz'})['node_list_id'],
+            list_id)
+        self.assertEqual(len(dummy._node_lists), 2)
+
+        node_list = dummy._node_lists[int(list_id)]
+        for node_select in dummy.NODE_SELECTION:
+            for extra in sconfig.NODE_EXTRA_OPTIONS:
+                dummy.get_initial_vars({
+                    'nodes': '1',
+                    'chunking': {'size': '7', 'node_selection': node_select,
+                                 'extra': extra}})
+                chunks = dummy._chunks[(int(list_id), 7, node_select, extra)]
+                # Every node should be used, and only the backfilled chunk
+                # may overlap the others.
+                self.assertEqual(set().union(*chunks), set(node_list)
+                                 if extra == sconfig.BACKFILL else
+                                 set().union(*chunks[:len(node_list)//7]))
+                self.assertEqual(len(set().union(*chunks[:len(node_list)//7])),
+                                 len(node_list)//7*7)
+                if node_select == 'contiguous':
+                    self.assertEqual(sorted(chunks[0]), node_list[:7])
+
+    def test_node_filtering_memo_custom(self):
+        """Node filtering results shouldn't be reused for plugins with custom
+        filters, unless they declare the options those filters use."""
+
+        dummy_cls = type(pavilion.schedulers.get_plugin('dummy'))
+
+        class CustomFilter(dummy_cls):
+            """Filters on an option that isn't in NODE_FILTER_OPTIONS."""
+
+            def _filter_custom(self, sched_config, node_name, node):
+                if not sched_config['share_allocation'] and node_name.endswith('1'):
+                    return 'ends with 1'
+                return None
+
+        class DeclaredFilter(CustomFilter):
+            """Declares the option its custom filter uses."""
+
+            NODE_FILTER_OPTIONS = dummy_cls.NODE_FILTER_OPTIONS + ['share_allocation']
+
+        self.assertTrue(dummy_cls._memoize_filters())
+        self.assertFalse(CustomFilter._memoize_filters())
+        self.assertTrue(DeclaredFilter._memoize_filters())
+
+        for plugin_cls in CustomFilter, DeclaredFilter:
+            plugin = plugin_cls()
+            shared_id = plugin.get_initial_vars({'share_allocation': 'True'})['node_list_id']
+            unshared_id = plugin.get_initial_vars(
+                {'share_allocation': 'False'})['node_list_id']
+            self.assertNotEqual(shared_id, unshared_id)
+
+    def test_job_statuses_fallback(self):
+        """Plugins that don't query job statuses in bulk should have each job
+        queried individually (and only once)."""
+
+        dummy = type(pavilion.schedulers.get_plugin('dummy'))()
+
+        queried = []
+        orig_job_status = dummy._job_status
+
+        def count_job_status(pav_cfg, job_info):
+            queried.append(job_info['id'])
+            return orig_job_status(pav_cfg, job_info)
+
+        dummy._job_status = count_job_status
+
+        cfg = self._quick_test_cfg()
+        cfg['scheduler'] = 'dummy'
+        tests = [self._quick_test(cfg, finalize=False) for _ in range(3)]
+
+        # The first two tests share a job.
+        job1 = Job.new(self.pav_cfg, tests[:2])
+        job1.info = {'id': '1'}
+        job2 = Job.new(self.pav_cfg, tests[2:])
+        job2.info = {'id': '2'}
+        tests[0].job = tests[1].job = job1
+        tests[2].job = job2
+
+        statuses = dummy.job_statuses(self.pav_cfg, tests)
+        self.assertEqual(sorted(queried), ['1', '2'])
+        self.assertEqual([status.state for status in statuses],
+                         [STATES.SCHEDULED, STATES.SCHEDULED, STATES.SCHED_ERROR])
+
+        # Recently queried statuses are cached.
+        dummy.job_statuses(self.pav_cfg, tests)
+        self.assertEqual(len(queried), 2)
+
+    def test_kickoff_partial_failure(self):
+        """Jobs submitted before a kickoff failure should still be recorded."""
+
+        dummy = type(pavilion.schedulers.get_plugin('dummy'))()
+        orig_kickoff = dummy._kickoff
+
+        def fail_second(pav_cfg, job, sched_config):
+            if job is kickoffs[1][1]:
+                raise schedulers.SchedulerPluginError("Kickoff failed.")
+            return orig_kickoff(pav_cfg, job, sched_config)
+
+        dummy._kickoff = fail_second
+
+        cfg = self._quick_test_cfg()
+        cfg['scheduler'] = 'dummy'
+        kickoffs = []
+        for _ in range(3):
+            test = self._quick_test(cfg, finalize=False)
+            header = schedulers.KickoffScriptHeader(
+                job_name='pav_{}'.format(test.name), sched_config={}, nodes=['node01'])
+            kickoffs.append((test, Job.new(self.pav_cfg, [test]), {}, header, 'kicked off'))
+
+        with self.assertRaises(schedulers.SchedulerPluginError):
+            dummy._kickoff_individual(self.pav_cfg, kickoffs)
+
+        test, job, _, _, _ = kickoffs[0]
+        self.assertIs(test.job, job)
+        self.assertEqual(job.info['id'], '1')
+        self.assertEqual(test.status.current().state, STATES.SCHEDULED)
+        for test, _, _, _, _ in kickoffs[1:]:
+            self.assertNotEqual(test.status.current().state, STATES.SCHEDULED)
+
+    def test_node_snapshots(self):
+        """Check that jobs share node info snapshots, and can load just the nodes
+        they need from them."""
+
+        nodes = Nodes({})
+        for i in range(20):
+            nodes['node{:02d}'.format(i)] = NodeInfo({'name': 'node{:02d}'.format(i),
+                                                      'cpus': i})
+
+        snapshot = NodeSnapshot.save(self.pav_cfg, nodes)
+        # Identical node info gives the same snapshot.
+        self.assertEqual(NodeSnapshot.save(self.pav_cfg, Nodes(dict(nodes))).path,
+                         snapshot.path)
+        self.assertEqual(snapshot.load(), nodes)
+
+        test = self._quick_test()
+        job = Job.new(self.pav_cfg, [test])
+        job_nodes = ['node03', 'node04', 'node05']
+        job.save_node_data({node: nodes[node] for node in job_nodes}, snapshot)
+        self.assertFalse((job.path/Job.NODE_INFO_FN).exists())
+
+        self.assertEqual(job.load_sched_data(), {node: nodes[node] for node in job_nodes})
+        self.assertEqual(job.load_sched_data(['node04']), {'node04': nodes['node04']})
+        with self.assertRaises(JobError):
+            job.load_sched_data(['node06'])
+
+        # Only unused (and not recently used) snapshots are cleaned up.
+        unused = NodeSnapshot.save(self.pav_cfg, Nodes({'node99': NodeInfo({})}))
+        for path in snapshot.path, unused.path:
+            os.utime(path.as_posix(), (time.time() - 2*clean.NODE_SNAPSHOT_MIN_AGE,)*2)
+        clean.delete_unused_node_snapshots(self.pav_cfg)
+        self.assertTrue(snapshot.path.exists())
+        self.assertFalse(unused.path.exists())
+
+    def test_node_inventory_cache(self):
+        """Check that the node inventory cache is shared and refreshed."""
+
+        dummy = pavilion.schedulers.get_plugin('dummy')  # type: SchedulerPluginAdvanced
+
+        pav_cfg = self.pav_cfg.copy()
+        pav_cfg.node_inventory_ttl = 600
+
+        inv_path = dummy._node_inventory_path(pav_cfg)
+        if inv_path.exists():
+            inv_path.unlink()
+
+        nodes = dummy.refresh_node_inventory(pav_cfg)
+        self.assertEqual(len(nodes), 100)
+        self.assertTrue(inv_path.exists())
+
+        # The cached data should be used, rather than asking the scheduler.
+        orig_get_raw = dummy._get_raw_node_data
+
+        def no_raw_data(sched_config):
+            raise RuntimeError("Should have used the cached node inventory.")
+
+        dummy._get_raw_node_data = no_raw_data
+        try:
+            sched_vars = dummy.get_initial_vars({}, pav_cfg)
+            node_list = dummy._node_lists[int(sched_vars.node_list_id())]
+            self.assertEqual(len(node_list), 90)
+
+            # An expired cache isn't used.
+            pav_cfg.node_inventory_ttl = 1
+            os.utime(inv_path.as_posix(), (time.time() - 10, time.time() - 10))
+            with self.assertRaises(RuntimeError):
+                dummy._get_cached_raw_node_data(pav_cfg, schedulers.validate_config({}))
+        finally:
+            dummy._get_raw_node_data = orig_get_raw
+            inv_path.unlink()
+
     def test_chunking_size(self):
         """"""
 
@@ -1,5 +1,7 @@
 import subprocess
 import copy
+import os
+import shutil
 import yc_yaml as yaml
 import time
 import unittest
@@ -189,6 +191,39 @@ class SlurmTests(PavTestCase):
         self.assertEqual(sched_status.state, STATES.SCHED_RUNNING)
         self.assertIn('COMPLETED', sched_status.note)
 
+    @unittest.skipIf(not has_slurm(), "Only runs on a system with slurm.")
+    def test_job_statuses(self):
+        """Make sure bulk job status queries match the individual ones."""
+
+        cfg = self._quick_test_cfg()
+        cfg['scheduler'] = 'slurm'
+        cfg.update(self.slurm_mode)
+
+        slurm = pavilion.schedulers.get_plugin('slurm')
+
+        tests = []
+        for match in 'JobState=CANCELLED', 'JobState=COMPLETED':
+            test = self._quick_test(cfg, name='slurm_job_statuses', finalize=False)
+            test.status.set(STATES.SCHEDULED, "not really though.")
+            test.job = self._get_job(match, test)
+            if test.job is not None:
+                tests.append(test)
+
+        # A job slurm has never heard of.
+        test = self._quick_test(cfg, name='slurm_job_statuses', finalize=False)
+        test.job = jobs.Job.new(self.pav_cfg, [test])
+        test.job.info = {
+            'id': '999999999',
+            'sys_name': sys_vars.get_vars(True)['sys_name']
+        }
+        tests.append(test)
+
+        bulk = slurm.job_statuses(self.pav_cfg, tests)
+        self.assertEqual(len(bulk), len(tests))
+        for test, status in zip(tests, bulk):
+            single = slurm._job_status(self.pav_cfg, test.job.info)
+            self.assertEqual(status.state, single.state)
+
     @unittest.skipIf(not has_slurm(), "Only runs on a system with slurm.")
     def test_sched_vars(self):
         """Make sure the scheduler vars are reasonable when not on a node."""
@@ -403,6 +438,111 @@ class SlurmTests(PavTestCase):
         for test in tests:
             self.assertEqual(len(list((test.job.path/'tests').iterdir())), 1)
 
+        # Both tests should have been submitted as tasks of a single job array.
+        array_ids = {test.job.info['id'].split('_')[0] for test in tests}
+        self.assertEqual(len(array_ids), 1)
+
+    MOCK_SLURM_DIR = Path(__file__).parents[1]/'data'/'mock_slurm'
+
+    def test_kickoff_array(self):
+        """Check that individually scheduled tests are submitted as job arrays, and that
+        the status of each array task is found. This uses the mock slurm commands in
+        test/data/mock_slurm, so it doesn't need slurm."""
+
+        state_dir = self.pav_cfg.working_dir/'mock_slurm'
+        shutil.rmtree(state_dir.as_posix(), ignore_errors=True)
+        state_dir.mkdir()
+
+        orig_environ = os.environ.copy()
+        os.environ['PATH'] = '{}:{}'.format(self.MOCK_SLURM_DIR, os.environ['PATH'])
+        os.environ['MOCK_SLURM_STATE'] = state_dir.as_posix()
+
+        slurm = pavilion.schedulers.get_plugin('slurm')
+        # Don't use (or leave behind) a node inventory cached for a real system.
+        inventory_path = slurm._node_inventory_path(self.pav_cfg)
+        if inventory_path.exists():
+            inventory_path.unlink()
+
+        try:
+            cfg = self._quick_test_cfg()
+            cfg['scheduler'] = 'slurm'
+            cfg['chunk'] = '0'
+            cfg['schedule'].update({'nodes': '1', 'share_allocation': 'False'})
+
+            # These leave the node picking to slurm (_schedule_flex_chunk).
+            flex_tests = [
+                self._quick_test(cfg=copy.deepcopy(cfg), name='kickoff_flex{}'.format(i),
+                                 finalize=False)
+                for i in range(2)]
+
+            # These are given nodes from a chunk (_schedule_indi_chunk).
+            cfg['schedule']['chunking'] = {'size': '2'}
+            indi_tests = [
+                self._quick_test(cfg=copy.deepcopy(cfg), name='kickoff_indi{}'.format(i),
+                                 finalize=False)
+                for i in range(2)]
+
+            # This asks for a different kind of allocation, so it's submitted alone.
+            cfg['schedule']['slurm'] = {'sbatch_extra': ['--comment "alone"']}
+            solo_test = self._quick_test(cfg=cfg, name='kickoff_solo', finalize=False)
+
+            tests = flex_tests + indi_tests + [solo_test]
+            slurm.schedule_tests(self.pav_cfg, tests)
+
+            sbatch_calls = (state_dir/'sbatch.log').read_text().splitlines()
+            self.assertEqual(len(sbatch_calls), 3)
+
+            for array_tests in flex_tests, indi_tests:
+                base_job = array_tests[0].job
+                array_id = base_job.info['id'].split('_')[0]
+                self.assertEqual([test.job.info['id'] for test in array_tests],
+                                 ['{}_0'.format(array_id), '{}_1'.format(array_id)])
+                self.assertNotEqual(array_tests[0].job.path, array_tests[1].job.path)
+
+                array_path = base_job.path/Slurm.ARRAY_KICKOFF_FN
+                self.assertIn(
+                    '{} --array=0-1 --output={} {}'.format(
+                        array_id, base_job.path/Slurm.ARRAY_LOG_FN.format('%a'),
+                        array_path),
+                    sbatch_calls)
+
+                script = array_path.read_text()
+                self.assertIn('#SBATCH -N 1', script)
+                self.assertIn('${kickoffs[$SLURM_ARRAY_TASK_ID]}', script)
+                kickoff_paths = [test.job.kickoff_path.as_posix() for test in array_tests]
+                self.assertLess(script.index(kickoff_paths[0]),
+                                script.index(kickoff_paths[1]))
+
+                for task_id, test in enumerate(array_tests):
+                    self.assertEqual(
+                        test.job.sched_log.resolve(),
+                        (base_job.path/Slurm.ARRAY_LOG_FN.format(task_id)).resolve())
+
+            solo_id = solo_test.job.info['id']
+            self.assertNotIn('_', solo_id)
+            self.assertIn('{} --output={} {}'.format(solo_id, solo_test.job.sched_log,
+                                                     solo_test.job.kickoff_path),
+                          sbatch_calls)
+
+            for test in tests:
+                self.assertEqual(test.status.current().state, STATES.SCHEDULED)
+
+            # Start one of the array tasks.
+            running_id = indi_tests[1].job.info['id']
+            jobs_path = state_dir/'jobs'
+            jobs_path.write_text(jobs_path.read_text().replace(
+                '{}|PENDING|'.format(running_id), '{}|RUNNING|'.format(running_id)))
+
+            statuses = slurm.job_statuses(self.pav_cfg, tests)
+            self.assertEqual([status.state for status in statuses],
+                             [STATES.SCHEDULED]*3 + [STATES.SCHED_RUNNING, STATES.SCHEDULED])
+            self.assertIn("'PENDING'", statuses[0].note)
+        finally:
+            os.environ.clear()
+            os.environ.update(orig_environ)
+            if inventory_path.exists():
+                inventory_path.unlink()
+
     @unittest.skipIf(not has_slurm(), "Only runs on a system with slurm.")
     def test_mpirun(self):
         """Schedule a test but run it with mpirun.
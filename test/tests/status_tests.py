@@ -108,3 +108,44 @@ class StatusTests(PavTestCase):
             self.assertIsNot(entry.when, None)
 
         fn.unlink()
+
+    def test_binary_status(self):
+        """Check the binary status file format."""
+
+        fn = Path(tempfile.mktemp())
+
+        status = TestStatusFile(fn, fmt=TestStatusFile.FORMAT_BINARY)
+        self.assertEqual(status.current().state, STATES.STATUS_CREATED)
+        self.assertTrue(status.has_state(STATES.STATUS_CREATED))
+        self.assertFalse(status.has_state(STATES.RUNNING))
+
+        states = [STATES.CREATED, STATES.RUNNING, STATES.RESULTS]
+        for state in states:
+            status.set(state, '{}_{}'.format(state, state.lower()))
+
+        # A fresh object should recognize the format.
+        status = TestStatusFile(fn)
+        self.assertEqual(len(status.history()), 4)
+        self.assertEqual(status.current().state, STATES.RESULTS)
+        self.assertEqual(status.current().note, 'RESULTS_results')
+        for state in states:
+            self.assertTrue(status.has_state(state))
+        self.assertFalse(status.has_state(STATES.COMPLETE))
+
+        status.set(STATES.COMPLETE, "done")
+        self.assertTrue(status.has_state(STATES.COMPLETE))
+
+        # Too long notes are truncated.
+        status.set(STATES.INFO, "This is " + "way "*10000 + "too long.")
+        self.assertLessEqual(len(status.current().note), TestStatusInfo.NOTE_MAX)
+
+        # A damaged header just means the records are read instead.
+        with fn.open('r+b') as status_file:
+            status_file.seek(TestStatusFile.HEADER.size)
+            status_file.write(b'garbage')
+        status = TestStatusFile(fn)
+        self.assertTrue(status.has_state(STATES.RUNNING))
+        self.assertFalse(status.has_state(STATES.BUILDING))
+        self.assertEqual(status.current().state, STATES.INFO)
+
+        fn.unlink()
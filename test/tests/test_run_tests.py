@@ -1,9 +1,11 @@
 """Test the 'TestRun' object'"""
 
 import io
+import threading
 
 from pavilion.errors import TestRunError
-from pavilion.test_run import TestRun
+from pavilion import status_utils
+from pavilion.test_run import TestRun, TestWaiter, TestSummary
 from pavilion.unittest import PavTestCase
 from pavilion.variables import VariableSetManager
 
@@ -200,3 +202,83 @@ class TestRunTests(PavTestCase):
         cmp_file = self.TEST_DATA_ROOT / 'create_files_results' / 'tmpl1.txt'
         self.assertTrue(test_file.is_symlink())
         self.assertEqual(test_file.open().read(), cmp_file.open().read())
+
+    def test_waiter(self):
+        """Check that the test waiter notices completions, with and without
+        inotify."""
+
+        for use_inotify in True, False:
+            tests = [self._quick_test(finalize=False) for _ in range(3)]
+            tests[0].set_run_complete()
+
+            with TestWaiter(tests, use_inotify=use_inotify) as waiter:
+                self.assertEqual(waiter.completed, [tests[0]])
+                self.assertEqual(len(waiter.remaining), 2)
+
+                # Nothing should complete here.
+                self.assertEqual(waiter.wait(timeout=0.3), [])
+
+                timer = threading.Timer(0.2, tests[1].set_run_complete)
+                timer.start()
+                self.assertEqual(waiter.wait(timeout=10, wait_for_all=False),
+                                 [tests[1]])
+                timer.join()
+
+                tests[2].set_run_complete()
+                self.assertEqual(waiter.wait(timeout=10), [tests[2]])
+                self.assertEqual(waiter.remaining, [])
+
+    def test_summary(self):
+        """Check that test summaries are saved with the test, and that they
+        can stand in for the full test when getting statuses."""
+
+        test = self._quick_test()
+        test.run()
+
+        summary = TestSummary.load(test.working_dir, test.id)
+        for attr in 'id', 'name', 'uuid', 'result', 'build_name', 'complete':
+            self.assertEqual(getattr(summary, attr), getattr(test, attr), attr)
+        self.assertEqual(summary.full_id, test.full_id)
+        self.assertEqual(summary.series, test.series)
+
+        test_status = status_utils.get_status(test, self.pav_cfg)
+        summ_status = status_utils.get_status(summary, self.pav_cfg)
+        for key in 'name', 'note', 'part', 'result', 'state', 'test_id':
+            self.assertEqual(summ_status[key], test_status[key], key)
+
+        # Tests without a summary can't be loaded as one.
+        (test.path/TestSummary.SUMMARY_FN).unlink()
+        with self.assertRaises(TestRunError):
+            TestSummary.load(test.working_dir, test.id)
+
+    def test_lazy_load(self):
+        """Check that lazily loaded tests match fully loaded ones, and that the
+        lazy components are only loaded on demand."""
+
+        test = self._quick_test()
+
+        eager = TestRun.load(self.pav_cfg, test.working_dir, test.id)
+        lazy = TestRun.load(self.pav_cfg, test.working_dir, test.id, lazy=True)
+
+        for attr in 'full_id', 'name', 'scheduler', 'sys_name', 'skipped', 'build_name':
+            self.assertEqual(getattr(lazy, attr), getattr(eager, attr), attr)
+
+        # pylint: disable=protected-access
+        self.assertIsNone(lazy._config)
+        self.assertIsNone(lazy._var_man)
+        self.assertIsNone(lazy._builder)
+        self.assertIsNone(lazy._skip_reasons)
+
+        self.assertEqual(lazy.config, eager.config)
+        self.assertEqual(lazy.var_man.as_dict(), eager.var_man.as_dict())
+        self.assertEqual(lazy.builder.name, eager.builder.name)
+        self.assertEqual(lazy.skip_reasons, eager.skip_reasons)
+        self.assertEqual(lazy.run_timeout, eager.run_timeout)
+        self.assertEqual(lazy.permute_vars, eager.permute_vars)
+
+        # Tests without a summary are still lazily loaded, just from the config.
+        (test.path/TestSummary.SUMMARY_FN).unlink()
+        lazy = TestRun.load(self.pav_cfg, test.working_dir, test.id, lazy=True)
+        self.assertEqual(lazy.full_id, eager.full_id)
+        self.assertIsNone(lazy._var_man)
+        self.assertEqual(lazy.var_man.as_dict(), eager.var_man.as_dict())
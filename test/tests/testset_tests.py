@@ -1,6 +1,7 @@
 """Tests for the test_set module."""
 
 from pavilion.series.test_set import TestSet, TestSetError
+from pavilion.status_file import STATES
 from pavilion.unittest import PavTestCase
 
 
@@ -85,6 +86,27 @@ class TestSetTests(PavTestCase):
         ts3.make()
         ts3.build()
 
+    def test_build_dedup(self):
+        """Tests that share a build should build it just once, with the rest
+        reusing it."""
+
+        ts1 = TestSet(self.pav_cfg, "test_build_dedup", ['build_parallel.local2*4'])
+        ts1.make()
+        ts1.build()
+
+        self.assertEqual(len({test.build_name for test in ts1.tests}), 1)
+
+        reused = 0
+        for test in ts1.tests:
+            states = [status.state for status in test.status.history()]
+            self.assertIn(STATES.BUILD_DONE, states)
+            if STATES.BUILD_REUSED in states:
+                reused += 1
+                # Tests reusing the build shouldn't have waited on its lock.
+                self.assertNotIn(STATES.BUILD_WAIT, states)
+
+        self.assertEqual(reused, 3)
+
     def test_rebuild(self):
         """Check that rebuilds are handled properly."""
 
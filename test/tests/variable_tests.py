@@ -1,3 +1,6 @@
+import copy
+import pickle
+
 import pavilion.deferred
 from pavilion.resolver import variables
 from pavilion.errors import VariableError, DeferredError
@@ -187,3 +190,52 @@ class TestVariables(PavTestCase):
                 pass
             else:
                 self.fail("Did not raise the appropriate error.")
+
+    def test_permutations(self):
+        """Check that permuted variable managers share unchanged data with
+        the original, but never see each other's changes."""
+
+        # pylint: disable=protected-access
+
+        var_man = variables.VariableSetManager()
+        var_man.add_var_set('var', {
+            'ints': ['1', '2', '3'],
+            'structs': [{'x': '1', 'y': '2'}, {'x': '3', 'y': '4'}],
+            'ref': '{{ints}}-{{structs.x}}',
+        })
+        var_man.add_var_set('sys', {'big': [str(i) for i in range(100)]})
+        orig = var_man.as_dict()
+
+        perms = var_man.get_permutations([('var', 'ints'), ('var', 'structs')])
+        self.assertEqual(len(perms), 6)
+        self.assertEqual([(p['ints'], p['structs.x']) for p in perms],
+                         [('1', '1'), ('1', '3'), ('2', '1'),
+                          ('2', '3'), ('3', '1'), ('3', '3')])
+        # Unpermuted var sets are shared outright.
+        for perm in perms:
+            self.assertIs(perm.variable_sets['sys'], var_man.variable_sets['sys'])
+
+        for perm in perms:
+            perm.resolve_references()
+        self.assertEqual([p['ref'] for p in perms],
+                         ['1-1', '1-3', '2-1', '2-3', '3-1', '3-3'])
+        self.assertEqual(var_man.as_dict(), orig)
+
+        perms[0]._set_value('structs.x', 'changed')
+        var_man._set_value('structs.1.y', 'base')
+        self.assertEqual(perms[0]['structs.x'], 'changed')
+        self.assertEqual(perms[2]['structs.x'], '1')
+        self.assertEqual(perms[1]['structs.y'], '4')
+        self.assertEqual(var_man['structs.0.x'], '1')
+        self.assertEqual(var_man['structs.1.y'], 'base')
+
+        var_copy = copy.deepcopy(var_man)
+        var_copy._set_value('sys.big.5', 'five')
+        self.assertEqual(var_man['sys.big.5'], '5')
+        self.assertEqual(var_copy['sys.big.5'], 'five')
+
+        perm = pickle.loads(pickle.dumps(perms[3]))
+        self.assertEqual(perm, perms[3])
+        perm._set_value('ints', '10')
+        self.assertEqual(perm['ints'], '10')
+        self.assertEqual(perms[3]['ints'], '2')
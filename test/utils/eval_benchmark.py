@@ -0,0 +1,109 @@
+"""
+Result evaluation benchmark.
+
+Usage: python3 eval_benchmark.py [records]
+
+Evaluates a set of typical result evaluation expressions against <records>
+(default 50000) synthetic result dicts, both by transforming each expression's
+parse tree for every record (as result evaluation used to), and with compiled
+evaluation plans. Checks that both give the same values, and prints the time
+each took.
+"""
+
+from pathlib import Path
+import random
+import sys
+import time
+
+libdir = (Path(__file__).resolve().parents[2]/'lib').as_posix()
+sys.path.append(libdir)
+
+from pavilion import parsers
+from pavilion import plugins
+from pavilion.unittest import PavTestCase
+
+if '--help' in sys.argv or '-h' in sys.argv:
+    print(__doc__)
+    sys.exit(0)
+
+record_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+EXPRESSIONS = [
+    'return_value == 0',
+    'duration * 1000',
+    'sum(per_file.*.flops) / len(per_file)',
+    'avg(per_file.*.time) < 10.5',
+    'max(per_file.*.flops) - min(per_file.*.flops)',
+    'per_file.*.flops > 100',
+    'result == "PASS" and not timed_out',
+]
+
+
+def synthetic_results(count):
+    """Generate 'count' synthetic result dicts."""
+
+    rand = random.Random(42)
+    records = []
+    for rec_id in range(count):
+        per_file = {}
+        for node in range(rand.randint(1, 8)):
+            per_file['node{:02d}'.format(node)] = {
+                'flops': rand.uniform(50, 150),
+                'time': rand.uniform(1, 20),
+            }
+        records.append({
+            'id': rec_id,
+            'return_value': rand.choice([0, 0, 0, 1]),
+            'duration': rand.uniform(1, 100),
+            'result': rand.choice(['PASS', 'PASS', 'FAIL']),
+            'timed_out': rand.random() < 0.05,
+            'per_file': per_file,
+        })
+    return records
+
+
+def evaluate_by_tree(expr, records):
+    """Evaluate the expression by transforming its parse tree for each record."""
+
+    tree = parsers.parse_expression(expr)
+    values = []
+    for results in records:
+        try:
+            values.append(parsers.EvaluationExprTransformer(results).transform(tree))
+        except (parsers.ParserValueError, ArithmeticError, TypeError, ValueError) as err:
+            values.append(err)
+    return values
+
+
+case = PavTestCase()
+case.set_up()
+try:
+    plugins.initialize_plugins(case.pav_cfg)
+    records = synthetic_results(record_count)
+
+    tree_total = plan_total = 0
+    for expr in EXPRESSIONS:
+        start = time.time()
+        tree_values = evaluate_by_tree(expr, records)
+        tree_time = time.time() - start
+
+        start = time.time()
+        plan_values = parsers.get_evaluation_plan(expr).evaluate_many(records)
+        plan_time = time.time() - start
+
+        same = all(
+            (str(tree_val) == str(plan_val) if isinstance(tree_val, Exception)
+             else tree_val == plan_val)
+            for tree_val, plan_val in zip(tree_values, plan_values))
+        if not same:
+            print("Values differ for expression '{}'".format(expr))
+            sys.exit(1)
+
+        tree_total += tree_time
+        plan_total += plan_time
+        print("{:50s} {:8.3f}s tree, {:8.3f}s plan".format(expr, tree_time, plan_time))
+
+    print("{:50s} {:8.3f}s tree, {:8.3f}s plan ({} records)"
+          .format('total', tree_total, plan_total, record_count))
+finally:
+    case.tear_down()
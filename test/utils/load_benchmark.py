@@ -0,0 +1,78 @@
+"""
+Test run loading benchmark.
+
+Usage: python3 load_benchmark.py [count]
+
+Creates a synthetic working directory with <count> test runs (default 10000),
+which are copies of a single quick test, and then times loading every one of
+them with TestRun.load(), both normally and lazily (lazy=True). Each test's
+current status is read as well, as a stand in for what most commands then
+do with the test.
+
+The working directory is created in a temp directory, and removed afterwards.
+"""
+
+from pathlib import Path
+import json
+import shutil
+import sys
+import tempfile
+import time
+
+libdir = (Path(__file__).resolve().parents[2]/'lib').as_posix()
+sys.path.append(libdir)
+
+from pavilion import dir_db
+from pavilion.test_run import TestRun, TestSummary
+from pavilion.unittest import PavTestCase
+
+if '--help' in sys.argv or '-h' in sys.argv:
+    print(__doc__)
+    sys.exit(0)
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+case = PavTestCase()
+case.set_up()
+pav_cfg = case.pav_cfg
+
+working_dir = Path(tempfile.mkdtemp())
+try:
+    for subdir in case.WORKING_DIRS:
+        (working_dir/subdir).mkdir()
+    pav_cfg['working_dir'] = working_dir
+
+    base_test = case._quick_test()  # pylint: disable=protected-access
+    runs_dir = working_dir/TestRun.RUN_DIR
+
+    print("Creating {} test runs in {}".format(count, working_dir))
+    for test_id in range(base_test.id + 1, base_test.id + count):
+        test_path = dir_db.make_id_path(runs_dir, test_id)
+        shutil.copytree(base_test.path.as_posix(), test_path.as_posix(),
+                        symlinks=True)
+
+        # Give each copy its own id.
+        attr_path = test_path/TestRun.ATTR_FILE_NAME
+        attrs = json.loads(attr_path.read_text())
+        attrs['id'] = test_id
+        attr_path.write_text(json.dumps(attrs))
+
+        summary_path = test_path/TestSummary.SUMMARY_FN
+        summary = json.loads(summary_path.read_text())
+        summary['attributes']['id'] = test_id
+        summary_path.write_text(json.dumps(summary))
+
+    test_ids = list(range(base_test.id, base_test.id + count))
+
+    for lazy in False, True:
+        start = time.time()
+        for test_id in test_ids:
+            test = TestRun.load(pav_cfg, working_dir, test_id, lazy=lazy)
+            test.status.current()
+        total = time.time() - start
+
+        print("{:6s} load: {:8.3f}s total, {:8.3f}ms per test".format(
+            'lazy' if lazy else 'eager', total, total/count*1000))
+finally:
+    case.tear_down()
+    shutil.rmtree(working_dir.as_posix())
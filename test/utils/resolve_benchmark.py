@@ -0,0 +1,69 @@
+"""
+Test config resolution benchmark.
+
+Usage: python3 resolve_benchmark.py [tests] [permutations]
+
+Generates a suite with <tests> tests (default 500), each with <permutations>
+permutations (default 10), and times resolving the whole suite with
+TestConfigResolver.load() using each of the serial, thread and process
+resolution modes.
+
+The suite is written to a temp config directory, which is removed afterwards.
+"""
+
+from pathlib import Path
+import shutil
+import sys
+import tempfile
+import time
+
+libdir = (Path(__file__).resolve().parents[2]/'lib').as_posix()
+sys.path.append(libdir)
+
+from pavilion.resolver import TestConfigResolver
+from pavilion.unittest import PavTestCase
+
+if '--help' in sys.argv or '-h' in sys.argv:
+    print(__doc__)
+    sys.exit(0)
+
+test_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+permutations = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+cfg_dir = Path(tempfile.mkdtemp())
+try:
+    (cfg_dir/'tests').mkdir()
+    with (cfg_dir/'tests'/'resolve_bench.yaml').open('w') as suite_file:
+        for i in range(test_count):
+            suite_file.write(
+                "test{i}:\n"
+                "    scheduler: raw\n"
+                "    permute_on: [perm]\n"
+                "    variables:\n"
+                "        perm: [{perms}]\n"
+                "        greeting: 'hello {i}'\n"
+                "    run:\n"
+                "        cmds: ['echo \"{{{{greeting}}}} {{{{perm}}}} {{{{sys.sys_name}}}}\"']\n"
+                .format(i=i, perms=', '.join(str(p) for p in range(permutations))))
+
+    case = PavTestCase()
+    case.pav_cfg = case.make_pav_config(
+        config_dirs=[PavTestCase.TEST_DATA_ROOT/'pav_config_dir', cfg_dir])
+    case.set_up()
+
+    for mode in 'serial', 'thread', 'process':
+        resolver = TestConfigResolver(case.pav_cfg)
+        # Force the resolution mode.
+        resolver.RESOLVE_SERIAL_MAX = test_count if mode == 'serial' else 0
+        resolver.RESOLVE_THREAD_MAX = test_count if mode == 'thread' else 0
+
+        start = time.time()
+        ptests = resolver.load(['resolve_bench'])
+        total = time.time() - start
+
+        print("{:8s} {:6d} tests in {:8.3f}s, {:8.1f} tests/s".format(
+            mode, len(ptests), total, len(ptests)/total))
+
+    case.tear_down()
+finally:
+    shutil.rmtree(cfg_dir.as_posix())
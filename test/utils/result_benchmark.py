@@ -0,0 +1,87 @@
+"""
+Result parsing benchmark.
+
+Usage: python3 result_benchmark.py [files] [max_cpu]
+
+Creates a quick test whose build directory holds a synthetic per-node output
+tree of <files> files (default 5000), and times parsing results from all of
+them with several keys (using 'per_file: name'), with the 'max_cpu' setting at
+1 and then at <max_cpu> (default 8).
+
+Each file looks like the output of a small benchmark, with a block of progress
+lines followed by a table of timings and a summary.
+"""
+
+from pathlib import Path
+import sys
+import time
+
+libdir = (Path(__file__).resolve().parents[2]/'lib').as_posix()
+sys.path.append(libdir)
+
+from pavilion import result
+from pavilion import utils
+from pavilion.unittest import PavTestCase
+
+if '--help' in sys.argv or '-h' in sys.argv:
+    print(__doc__)
+    sys.exit(0)
+
+file_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+max_cpu = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+NODE_OUTPUT = """Starting run on {node}
+{progress}
+Timings:
+phase    time    rate
+setup    1.{n}   10.{n}
+solve    2.{n}   20.{n}
+cleanup  3.{n}   30.{n}
+
+Total time: {n}.5
+Result: PASSED
+"""
+
+case = PavTestCase()
+case.set_up()
+try:
+    pav_cfg = case.pav_cfg
+
+    cfg = case._quick_test_cfg()  # pylint: disable=protected-access
+    cfg['result_parse'] = {
+        'regex': {
+            '_defaults': {'files': ['nodes/*.out'], 'per_file': 'name'},
+            'node': {'regex': r'^Starting run on (\S+)'},
+            'total': {'regex': r'^Total time: (\S+)'},
+            'passed': {'regex': r'^Result: PASSED', 'action': 'true'},
+            'steps': {'regex': r'^step (\d+)', 'match_select': 'last'},
+        },
+        'table': {
+            'timings': {
+                'files': ['nodes/*.out'],
+                'per_file': 'name',
+                'preceded_by': [r'^Timings:'],
+            },
+        },
+    }
+    test = case._quick_test(cfg, 'result_bench')  # pylint: disable=protected-access
+
+    node_dir = test.path/'build'/'nodes'
+    node_dir.mkdir()
+    progress = '\n'.join('step {}: ok'.format(i) for i in range(50))
+    for i in range(file_count):
+        node = 'node{:05d}'.format(i)
+        (node_dir/(node + '.out')).write_text(
+            NODE_OUTPUT.format(node=node, n=i, progress=progress))
+
+    for cpus in sorted({1, max_cpu}):
+        pav_cfg['max_cpu'] = cpus
+        results = result.base_results(test)
+        start = time.time()
+        result.parse_results(pav_cfg, test, results, utils.IndentedLog())
+        total = time.time() - start
+
+        print("max_cpu {:3d}: {:8.3f}s total, {:8.3f}ms per file ({} files)"
+              .format(cpus, total, total/file_count*1000, file_count))
+finally:
+    case.tear_down()
@@ -0,0 +1,87 @@
+"""
+Scheduler node selection benchmark.
+
+Usage: python3 sched_benchmark.py [tests] [node_counts...]
+
+For each node count (default 10000 and 50000), gives the dummy scheduler a
+synthetic node inventory of that size, and times getting the initial scheduler
+variables (node filtering and chunking) for <tests> test configs (default 1000).
+The test configs cycle through a few partitions, chunk sizes and node selection
+methods, as a large series would.
+"""
+
+from pathlib import Path
+import sys
+import time
+
+libdir = (Path(__file__).resolve().parents[2]/'lib').as_posix()
+sys.path.append(libdir)
+
+from pavilion import plugins
+from pavilion import schedulers
+from pavilion.unittest import PavTestCase
+
+if '--help' in sys.argv or '-h' in sys.argv:
+    print(__doc__)
+    sys.exit(0)
+
+test_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+node_counts = [int(arg) for arg in sys.argv[2:]] or [10000, 50000]
+
+SCHED_CONFIGS = []
+for partition in None, 'foo', 'baz':
+    for chunk_size in '0', '8', '128':
+        for node_select in 'contiguous', 'distributed':
+            sched_config = {
+                'nodes': '1',
+                'chunking': {'size': chunk_size, 'node_selection': node_select},
+            }
+            if partition is not None:
+                sched_config['partition'] = partition
+            SCHED_CONFIGS.append(sched_config)
+
+
+def synthetic_nodes(count):
+    """Return a function that generates raw data for 'count' nodes."""
+
+    def get_raw_node_data(sched_config):
+        nodes = []
+        for node_id in range(count):
+            nodes.append({
+                'name': 'node{:06d}'.format(node_id),
+                'up': (node_id % 50) != 0,
+                'available': (node_id % 50) not in (0, 1),
+                'partitions': ['foo', 'baz'] if node_id % 2 else ['foo'],
+                'reservations': [],
+                'features': ['normal'],
+                'foo': sched_config['dummy']['foo'],
+            })
+        return nodes, None
+
+    return get_raw_node_data
+
+
+case = PavTestCase()
+case.set_up()
+try:
+    plugins.initialize_plugins(case.pav_cfg)
+
+    for node_count in node_counts:
+        # Use a fresh instance for each inventory.
+        dummy = type(schedulers.get_plugin('dummy'))()
+        dummy._get_raw_node_data = synthetic_nodes(node_count)  # pylint: disable=protected-access
+
+        start = time.time()
+        dummy.get_initial_vars(SCHED_CONFIGS[0])
+        first = time.time() - start
+
+        start = time.time()
+        for i in range(test_count):
+            dummy.get_initial_vars(SCHED_CONFIGS[i % len(SCHED_CONFIGS)])
+        total = time.time() - start
+
+        print("{:6d} nodes: {:8.3f}s first test, {:8.3f}s for {} tests "
+              "({:8.3f}ms per test)"
+              .format(node_count, first, total, test_count, total/test_count*1000))
+finally:
+    case.tear_down()
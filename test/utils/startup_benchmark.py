@@ -0,0 +1,126 @@
+"""
+Pavilion startup benchmark.
+
+Usage: python3 startup_benchmark.py [plugins] [runs]
+
+Creates a config directory with <plugins> synthetic user plugins (default 60,
+split between system variable, result parser and expression function plugins),
+and then times:
+
+- Initializing the plugin system with a cold plugin manifest, and with a warm one.
+- Running 'pav status' (in a subprocess, so including interpreter startup) with
+  a warm manifest, <runs> times (default 5).
+
+The config and working directories are created in a temp directory, and removed
+afterwards.
+"""
+
+from pathlib import Path
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+libdir = (Path(__file__).resolve().parents[2]/'lib').as_posix()
+sys.path.append(libdir)
+
+from pavilion import plugins
+from pavilion.unittest import PavTestCase
+
+if '--help' in sys.argv or '-h' in sys.argv:
+    print(__doc__)
+    sys.exit(0)
+
+plugin_count = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+PAV_BIN = Path(__file__).resolve().parents[2]/'bin'/'pav'
+
+PLUGIN_INFO = """[Core]
+Name = {name}
+Module = {name}
+"""
+
+PLUGINS = {
+    'sys': """
+from pavilion.sys_vars import SystemPlugin
+
+class Bench(SystemPlugin):
+    def __init__(self):
+        super().__init__(name='{name}', description='Benchmark plugin.')
+
+    def _get(self):
+        return '{name}'
+""",
+    'result': """
+import yaml_config as yc
+from pavilion.result_parsers import ResultParser
+
+class Bench(ResultParser):
+    def __init__(self):
+        super().__init__(name='{name}', description='Benchmark plugin.',
+                         config_elems=[yc.StrElem('thing')])
+
+    def __call__(self, file, thing=None):
+        return thing
+""",
+    'function': """
+from pavilion.expression_functions import FunctionPlugin
+
+class Bench(FunctionPlugin):
+    def __init__(self):
+        super().__init__(name='{name}', arg_specs=(int,),
+                         description='Benchmark plugin.')
+
+    @staticmethod
+    def {name}(val):
+        return val
+""",
+}
+
+tmp_dir = Path(tempfile.mkdtemp())
+try:
+    cfg_dir = tmp_dir/'config'
+    working_dir = tmp_dir/'working_dir'
+    for subdir in PavTestCase.WORKING_DIRS:
+        (working_dir/subdir).mkdir(parents=True)
+
+    kinds = sorted(PLUGINS)
+    for i in range(plugin_count):
+        kind = kinds[i % len(kinds)]
+        name = 'bench_{}_{}'.format(kind, i)
+        plugin_dir = cfg_dir/'plugins'/kind
+        plugin_dir.mkdir(parents=True, exist_ok=True)
+        (plugin_dir/(name + '.yapsy-plugin')).write_text(PLUGIN_INFO.format(name=name))
+        (plugin_dir/(name + '.py')).write_text(PLUGINS[kind].format(name=name))
+
+    (cfg_dir/'pavilion.yaml').write_text(
+        "working_dir: {}\nconfig_dirs: [{}]\n".format(working_dir, cfg_dir))
+
+    case = PavTestCase()
+    pav_cfg = case.make_pav_config(config_dirs=[cfg_dir])
+    pav_cfg['working_dir'] = working_dir
+
+    for state in 'cold', 'warm':
+        start = time.time()
+        plugins.initialize_plugins(pav_cfg)
+        total = time.time() - start
+        plugins._reset_plugins()  # pylint: disable=protected-access
+        print("{} plugin init ({} plugins): {:8.3f}ms"
+              .format(state, plugin_count, total*1000))
+
+    env = dict(os.environ, PAV_CONFIG_DIR=cfg_dir.as_posix())
+    times = []
+    for _ in range(runs):
+        start = time.time()
+        subprocess.run([PAV_BIN.as_posix(), 'status'], env=env,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       check=False)
+        times.append(time.time() - start)
+
+    print("pav status (warm): {:8.3f}ms best, {:8.3f}ms mean"
+          .format(min(times)*1000, sum(times)/len(times)*1000))
+finally:
+    shutil.rmtree(tmp_dir.as_posix())